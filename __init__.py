@@ -20,7 +20,9 @@ class DomainFilteringPipeline:
         excluded_domains_file: str = "data/excluded_domains.txt",
         enable_spam_filter: bool = True,
         fetch_metrics: bool = True,
-        api_client = None
+        api_client = None,
+        spam_threshold: int = 1,
+        spam_score_threshold: float = 0.1
     ):
         """
         Инициализация pipeline фильтрации
@@ -31,6 +33,8 @@ class DomainFilteringPipeline:
             enable_spam_filter: Включить фильтр спама
             fetch_metrics: Собирать дополнительные метрики
             api_client: Экземпляр API клиента (для сбора метрик)
+            spam_threshold: Минимум спам-анкоров для пометки домена
+            spam_score_threshold: Минимальная взвешенная доля спам-анкоров
         """
         from .spam_filter import SpamFilter, DomainExcluder
         from .metrics_collector import DomainMetricsCollector
@@ -39,6 +43,8 @@ class DomainFilteringPipeline:
         self.domain_excluder = DomainExcluder(excluded_domains_file)
         self.enable_spam_filter = enable_spam_filter
         self.fetch_metrics = fetch_metrics
+        self.spam_threshold = spam_threshold
+        self.spam_score_threshold = spam_score_threshold
         
         self.metrics_collector = None
         if fetch_metrics and api_client:
@@ -81,8 +87,8 @@ class DomainFilteringPipeline:
         # 3. Группируем backlinks по доменам
         domain_backlinks = self._group_backlinks_by_domain(backlinks)
         
-        # 4. Обрабатываем каждый домен
-        filtered_domains = []
+        # 4. Отбираем зарегистрированные домены
+        candidates = []
         
         for domain_info in domains:
             # Получаем домен из объекта DomainInfo
@@ -107,33 +113,45 @@ class DomainFilteringPipeline:
                 logger.debug(f"{domain}: пропущен (не зарегистрирован)")
                 continue
             
+            candidates.append((domain, domain_info))
+        
+        # 5. Проверяем анкоры всех доменов одним пакетом
+        spam_results = {}
+        if self.enable_spam_filter:
+            anchor_groups = {
+                domain: [
+                    getattr(bl, 'anchor_text', None)
+                    for bl in domain_backlinks[domain]
+                ]
+                for domain, _ in candidates
+                if domain in domain_backlinks
+            }
+            spam_results = self.spam_filter.scan_anchor_groups(
+                anchor_groups,
+                spam_threshold=self.spam_threshold,
+                spam_score_threshold=self.spam_score_threshold,
+                max_examples=3
+            )
+        
+        # 6. Обрабатываем каждый домен
+        filtered_domains = []
+        
+        for domain, domain_info in candidates:
             # Проверяем исключения
             is_excluded = self.domain_excluder.is_excluded(domain)
             if is_excluded:
                 logger.debug(f"{domain}: исключен из списка")
             
-            # Фильтруем по спам-анкорам
             domain_links = domain_backlinks.get(domain, [])
-            is_spam = False
-            spam_examples = []
+            spam_result = spam_results.get(domain)
+            is_spam = bool(spam_result and spam_result.is_spam)
+            spam_examples = spam_result.examples if is_spam else []
             
-            if self.enable_spam_filter and domain_links:
-                is_spam = any(
-                    self.spam_filter.is_spam_anchor(
-                        getattr(bl, 'anchor_text', None)
-                    )
-                    for bl in domain_links
+            if is_spam:
+                logger.debug(
+                    f"{domain}: помечен как спам "
+                    f"(примеры: {spam_examples[:2]})"
                 )
-                
-                if is_spam:
-                    spam_examples = self.spam_filter.get_spam_examples(
-                        domain_links,
-                        max_examples=3
-                    )
-                    logger.debug(
-                        f"{domain}: помечен как спам "
-                        f"(примеры: {spam_examples[:2]})"
-                    )
             
             # Получаем DR из domain_info если доступен
             dr = getattr(domain_info, 'dr', None)
@@ -145,9 +163,11 @@ class DomainFilteringPipeline:
                 backlink_count=len(domain_links),
                 dr=dr,
                 ur=ur,
-                is_registered=is_registered,
+                is_registered=True,
                 is_spam=is_spam,
                 is_excluded=is_excluded,
+                spam_score=round(spam_result.spam_score, 4) if spam_result else None,
+                spam_ratio=round(spam_result.spam_ratio, 4) if spam_result else None,
                 spam_anchor_examples=spam_examples,
                 checked_at=datetime.now()
             )
@@ -156,7 +176,7 @@ class DomainFilteringPipeline:
         
         logger.info(f"Обработано доменов: {len(filtered_domains)}")
         
-        # 5. Собираем дополнительные метрики (опционально)
+        # 7. Собираем дополнительные метрики (опционально)
         if self.fetch_metrics and self.metrics_collector:
             logger.info("")
             logger.info("Сбор дополнительных метрик...")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк ExcelExporter: обычный Workbook против потокового write-only режима
+
+Каждый замер выполняется в отдельном процессе, чтобы пиковый RSS
+(ru_maxrss) относился только к одному экспорту.
+
+Пример:
+    python benchmarks/bench_excel_export.py --rows 10000 100000 500000
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def make_domains(count: int, spam_share: float = 0.1, seed: int = 42) -> list:
+    """Синтетические домены с заполненными метриками"""
+    from src.models.filtered_domain import FilteredDomain
+    
+    rng = random.Random(seed)
+    return [
+        FilteredDomain(
+            domain=f"domain{i}.com",
+            backlink_count=rng.randint(1, 500),
+            dr=rng.randint(0, 100) or None,
+            ur=rng.randint(0, 100),
+            total_backlinks=rng.randint(1, 100000),
+            referring_domains=rng.randint(1, 5000),
+            organic_traffic=rng.randint(0, 100000),
+            is_registered=rng.random() < 0.8,
+            is_spam=rng.random() < spam_share,
+            spam_score=round(rng.random(), 4),
+            spam_ratio=round(rng.random(), 4),
+            availability_status="AVAILABLE",
+        )
+        for i in range(count)
+    ]
+
+
+def run_single(rows: int, write_only: bool) -> dict:
+    """Один замер в текущем процессе"""
+    from src.export.excel_exporter import ExcelExporter
+    
+    domains = make_domains(rows)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        ExcelExporter.export(
+            domains,
+            str(Path(tmp) / "report.xlsx"),
+            include_spam=True,
+            target_domain="example.com",
+            write_only=write_only
+        )
+        elapsed = time.perf_counter() - start
+    
+    # ru_maxrss в Linux - килобайты
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "rows": rows,
+        "mode": "write-only" if write_only else "normal",
+        "seconds": round(elapsed, 2),
+        "peak_rss_mb": round(rss_after / 1024, 1),
+        "export_rss_mb": round((rss_after - rss_before) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 500000],
+                        help='Размеры отчетов (строк)')
+    parser.add_argument('--modes', nargs='+', choices=['normal', 'write-only'],
+                        default=['normal', 'write-only'])
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.single:
+        print(json.dumps(run_single(args.rows[0], args.modes[0] == 'write-only')))
+        return
+    
+    print(f"{'rows':>8} {'mode':>11} {'time, s':>9} {'peak RSS, MB':>13} {'export RSS, MB':>15}")
+    for rows in args.rows:
+        for mode in args.modes:
+            output = subprocess.run(
+                [sys.executable, __file__, '--single', '--rows', str(rows), '--modes', mode],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{result['rows']:>8} {result['mode']:>11} {result['seconds']:>9} "
+                f"{result['peak_rss_mb']:>13} {result['export_rss_mb']:>15}"
+            )
+
+
+if __name__ == '__main__':
+    main()
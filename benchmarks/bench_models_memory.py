@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк памяти моделей: dataclass с __dict__, __slots__ и DomainBatch
+
+Строки доменов создаются заранее и общие для всех вариантов, поэтому
+замер показывает только накладные расходы хранения результата.
+
+Пример:
+    python benchmarks/bench_models_memory.py --domains 1000000
+"""
+
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.models.domain_batch import DomainBatch
+from src.models.filtered_domain import FilteredDomain
+
+
+@dataclass
+class LegacyFilteredDomain:
+    """Прежняя модель: обычный dataclass и список на каждый домен"""
+    domain: str
+    dr: Optional[int] = None
+    ur: Optional[int] = None
+    backlink_count: int = 0
+    total_backlinks: Optional[int] = None
+    referring_domains: Optional[int] = None
+    organic_traffic: Optional[int] = None
+    is_registered: bool = True
+    is_spam: bool = False
+    is_excluded: bool = False
+    spam_score: Optional[float] = None
+    spam_ratio: Optional[float] = None
+    availability_status: Optional[str] = None
+    spam_anchor_examples: List[str] = field(default_factory=list)
+    checked_at: Optional[datetime] = None
+
+
+def make_rows(count: int, seed: int = 42) -> list:
+    """Параметры доменов (как после пайплайна: метрики, статус, спам)"""
+    rng = random.Random(seed)
+    checked_at = datetime.now()
+    statuses = ("AVAILABLE", "REGISTERED", "UNKNOWN")
+    rows = []
+    for i in range(count):
+        is_spam = rng.random() < 0.05
+        rows.append(dict(
+            domain=f"domain{i}.com",
+            dr=rng.randint(0, 100),
+            backlink_count=rng.randint(1, 500),
+            is_registered=rng.random() < 0.8,
+            is_spam=is_spam,
+            spam_score=round(rng.random(), 4),
+            spam_ratio=round(rng.random(), 4),
+            availability_status=statuses[i % 3],
+            spam_anchor_examples=["casino"] if is_spam else [],
+            checked_at=checked_at,
+        ))
+    return rows
+
+
+def measure(name: str, build) -> None:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    size = len(result)
+    print(f"{name:>22} {current / size:>10.1f} {current / 2**20:>10.1f} {elapsed:>8.2f}")
+    del result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--domains', type=int, default=1000000, help='Число доменов')
+    args = parser.parse_args()
+    
+    rows = make_rows(args.domains)
+    
+    def slotted_rows():
+        for row in rows:
+            row = dict(row)
+            row['spam_anchor_examples'] = tuple(row['spam_anchor_examples'])
+            yield FilteredDomain(**row)
+    
+    print(f"{'variant':>22} {'B/domain':>10} {'total MB':>10} {'build s':>8}")
+    def legacy_rows():
+        for row in rows:
+            row = dict(row)
+            row['spam_anchor_examples'] = list(row['spam_anchor_examples'])
+            yield LegacyFilteredDomain(**row)
+    
+    measure("dataclass (__dict__)", lambda: list(legacy_rows()))
+    measure("dataclass (__slots__)", lambda: list(slotted_rows()))
+    measure("DomainBatch", lambda: DomainBatch(slotted_rows()))
+
+
+if __name__ == '__main__':
+    main()
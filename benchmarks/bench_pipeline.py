@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Офлайн-бенчмарк проверки доступности и полного конвейера анализа
+
+Keys.so, RDAP, WHOIS (и DNS с --dns-latency) заменены локальными серверами
+(fake_servers.py, tests/fake_dns.py), поэтому результаты не зависят от
+сети и лимитов сервисов. Каждый замер выполняется в отдельном процессе
+(пиковый RSS относится к одному сценарию). Итоги пишутся в JSON; с
+--compare печатается изменение относительно предыдущего файла.
+
+Сценарии:
+    check    - DomainAvailabilityChecker.check_domains по списку доменов
+    pipeline - сбор ссылок, проверка, фильтрация и экспорт CSV (PipelinedAnalyzer)
+
+Пример:
+    python benchmarks/bench_pipeline.py --domains 1000 10000 --rdap-latency 0.02
+    python benchmarks/bench_pipeline.py --domains 10000 --compare benchmarks/results/old.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_servers import FakeKeysSoServer, FakeRDAPServer, FakeWhoisServer, RDAPBehavior
+from tests.fake_dns import FakeDNSServer
+
+# TLD, обслуживаемые фейковым RDAP; остальные проверяются через WHOIS
+RDAP_TLDS = ("com", "net", "org")
+DOMAIN_TLDS = ("com", "net", "org", "ru")
+
+
+def percentile(values: list, q: float) -> float:
+    """Перцентиль q (0..100) по отсортированной выборке"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def configure_checker(checker, rdap: FakeRDAPServer, whois: FakeWhoisServer, provider: str) -> None:
+    """Направляет чекер на локальные серверы"""
+    rdap.attach(checker, RDAP_TLDS)
+    whois.attach(checker, provider)
+
+
+def timed(checker, latencies: list) -> None:
+    """Замер задержки каждой проверки домена"""
+    check_domain = checker.check_domain
+    
+    async def check(domain):
+        started = time.perf_counter()
+        try:
+            return await check_domain(domain)
+        finally:
+            latencies.append(time.perf_counter() - started)
+    
+    checker.check_domain = check
+
+
+async def scenario_check(args, rdap, whois, latencies) -> int:
+    from src.availability import DomainAvailabilityChecker
+    
+    checker = DomainAvailabilityChecker(
+        whois_api_key="bench",
+        whois_provider=args.whois_provider,
+        max_concurrent=args.max_workers,
+        per_server_limit=args.per_server_limit,
+        dns_prefilter=args.dns_address is not None,
+        dns_resolver=args.dns_address
+    )
+    configure_checker(checker, rdap, whois, args.whois_provider)
+    timed(checker, latencies)
+    domains = [f"site{i}.{DOMAIN_TLDS[i % len(DOMAIN_TLDS)]}" for i in range(args.domains[0])]
+    async with checker:
+        results = await checker.check_domains(domains)
+    return len(results)
+
+
+async def scenario_pipeline(args, rdap, whois, latencies) -> int:
+    from src.api.keys_so_client import KeysSoClient
+    from src.availability import DomainAvailabilityChecker
+    from src.export.fanout import FanOutExporter
+    from src.filtering import DomainFilteringPipeline
+    from src.runner import PipelinedAnalyzer
+    
+    domains = args.domains[0]
+    links = domains * args.links_per_domain
+    async with FakeKeysSoServer(links, domains, tlds=DOMAIN_TLDS, latency=args.keys_latency) as keys:
+        checker = DomainAvailabilityChecker(
+            whois_api_key="bench",
+            whois_provider=args.whois_provider,
+            max_concurrent=args.max_workers,
+            dns_prefilter=args.dns_address is not None,
+            dns_resolver=args.dns_address
+        )
+        configure_checker(checker, rdap, whois, args.whois_provider)
+        timed(checker, latencies)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            async with KeysSoClient(api_key="bench", base_url=keys.url, rate_limit=0) as client:
+                pipeline = DomainFilteringPipeline(
+                    spam_phrases_file="data/spam_phrases.txt",
+                    excluded_domains_file="data/excluded_domains.txt",
+                    fetch_metrics=False
+                )
+                analyzer = PipelinedAnalyzer(
+                    client, checker, pipeline,
+                    limit=links,
+                    check_workers=args.max_workers
+                )
+                exporter = FanOutExporter.for_formats(str(Path(tmp) / "report"), ["csv"])
+                async with checker:
+                    result = await analyzer.run("target.example", export=exporter.export_async)
+        
+        args.server_stats["keys_so"] = keys.stats.to_dict()
+        args.stages = [stage.to_dict() for stage in result.stages]
+    return result.domains
+
+
+async def run_single_async(args) -> dict:
+    behavior = RDAPBehavior(
+        available=0.3,
+        rate_limited=args.rdap_429,
+        server_error=args.rdap_5xx,
+        latency=args.rdap_latency,
+        jitter=args.jitter
+    )
+    latencies = []
+    args.server_stats = {}
+    args.stages = None
+    
+    async with contextlib.AsyncExitStack() as stack:
+        rdap = await stack.enter_async_context(FakeRDAPServer(behavior))
+        whois = await stack.enter_async_context(
+            FakeWhoisServer(latency=args.whois_latency, jitter=args.jitter)
+        )
+        dns = None
+        args.dns_address = None
+        if args.dns_latency is not None:
+            dns = await stack.enter_async_context(FakeDNSServer(latency=args.dns_latency))
+            args.dns_address = dns.address
+        scenario = scenario_check if args.scenario == 'check' else scenario_pipeline
+        started = time.perf_counter()
+        checked = await scenario(args, rdap, whois, latencies)
+        elapsed = time.perf_counter() - started
+        args.server_stats["rdap"] = rdap.stats.to_dict()
+        args.server_stats["whois"] = whois.stats.to_dict()
+        if dns is not None:
+            args.server_stats["dns"] = dns.stats.to_dict()
+    
+    result = {
+        "scenario": args.scenario,
+        "domains": args.domains[0],
+        "checked": checked,
+        "seconds": round(elapsed, 3),
+        "throughput": round(checked / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        },
+        # ru_maxrss в Linux - килобайты
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "servers": args.server_stats,
+    }
+    if args.stages:
+        result["stages"] = args.stages
+    return result
+
+
+def compare(results: list, baseline_file: str) -> None:
+    """Изменение пропускной способности и p99 относительно прошлого прогона"""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = {
+            (r["scenario"], r["domains"]): r
+            for r in json.load(f)["results"]
+        }
+    print(f"\nСравнение с {baseline_file}:")
+    for result in results:
+        old = baseline.get((result["scenario"], result["domains"]))
+        if not old:
+            continue
+        throughput = (result["throughput"] / old["throughput"] - 1) * 100 if old["throughput"] else 0.0
+        p99 = result["latency_ms"]["p99"] - old["latency_ms"]["p99"]
+        print(
+            f"  {result['scenario']:>8} {result['domains']:>7}: "
+            f"пропускная способность {throughput:+.1f}%, p99 {p99:+.1f} ms, "
+            f"RSS {result['peak_rss_mb'] - old['peak_rss_mb']:+.1f} MB"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=['check', 'pipeline'],
+                        default=['check', 'pipeline'])
+    parser.add_argument('--domains', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Размеры сценариев (доменов)')
+    parser.add_argument('--links-per-domain', type=int, default=3)
+    parser.add_argument('--max-workers', type=int, default=50)
+    parser.add_argument('--per-server-limit', type=int, default=10,
+                        help='Параллельных запросов к одному RDAP-серверу (check)')
+    parser.add_argument('--whois-provider', choices=FakeWhoisServer.PROVIDERS, default='whoisxml')
+    parser.add_argument('--rdap-latency', type=float, default=0.01, help='Задержка RDAP, s')
+    parser.add_argument('--whois-latency', type=float, default=0.02, help='Задержка WHOIS, s')
+    parser.add_argument('--dns-latency', type=float,
+                        help='DNS-префильтр с локальным резолвером и этой задержкой, s')
+    parser.add_argument('--keys-latency', type=float, default=0.01, help='Задержка страницы Keys.so, s')
+    parser.add_argument('--jitter', type=float, default=0.005, help='Разброс задержек, s')
+    parser.add_argument('--rdap-429', type=float, default=0.0, help='Доля ответов 429')
+    parser.add_argument('--rdap-5xx', type=float, default=0.0, help='Доля ответов 503')
+    parser.add_argument('--output', help='JSON с результатами '
+                        '(по умолчанию: benchmarks/results/pipeline-ДАТА.json)')
+    parser.add_argument('--compare', help='JSON прошлого прогона для сравнения')
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--scenario', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.single:
+        print(json.dumps(asyncio.run(run_single_async(args))))
+        return
+    
+    passthrough = [
+        '--links-per-domain', str(args.links_per_domain),
+        '--max-workers', str(args.max_workers),
+        '--per-server-limit', str(args.per_server_limit),
+        '--whois-provider', args.whois_provider,
+        '--rdap-latency', str(args.rdap_latency),
+        '--whois-latency', str(args.whois_latency),
+        '--keys-latency', str(args.keys_latency),
+        '--jitter', str(args.jitter),
+        '--rdap-429', str(args.rdap_429),
+        '--rdap-5xx', str(args.rdap_5xx),
+    ]
+    if args.dns_latency is not None:
+        passthrough += ['--dns-latency', str(args.dns_latency)]
+    
+    results = []
+    print(f"{'scenario':>8} {'domains':>7} {'time, s':>9} {'domains/s':>10} "
+          f"{'p50, ms':>8} {'p99, ms':>8} {'RSS, MB':>8} {'conn rdap/whois':>16}")
+    for scenario in args.scenarios:
+        for domains in args.domains:
+            output = subprocess.run(
+                [sys.executable, __file__, '--single', '--scenario', scenario,
+                 '--domains', str(domains), *passthrough],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            servers = result["servers"]
+            print(
+                f"{scenario:>8} {domains:>7} {result['seconds']:>9} {result['throughput']:>10} "
+                f"{result['latency_ms']['p50']:>8} {result['latency_ms']['p99']:>8} "
+                f"{result['peak_rss_mb']:>8} "
+                f"{servers['rdap']['connections']:>7}/{servers['whois']['connections']:<8}"
+            )
+    
+    output_file = Path(
+        args.output or
+        f"benchmarks/results/pipeline-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            "created_at": datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k not in ('single', 'scenario', 'compare', 'output')},
+            "results": results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты: {output_file}")
+    
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
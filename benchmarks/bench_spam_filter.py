@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк SpamFilter: автомат Ахо–Корасик против регулярки на каждую фразу
+
+Пример:
+    python benchmarks/bench_spam_filter.py --phrases 10000 --anchors 1000000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.filtering.spam_filter import SpamFilter
+
+
+def make_words(rng: random.Random, count: int) -> list:
+    """Словарь случайных слов"""
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return list({
+        ''.join(rng.choice(letters) for _ in range(rng.randint(3, 9)))
+        for _ in range(count)
+    })
+
+
+def legacy_is_spam(phrases, anchor: str) -> bool:
+    """Прежняя реализация is_spam_anchor"""
+    normalized = anchor.lower().strip()
+    for phrase in phrases:
+        if re.search(r'\b' + re.escape(phrase) + r'\b', normalized):
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--phrases', type=int, default=10000)
+    parser.add_argument('--anchors', type=int, default=1000000)
+    parser.add_argument(
+        '--legacy-sample',
+        type=int,
+        default=50,
+        help='Сколько анкоров прогнать через старую реализацию (для экстраполяции)'
+    )
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    vocabulary = make_words(rng, 50000)
+    phrases = {
+        ' '.join(rng.sample(vocabulary, rng.randint(1, 3)))
+        for _ in range(args.phrases)
+    }
+    anchors = [
+        ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 6)))
+        for _ in range(args.anchors)
+    ]
+    
+    spam_filter = SpamFilter()
+    spam_filter.spam_phrases = phrases
+    spam_filter._loaded = True
+    
+    started = time.perf_counter()
+    matcher = spam_filter.matcher
+    build_time = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    spam_count = sum(1 for anchor in anchors if spam_filter.is_spam_anchor(anchor))
+    scan_time = time.perf_counter() - started
+    
+    sample = anchors[:args.legacy_sample]
+    started = time.perf_counter()
+    for anchor in sample:
+        legacy_is_spam(phrases, anchor)
+    legacy_time = (time.perf_counter() - started) / max(len(sample), 1) * len(anchors)
+    
+    print(f"Фраз: {len(matcher)}, анкоров: {len(anchors)}, спам: {spam_count}")
+    print(f"Сборка автомата:      {build_time:.3f}s")
+    print(f"Ахо–Корасик:          {scan_time:.2f}s ({len(anchors) / scan_time:,.0f} анкоров/с)")
+    print(f"Регулярки (оценка):   {legacy_time:.0f}s по выборке из {len(sample)} анкоров")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк холодного старта domain_analyzer.py с бюджетом времени
+
+Каждый запуск - новый процесс интерпретатора. Кроме времени
+проверяется, какие тяжелые библиотеки были импортированы (по
+-X importtime): --help не должен загружать ни одну из них, запуск с
+CSV - только aiohttp.
+
+Сценарии:
+    help - domain_analyzer.py --help
+    run  - анализ небольшого числа ссылок (локальный Keys.so из
+           fake_servers.py, --skip-rdap --skip-dns, без метрик, отчет CSV)
+
+Код возврата 1, если медиана времени сценария выше бюджета или
+загружена лишняя библиотека - для проверки в CI.
+
+Пример:
+    python benchmarks/bench_startup.py --repeat 5 --budget-help 0.5 --budget-run 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_servers import FakeKeysSoServer
+
+# Библиотеки, загрузка которых заметна при старте
+HEAVY_MODULES = ("aiohttp", "aiosqlite", "openpyxl", "pyarrow", "tldextract")
+
+# Что допустимо загрузить в каждом сценарии
+ALLOWED = {
+    "help": set(),
+    "run": {"aiohttp"},
+}
+
+
+def imported_heavy(stderr: str) -> list:
+    """Тяжелые библиотеки из вывода -X importtime"""
+    found = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        module = line.rsplit("|", 1)[-1].strip().split(".")[0]
+        if module in HEAVY_MODULES:
+            found.add(module)
+    return sorted(found)
+
+
+def command(scenario: str, work_dir: str) -> list:
+    analyzer = str(ROOT / "domain_analyzer.py")
+    if scenario == "help":
+        return [sys.executable, analyzer, "--help"]
+    return [
+        sys.executable, analyzer, "target.example",
+        "--limit", "200", "--skip-rdap", "--skip-dns", "--skip-metrics", "-f", "csv",
+        "--no-checkpoint", "-o", os.path.join(work_dir, "report"),
+    ]
+
+
+def measure(scenario: str, repeat: int, env: dict, work_dir: str) -> dict:
+    """Время запусков и загруженные библиотеки"""
+    args = command(scenario, work_dir)
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(args, env=env, cwd=ROOT, check=True, capture_output=True)
+        times.append(time.perf_counter() - started)
+
+    traced = subprocess.run(
+        [args[0], "-X", "importtime", *args[1:]],
+        env=env, cwd=ROOT, check=True, capture_output=True, text=True
+    )
+    heavy = imported_heavy(traced.stderr)
+    return {
+        "scenario": scenario,
+        "median_s": round(statistics.median(times), 3),
+        "min_s": round(min(times), 3),
+        "max_s": round(max(times), 3),
+        "heavy_imports": heavy,
+        "unexpected_imports": sorted(set(heavy) - ALLOWED[scenario]),
+    }
+
+
+async def run_all(args) -> list:
+    # Процесс интерпретатора без проекта - нижняя граница любого сценария
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    baseline = time.perf_counter() - started
+    print(f"python -c pass: {baseline:.3f}s")
+
+    results = []
+    async with FakeKeysSoServer(links=args.links, domains=max(1, args.links // 3)) as keys_so:
+        env = dict(
+            os.environ,
+            KEYS_SO_API_KEY="bench",
+            KEYS_SO_BASE_URL=keys_so.url,
+            KEYS_SO_RATE_LIMIT="0",
+            WHOIS_API_KEY="",
+        )
+        with tempfile.TemporaryDirectory() as work_dir:
+            for scenario in args.scenarios:
+                # Сервер работает в этом же цикле событий - замер в потоке
+                result = await asyncio.to_thread(measure, scenario, args.repeat, env, work_dir)
+                result["budget_s"] = args.budget_help if scenario == "help" else args.budget_run
+                result["ok"] = (
+                    result["median_s"] <= result["budget_s"] and not result["unexpected_imports"]
+                )
+                results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=['help', 'run'], default=['help', 'run'])
+    parser.add_argument('--repeat', type=int, default=5, help='Запусков на сценарий')
+    parser.add_argument('--links', type=int, default=200, help='Ссылок в сценарии run')
+    parser.add_argument('--budget-help', type=float, default=0.5, help='Бюджет --help, s (медиана)')
+    parser.add_argument('--budget-run', type=float, default=3.0, help='Бюджет run, s (медиана)')
+    parser.add_argument('--output', help='JSON с результатами '
+                        '(по умолчанию: benchmarks/results/startup-ДАТА.json)')
+    args = parser.parse_args()
+
+    results = asyncio.run(run_all(args))
+
+    print(f"{'scenario':>8} {'median, s':>10} {'min, s':>8} {'budget, s':>10}  тяжелые импорты")
+    for result in results:
+        mark = "ok" if result["ok"] else "ПРЕВЫШЕН"
+        unexpected = (
+            f" (лишние: {', '.join(result['unexpected_imports'])})"
+            if result["unexpected_imports"] else ""
+        )
+        print(
+            f"{result['scenario']:>8} {result['median_s']:>10} {result['min_s']:>8} "
+            f"{result['budget_s']:>10}  {', '.join(result['heavy_imports']) or '-'}{unexpected}  {mark}"
+        )
+
+    output_file = Path(
+        args.output or
+        f"benchmarks/results/startup-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            "created_at": datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k != 'output'},
+            "results": results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты: {output_file}")
+
+    sys.exit(0 if all(result["ok"] for result in results) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,310 @@
+"""
+Локальные имитации Keys.so, RDAP и WHOIS API для офлайн-бенчмарков
+
+Серверы работают в том же цикле событий, что и проверяемый код, и
+отвечают детерминированно: результат для домена определяется его
+хэшем, поэтому повторные прогоны сравнимы. Каждый сервер считает
+запросы, ответы по статусам, открытые TCP-соединения и пик
+одновременных запросов. Резолвер DNS - в tests/fake_dns.py (общий с
+тестами).
+
+Пример:
+    async with FakeRDAPServer(RDAPBehavior(latency=0.02)) as rdap:
+        loader._parse_bootstrap_data(rdap.bootstrap(["com", "net"]))
+"""
+
+import asyncio
+import random
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Sequence
+
+from aiohttp import web
+
+
+def _bucket(value: str) -> float:
+    """Детерминированное число [0, 1) по строке"""
+    return (zlib.crc32(value.encode('utf-8')) % 10000) / 10000
+
+
+@dataclass
+class ServerStats:
+    """Счетчики запросов фейкового сервера"""
+    
+    requests: int = 0
+    connections: int = 0  # Открыто TCP-соединений
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "peak_in_flight": self.peak_in_flight,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+        }
+
+
+class FakeServer:
+    """Базовый in-process сервер на aiohttp с учетом соединений"""
+    
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = 42):
+        """
+        Args:
+            latency: Задержка ответа, секунды
+            jitter: Случайная добавка к задержке (равномерно 0..jitter)
+            seed: Зерно генератора задержек
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.stats = ServerStats()
+        self.url = ""
+        self._rng = random.Random(seed)
+        self._transports = set()
+        self._runner = None
+    
+    def routes(self) -> List[web.RouteDef]:
+        raise NotImplementedError
+    
+    @web.middleware
+    async def _track(self, request: web.Request, handler):
+        transport = request.transport
+        if transport is not None and id(transport) not in self._transports:
+            self._transports.add(id(transport))
+            self.stats.connections += 1
+        self.stats.requests += 1
+        self.stats.in_flight += 1
+        self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.stats.in_flight)
+        try:
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+            if delay:
+                await asyncio.sleep(delay)
+            response = await handler(request)
+            self.stats.statuses[response.status] += 1
+            return response
+        finally:
+            self.stats.in_flight -= 1
+    
+    async def start(self) -> str:
+        app = web.Application(middlewares=[self._track])
+        app.add_routes(self.routes())
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+    
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+
+class FakeKeysSoServer(FakeServer):
+    """
+    Keys.so: постраничные backlinks/outlinks
+    
+    Ссылка i ссылается с домена site{i % domains}.{tld}; часть анкоров
+    содержит спам-фразы, чтобы фильтр работал как на реальных данных.
+    """
+    
+    SPAM_ANCHORS = ("buy casino online", "best poker bonus")
+    ANCHORS = ("home", "read more", "example", "click here", "news")
+    
+    def __init__(
+        self,
+        links: int,
+        domains: int,
+        tlds: Sequence[str] = ("com", "net", "org", "ru"),
+        spam_share: float = 0.05,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.links = links
+        self.domains = max(1, domains)
+        self.tlds = list(tlds)
+        self.spam_share = spam_share
+    
+    def routes(self) -> List[web.RouteDef]:
+        return [
+            web.get("/report/simple/links/backlinks", self._page),
+            web.get("/report/simple/links/outlinks", self._page),
+        ]
+    
+    def domain(self, i: int) -> str:
+        n = i % self.domains
+        return f"site{n}.{self.tlds[n % len(self.tlds)]}"
+    
+    def _item(self, i: int) -> dict:
+        domain = self.domain(i)
+        spam = _bucket(f"anchor{i}") < self.spam_share
+        anchors = self.SPAM_ANCHORS if spam else self.ANCHORS
+        return {
+            "source_name": domain,
+            "source_url": f"http://{domain}/page{i}",
+            "url": "http://target.example/",
+            "anchor": anchors[i % len(anchors)],
+            "source_dr": i % 100,
+            "created_at": "2024-01-01T00:00:00Z",
+            "status": "active",
+            "nofollow": i % 3 == 0,
+        }
+    
+    async def _page(self, request: web.Request) -> web.Response:
+        per_page = int(request.query.get("per_page", 100))
+        page = int(request.query.get("page", 1))
+        last_page = max(1, -(-self.links // per_page))
+        start = (page - 1) * per_page
+        data = [self._item(i) for i in range(start, min(start + per_page, self.links))]
+        return web.json_response({
+            "data": data,
+            "total": self.links,
+            "current_page": page,
+            "last_page": last_page,
+        })
+
+
+@dataclass
+class RDAPBehavior:
+    """Доли ответов RDAP сервера (остальное - 200, зарегистрирован)"""
+    
+    available: float = 0.3   # 404
+    rate_limited: float = 0.0  # 429
+    server_error: float = 0.0  # 503 (клиент повторяет запрос)
+    latency: float = 0.0
+    jitter: float = 0.0
+
+
+class FakeRDAPServer(FakeServer):
+    """RDAP: /domain/{name} -> 200 / 404 / 429 / 503 по хэшу домена"""
+    
+    def __init__(self, behavior: RDAPBehavior = None, **kwargs):
+        self.behavior = behavior or RDAPBehavior()
+        kwargs.setdefault("latency", self.behavior.latency)
+        kwargs.setdefault("jitter", self.behavior.jitter)
+        super().__init__(**kwargs)
+    
+    def routes(self) -> List[web.RouteDef]:
+        return [web.get("/domain/{name}", self._domain)]
+    
+    def bootstrap(self, tlds: Sequence[str]) -> dict:
+        """IANA bootstrap (dns.json), направляющий TLD на этот сервер"""
+        return {"services": [[list(tlds), [self.url + "/"]]]}
+    
+    def attach(self, checker, tlds: Sequence[str]) -> None:
+        """
+        Направляет RDAP проверки DomainAvailabilityChecker на этот сервер
+        
+        Bootstrap подменяется без загрузки с IANA (TLD извлекаются по
+        локальному снимку списка суффиксов).
+        """
+        checker.bootstrap_loader._parse_bootstrap_data(self.bootstrap(tlds))
+        checker.bootstrap_loader._loaded = True
+        # Подмененный bootstrap не устаревает и не перепроверяется с IANA
+        checker.bootstrap_loader._expires_at = float("inf")
+        checker._bootstrap_loaded = True
+    
+    async def _domain(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        behavior = self.behavior
+        value = _bucket(name)
+        if value < behavior.rate_limited:
+            return web.json_response({"errorCode": 429}, status=429)
+        value -= behavior.rate_limited
+        if value < behavior.server_error:
+            return web.json_response({"errorCode": 503}, status=503)
+        value -= behavior.server_error
+        if value < behavior.available:
+            return web.json_response({"errorCode": 404, "title": "Not Found"}, status=404)
+        return web.json_response({
+            "objectClassName": "domain",
+            "ldhName": name.upper(),
+            "status": ["active"],
+            "events": [{"eventAction": "registration", "eventDate": "2010-01-01T00:00:00Z"}],
+        })
+
+
+class FakeWhoisServer(FakeServer):
+    """
+    WHOIS API: форматы ответов всех провайдеров WHOISChecker
+    
+    Каждый провайдер обслуживается под своим префиксом; base_url для
+    WHOISChecker - base_url(provider).
+    """
+    
+    PROVIDERS = ("whoisxml", "apininjas", "whoapi", "whoxy", "jsonwhois", "whodat")
+    
+    def __init__(self, available: float = 0.3, **kwargs):
+        super().__init__(**kwargs)
+        self.available = available
+    
+    def base_url(self, provider: str) -> str:
+        return f"{self.url}/{provider}"
+    
+    def attach(self, checker, provider: str) -> None:
+        """Направляет WHOIS проверки DomainAvailabilityChecker на этот сервер"""
+        if checker.whois_checker:
+            checker.whois_checker.base_url = self.base_url(provider)
+    
+    def routes(self) -> List[web.RouteDef]:
+        return [
+            web.get("/whoisxml/domainAvailability", self._whoisxml),
+            web.get("/apininjas/whois", self._apininjas),
+            web.get("/whoapi/", self._whoapi),
+            web.get("/whoxy/", self._whoxy),
+            web.get("/jsonwhois/whois", self._jsonwhois),
+            web.get("/whodat/{name}", self._whodat),
+        ]
+    
+    def _is_available(self, domain: str) -> bool:
+        return _bucket(domain) < self.available
+    
+    async def _whoisxml(self, request: web.Request) -> web.Response:
+        free = self._is_available(request.query["domainName"])
+        return web.json_response({
+            "DomainInfo": {"domainAvailability": "AVAILABLE" if free else "UNAVAILABLE"}
+        })
+    
+    async def _apininjas(self, request: web.Request) -> web.Response:
+        domain = request.query["domain"]
+        if self._is_available(domain):
+            return web.json_response({})
+        return web.json_response({"domain_name": domain, "registrar": "Fake Registrar"})
+    
+    async def _whoapi(self, request: web.Request) -> web.Response:
+        free = self._is_available(request.query["domain"])
+        return web.json_response({"status": 0, "taken": 0 if free else 1})
+    
+    async def _whoxy(self, request: web.Request) -> web.Response:
+        domain = request.query["whois"]
+        if self._is_available(domain):
+            return web.json_response({"status": 1})
+        return web.json_response({"status": 1, "domain_registered": "yes", "registrar_name": "Fake"})
+    
+    async def _jsonwhois(self, request: web.Request) -> web.Response:
+        domain = request.query["identifier"]
+        if self._is_available(domain):
+            return web.json_response({"registered": False})
+        return web.json_response({"registered": True, "domain_name": domain, "registrar": "Fake"})
+    
+    async def _whodat(self, request: web.Request) -> web.Response:
+        domain = request.match_info["name"]
+        if self._is_available(domain):
+            return web.json_response({"error": "not found"}, status=404)
+        return web.json_response({"domain": domain, "registrar": "Fake"})
+
+
+def expected_status(domain: str, available: float) -> str:
+    """Ожидаемый статус домена для заданной доли свободных (для проверок)"""
+    return "AVAILABLE" if _bucket(domain) < available else "REGISTERED"
@@ -6,19 +6,203 @@ Domain Backlink Analyzer
 
 import asyncio
 import argparse
+import json
 import os
 from datetime import datetime
 from pathlib import Path
 
-from src.api.keys_so_client import KeysSoClient
 from src.domain.extractor import DomainExtractor
 from src.availability import DomainAvailabilityChecker
 from src.filtering import DomainFilteringPipeline
-from src.export.csv_exporter import CSVExporter
-from src.export.excel_exporter import ExcelExporter
-from src.export.json_exporter import JSONExporter
+from src.export.fanout import FanOutExporter, parse_formats
+from src.runner import BatchRunner, PipelinedAnalyzer, format_stage_table, load_targets
+from src.runner.batch import DEFAULT_TARGET_CONCURRENCY
+from src.runner.checkpoint import DEFAULT_RUNS_DIR, RunCheckpoint, new_run_id
 from src.utils.config import APIConfig, LogConfig
 from src.utils.logger import setup_logger
+from src.utils.metrics import registry as metrics
+from src.utils.profiling import PROFILE_MODES, create_profiler
+
+# HTTP-клиенты (aiohttp), кассеты, сервер метрик, openpyxl и pyarrow
+# импортируются там, где нужны: --help и ошибки аргументов не ждут их
+# загрузки, а запуск без xlsx/parquet не загружает эти библиотеки
+
+
+def _format_list(value: str) -> list:
+    """Тип аргумента --format: список форматов через запятую"""
+    try:
+        return parse_formats(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _output_base(output, domain: str) -> str:
+    """Путь отчета без расширения (расширение подставляется для каждого формата)"""
+    if output:
+        return output
+    safe_domain = domain.replace('.', '_').replace('/', '_')
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    return f"output/results_{safe_domain}_{date_str}"
+
+
+def _exporter(args, output_file: str, target_domain: str):
+    """Функция экспорта во все выбранные форматы за один проход"""
+    return FanOutExporter.for_formats(
+        output_file,
+        args.format,
+        include_spam=args.include_spam,
+        include_excluded=args.include_excluded,
+        only_available=args.only_available,
+        target_domain=target_domain,
+        compression=args.compress
+    ).export_async
+
+
+def _export_links(args, result_files: dict, links) -> None:
+    """Таблица ссылок рядом с parquet-отчетом (--export-links)"""
+    if 'parquet' in result_files and args.export_links:
+        from src.export.parquet_exporter import ParquetExporter, DEFAULT_PARQUET_COMPRESSION
+        ParquetExporter.export_links(
+            links,
+            ParquetExporter.links_file_for(result_files['parquet']),
+            compression=args.compress or DEFAULT_PARQUET_COMPRESSION
+        )
+
+
+def _write_stats(path: str, **fields) -> str:
+    """Статистика запуска (стадии, задержки, повторы, кэши) в JSON рядом с отчетом"""
+    stats = dict(fields, metrics=metrics.snapshot())
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def _log_metrics(logger) -> None:
+    """Сводка задержек запросов, ожиданий и кэшей"""
+    lines = metrics.format_lines()
+    if lines:
+        logger.info("")
+        logger.info("Запросы, ожидания и кэши:")
+        for line in lines:
+            logger.info(line)
+
+
+def _write_profile(logger, profiler, out_dir: str) -> None:
+    """Файлы профилировщика в каталоге запуска и начало сводки в лог"""
+    os.makedirs(out_dir, exist_ok=True)
+    files = profiler.write(out_dir)
+    logger.info("")
+    logger.info(f"Профиль ({profiler.mode}): {', '.join(files)}")
+    for line in profiler.summary_lines():
+        logger.info(f"  {line}")
+
+
+def _report_single(args, logger, run, output_base: str) -> None:
+    """Итоги анализа одного домена"""
+    result_files = run.export_result
+    _export_links(args, result_files, run.all_links)
+    
+    logger.info("")
+    logger.info("Стадии конвейера:")
+    for line in format_stage_table(run.stages):
+        logger.info(line)
+    _log_metrics(logger)
+    stats_file = _write_stats(f"{output_base}.stats.json", target=args.domain, **run.to_dict())
+    
+    logger.info("")
+    logger.info("=" * 70)
+    logger.info("✓ Анализ завершен успешно!")
+    logger.info("")
+    logger.info(f"Результаты сохранены: {', '.join(result_files.values())}")
+    logger.info(f"Статистика запуска: {stats_file}")
+    logger.info("")
+    logger.info("Статистика:")
+    if run.resumed_links or run.resumed_checks:
+        logger.info(
+            f"  ├─ Из журнала запуска: ссылок {run.resumed_links}, "
+            f"проверок {run.resumed_checks}"
+        )
+    logger.info(f"  ├─ Всего ссылок собрано: {run.links}")
+    logger.info(f"  ├─ Уникальных доменов: {run.domains}")
+    if run.unchecked:
+        logger.info(f"  ├─ Не проверено (--check-budget): {run.unchecked}")
+    logger.info(f"  ├─ Зарегистрированных: {run.registered}")
+    logger.info(f"  ├─ Свободных (AVAILABLE): {run.available}")
+    logger.info(f"  └─ Валидных в отчете: {run.valid}")
+
+
+async def _analyze_batch(args, analyzer, targets: list, run_dir, link_types: list):
+    """Анализ всех целей пакета с отчетом по каждой"""
+    output_dir = args.output or "output"
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    
+    def export_for(target: str):
+        safe_domain = target.replace('.', '_')
+        return _exporter(args, f"{output_dir}/results_{safe_domain}_{date_str}", target)
+    
+    checkpoint_for = None
+    if run_dir:
+        # Журнал пакета: список целей в корне, журнал каждой цели - в targets/
+        batch_log = RunCheckpoint(run_dir)
+        batch_log.write_meta(targets=targets, link_types=link_types, limit=args.limit, status="running")
+        
+        def checkpoint_for(target: str):
+            return RunCheckpoint(os.path.join(run_dir, "targets", target.replace('.', '_')))
+    
+    batch = await BatchRunner(analyzer, concurrency=args.target_concurrency).run(
+        targets, export_for=export_for, checkpoint_for=checkpoint_for
+    )
+    if run_dir:
+        batch_log.write_meta(status="failed" if batch.failed else "completed")
+    for outcome in batch.outcomes:
+        if outcome.ok:
+            _export_links(args, outcome.result.export_result, outcome.result.all_links)
+    
+    # Сводный отчет: один домен - одна запись по всем целям
+    combined_files = FanOutExporter.export_formats(
+        batch.combined.domains(),
+        f"{output_dir}/results_combined_{date_str}",
+        args.format,
+        include_spam=args.include_spam,
+        include_excluded=args.include_excluded,
+        only_available=args.only_available,
+        target_domain=f"{len(targets)} targets",
+        compression=args.compress
+    )
+    combined_files['stats'] = _write_stats(
+        f"{output_dir}/results_combined_{date_str}.stats.json",
+        targets={
+            outcome.target: outcome.result.to_dict() if outcome.ok else {"error": str(outcome.error)}
+            for outcome in batch.outcomes
+        },
+        domains=len(batch.combined)
+    )
+    return batch, combined_files
+
+
+def _report_batch(logger, checker, batch, combined_files: dict) -> int:
+    """Итоги пакетного анализа; код возврата 1, если часть целей не обработана"""
+    logger.info("")
+    logger.info("=" * 70)
+    total = len(batch.outcomes)
+    logger.info(f"✓ Пакетный анализ завершен: {total - len(batch.failed)}/{total} целей")
+    logger.info("")
+    for outcome in batch.outcomes:
+        if outcome.ok:
+            run = outcome.result
+            logger.info(
+                f"  {outcome.target}: ссылок {run.links}, доменов {run.domains}, "
+                f"свободных {run.available}, валидных {run.valid} "
+                f"({run.wall_time:.1f}s) -> {', '.join(run.export_result.values())}"
+            )
+        else:
+            logger.info(f"  {outcome.target}: ошибка - {outcome.error}")
+    _log_metrics(logger)
+    logger.info("")
+    logger.info(f"Сводный отчет ({len(batch.combined)} доменов): {', '.join(combined_files.values())}")
+    logger.info(f"Повторных проверок доменов пропущено: {checker.dedup_hits}")
+    return 1 if batch.failed else 0
 
 
 async def main():
@@ -31,23 +215,85 @@ async def main():
 Примеры использования:
   %(prog)s example.com
   %(prog)s example.com -o report.xlsx -f xlsx
+  %(prog)s example.com -f csv,xlsx,json,parquet
   %(prog)s example.com --skip-rdap --verbose
+  %(prog)s --targets-file clients.txt -f xlsx -o output/batch
+  %(prog)s --resume 20240101-120000-example_com
+  %(prog)s example.com --record cassettes/example
+  %(prog)s example.com --replay cassettes/example --no-checkpoint
+  %(prog)s --targets-file clients.txt --metrics-port 9108
+  %(prog)s example.com --profile async
         """
     )
     
     # Обязательные аргументы
-    parser.add_argument('domain', help='Домен для анализа (example.com)')
+    parser.add_argument('domain', nargs='?', help='Домен для анализа (example.com)')
+    parser.add_argument(
+        '--targets-file',
+        help='Пакетный режим: файл с целевыми доменами (один на строку). '
+             'Отчет по каждой цели и сводный отчет'
+    )
+    parser.add_argument(
+        '--target-concurrency',
+        type=int,
+        default=DEFAULT_TARGET_CONCURRENCY,
+        help=f'Пакетный режим: целей одновременно (по умолчанию: {DEFAULT_TARGET_CONCURRENCY})'
+    )
     
     # Опциональные аргументы
     parser.add_argument(
         '--output', '-o',
-        help='Путь к выходному файлу (по умолчанию: results_DOMAIN_DATE.csv)'
+        help='Путь к отчету без расширения, расширение подставляется по --format '
+             '(по умолчанию: output/results_DOMAIN_DATE); '
+             'в пакетном режиме - каталог отчетов (по умолчанию: output)'
     )
     parser.add_argument(
         '--format', '-f',
-        choices=['csv', 'xlsx', 'json'],
-        default='csv',
-        help='Формат вывода (по умолчанию: csv)'
+        type=_format_list,
+        default=['csv'],
+        help='Форматы вывода через запятую: csv, xlsx, json, ndjson, parquet '
+             '(по умолчанию: csv; ndjson - одна запись на строку)'
+    )
+    parser.add_argument(
+        '--compress',
+        choices=['gzip', 'zstd'],
+        help='Сжатие выходного файла (для csv, json, ndjson; для parquet - кодек страниц)'
+    )
+    parser.add_argument(
+        '--export-links',
+        action='store_true',
+        help='Для parquet: сохранить все ссылки в отдельную таблицу *.links.parquet'
+    )
+    parser.add_argument(
+        '--runs-dir',
+        default=DEFAULT_RUNS_DIR,
+        help=f'Каталог журналов запусков (по умолчанию: {DEFAULT_RUNS_DIR})'
+    )
+    parser.add_argument(
+        '--resume',
+        metavar='RUN_ID',
+        help='Продолжить прерванный запуск: загруженные страницы и проверки '
+             'берутся из журнала'
+    )
+    parser.add_argument(
+        '--no-checkpoint',
+        action='store_true',
+        help='Не вести журнал запуска'
+    )
+    parser.add_argument(
+        '--record',
+        metavar='DIR',
+        help='Записать запросы к Keys.so, RDAP и WHOIS в кассету DIR'
+    )
+    parser.add_argument(
+        '--replay',
+        metavar='DIR',
+        help='Воспроизвести ответы из кассеты DIR без обращения к сети'
+    )
+    parser.add_argument(
+        '--replay-latency',
+        action='store_true',
+        help='При воспроизведении выдерживать записанные задержки ответов'
     )
     parser.add_argument(
         '--limit',
@@ -76,6 +322,18 @@ async def main():
         action='store_true',
         help='Пропустить RDAP, использовать только WHOIS API'
     )
+    parser.add_argument(
+        '--skip-dns',
+        action='store_true',
+        help='Не проверять делегирование по DNS перед RDAP/WHOIS '
+             '(с --record/--replay DNS не используется)'
+    )
+    parser.add_argument(
+        '--dns-resolver',
+        metavar='HOST[:PORT]',
+        default=os.getenv('DNS_RESOLVER'),
+        help='Резолвер для DNS-проверки (по умолчанию: DNS_RESOLVER или /etc/resolv.conf)'
+    )
     parser.add_argument(
         '--skip-metrics',
         action='store_true',
@@ -96,12 +354,49 @@ async def main():
         action='store_true',
         help='Включить исключенные домены в отчет'
     )
+    parser.add_argument(
+        '--spam-threshold',
+        type=int,
+        default=1,
+        help='Мин. число спам-анкоров для пометки домена (по умолчанию: 1)'
+    )
+    parser.add_argument(
+        '--spam-score-threshold',
+        type=float,
+        default=0.1,
+        help='Мин. взвешенная доля спам-анкоров для пометки домена (по умолчанию: 0.1)'
+    )
     parser.add_argument(
         '--max-workers',
         type=int,
         default=20,
         help='Макс. параллельных запросов (по умолчанию: 20)'
     )
+    parser.add_argument(
+        '--check-budget',
+        type=int,
+        metavar='N',
+        help='Не более N запросов к RDAP/WHOIS (домены проверяются от самых '
+             'ценных по DR и числу ссылок; ответы DNS не считаются), '
+             'в пакетном режиме - для каждой цели'
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        help='Отдавать метрики Prometheus на http://HOST:PORT/metrics во время работы'
+    )
+    parser.add_argument(
+        '--metrics-host',
+        default='127.0.0.1',
+        help='Адрес для --metrics-port (по умолчанию: 127.0.0.1)'
+    )
+    parser.add_argument(
+        '--profile',
+        choices=PROFILE_MODES,
+        help='Профилирование запуска: cpu (cProfile + collapsed stacks), async '
+             '(ожидание по корутинам), memory (tracemalloc на границах стадий); '
+             'результаты - в каталоге запуска'
+    )
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -113,6 +408,44 @@ async def main():
     )
     
     args = parser.parse_args()
+    link_types = (
+        ['backlinks', 'outlinks'] if args.link_type == 'all'
+        else [args.link_type]
+    )
+    if args.resume:
+        # Цели и параметры сбора берутся из сохраненного запуска
+        if args.domain or args.targets_file:
+            parser.error("--resume продолжает сохраненный запуск: домен и --targets-file не указываются")
+        try:
+            meta = RunCheckpoint(os.path.join(args.runs_dir, args.resume)).read_meta()
+        except FileNotFoundError:
+            parser.error(f"запуск {args.resume} не найден в {args.runs_dir}")
+        args.domain = meta.get("target")
+        targets = meta.get("targets")
+        link_types = meta["link_types"]
+        args.limit = meta["limit"]
+        run_id = args.resume
+    else:
+        if bool(args.domain) == bool(args.targets_file):
+            parser.error("укажите домен или --targets-file (одно из двух)")
+        targets = load_targets(args.targets_file) if args.targets_file else None
+        run_id = new_run_id(args.domain or Path(args.targets_file).stem)
+    run_dir = None if args.no_checkpoint else os.path.join(args.runs_dir, run_id)
+    
+    if args.record and args.replay:
+        parser.error("--record и --replay несовместимы")
+    cassette = None
+    if args.record or args.replay:
+        from src.utils.cassette import Cassette
+        cassette = Cassette(
+            args.replay or args.record,
+            mode="replay" if args.replay else "record",
+            replay_latency=args.replay_latency
+        )
+        try:
+            cassette.open()
+        except FileNotFoundError as e:
+            parser.error(str(e))
     
     # Настройка логирования
     log_config = LogConfig.from_env()
@@ -126,138 +459,111 @@ async def main():
     logger.info("=" * 70)
     logger.info("Domain Backlink Analyzer v1.0")
     logger.info("=" * 70)
-    logger.info(f"Целевой домен: {args.domain}")
-    logger.info(f"Формат вывода: {args.format.upper()}")
+    if targets is None:
+        logger.info(f"Целевой домен: {args.domain}")
+    else:
+        logger.info(f"Целей в пакете: {len(targets)} ({args.targets_file})")
+    logger.info(f"Формат вывода: {', '.join(args.format).upper()}")
     logger.info("=" * 70)
     
     start_time = datetime.now()
+    exit_code = 0
+    metrics_server = None
+    profiler = create_profiler(args.profile) if args.profile else None
     
     try:
-        api_config = APIConfig.from_env()
+        if args.metrics_port is not None:
+            from src.utils.metrics_server import MetricsServer
+            metrics_server = MetricsServer(args.metrics_port, host=args.metrics_host)
+            await metrics_server.start()
+        if profiler is not None:
+            profiler.start()
+        
+        replaying = cassette is not None and cassette.replaying
+        if replaying and not os.getenv("KEYS_SO_API_KEY"):
+            # Ключ в кассету не записывается и для воспроизведения не нужен
+            api_config = APIConfig(
+                api_key="replay",
+                base_url=os.getenv("KEYS_SO_BASE_URL", APIConfig.base_url)
+            )
+        else:
+            api_config = APIConfig.from_env()
+        
+        from src.api.keys_so_client import KeysSoClient
         
         async with KeysSoClient(
             api_key=api_config.api_key,
             base_url=api_config.base_url,
             timeout=api_config.timeout,
-            max_retries=api_config.max_retries
+            max_retries=api_config.max_retries,
+            # Воспроизведение не расходует квоту - без лимита, если не
+            # нужно повторить исходные задержки
+            rate_limit=0 if replaying and not args.replay_latency else api_config.rate_limit,
+            cassette=cassette
         ) as api_client:
             
-            # ЭТАП 1: Сбор ссылок
-            logger.info("")
-            all_links = []
-
-            if args.link_type in ['backlinks', 'all']:
-                logger.info("[1/5] Сбор входящих ссылок (backlinks)...")
-                backlinks = await api_client.get_backlinks(
-                    domain=args.domain,
-                    limit=args.limit
-                )
-                logger.info(f"✓ Получено входящих ссылок: {len(backlinks)}")
-                all_links.extend(backlinks)
-
-            if args.link_type in ['outlinks', 'all']:
-                logger.info("[1/5] Сбор исходящих ссылок (outlinks)...")
-                outlinks = await api_client.get_all_outlinks(
-                    domain=args.domain,
-                    limit=args.limit
-                )
-                logger.info(f"✓ Получено исходящих ссылок: {len(outlinks)}")
-                all_links.extend(outlinks)
-
-            logger.info(f"✓ Всего ссылок собрано: {len(all_links)}")
-            
-            # ЭТАП 2: Извлечение уникальных доменов
-            logger.info("")
-            logger.info("[2/5] Извлечение уникальных доменов...")
-            extractor = DomainExtractor()
-            unique_domains = extractor.extract_unique_domains(all_links)
-            logger.info(f"✓ Уникальных доменов: {len(unique_domains)}")
-            
-            # ЭТАП 3: Проверка доступности
-            logger.info("")
-            logger.info("[3/5] Проверка доступности (RDAP/WHOIS)...")
             checker = DomainAvailabilityChecker(
-                whois_api_key=os.getenv('WHOIS_API_KEY'),
+                whois_api_key=os.getenv('WHOIS_API_KEY') or ("replay" if replaying else None),
                 whois_provider=os.getenv('WHOIS_API_PROVIDER', 'whoisxml'),
                 max_concurrent=args.max_workers,
-                skip_rdap=args.skip_rdap
+                skip_rdap=args.skip_rdap,
+                shared=targets is not None,
+                cassette=cassette,
+                # DNS-ответы в кассету не пишутся: воспроизведение шло бы
+                # по другим доменам, чем запись
+                dns_prefilter=not args.skip_dns and cassette is None,
+                dns_resolver=args.dns_resolver
             )
-            check_results = await checker.check_domains(unique_domains)
-            logger.info(f"✓ Проверено доменов: {len(check_results)}")
-            
-            # ЭТАП 4: Фильтрация и сбор метрик
-            logger.info("")
-            logger.info("[4/5] Фильтрация и сбор метрик...")
             pipeline = DomainFilteringPipeline(
                 spam_phrases_file=args.spam_file,
                 excluded_domains_file=args.exclude_file,
                 fetch_metrics=not args.skip_metrics,
-                api_client=api_client
-            )
-            
-            final_domains = await pipeline.process_domains(
-                domains=unique_domains,
-                availability_results=check_results,
-                backlinks=all_links
+                api_client=api_client,
+                spam_threshold=args.spam_threshold,
+                spam_score_threshold=args.spam_score_threshold
             )
-            
-            # ЭТАП 5: Экспорт
+            # Сбор ссылок, проверка доступности, фильтрация и экспорт
+            # идут одновременно: домены проверяются по мере появления
             logger.info("")
-            logger.info("[5/5] Экспорт результатов...")
+            logger.info(
+                f"Сбор ссылок ({', '.join(link_types)}), проверка доступности, "
+                f"фильтрация и экспорт (конвейер)..."
+            )
+            analyzer = PipelinedAnalyzer(
+                api_client,
+                checker,
+                pipeline,
+                extractor=DomainExtractor(),
+                link_types=link_types,
+                limit=args.limit,
+                check_workers=args.max_workers,
+                check_budget=args.check_budget,
+                keep_links=args.export_links and 'parquet' in args.format,
+                keep_dates=args.export_links,
+                stage_listener=profiler.stage_boundary if profiler else None
+            )
             
-            # Определяем имя файла
-            if args.output:
-                output_file = args.output
-            else:
-                safe_domain = args.domain.replace('.', '_').replace('/', '_')
-                date_str = datetime.now().strftime("%Y-%m-%d")
-                output_file = f"output/results_{safe_domain}_{date_str}.{args.format}"
+            if run_dir:
+                logger.info(f"Журнал запуска: {run_dir} (продолжить: --resume {run_id})")
             
-            # Экспорт в выбранном формате
-            if args.format == 'csv':
-                result_file = CSVExporter.export(
-                    final_domains,
-                    output_file,
-                    include_spam=args.include_spam,
-                    include_excluded=args.include_excluded,
-                    only_available=args.only_available
-                )
-            elif args.format == 'xlsx':
-                result_file = ExcelExporter.export(
-                    final_domains,
-                    output_file,
-                    include_spam=args.include_spam,
-                    include_excluded=args.include_excluded,
-                    target_domain=args.domain
-                )
-            elif args.format == 'json':
-                result_file = JSONExporter.export(
-                    final_domains,
-                    output_file,
-                    include_spam=args.include_spam,
-                    include_excluded=args.include_excluded,
-                    target_domain=args.domain
-                )
+            async with checker:
+                if targets is None:
+                    output_base = _output_base(args.output, args.domain)
+                    run = await analyzer.run(
+                        args.domain,
+                        export=_exporter(args, output_base, args.domain),
+                        checkpoint=RunCheckpoint(run_dir) if run_dir else None
+                    )
+                    _report_single(args, logger, run, output_base)
+                else:
+                    batch, combined_files = await _analyze_batch(
+                        args, analyzer, targets, run_dir, link_types
+                    )
+                    exit_code = _report_batch(logger, checker, batch, combined_files)
             
             # Финальная статистика
-            end_time = datetime.now()
-            duration = end_time - start_time
-            
-            valid_domains = [d for d in final_domains if d.is_valid]
-            
-            logger.info("")
-            logger.info("=" * 70)
-            logger.info("✓ Анализ завершен успешно!")
-            logger.info("")
-            logger.info(f"Результаты сохранены: {result_file}")
-            logger.info("")
-            logger.info("Статистика:")
-            logger.info(f"  ├─ Всего ссылок собрано: {len(all_links)}")
-            logger.info(f"  ├─ Уникальных доменов: {len(unique_domains)}")
-            logger.info(f"  ├─ Зарегистрированных: {sum(1 for r in check_results if r.status.value == 'REGISTERED')}")
-            logger.info(f"  ├─ Свободных (AVAILABLE): {sum(1 for r in check_results if r.status.value == 'AVAILABLE')}")
-            logger.info(f"  ├─ Валидных в отчете: {len(valid_domains)}")
-            logger.info(f"  └─ Время выполнения: {duration.total_seconds():.1f}s")
+            duration = datetime.now() - start_time
+            logger.info(f"Время выполнения: {duration.total_seconds():.1f}s")
             logger.info("=" * 70)
             
     except KeyboardInterrupt:
@@ -268,7 +574,17 @@ async def main():
         logger.exception(f"❌ Критическая ошибка: {e}")
         return 1
     
-    return 0
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            _write_profile(logger, profiler, run_dir or os.path.join(args.runs_dir, run_id))
+        if metrics_server is not None:
+            await metrics_server.stop()
+        if cassette is not None:
+            logger.info(f"Кассета {cassette.path}: {cassette.summary()}")
+            cassette.close()
+    
+    return exit_code
 
 
 if __name__ == "__main__":
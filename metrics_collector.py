@@ -3,11 +3,156 @@
 """
 
 import asyncio
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
 from typing import List, Dict, Optional
 import logging
 
+from ..utils.metrics import registry as metrics
+
 logger = logging.getLogger(__name__)
 
+# Лимит параметров в одном SQL-запросе (SQLITE_MAX_VARIABLE_NUMBER = 999)
+_SQL_CHUNK_SIZE = 500
+
+
+class MetricsCacheManager:
+    """Кэш метрик доменов в SQLite с TTL"""
+    
+    def __init__(
+        self,
+        db_path: str = "data/metrics_cache.db",
+        ttl_days: int = 7
+    ):
+        self.db_path = Path(db_path)
+        self.ttl = timedelta(days=ttl_days)
+        self._initialized = False
+        
+        # aiosqlite импортируется здесь, а не при импорте модуля: сборщик
+        # метрик без кэша (use_cache=False) обходится без него
+        import aiosqlite
+        self._connect = aiosqlite.connect
+    
+    async def initialize(self) -> None:
+        """Инициализация базы данных"""
+        if self._initialized:
+            return
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        async with self._connect(self.db_path) as db:
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS domain_metrics (
+                    domain TEXT PRIMARY KEY,
+                    metrics TEXT NOT NULL,
+                    fetched_at TIMESTAMP NOT NULL
+                )
+            ''')
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_metrics_fetched_at
+                ON domain_metrics(fetched_at)
+            ''')
+            await db.commit()
+        
+        self._initialized = True
+        logger.debug(f"Кэш метрик инициализирован: {self.db_path}")
+    
+    async def get_many(
+        self,
+        domains: List[str]
+    ) -> Dict[str, Dict[str, any]]:
+        """
+        Пакетное получение непросроченных метрик из кэша
+        
+        Args:
+            domains: Список доменов
+            
+        Returns:
+            Словарь {домен: метрики} только для найденных доменов
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        cutoff = (datetime.now() - self.ttl).isoformat()
+        found = {}
+        
+        async with self._connect(self.db_path) as db:
+            for i in range(0, len(domains), _SQL_CHUNK_SIZE):
+                chunk = [d.lower() for d in domains[i:i + _SQL_CHUNK_SIZE]]
+                placeholders = ','.join('?' * len(chunk))
+                async with db.execute(
+                    f'''
+                    SELECT domain, metrics FROM domain_metrics
+                    WHERE fetched_at >= ?
+                    AND domain IN ({placeholders})
+                    ''',
+                    (cutoff, *chunk)
+                ) as cursor:
+                    async for domain, metrics in cursor:
+                        found[domain] = json.loads(metrics)
+        
+        return found
+    
+    async def set_many(
+        self,
+        metrics: Dict[str, Dict[str, any]]
+    ) -> None:
+        """
+        Пакетное сохранение метрик в кэш
+        
+        Args:
+            metrics: Словарь {домен: метрики}
+        """
+        if not metrics:
+            return
+        
+        if not self._initialized:
+            await self.initialize()
+        
+        fetched_at = datetime.now().isoformat()
+        
+        async with self._connect(self.db_path) as db:
+            await db.executemany(
+                '''
+                INSERT OR REPLACE INTO domain_metrics
+                (domain, metrics, fetched_at)
+                VALUES (?, ?, ?)
+                ''',
+                [
+                    (domain.lower(), json.dumps(values), fetched_at)
+                    for domain, values in metrics.items()
+                ]
+            )
+            await db.commit()
+        
+        logger.debug(f"Сохранено в кэш метрик: {len(metrics)} доменов")
+    
+    async def cleanup_old_entries(self) -> int:
+        """
+        Очистка устаревших записей
+        
+        Returns:
+            Количество удаленных записей
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        cutoff = (datetime.now() - self.ttl).isoformat()
+        
+        async with self._connect(self.db_path) as db:
+            cursor = await db.execute(
+                'DELETE FROM domain_metrics WHERE fetched_at < ?',
+                (cutoff,)
+            )
+            deleted_count = cursor.rowcount
+            await db.commit()
+        
+        if deleted_count > 0:
+            logger.info(f"Удалено {deleted_count} устаревших метрик из кэша")
+        
+        return deleted_count
+
 
 class DomainMetricsCollector:
     """Сбор детальных метрик доменов через API keys.so"""
@@ -15,17 +160,23 @@ class DomainMetricsCollector:
     def __init__(
         self,
         api_client,
-        max_concurrent: int = 10
+        max_concurrent: int = 10,
+        cache: Optional[MetricsCacheManager] = None,
+        use_cache: bool = True
     ):
         """
         Инициализация сборщика метрик
         
         Args:
-            api_client: Экземпляр KeysSoClient
+            api_client: Экземпляр KeysSoClient (частоту запросов
+                ограничивает его rate limiter)
             max_concurrent: Максимум параллельных запросов
+            cache: Кэш метрик (по умолчанию data/metrics_cache.db)
+            use_cache: Использовать кэш метрик
         """
         self.api_client = api_client
         self.max_concurrent = max_concurrent
+        self.cache = (cache or MetricsCacheManager()) if use_cache else None
     
     async def collect_metrics(
         self,
@@ -42,29 +193,59 @@ class DomainMetricsCollector:
         """
         logger.info(f"Начало сбора метрик для {len(domains)} доменов...")
         
-        # Семафор для ограничения concurrency
+        # Сначала одним запросом берем все, что есть в кэше
+        cached = {}
+        if self.cache is not None:
+            try:
+                cached = await self.cache.get_many(domains)
+            except Exception as e:
+                logger.warning(f"Ошибка чтения кэша метрик: {e}")
+        
+        missing = [d for d in domains if d.lower() not in cached]
+        if self.cache is not None:
+            metrics.inc("cache_hits", len(domains) - len(missing), cache="domain_metrics")
+            metrics.inc("cache_misses", len(missing), cache="domain_metrics")
+        
+        # Семафор для ограничения concurrency, частоту задает rate limiter клиента
         semaphore = asyncio.Semaphore(self.max_concurrent)
         
         # Запускаем параллельный сбор
         tasks = [
             self._get_domain_metrics_with_semaphore(domain, semaphore)
-            for domain in domains
+            for domain in missing
         ]
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         # Формируем словарь результатов
-        metrics_dict = {}
-        for domain, result in zip(domains, results):
+        fetched = {}
+        for domain, result in zip(missing, results):
             if isinstance(result, Exception):
                 logger.error(f"Ошибка сбора метрик для {domain}: {result}")
-                metrics_dict[domain] = None
+                fetched[domain] = None
             else:
-                metrics_dict[domain] = result
+                fetched[domain] = result
+        
+        # Сохраняем в кэш только успешные ответы
+        if self.cache is not None:
+            try:
+                await self.cache.set_many(
+                    {d: m for d, m in fetched.items() if m is not None}
+                )
+            except Exception as e:
+                logger.warning(f"Ошибка записи кэша метрик: {e}")
+        
+        metrics_dict = {
+            domain: cached[domain.lower()]
+            if domain.lower() in cached else fetched.get(domain)
+            for domain in domains
+        }
         
         successful = sum(1 for v in metrics_dict.values() if v is not None)
         logger.info(
-            f"Сбор метрик завершен: {successful}/{len(domains)} успешно"
+            f"Сбор метрик завершен: {successful}/{len(domains)} успешно "
+            f"(из кэша: {len(domains) - len(missing)}, "
+            f"запросов к API: {len(missing)})"
         )
         
         return metrics_dict
@@ -157,12 +338,9 @@ class DomainMetricsCollector:
             )
             
             # Собираем метрики для текущего пакета
+            # (паузы между запросами обеспечивает rate limiter клиента)
             batch_metrics = await self.collect_metrics(batch)
             all_metrics.update(batch_metrics)
-            
-            # Небольшая задержка между пакетами
-            if i + batch_size < len(domains):
-                await asyncio.sleep(1)
         
         return all_metrics
     
@@ -2,22 +2,233 @@
 Фильтрация доменов по спам-фразам в анкорах и управление исключениями
 """
 
-import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Set, Optional
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Set, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Вес спам-фразы, если он не указан в файле
+DEFAULT_PHRASE_WEIGHT = 1.0
+
+
+@dataclass
+class AnchorScanResult:
+    """
+    Результат проверки анкоров одного домена
+    
+    Заполняется инкрементально (по одному анкору), поэтому хранить
+    полный список анкоров домена не требуется.
+    """
+    anchors_checked: int = 0
+    spam_count: int = 0
+    spam_weight: float = 0.0  # Сумма весов спам-анкоров
+    is_spam: bool = False
+    examples: List[str] = field(default_factory=list)
+    phrase_counts: Dict[str, int] = field(default_factory=dict)
+    completed: bool = True  # False если проверка остановлена досрочно
+    
+    @property
+    def spam_ratio(self) -> float:
+        """Доля спам-анкоров среди проверенных"""
+        if not self.anchors_checked:
+            return 0.0
+        return self.spam_count / self.anchors_checked
+    
+    @property
+    def spam_score(self) -> float:
+        """Взвешенная доля спам-анкоров (с весами 1.0 равна spam_ratio)"""
+        if not self.anchors_checked:
+            return 0.0
+        return self.spam_weight / self.anchors_checked
+    
+    def evaluate(
+        self,
+        spam_threshold: int = 1,
+        spam_score_threshold: float = 0.0
+    ) -> bool:
+        """
+        Вынесение решения о спаме по накопленной статистике
+        
+        Args:
+            spam_threshold: Минимум спам-анкоров
+            spam_score_threshold: Минимальный взвешенный spam_score
+            
+        Returns:
+            Итоговый флаг is_spam
+        """
+        self.is_spam = (
+            self.spam_count >= max(spam_threshold, 1) and
+            self.spam_score >= spam_score_threshold
+        )
+        return self.is_spam
+
+
+def _is_word_char(ch: str) -> bool:
+    """Символ слова в смысле регулярного выражения \\w"""
+    return ch.isalnum() or ch == '_'
+
+
+class PhraseMatcher:
+    """
+    Поиск множества фраз в тексте за один проход (автомат Ахо–Корасик)
+    
+    Совпадение засчитывается только на границах слов - так же, как
+    шаблон r'\\b' + re.escape(phrase) + r'\\b'.
+    """
+    
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases: List[str] = [p for p in dict.fromkeys(phrases) if p]
+        
+        # Переходы, suffix-ссылки и ссылки на ближайший терминальный суффикс
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        self._terminal: List[int] = [-1]
+        self._output: List[int] = [0]
+        
+        # Характеристики фраз для проверки границ слов
+        self._lengths: List[int] = []
+        self._starts_word: List[bool] = []
+        self._ends_word: List[bool] = []
+        
+        for index, phrase in enumerate(self.phrases):
+            self._add_phrase(index, phrase)
+        self._build_links()
+    
+    def __len__(self) -> int:
+        return len(self.phrases)
+    
+    def _add_phrase(self, index: int, phrase: str) -> None:
+        """Добавление фразы в бор"""
+        node = 0
+        for ch in phrase:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._terminal.append(-1)
+                self._output.append(0)
+            node = next_node
+        
+        self._terminal[node] = index
+        self._lengths.append(len(phrase))
+        self._starts_word.append(_is_word_char(phrase[0]))
+        self._ends_word.append(_is_word_char(phrase[-1]))
+    
+    def _build_links(self) -> None:
+        """Построение suffix-ссылок обходом в ширину"""
+        goto, fail, terminal, output = (
+            self._goto, self._fail, self._terminal, self._output
+        )
+        queue = deque(goto[0].values())
+        
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                link = goto[state].get(ch, 0)
+                fail[child] = link if link != child else 0
+                output[child] = link if terminal[link] >= 0 else output[link]
+                queue.append(child)
+    
+    def _iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Итерация по совпадениям на границах слов
+        
+        Yields:
+            Кортежи (индекс фразы, позиция начала)
+        """
+        goto, fail, terminal, output = (
+            self._goto, self._fail, self._terminal, self._output
+        )
+        lengths, starts_word, ends_word = (
+            self._lengths, self._starts_word, self._ends_word
+        )
+        text_len = len(text)
+        state = 0
+        
+        for pos, ch in enumerate(text):
+            while True:
+                next_state = goto[state].get(ch)
+                if next_state is not None:
+                    state = next_state
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            
+            node = state if terminal[state] >= 0 else output[state]
+            while node:
+                index = terminal[node]
+                start = pos + 1 - lengths[index]
+                before = start > 0 and _is_word_char(text[start - 1])
+                after = pos + 1 < text_len and _is_word_char(text[pos + 1])
+                if before != starts_word[index] and after != ends_word[index]:
+                    yield index, start
+                node = output[node]
+    
+    def search(self, text: str) -> Optional[str]:
+        """Первая найденная фраза или None"""
+        for index, _ in self._iter_matches(text):
+            return self.phrases[index]
+        return None
+    
+    def find_all(self, text: str) -> List[str]:
+        """Все найденные фразы (без повторов, в порядке появления)"""
+        found = {}
+        for index, start in self._iter_matches(text):
+            found.setdefault(index, start)
+        return [
+            self.phrases[index]
+            for index in sorted(found, key=found.get)
+        ]
+
+
 class SpamFilter:
     """Фильтрация доменов по спам-фразам в анкорах"""
     
     def __init__(self, spam_phrases_file: str = "data/spam_phrases.txt"):
         self.spam_phrases_file = Path(spam_phrases_file)
-        self.spam_phrases: Set[str] = set()
+        self.spam_phrases: FrozenSet[str] = frozenset()
+        self.spam_weights: Dict[str, float] = {}  # Фразы с весом не 1.0
         self._loaded = False
     
+    @property
+    def spam_phrases(self) -> FrozenSet[str]:
+        """
+        Набор спам-фраз (неизменяемый: набор меняется только присваиванием
+        или add_phrases/remove_phrases, и каждое изменение сбрасывает автомат)
+        """
+        return self._spam_phrases
+    
+    @spam_phrases.setter
+    def spam_phrases(self, phrases: Iterable[str]) -> None:
+        self._spam_phrases = frozenset(phrases)
+        self._matcher: Optional[PhraseMatcher] = None
+    
+    def add_phrases(self, phrases: Iterable[str]) -> None:
+        """Добавление спам-фраз"""
+        self.spam_phrases = self._spam_phrases.union(phrases)
+    
+    def remove_phrases(self, phrases: Iterable[str]) -> None:
+        """Удаление спам-фраз"""
+        self.spam_phrases = self._spam_phrases.difference(phrases)
+    
+    @property
+    def matcher(self) -> PhraseMatcher:
+        """Автомат спам-фраз (собирается заново после изменения набора фраз)"""
+        if self._matcher is None:
+            self._matcher = PhraseMatcher(sorted(self._spam_phrases))
+        return self._matcher
+    
     def load_spam_phrases(self) -> None:
         """Загрузка спам-фраз из файла"""
         if self._loaded:
@@ -31,23 +242,79 @@ class SpamFilter:
             self._loaded = True
             return
         
+        phrases = set()
         try:
             with open(self.spam_phrases_file, 'r', encoding='utf-8') as f:
                 for line in f:
                     phrase = line.strip().lower()
                     if phrase and not phrase.startswith('#'):  # Игнорируем комментарии
-                        self.spam_phrases.add(phrase)
+                        phrase, weight = self._parse_weighted_phrase(phrase)
+                        if not phrase:
+                            continue
+                        phrases.add(phrase)
+                        if weight != DEFAULT_PHRASE_WEIGHT:
+                            self.spam_weights[phrase] = weight
             
             logger.info(
-                f"Загружено {len(self.spam_phrases)} спам-фраз из "
+                f"Загружено {len(phrases)} спам-фраз из "
                 f"{self.spam_phrases_file}"
             )
             
         except Exception as e:
             logger.error(f"Ошибка загрузки спам-фраз: {e}")
         
+        # Автомат компилируется один раз на весь набор фраз
+        self.add_phrases(phrases)
+        self.matcher
         self._loaded = True
     
+    @staticmethod
+    def _parse_weighted_phrase(line: str) -> Tuple[str, float]:
+        """
+        Разбор строки файла спам-фраз
+        
+        Формат: "фраза" или "фраза | вес" (например, "viagra | 5")
+        """
+        if '|' not in line:
+            return line, DEFAULT_PHRASE_WEIGHT
+        
+        phrase, _, weight = line.rpartition('|')
+        phrase = phrase.strip()
+        try:
+            return phrase, float(weight)
+        except ValueError:
+            logger.warning(
+                f"Некорректный вес спам-фразы '{phrase}': {weight.strip()!r}, "
+                f"используется {DEFAULT_PHRASE_WEIGHT}"
+            )
+            return phrase, DEFAULT_PHRASE_WEIGHT
+    
+    def anchor_weight(self, phrases: List[str]) -> float:
+        """Вес спам-анкора - максимальный вес найденных в нем фраз"""
+        weights = self.spam_weights
+        return max(weights.get(p, DEFAULT_PHRASE_WEIGHT) for p in phrases)
+    
+    def find_spam_phrases(self, anchor_text: Optional[str]) -> List[str]:
+        """
+        Поиск всех спам-фраз в анкоре
+        
+        Args:
+            anchor_text: Текст анкора
+            
+        Returns:
+            Список найденных спам-фраз (пустой для чистого анкора)
+        """
+        if not anchor_text:
+            return []
+        
+        if not self._loaded:
+            self.load_spam_phrases()
+        
+        if not self.spam_phrases:
+            return []
+        
+        return self.matcher.find_all(anchor_text.lower().strip())
+    
     def is_spam_anchor(self, anchor_text: Optional[str]) -> bool:
         """
         Проверка анкора на наличие спам-фраз
@@ -70,19 +337,198 @@ class SpamFilter:
         # Нормализуем анкор
         normalized = anchor_text.lower().strip()
         
-        # Проверяем каждую спам-фразу
-        for spam_phrase in self.spam_phrases:
-            # Проверка точного совпадения слова (word boundary)
-            pattern = r'\b' + re.escape(spam_phrase) + r'\b'
-            if re.search(pattern, normalized):
-                logger.debug(
-                    f"Спам-фраза '{spam_phrase}' найдена в анкоре: "
-                    f"'{anchor_text[:50]}...'"
-                )
-                return True
+        # Один проход автомата по анкору вместо регулярки на каждую фразу
+        spam_phrase = self.matcher.search(normalized)
+        if spam_phrase is not None:
+            logger.debug(
+                f"Спам-фраза '{spam_phrase}' найдена в анкоре: "
+                f"'{anchor_text[:50]}...'"
+            )
+            return True
         
         return False
     
+    def update_scan(
+        self,
+        result: AnchorScanResult,
+        anchor: Optional[str],
+        max_examples: int = 3
+    ) -> bool:
+        """
+        Учет одного анкора в статистике домена
+        
+        Args:
+            result: Накопитель статистики домена
+            anchor: Текст анкора
+            max_examples: Максимум примеров спам-анкоров
+            
+        Returns:
+            True если анкор спамный
+        """
+        if not self._loaded:
+            self.load_spam_phrases()
+        
+        result.anchors_checked += 1
+        if not anchor or not self.spam_phrases:
+            return False
+        
+        found = self.matcher.find_all(anchor.lower().strip())
+        if not found:
+            return False
+        
+        result.spam_count += 1
+        result.spam_weight += self.anchor_weight(found)
+        phrase_counts = result.phrase_counts
+        for phrase in found:
+            phrase_counts[phrase] = phrase_counts.get(phrase, 0) + 1
+        if len(result.examples) < max_examples:
+            result.examples.append(anchor)
+        return True
+    
+    def scan_anchors(
+        self,
+        anchors: Iterable[Optional[str]],
+        spam_threshold: int = 1,
+        spam_score_threshold: float = 0.0,
+        max_examples: int = 3,
+        early_exit: bool = True
+    ) -> AnchorScanResult:
+        """
+        Проверка всех анкоров домена за один проход
+        
+        Args:
+            anchors: Анкоры ссылок домена
+            spam_threshold: Минимум спам-анкоров для пометки домена
+            spam_score_threshold: Минимальный взвешенный spam_score
+            max_examples: Максимум примеров спам-анкоров
+            early_exit: Остановиться, когда исход уже не изменится: порог
+                спам-анкоров достигнут, примеры собраны, а spam_score не
+                опустится ниже spam_score_threshold даже если все
+                оставшиеся анкоры чистые (нужен известный размер anchors)
+            
+        Returns:
+            AnchorScanResult с флагом, примерами и счетчиками фраз
+            (при досрочной остановке completed=False, а доли посчитаны
+            по проверенным анкорам)
+        """
+        if not self._loaded:
+            self.load_spam_phrases()
+        
+        result = AnchorScanResult()
+        
+        # Вес, после которого spam_score по всем анкорам не ниже порога.
+        # Оценка верна только для неотрицательных весов фраз.
+        exit_weight = 0.0
+        can_exit = early_exit
+        if early_exit and spam_score_threshold > 0:
+            can_exit = (
+                hasattr(anchors, '__len__') and
+                min(self.spam_weights.values(), default=DEFAULT_PHRASE_WEIGHT) >= 0
+            )
+            if can_exit:
+                exit_weight = spam_score_threshold * len(anchors)
+        
+        for anchor in anchors:
+            is_spam = self.update_scan(result, anchor, max_examples)
+            if (
+                can_exit and is_spam and
+                result.spam_count >= spam_threshold and
+                len(result.examples) >= max_examples and
+                result.spam_weight >= exit_weight
+            ):
+                result.completed = False
+                break
+        
+        result.evaluate(spam_threshold, spam_score_threshold)
+        return result
+    
+    def scan_anchor_groups(
+        self,
+        groups: Dict[str, List[Optional[str]]],
+        spam_threshold: int = 1,
+        spam_score_threshold: float = 0.0,
+        max_examples: int = 3,
+        early_exit: bool = True,
+        max_workers: Optional[int] = None,
+        use_processes: bool = False,
+        parallel_threshold: int = 50000
+    ) -> Dict[str, AnchorScanResult]:
+        """
+        Пакетная проверка анкоров для множества доменов
+        
+        Args:
+            groups: Словарь {домен: анкоры}
+            spam_threshold: Минимум спам-анкоров для пометки домена
+            spam_score_threshold: Минимальный взвешенный spam_score
+            max_examples: Максимум примеров спам-анкоров на домен
+            early_exit: Досрочная остановка по каждому домену
+            max_workers: Размер пула (None или 0 - без пула)
+            use_processes: Пул процессов вместо пула потоков
+            parallel_threshold: Минимум анкоров в пакете для запуска пула
+            
+        Returns:
+            Словарь {домен: AnchorScanResult}
+        """
+        if not self._loaded:
+            self.load_spam_phrases()
+        
+        scan_kwargs = {
+            'spam_threshold': spam_threshold,
+            'spam_score_threshold': spam_score_threshold,
+            'max_examples': max_examples,
+            'early_exit': early_exit
+        }
+        total_anchors = sum(len(anchors) for anchors in groups.values())
+        
+        if not max_workers or max_workers < 2 or total_anchors < parallel_threshold:
+            return {
+                domain: self.scan_anchors(anchors, **scan_kwargs)
+                for domain, anchors in groups.items()
+            }
+        
+        # Автомат собирается до запуска потоков, чтобы они его разделяли
+        self.matcher
+        chunks = _split_groups(groups, max_workers * 4)
+        logger.debug(
+            f"Проверка {total_anchors} анкоров {len(groups)} доменов "
+            f"в пуле ({max_workers} {'процессов' if use_processes else 'потоков'})"
+        )
+        
+        results: Dict[str, AnchorScanResult] = {}
+        if use_processes:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_scan_worker,
+                initargs=(sorted(self.spam_phrases), self.spam_weights)
+            ) as executor:
+                futures = [
+                    executor.submit(_scan_chunk_in_worker, chunk, scan_kwargs)
+                    for chunk in chunks
+                ]
+                for future in futures:
+                    results.update(future.result())
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(self._scan_chunk, chunk, scan_kwargs)
+                    for chunk in chunks
+                ]
+                for future in futures:
+                    results.update(future.result())
+        
+        return results
+    
+    def _scan_chunk(
+        self,
+        chunk: List[Tuple[str, List[Optional[str]]]],
+        scan_kwargs: dict
+    ) -> Dict[str, AnchorScanResult]:
+        """Проверка части доменов пакета"""
+        return {
+            domain: self.scan_anchors(anchors, **scan_kwargs)
+            for domain, anchors in chunk
+        }
+    
     def filter_backlinks(
         self,
         backlinks: List
@@ -147,12 +593,256 @@ class SpamFilter:
         return spam_examples
 
 
+def _split_groups(
+    groups: Dict[str, List[Optional[str]]],
+    parts: int
+) -> List[List[Tuple[str, List[Optional[str]]]]]:
+    """Разбиение доменов на части примерно равного числа анкоров"""
+    target = max(sum(len(a) for a in groups.values()) // max(parts, 1), 1)
+    chunks = []
+    current = []
+    size = 0
+    
+    for domain, anchors in groups.items():
+        current.append((domain, anchors))
+        size += len(anchors)
+        if size >= target:
+            chunks.append(current)
+            current = []
+            size = 0
+    
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# Фильтр воркера пула процессов (автомат собирается один раз на процесс)
+_worker_filter: Optional[SpamFilter] = None
+
+
+def _init_scan_worker(phrases: List[str], weights: Dict[str, float]) -> None:
+    """Инициализация воркера пула процессов"""
+    global _worker_filter
+    _worker_filter = SpamFilter()
+    _worker_filter.spam_phrases = phrases
+    _worker_filter.spam_weights = dict(weights)
+    _worker_filter._loaded = True
+
+
+def _scan_chunk_in_worker(
+    chunk: List[Tuple[str, List[Optional[str]]]],
+    scan_kwargs: dict
+) -> Dict[str, AnchorScanResult]:
+    """Проверка части доменов в воркере пула процессов"""
+    return _worker_filter._scan_chunk(chunk, scan_kwargs)
+
+
+# Флаги правил в узлах суффиксного бора ExclusionIndex (битовая маска)
+_SUBDOMAINS = 1  # *.example.com - только поддомены
+_DOMAIN_AND_SUBDOMAINS = 2  # .example.com - домен и все поддомены
+
+
+def _is_exclusion_pattern(rule: str) -> bool:
+    """Правило - шаблон (*.example.com, .ru), а не точный домен"""
+    return rule.startswith('.') or rule.startswith('*.')
+
+
+class ExclusionIndex:
+    """
+    Индекс исключенных доменов
+    
+    Точные домены хранятся в хэш-множестве, правила-шаблоны - в боре
+    по меткам домена в обратном порядке (com -> example -> blog).
+    
+    Форматы правил:
+        example.com     - только сам домен
+        *.blogspot.com  - любые поддомены blogspot.com
+        .example.com    - домен и все его поддомены
+        *.ru или .ru    - вся доменная зона
+    """
+    
+    def __init__(self, source_file: Optional[str] = None):
+        self.source_file = Path(source_file) if source_file else None
+        self.exact: Set[str] = set()
+        self._trie: dict = {}
+        self._rules_count = 0
+        self._mtime_ns: Optional[int] = None
+    
+    def __len__(self) -> int:
+        return len(self.exact) + self._rules_count
+    
+    def __contains__(self, domain: str) -> bool:
+        return self.matches(domain)
+    
+    @staticmethod
+    def _parse(rule: str) -> Tuple[int, str]:
+        """Флаг шаблона (0 - точный домен) и домен правила"""
+        rule = rule.strip().lower().rstrip('.')
+        if rule.startswith('*.'):
+            return _SUBDOMAINS, rule[2:]
+        if rule.startswith('.'):
+            return _DOMAIN_AND_SUBDOMAINS, rule[1:]
+        return 0, rule
+    
+    def add(self, rule: str) -> None:
+        """Добавление правила (домена или шаблона)"""
+        flag, suffix = self._parse(rule)
+        if not suffix:
+            return
+        if not flag:
+            self.exact.add(suffix)
+            return
+        
+        node = self._trie
+        for label in reversed(suffix.split('.')):
+            node = node.setdefault(label, {})
+        
+        flags = node.get(None, 0)
+        if not flags & flag:
+            self._rules_count += 1
+            node[None] = flags | flag
+    
+    def remove(self, rule: str) -> bool:
+        """
+        Удаление правила (домена или шаблона)
+        
+        Returns:
+            True если правило было в индексе
+        """
+        flag, suffix = self._parse(rule)
+        if not suffix:
+            return False
+        if not flag:
+            if suffix in self.exact:
+                self.exact.remove(suffix)
+                return True
+            return False
+        
+        path = [self._trie]
+        labels = list(reversed(suffix.split('.')))
+        for label in labels:
+            node = path[-1].get(label)
+            if node is None:
+                return False
+            path.append(node)
+        
+        node = path[-1]
+        flags = node.get(None, 0)
+        if not flags & flag:
+            return False
+        
+        self._rules_count -= 1
+        if flags & ~flag:
+            node[None] = flags & ~flag
+            return True
+        del node[None]
+        # Удаляем опустевшие узлы от листа к корню
+        for label, parent in zip(reversed(labels), reversed(path[:-1])):
+            if parent[label]:
+                break
+            del parent[label]
+        return True
+    
+    def matches(self, domain: str) -> bool:
+        """
+        Проверка домена по всем правилам
+        
+        Args:
+            domain: Доменное имя
+            
+        Returns:
+            True если домен исключен
+        """
+        domain = domain.lower()
+        if domain in self.exact:
+            return True
+        if not self._trie:
+            return False
+        
+        labels = domain.split('.')
+        depth = len(labels)
+        node = self._trie
+        
+        for index in range(depth - 1, -1, -1):
+            node = node.get(labels[index])
+            if node is None:
+                return False
+            flags = node.get(None)
+            if flags and (index > 0 or flags & _DOMAIN_AND_SUBDOMAINS):
+                return True
+        
+        return False
+    
+    def filter_many(self, domains: Iterable[str]) -> List[str]:
+        """Домены, не попавшие под исключения (с сохранением порядка)"""
+        exact = self.exact
+        if not self._trie:
+            return [d for d in domains if d.lower() not in exact]
+        return [d for d in domains if not self.matches(d)]
+    
+    def clear(self) -> None:
+        """Удаление всех правил"""
+        self.exact = set()
+        self._trie = {}
+        self._rules_count = 0
+    
+    def load(self) -> None:
+        """Загрузка правил из source_file"""
+        self.clear()
+        self._mtime_ns = None
+        
+        if self.source_file is None:
+            return
+        if not self.source_file.exists():
+            logger.warning(f"Файл исключений не найден: {self.source_file}")
+            return
+        
+        try:
+            self._mtime_ns = self.source_file.stat().st_mtime_ns
+            with open(self.source_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        self.add(line)
+            
+            logger.info(
+                f"Загружено {len(self.exact)} исключенных доменов и "
+                f"{self._rules_count} правил-шаблонов"
+            )
+            
+        except Exception as e:
+            logger.error(f"Ошибка загрузки исключений: {e}")
+    
+    def reload_if_changed(self) -> bool:
+        """
+        Перезагрузка правил, если файл изменился с момента загрузки
+        
+        Returns:
+            True если правила были перезагружены
+        """
+        if self.source_file is None:
+            return False
+        
+        try:
+            mtime_ns = self.source_file.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        
+        if mtime_ns == self._mtime_ns:
+            return False
+        
+        logger.info(f"Файл исключений изменился, перезагрузка: {self.source_file}")
+        self.load()
+        return True
+
+
 class DomainExcluder:
     """Управление исключениями доменов"""
     
     def __init__(self, excluded_domains_file: str = "data/excluded_domains.txt"):
         self.excluded_domains_file = Path(excluded_domains_file)
         self.excluded_domains: Set[str] = set()
+        self._rules = ExclusionIndex()  # Шаблоны (*.example.com, .ru)
         self._loaded = False
     
     def load_excluded_domains(self) -> None:
@@ -173,7 +863,7 @@ class DomainExcluder:
                 for line in f:
                     domain = line.strip().lower()
                     if domain and not domain.startswith('#'):
-                        self.excluded_domains.add(domain)
+                        self._add_rule(domain)
             
             logger.info(
                 f"Загружено {len(self.excluded_domains)} исключенных доменов"
@@ -184,6 +874,12 @@ class DomainExcluder:
         
         self._loaded = True
     
+    def _add_rule(self, rule: str) -> None:
+        """Учет строки исключений: домена или шаблона"""
+        self.excluded_domains.add(rule)
+        if _is_exclusion_pattern(rule):
+            self._rules.add(rule)
+    
     def is_excluded(self, domain: str) -> bool:
         """
         Проверка домена на исключение
@@ -197,19 +893,20 @@ class DomainExcluder:
         if not self._loaded:
             self.load_excluded_domains()
         
-        return domain.lower() in self.excluded_domains
+        domain = domain.lower()
+        return domain in self.excluded_domains or domain in self._rules
     
     def add_exclusion(self, domain: str) -> None:
         """
         Добавить домен в список исключений
         
         Args:
-            domain: Доменное имя
+            domain: Доменное имя или шаблон (*.example.com, .ru)
         """
         if not self._loaded:
             self.load_excluded_domains()
         
-        self.excluded_domains.add(domain.lower())
+        self._add_rule(domain.strip().lower())
         logger.info(f"Домен {domain} добавлен в исключения")
     
     def remove_exclusion(self, domain: str) -> bool:
@@ -217,7 +914,7 @@ class DomainExcluder:
         Удалить домен из списка исключений
         
         Args:
-            domain: Доменное имя
+            domain: Доменное имя или шаблон (*.example.com, .ru)
             
         Returns:
             True если домен был удален
@@ -225,9 +922,11 @@ class DomainExcluder:
         if not self._loaded:
             self.load_excluded_domains()
         
-        domain_lower = domain.lower()
+        domain_lower = domain.strip().lower()
         if domain_lower in self.excluded_domains:
             self.excluded_domains.remove(domain_lower)
+            if _is_exclusion_pattern(domain_lower):
+                self._rules.remove(domain_lower)
             logger.info(f"Домен {domain} удален из исключений")
             return True
         
@@ -0,0 +1,60 @@
+"""
+Декодирование страниц Keys.so в компактные записи Backlink
+"""
+
+import json
+from typing import Any, Dict, List, Tuple, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from ..models.backlink import Backlink
+
+
+def loads(body: Union[bytes, str]) -> Any:
+    """Разбор JSON напрямую из байтов ответа (orjson, если установлен)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def decode_links_page(
+    page: Union[bytes, str, Dict[str, Any]],
+    keep_dates: bool = False
+) -> Tuple[List[Backlink], Dict[str, Any]]:
+    """
+    Страница ссылок Keys.so -> записи Backlink и данные пагинации
+    
+    Словари элементов не сохраняются: после вызова на них не остается
+    ссылок, и память страницы освобождается сразу.
+    
+    Args:
+        page: Тело ответа (байты/строка) или уже разобранный словарь
+        keep_dates: Разобрать 'created_at' в discovered_at
+        
+    Returns:
+        (записи, {'count', 'total', 'current_page', 'last_page'}); count -
+        число элементов на странице (включая пропущенные без домена)
+    """
+    if isinstance(page, (bytes, bytearray, memoryview, str)):
+        page = loads(page)
+    
+    data = page.get('data') if isinstance(page, dict) else None
+    if not data:
+        return [], {'count': 0}
+    
+    records = [
+        Backlink.from_keys_so(item, keep_dates=keep_dates)
+        for item in data
+        if isinstance(item, dict)
+    ]
+    meta = {
+        'count': len(data),
+        'total': page.get('total', 0),
+        'current_page': page.get('current_page'),
+        'last_page': page.get('last_page', 0),
+    }
+    return records, meta
@@ -3,13 +3,25 @@ Keys.so API Client
 Клиент для работы с API Keys.so
 """
 
+import asyncio
 import logging
 import aiohttp
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional, Union
 from datetime import datetime
 
+from ..models.backlink import Backlink
+from ..utils.metrics import registry as metrics
+from ..utils.rate_limiter import AsyncRateLimiter
+from .decoding import decode_links_page, loads
+
 logger = logging.getLogger(__name__)
 
+# Эндпоинты списков ссылок по типу
+LINK_ENDPOINTS = {
+    'backlinks': "/report/simple/links/backlinks",
+    'outlinks': "/report/simple/links/outlinks",
+}
+
 
 class KeysSoClient:
     """Клиент для работы с Keys.so API"""
@@ -19,7 +31,10 @@ class KeysSoClient:
         api_key: str,
         base_url: str = "https://api.keys.so",
         timeout: int = 30,
-        max_retries: int = 3
+        max_retries: int = 3,
+        rate_limit: float = 1.0,
+        rate_burst: int = 10,
+        cassette=None
     ):
         """
         Инициализация клиента
@@ -29,16 +44,26 @@ class KeysSoClient:
             base_url: Базовый URL API
             timeout: Таймаут запросов в секундах
             max_retries: Максимальное количество повторных попыток
+            rate_limit: Запросов в секунду (0 - без ограничения)
+            rate_burst: Запросов подряд без ожидания
+            cassette: Кассета для записи/воспроизведения запросов (Cassette)
         """
         self.api_key = api_key
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
         self.max_retries = max_retries
         self.session: Optional[aiohttp.ClientSession] = None
+        self.cassette = cassette
+
+        # Общий лимитер для всех запросов клиента (страницы, метрики)
+        self.rate_limiter = AsyncRateLimiter(rate_limit, burst=rate_burst, name="keys_so")
         logger.info("Keys.so API клиент инициализирован")
 
     async def __aenter__(self):
         """Вход в контекстный менеджер"""
+        if self.cassette is not None and self.cassette.replaying:
+            self.session = self.cassette.wrap(None)
+            return self
         self.session = aiohttp.ClientSession(
             timeout=aiohttp.ClientTimeout(total=self.timeout),
             headers={
@@ -46,6 +71,8 @@ class KeysSoClient:
                 'Content-Type': 'application/json'
             }
         )
+        if self.cassette is not None:
+            self.session = self.cassette.wrap(self.session)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -81,25 +108,33 @@ class KeysSoClient:
                     request_method = self.session.post
                     kwargs = {"json": params}
 
-                async with request_method(url, **kwargs) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    elif response.status == 401:
-                        raise Exception("Ошибка авторизации. Проверьте API ключ")
-                    elif response.status == 429:
-                        logger.warning("Rate limit exceeded. Waiting before retry...")
-                        if attempt < self.max_retries - 1:
-                            import asyncio
-                            await asyncio.sleep(10)
-                            continue
-                        raise Exception("Rate limit exceeded")
-                    else:
-                        error_text = await response.text()
-                        raise Exception(f"API error {response.status}: {error_text}")
+                await self.rate_limiter.acquire()
+                with metrics.track("in_flight_requests", service="keys_so"), \
+                        metrics.timer("keys_so_request", endpoint=endpoint):
+                    async with request_method(url, **kwargs) as response:
+                        status = response.status
+                        if status == 200:
+                            return loads(await response.read())
+                        if status != 429:
+                            error_text = await response.text()
+                if status == 401:
+                    raise Exception("Ошибка авторизации. Проверьте API ключ")
+                elif status == 429:
+                    logger.warning("Rate limit exceeded. Waiting before retry...")
+                    if attempt < self.max_retries - 1:
+                        # Пауза действует на все параллельные запросы клиента
+                        self.rate_limiter.pause(10)
+                        metrics.inc("retries", service="keys_so")
+                        metrics.inc("backoff_seconds", 10, service="keys_so")
+                        continue
+                    raise Exception("Rate limit exceeded")
+                else:
+                    raise Exception(f"API error {status}: {error_text}")
             except aiohttp.ClientError as e:
                 if attempt < self.max_retries - 1:
                     logger.warning(f"Request failed (attempt {attempt + 1}/{self.max_retries}): {e}")
-                    import asyncio
+                    metrics.inc("retries", service="keys_so")
+                    metrics.inc("backoff_seconds", 2 ** attempt, service="keys_so")
                     await asyncio.sleep(2 ** attempt)
                     continue
                 raise Exception(f"Failed to make request after {self.max_retries} attempts: {e}")
@@ -136,65 +171,30 @@ class KeysSoClient:
     async def get_backlinks(
         self,
         domain: str,
-        limit: int = 100000
-    ) -> List[Dict[str, Any]]:
+        limit: int = 100000,
+        as_records: bool = False,
+        keep_dates: bool = False
+    ) -> List[Union[Dict[str, Any], Backlink]]:
         """
         Получение обратных ссылок для домена (входящие ссылки)
 
         Args:
             domain: Домен для анализа
             limit: Максимальное количество ссылок
+            as_records: Вернуть компактные записи Backlink вместо словарей API
+            keep_dates: Для записей - разобрать дату обнаружения ссылки
 
         Returns:
             Список обратных ссылок
         """
         logger.info(f"Получение входящих ссылок для {domain}")
 
-        all_results = []
-        per_page = 100  # Безопасное значение для API
-        page = 1
-
         try:
-            while len(all_results) < limit:
-                endpoint = "/report/simple/links/backlinks"
-                params = {
-                    'domain': domain,
-                    'per_page': per_page,
-                    'page': page
-                }
-
-                response = await self._make_request(endpoint, params, method="GET")
-
-                # Проверяем структуру ответа
-                if not response or 'data' not in response:
-                    logger.warning(f"Unexpected response structure: {response}")
-                    break
-
-                data = response['data']
-                if not data:
-                    logger.info("Больше нет данных")
-                    break
-
-                all_results.extend(data)
-
-                # Проверяем, есть ли еще страницы
-                total = response.get('total', 0)
-                current_page = response.get('current_page', page)
-                last_page = response.get('last_page', 0)
-
-                logger.info(f"Получено {len(all_results)} из {total} ссылок (страница {current_page}/{last_page})")
-
-                if len(all_results) >= limit or current_page >= last_page or len(data) < per_page:
-                    break
-
-                page += 1
-
-                # Защита от rate limit
-                import asyncio
-                await asyncio.sleep(1)
-
-            logger.info(f"Всего получено входящих ссылок: {len(all_results)}")
-            return all_results
+            results = await self._collect_links(
+                LINK_ENDPOINTS['backlinks'], domain, limit, as_records, keep_dates
+            )
+            logger.info(f"Всего получено входящих ссылок: {len(results)}")
+            return results
 
         except Exception as e:
             logger.error(f"Ошибка при получении данных: {e}")
@@ -203,69 +203,134 @@ class KeysSoClient:
     async def get_all_outlinks(
         self,
         domain: str,
-        limit: int = 100000
-    ) -> List[Dict[str, Any]]:
+        limit: int = 100000,
+        as_records: bool = False,
+        keep_dates: bool = False
+    ) -> List[Union[Dict[str, Any], Backlink]]:
         """
         Получение всех исходящих ссылок для домена
 
         Args:
             domain: Домен для анализа
             limit: Максимальное количество ссылок
+            as_records: Вернуть компактные записи Backlink вместо словарей API
+            keep_dates: Для записей - разобрать дату обнаружения ссылки
 
         Returns:
             Список исходящих ссылок
         """
         logger.info(f"Получение исходящих ссылок для {domain}")
 
+        try:
+            results = await self._collect_links(
+                LINK_ENDPOINTS['outlinks'], domain, limit, as_records, keep_dates
+            )
+            logger.info(f"Всего получено исходящих ссылок: {len(results)}")
+            return results
+
+        except Exception as e:
+            logger.error(f"Ошибка при получении исходящих ссылок: {e}")
+            raise
+
+    async def _collect_links(
+        self,
+        endpoint: str,
+        domain: str,
+        limit: int,
+        as_records: bool = False,
+        keep_dates: bool = False
+    ) -> List[Union[Dict[str, Any], Backlink]]:
+        """
+        Постраничный сбор ссылок в один список
+
+        Args:
+            endpoint: Эндпоинт ссылок (backlinks или outlinks)
+            domain: Домен для анализа
+            limit: Максимальное количество ссылок
+            as_records: Вернуть компактные записи Backlink
+            keep_dates: Разобрать дату обнаружения ссылки
+
+        Returns:
+            Список ссылок
+        """
         all_results = []
-        per_page = 100
-        page = 1
+        async for page in self.iter_link_pages(endpoint, domain, limit, as_records, keep_dates):
+            all_results.extend(page)
+        return all_results
 
-        try:
-            while len(all_results) < limit:
-                endpoint = "/report/simple/links/outlinks"
-                params = {
-                    'domain': domain,
-                    'per_page': per_page,
-                    'page': page
-                }
+    async def iter_link_pages(
+        self,
+        endpoint: str,
+        domain: str,
+        limit: int = 100000,
+        as_records: bool = True,
+        keep_dates: bool = False,
+        start_page: int = 1
+    ) -> AsyncIterator[List[Union[Dict[str, Any], Backlink]]]:
+        """
+        Постраничная выдача ссылок по мере загрузки
 
-                response = await self._make_request(endpoint, params, method="GET")
+        В режиме as_records каждая страница сразу декодируется в записи
+        Backlink, и словари ответа не накапливаются.
 
-                # Проверяем структуру ответа
-                if not response or 'data' not in response:
-                    logger.warning(f"Unexpected response structure: {response}")
-                    break
+        Args:
+            endpoint: Эндпоинт ссылок (LINK_ENDPOINTS)
+            domain: Домен для анализа
+            limit: Максимальное количество ссылок
+            as_records: Выдавать компактные записи Backlink
+            keep_dates: Разобрать дату обнаружения ссылки
+            start_page: Первая страница (продолжение прерванного сбора)
 
-                data = response['data']
-                if not data:
-                    logger.info("Больше нет данных")
-                    break
+        Yields:
+            Ссылки одной страницы
+        """
+        endpoint = LINK_ENDPOINTS.get(endpoint, endpoint)
+        received = 0
+        per_page = 100  # Безопасное значение для API
+        page = start_page
 
-                all_results.extend(data)
+        while received < limit:
+            params = {
+                'domain': domain,
+                'per_page': per_page,
+                'page': page
+            }
 
-                # Проверяем, есть ли еще страницы
-                total = response.get('total', 0)
-                current_page = response.get('current_page', page)
-                last_page = response.get('last_page', 0)
+            response = await self._make_request(endpoint, params, method="GET")
 
-                logger.info(f"Получено {len(all_results)} из {total} ссылок (страница {current_page}/{last_page})")
+            # Проверяем структуру ответа
+            if not response or 'data' not in response:
+                logger.warning(f"Unexpected response structure: {response}")
+                break
 
-                if len(all_results) >= limit or current_page >= last_page or len(data) < per_page:
-                    break
+            if as_records:
+                data, meta = decode_links_page(response, keep_dates=keep_dates)
+                count = meta['count']
+            else:
+                data = response['data']
+                count = len(data) if data else 0
+                meta = response
+            if not count:
+                logger.info("Больше нет данных")
+                break
 
-                page += 1
+            received += len(data)
 
-                # Защита от rate limit
-                import asyncio
-                await asyncio.sleep(1)
+            # Проверяем, есть ли еще страницы
+            total = meta.get('total', 0)
+            current_page = meta.get('current_page') or page
+            last_page = meta.get('last_page', 0)
+            del response
 
-            logger.info(f"Всего получено исходящих ссылок: {len(all_results)}")
-            return all_results
+            logger.info(f"Получено {received} из {total} ссылок (страница {current_page}/{last_page})")
+            metrics.inc("pages_fetched", endpoint=endpoint)
+            metrics.inc("links_fetched", len(data), endpoint=endpoint)
+            yield data
 
-        except Exception as e:
-            logger.error(f"Ошибка при получении исходящих ссылок: {e}")
-            raise
+            if received >= limit or current_page >= last_page or count < per_page:
+                break
+
+            page += 1
 
     async def get_domain_metrics(
         self,
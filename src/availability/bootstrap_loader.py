@@ -1,153 +1,262 @@
 import aiohttp
 import asyncio
-import json
+import os
+import pickle
+import time
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Set
+from typing import Dict, Optional, Sequence, Set, Tuple
 import logging
 
+from ..utils.metrics import registry as metrics
+
 logger = logging.getLogger(__name__)
 
+# Версия формата индекса; индекс другой версии загружается заново
+INDEX_FORMAT = 1
+
+# Пауза перед повторной попыткой обновления после ошибки, секунды
+RETRY_AFTER = 600
+
 
 class RDAPBootstrapLoader:
-    """Загрузка и кэширование IANA RDAP Bootstrap Registry"""
-    
+    """
+    Загрузка и кэширование IANA RDAP Bootstrap Registry
+
+    dns.json разбирается в индекс суффикс -> кортеж серверов; одинаковые
+    списки серверов (у одного реестра бывают сотни TLD) хранятся одним
+    объектом. Индекс сохраняется pickle-файлом (загрузка - доли
+    миллисекунды) вместе с ETag и Last-Modified ответа IANA.
+
+    Устаревший индекс продолжает обслуживать проверки, а обновление идет
+    в фоне условным запросом (If-None-Match / If-Modified-Since): ответ
+    304 только продлевает срок, новый список подменяет индекс целиком.
+    """
+
     def __init__(
         self,
-        cache_file: str = "data/rdap_bootstrap.json",
+        cache_file: str = "data/rdap_bootstrap.pickle",
         cache_ttl_days: int = 7,
-        bootstrap_url: str = "https://data.iana.org/rdap/dns.json"
+        bootstrap_url: str = "https://data.iana.org/rdap/dns.json",
+        cassette=None
     ):
         self.cache_file = Path(cache_file)
-        self.cache_ttl = timedelta(days=cache_ttl_days)
+        self.cassette = cassette
+        self.cache_ttl = cache_ttl_days * 86400
         self.bootstrap_url = bootstrap_url
-        
+
         # Данные bootstrap
-        self._tld_to_servers: Dict[str, list] = {}
+        self._tld_to_servers: Dict[str, Tuple[str, ...]] = {}
         self._loaded = False
-    
+
+        # Валидаторы последнего ответа IANA и срок годности индекса
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
     async def load(self) -> None:
-        """Загрузка bootstrap данных (из кэша или с сервера)"""
+        """Загрузка bootstrap данных (из индекса или с сервера)"""
         if self._loaded:
             return
-        
-        # Проверяем кэш
-        if await self._is_cache_valid():
-            logger.info("Загрузка RDAP bootstrap из кэша...")
-            await self._load_from_cache()
+
+        if self._load_index():
+            logger.info("RDAP bootstrap загружен из индекса")
+            metrics.inc("cache_hits", cache="rdap_bootstrap")
+            # Устаревший индекс работает, пока идет обновление
+            self._maybe_refresh()
         else:
             logger.info("Загрузка RDAP bootstrap с IANA...")
+            metrics.inc("cache_misses", cache="rdap_bootstrap")
             await self._load_from_server()
-        
+
         self._loaded = True
         logger.info(
             f"RDAP bootstrap загружен: {len(self._tld_to_servers)} TLD "
             f"поддерживают RDAP"
         )
-    
-    async def _is_cache_valid(self) -> bool:
-        """Проверка валидности кэша"""
-        if not self.cache_file.exists():
+
+    async def close(self) -> None:
+        """Остановка фонового обновления"""
+        task, self._refresh_task = self._refresh_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    @property
+    def stale(self) -> bool:
+        """Срок годности индекса истек"""
+        return time.time() >= self._expires_at
+
+    def _load_index(self) -> bool:
+        """Загрузка индекса из файла; False - индекса нет или он поврежден"""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                index = pickle.load(f)
+            if index.get('format') != INDEX_FORMAT:
+                return False
+        except FileNotFoundError:
             return False
-        
-        # Проверяем возраст файла
-        mtime = datetime.fromtimestamp(self.cache_file.stat().st_mtime)
-        age = datetime.now() - mtime
-        return age < self.cache_ttl
-    
-    async def _load_from_cache(self) -> None:
-        """Загрузка из кэша"""
+        except Exception as e:
+            logger.warning(f"Ошибка загрузки индекса RDAP bootstrap: {e}")
+            return False
+
+        self._tld_to_servers = index['suffixes']
+        self._etag = index.get('etag')
+        self._last_modified = index.get('last_modified')
+        self._expires_at = index.get('fetched_at', 0.0) + self.cache_ttl
+        return True
+
+    def _save_index(self) -> None:
+        """Атомарная запись индекса (чтение параллельным процессом не увидит половину)"""
         try:
-            with open(self.cache_file, 'r') as f:
-                data = json.load(f)
-            self._tld_to_servers = data.get('tld_to_servers', {})
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            index = {
+                'format': INDEX_FORMAT,
+                'suffixes': self._tld_to_servers,
+                'etag': self._etag,
+                'last_modified': self._last_modified,
+                'fetched_at': self._expires_at - self.cache_ttl,
+            }
+            tmp_file = self.cache_file.with_name(self.cache_file.name + '.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
+            logger.debug(f"RDAP bootstrap сохранен в {self.cache_file}")
         except Exception as e:
-            logger.warning(f"Ошибка загрузки кэша: {e}. Загрузка с сервера...")
-            await self._load_from_server()
-    
+            logger.warning(f"Не удалось сохранить индекс RDAP bootstrap: {e}")
+
+    def _session(self):
+        timeout = aiohttp.ClientTimeout(total=30)
+        if self.cassette:
+            return self.cassette.session(timeout=timeout)
+        return aiohttp.ClientSession(timeout=timeout)
+
+    async def _fetch(self, conditional: bool = False) -> bool:
+        """
+        Запрос dns.json
+
+        Args:
+            conditional: Условный запрос с валидаторами сохраненного индекса
+
+        Returns:
+            True - индекс заменен, False - не изменился (304)
+        """
+        headers = {}
+        if conditional and self._etag:
+            headers['If-None-Match'] = self._etag
+        if conditional and self._last_modified:
+            headers['If-Modified-Since'] = self._last_modified
+
+        async with self._session() as session:
+            async with session.get(self.bootstrap_url, headers=headers or None) as response:
+                if response.status == 304:
+                    self._expires_at = time.time() + self.cache_ttl
+                    self._save_index()
+                    return False
+                if response.status != 200:
+                    raise Exception(
+                        f"HTTP {response.status}: {await response.text()}"
+                    )
+                data = await response.json()
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+
+        self._parse_bootstrap_data(data)
+        self._etag = etag
+        self._last_modified = last_modified
+        self._expires_at = time.time() + self.cache_ttl
+        self._save_index()
+        return True
+
     async def _load_from_server(self) -> None:
-        """Загрузка с IANA сервера"""
+        """Загрузка с IANA сервера (индекса нет)"""
         try:
-            timeout = aiohttp.ClientTimeout(total=30)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(self.bootstrap_url) as response:
-                    if response.status != 200:
-                        raise Exception(
-                            f"HTTP {response.status}: {await response.text()}"
-                        )
-                    
-                    data = await response.json()
-            
-            # Парсинг данных
-            self._parse_bootstrap_data(data)
-            
-            # Сохранение в кэш
-            await self._save_to_cache()
-            
+            await self._fetch()
         except Exception as e:
             logger.error(f"Ошибка загрузки RDAP bootstrap: {e}")
-            # Попытка использовать старый кэш
-            if self.cache_file.exists():
-                logger.warning("Использование устаревшего кэша...")
-                await self._load_from_cache()
-            else:
-                raise
-    
+            raise
+
+    def _maybe_refresh(self) -> None:
+        """Запуск фонового обновления устаревшего индекса"""
+        if not self.stale or (self._refresh_task and not self._refresh_task.done()):
+            return
+        try:
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh())
+        except RuntimeError:
+            # Вне event loop обновлять некому - обновится при следующем load()
+            pass
+
+    async def _refresh(self) -> None:
+        """Условная перепроверка dns.json; при ошибке остается старый индекс"""
+        try:
+            updated = await self._fetch(conditional=True)
+        except Exception as e:
+            self._expires_at = time.time() + RETRY_AFTER
+            metrics.inc("bootstrap_revalidations", result="error")
+            logger.warning(f"Не удалось обновить RDAP bootstrap, используется прежний: {e}")
+            return
+        metrics.inc("bootstrap_revalidations", result="updated" if updated else "not_modified")
+        logger.info(
+            f"RDAP bootstrap {'обновлен' if updated else 'не изменился'} "
+            f"({len(self._tld_to_servers)} TLD)"
+        )
+
     def _parse_bootstrap_data(self, data: dict) -> None:
         """Парсинг JSON данных bootstrap"""
         services = data.get('services', [])
-        self._tld_to_servers = {}
-        
+        tld_to_servers = {}
+        # Одинаковые списки серверов - один кортеж
+        server_lists: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
         for service in services:
             if len(service) < 2:
                 continue
-            
+
             tlds = service[0]  # Список TLD
-            servers = service[1]  # Список RDAP серверов
-            
+            servers = tuple(service[1])  # Список RDAP серверов
+            servers = server_lists.setdefault(servers, servers)
+
             for tld in tlds:
                 # Удаляем точку в начале если есть
-                tld = tld.lstrip('.')
-                self._tld_to_servers[tld.lower()] = servers
-    
-    async def _save_to_cache(self) -> None:
-        """Сохранение в кэш"""
-        try:
-            # Создаем директорию если не существует
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            cache_data = {
-                'tld_to_servers': self._tld_to_servers,
-                'updated_at': datetime.now().isoformat()
-            }
-            
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
-            
-            logger.debug(f"RDAP bootstrap сохранен в {self.cache_file}")
-        except Exception as e:
-            logger.warning(f"Не удалось сохранить кэш: {e}")
-    
-    def get_rdap_servers(self, tld: str) -> Optional[list]:
+                tld = tld.strip('.')
+                tld_to_servers[tld.lower()] = servers
+
+        # Замена целиком: проверки во время обновления видят старый или новый индекс
+        self._tld_to_servers = tld_to_servers
+
+    def get_rdap_servers(self, tld: str) -> Optional[Sequence[str]]:
         """
-        Получение RDAP серверов для TLD
-        
+        Получение RDAP серверов для суффикса или домена
+
+        Выбирается самый длинный совпадающий суффикс из bootstrap
+        (для co.uk - запись co.uk, если есть, иначе uk).
+
         Args:
-            tld: Top-level domain (com, co.uk, etc)
-        
+            tld: Суффикс (com, co.uk) или доменное имя
+
         Returns:
-            Список URLs RDAP серверов или None если не поддерживается
+            Кортеж URL RDAP серверов или None если не поддерживается
         """
         if not self._loaded:
             logger.warning("Bootstrap не загружен! Вызовите load() сначала.")
             return None
-        
-        return self._tld_to_servers.get(tld.lower())
-    
+
+        self._maybe_refresh()
+        index = self._tld_to_servers
+        name = tld.lower().strip('.')
+        while True:
+            servers = index.get(name)
+            if servers is not None:
+                return servers
+            dot = name.find('.')
+            if dot < 0:
+                return None
+            name = name[dot + 1:]
+
     def supports_rdap(self, tld: str) -> bool:
         """Проверка поддержки RDAP для TLD"""
-        return tld.lower() in self._tld_to_servers
-    
+        return self.get_rdap_servers(tld) is not None
+
     def get_supported_tlds(self) -> Set[str]:
         """Получение всех TLD с поддержкой RDAP"""
         return set(self._tld_to_servers.keys())
@@ -5,16 +5,20 @@ Domain Availability Checker
 
 import logging
 import asyncio
-from typing import List, Optional
-from dataclasses import dataclass
+import dataclasses
+import time
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlparse
 from enum import Enum
 
-from .rdap_checker import RDAPChecker
-from .bootstrap_loader import RDAPBootstrapLoader
-from .whois_checker import WHOISChecker
+from ..models.slots import slotted_dataclass
+from ..utils.metrics import registry as metrics
 
 logger = logging.getLogger(__name__)
 
+# Полоса планировщика для TLD без RDAP
+WHOIS_LANE = "whois"
+
 
 class DomainStatus(Enum):
     """Статус домена"""
@@ -24,13 +28,16 @@ class DomainStatus(Enum):
     ERROR = "ERROR"
 
 
-@dataclass
+@slotted_dataclass
 class AvailabilityResult:
     """Результат проверки доступности домена"""
     domain: str
     status: DomainStatus
-    checked_via: str  # "rdap", "whois", "error"
+    checked_via: str  # "dns", "rdap", "whois", "error"
     error: Optional[str] = None
+    # Запросов к RDAP/WHOIS для этой проверки (0 - ответ DNS или
+    # результат уже идущей проверки общего чекера)
+    lookups: int = 0
 
 
 class DomainAvailabilityChecker:
@@ -41,7 +48,14 @@ class DomainAvailabilityChecker:
         whois_api_key: Optional[str] = None,
         whois_provider: str = "whoisxml",
         max_concurrent: int = 20,
-        skip_rdap: bool = False
+        per_server_limit: int = 10,
+        whois_limit: Optional[int] = None,
+        skip_rdap: bool = False,
+        shared: bool = False,
+        cassette=None,
+        dns_prefilter: bool = False,
+        dns_resolver: Optional[str] = None,
+        dns_concurrency: int = 50
     ):
         """
         Инициализация чекера
@@ -50,32 +64,137 @@ class DomainAvailabilityChecker:
             whois_api_key: API ключ для WHOIS сервиса
             whois_provider: Провайдер WHOIS API
             max_concurrent: Максимум параллельных запросов
+            per_server_limit: Максимум параллельных запросов к одному
+                RDAP-серверу (для check_domain и check_domains)
+            whois_limit: Максимум параллельных запросов к WHOIS API
+                (по умолчанию max_concurrent)
             skip_rdap: Пропустить RDAP, использовать только WHOIS
+            shared: Чекер общий для нескольких запусков: каждый домен
+                проверяется один раз, max_concurrent ограничивает все
+                проверки процесса
+            cassette: Кассета для записи/воспроизведения RDAP и WHOIS (Cassette)
+            dns_prefilter: Сначала NS-запрос: делегированный домен -
+                REGISTERED без RDAP и WHOIS
+            dns_resolver: Адрес резолвера host[:port] (по умолчанию -
+                из /etc/resolv.conf)
+            dns_concurrency: Максимум одновременных DNS-запросов
         """
         self.whois_api_key = whois_api_key
         self.whois_provider = whois_provider
         self.max_concurrent = max_concurrent
+        self.per_server_limit = per_server_limit
+        self.whois_limit = whois_limit or max_concurrent
         self.skip_rdap = skip_rdap
+        self.shared = shared
+
+        # Результаты и проверки в процессе (shared), по домену
+        self._checks: Dict[str, asyncio.Future] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lane_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.dedup_hits = 0
 
-        # Инициализация компонентов
-        self.bootstrap_loader = RDAPBootstrapLoader()
+        # Инициализация компонентов. HTTP-клиенты (aiohttp) импортируются
+        # здесь, а не при импорте модуля: результаты и статусы проверок
+        # нужны журналу запуска и конвейеру и без сети
+        from .bootstrap_loader import RDAPBootstrapLoader
+        from .rdap_checker import RDAPChecker
+        from .whois_checker import WHOISChecker
+
+        self.bootstrap_loader = RDAPBootstrapLoader(cassette=cassette)
         self._bootstrap_loaded = False
-        self.rdap_checker = RDAPChecker(self.bootstrap_loader) if not skip_rdap else None
+        self._bootstrap_lock: Optional[asyncio.Lock] = None
+        self.rdap_checker = RDAPChecker(
+            self.bootstrap_loader,
+            cassette=cassette
+        ) if not skip_rdap else None
         self.whois_checker = WHOISChecker(
             api_provider=whois_provider,
-            api_key=whois_api_key
+            api_key=whois_api_key,
+            cassette=cassette
         ) if whois_api_key else None
 
+        self.dns_prefilter = None
+        if dns_prefilter:
+            from .dns_prefilter import DNSPrefilter, DNSResolver
+            self.dns_prefilter = DNSPrefilter(
+                DNSResolver(dns_resolver),
+                max_concurrent=dns_concurrency
+            )
+
         logger.info(
             f"Domain Availability Checker инициализирован "
-            f"(max_concurrent={max_concurrent}, skip_rdap={skip_rdap})"
+            f"(max_concurrent={max_concurrent}, skip_rdap={skip_rdap}, "
+            f"dns={self.dns_prefilter.resolver.address if self.dns_prefilter else 'off'})"
         )
 
+    async def __aenter__(self):
+        """Открытие общих HTTP-сессий RDAP и WHOIS и сокетов DNS"""
+        for checker in (self.rdap_checker, self.whois_checker):
+            if checker:
+                await checker.open(limit=self.max_concurrent)
+        if self.dns_prefilter:
+            await self.dns_prefilter.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Закрытие HTTP-сессий и фонового обновления bootstrap"""
+        await self.bootstrap_loader.close()
+        for checker in (self.rdap_checker, self.whois_checker, self.dns_prefilter):
+            if checker:
+                await checker.close()
+
     async def _ensure_bootstrap_loaded(self):
         """Гарантирует, что bootstrap данные загружены"""
-        if not self._bootstrap_loaded and self.rdap_checker:
-            await self.bootstrap_loader.load()
-            self._bootstrap_loaded = True
+        if self._bootstrap_loaded or not self.rdap_checker:
+            return
+        # Параллельные проверки ждут одну загрузку, а не запускают свои
+        if self._bootstrap_lock is None:
+            self._bootstrap_lock = asyncio.Lock()
+        async with self._bootstrap_lock:
+            if not self._bootstrap_loaded:
+                await self.bootstrap_loader.load()
+                self._bootstrap_loaded = True
+
+    def _rdap_servers(self, domain: str) -> Optional[Sequence[str]]:
+        """RDAP серверы для домена или None (RDAP отключен, TLD без RDAP)"""
+        if not self.rdap_checker or not self._bootstrap_loaded:
+            return None
+        extracted = self.rdap_checker.suffixes.registrable(domain)
+        if not extracted:
+            return None
+        return self.bootstrap_loader.get_rdap_servers(extracted[1])
+
+    def lane_of(self, domain: str) -> str:
+        """
+        Полоса проверки домена: хост RDAP-сервера реестра или WHOIS_LANE
+
+        Args:
+            domain: Доменное имя
+
+        Returns:
+            Имя полосы (rdap.verisign.com, whois)
+        """
+        servers = self._rdap_servers(domain)
+        if not servers:
+            return WHOIS_LANE
+        return urlparse(servers[0]).netloc or servers[0]
+
+    def lane_limit(self, lane: str) -> int:
+        """Лимит параллельных проверок полосы"""
+        return self.whois_limit if lane == WHOIS_LANE else self.per_server_limit
+
+    def _lane_semaphore(self, lane: str) -> asyncio.Semaphore:
+        """
+        Семафор полосы: лимит действует для любого пути проверки -
+        пакетного check_domains и отдельных check_domain из воркеров
+        конвейера
+        """
+        semaphore = self._lane_semaphores.get(lane)
+        if semaphore is None:
+            semaphore = self._lane_semaphores[lane] = asyncio.Semaphore(
+                max(self.lane_limit(lane), 1)
+            )
+        return semaphore
 
     async def check_domain(self, domain: str) -> AvailabilityResult:
         """
@@ -87,31 +206,92 @@ class DomainAvailabilityChecker:
         Returns:
             Результат проверки
         """
+        if not self.shared:
+            return await self._check_domain(domain)
+
+        # Повторный запрос (в т.ч. пока идет первая проверка) ждет ту же задачу
+        key = domain.lower()
+        check = self._checks.get(key)
+        duplicate = check is not None
+        if not duplicate:
+            check = asyncio.ensure_future(self._check_limited(domain))
+            self._checks[key] = check
+            metrics.inc("cache_misses", cache="availability")
+        else:
+            self.dedup_hits += 1
+            metrics.inc("cache_hits", cache="availability")
+        try:
+            result = await asyncio.shield(check)
+        except Exception:
+            # Неудачную проверку можно повторить
+            if self._checks.get(key) is check:
+                del self._checks[key]
+            raise
+        # Запросы к RDAP/WHOIS учтены у первого вызова
+        return dataclasses.replace(result, lookups=0) if duplicate else result
+
+    async def _check_limited(self, domain: str) -> AvailabilityResult:
+        """Проверка под общим лимитом параллельности"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        started = time.perf_counter()
+        async with self._semaphore:
+            metrics.inc("semaphore_wait_seconds", time.perf_counter() - started, pool="availability")
+            return await self._check_domain(domain)
+
+    async def _check_domain(self, domain: str) -> AvailabilityResult:
+        """Проверка домена через RDAP с fallback на WHOIS"""
+        result = await self._resolve(domain)
+        metrics.inc(
+            "domains_checked", method=result.checked_via, status=result.status.value
+        )
+        return result
+
+    async def _resolve(self, domain: str) -> AvailabilityResult:
+        """Первый ответивший источник: DNS (только делегирование), RDAP, WHOIS"""
+        # Делегированный домен точно зарегистрирован; NXDOMAIN и неясный
+        # ответ проверяются дальше
+        if self.dns_prefilter and await self.dns_prefilter.is_delegated(domain):
+            return AvailabilityResult(
+                domain=domain,
+                status=DomainStatus.REGISTERED,
+                checked_via="dns"
+            )
+
         # Загружаем bootstrap если еще не загружен
         await self._ensure_bootstrap_loaded()
+        lookups = 0
 
-        # Пытаемся через RDAP (если не отключен)
-        if self.rdap_checker:
+        # Пытаемся через RDAP (если не отключен и TLD его поддерживает)
+        if self.rdap_checker and self._rdap_servers(domain):
+            lookups += 1
             try:
-                rdap_result = await self.rdap_checker.check_domain(domain)
+                async with self._lane_semaphore(self.lane_of(domain)):
+                    with metrics.track("in_flight_requests", service="rdap"):
+                        rdap_result = await self.rdap_checker.check_domain(domain)
                 if rdap_result:
                     return AvailabilityResult(
                         domain=domain,
                         status=DomainStatus[rdap_result.status.value],
-                        checked_via="rdap"
+                        checked_via="rdap",
+                        lookups=lookups
                     )
             except Exception as e:
                 logger.debug(f"RDAP check failed for {domain}: {e}")
 
         # Fallback на WHOIS API (если есть ключ)
         if self.whois_checker:
+            lookups += 1
             try:
-                whois_result = await self.whois_checker.check_domain(domain)
+                async with self._lane_semaphore(WHOIS_LANE):
+                    with metrics.track("in_flight_requests", service="whois"):
+                        whois_result = await self.whois_checker.check_domain(domain)
                 if whois_result:
                     return AvailabilityResult(
                         domain=domain,
                         status=DomainStatus[whois_result.status.value],
-                        checked_via="whois"
+                        checked_via="whois",
+                        lookups=lookups
                     )
             except Exception as e:
                 logger.debug(f"WHOIS check failed for {domain}: {e}")
@@ -122,7 +302,8 @@ class DomainAvailabilityChecker:
             domain=domain,
             status=DomainStatus.REGISTERED,
             checked_via="default",
-            error="Could not verify domain availability"
+            error="Could not verify domain availability",
+            lookups=lookups
         )
     
     async def check_domains(
@@ -132,6 +313,12 @@ class DomainAvailabilityChecker:
         """
         Проверка списка доменов с параллельной обработкой
 
+        Домены группируются по RDAP-серверу реестра (TLD без RDAP - в
+        полосу WHOIS) и выдаются по кругу, чтобы очередь к медленному
+        серверу не занимала общие слоты: не больше per_server_limit
+        запросов к одному серверу и max_concurrent всего. Порядок
+        результатов совпадает с порядком domains.
+
         Args:
             domains: Список доменов для проверки
 
@@ -140,21 +327,31 @@ class DomainAvailabilityChecker:
         """
         logger.info(f"Проверка доступности {len(domains)} доменов")
 
-        # Создаем семафор для ограничения параллельных запросов
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        # Полосы определяются по bootstrap; ошибка загрузки повторится
+        # в каждой проверке и станет ее результатом
+        try:
+            await self._ensure_bootstrap_loaded()
+        except Exception as e:
+            logger.error(f"RDAP bootstrap не загружен: {e}")
+
+        from .scheduler import LaneScheduler
 
-        async def check_with_semaphore(domain: str) -> AvailabilityResult:
-            async with semaphore:
-                return await self.check_domain(domain)
+        scheduler = LaneScheduler(self.max_concurrent, self.lane_limit)
+        for i, domain in enumerate(domains):
+            scheduler.add(self.lane_of(domain), i)
+        lanes = scheduler.lanes
+        logger.debug(
+            f"Полосы проверки ({len(lanes)}): "
+            + ", ".join(f"{lane}={count}" for lane, count in sorted(lanes.items(), key=lambda x: -x[1]))
+        )
 
-        # Запускаем проверки параллельно
-        tasks = [check_with_semaphore(domain) for domain in domains]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        by_index = await scheduler.run(lambda i: self.check_domain(domains[i]))
 
         # Обработка результатов и исключений
         final_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
+        for i in range(len(domains)):
+            result = by_index[i]
+            if isinstance(result, BaseException):
                 logger.error(f"Error checking {domains[i]}: {result}")
                 final_results.append(AvailabilityResult(
                     domain=domains[i],
@@ -0,0 +1,406 @@
+"""
+DNS-префильтр проверки доступности
+
+Большинство доменов-доноров - живые сайты. Один NS-запрос к
+рекурсивному резолверу доказывает, что домен делегирован (а значит,
+зарегистрирован), без обращения к RDAP с его лимитами и к платному
+WHOIS API. Дальше идут только NXDOMAIN и неясные ответы.
+
+Запросы - UDP (RFC 1035) через пул сокетов к одному резолверу, без
+внешних библиотек: нужны только код ответа, типы записей ответа и
+записи NS/SOA секции полномочий.
+"""
+
+import asyncio
+import itertools
+import logging
+import secrets
+import struct
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ..utils.metrics import registry as metrics
+
+logger = logging.getLogger(__name__)
+
+QTYPE_NS = 2
+QTYPE_SOA = 6
+QCLASS_IN = 1
+
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+
+DEFAULT_RESOLVER = "8.8.8.8"
+
+# Срок годности ответов в кэше префильтра, секунды
+DELEGATED_TTL = 3600
+NXDOMAIN_TTL = 300
+
+
+class DNSError(Exception):
+    """Некорректный ответ DNS"""
+
+
+class DNSResponse(NamedTuple):
+    """
+    Разобранный ответ: код, флаг TC, типы записей секции ответа и
+    записи секции полномочий (имя владельца, тип)
+    """
+    rcode: int
+    truncated: bool
+    answer_types: List[int]
+    authority: List[Tuple[str, int]]
+
+
+def parse_address(value: str, default_port: int = 53) -> Tuple[str, int]:
+    """
+    Адрес резолвера: 'host', 'host:port' или '[ipv6]:port'
+
+    Returns:
+        (host, port)
+    """
+    value = value.strip()
+    if value.startswith("["):
+        host, _, rest = value[1:].partition("]")
+        return host, int(rest[1:]) if rest.startswith(":") else default_port
+    if value.count(":") == 1:
+        host, port = value.split(":")
+        return host, int(port)
+    return value, default_port
+
+
+def system_resolver(path: str = "/etc/resolv.conf") -> str:
+    """Первый nameserver из resolv.conf или DEFAULT_RESOLVER"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    return f"[{parts[1]}]" if ":" in parts[1] else parts[1]
+    except OSError:
+        pass
+    return DEFAULT_RESOLVER
+
+
+def encode_name(name: str) -> bytes:
+    """Доменное имя в формате QNAME (метки с длиной, IDN - punycode)"""
+    encoded = b""
+    for label in name.strip(".").split("."):
+        raw = label.encode("idna") if not label.isascii() else label.encode("ascii")
+        if not raw or len(raw) > 63:
+            raise ValueError(f"Некорректная метка DNS: {label!r}")
+        encoded += bytes([len(raw)]) + raw
+    return encoded + b"\x00"
+
+
+def build_query(query_id: int, name: str, qtype: int = QTYPE_NS) -> bytes:
+    """DNS-запрос с флагом RD (рекурсия)"""
+    header = struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0)
+    return header + encode_name(name) + struct.pack("!HH", qtype, QCLASS_IN)
+
+
+def _skip_name(data: bytes, offset: int) -> int:
+    """Смещение после имени (с учетом сжатия указателями)"""
+    while True:
+        if offset >= len(data):
+            raise DNSError("Имя выходит за пределы ответа")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        if length == 0:
+            return offset + 1
+        offset += 1 + length
+
+
+def _read_name(data: bytes, offset: int) -> str:
+    """Имя в нижнем регистре, без точки в конце (указатели раскрываются)"""
+    labels = []
+    for _ in range(128):  # Защита от циклических указателей
+        if offset >= len(data):
+            raise DNSError("Имя выходит за пределы ответа")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(data):
+                raise DNSError("Указатель выходит за пределы ответа")
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        if length == 0:
+            return ".".join(labels).lower()
+        labels.append(data[offset + 1:offset + 1 + length].decode("ascii", "replace"))
+        offset += 1 + length
+    raise DNSError("Слишком длинная цепочка указателей")
+
+
+def parse_response(data: bytes) -> Tuple[int, bytes, DNSResponse]:
+    """
+    Разбор ответа
+
+    Returns:
+        (id запроса, секция вопроса, ответ)
+    """
+    if len(data) < 12:
+        raise DNSError("Ответ короче заголовка")
+    query_id, flags, qdcount, ancount, nscount, _ = struct.unpack("!HHHHHH", data[:12])
+    offset = 12
+    for _ in range(qdcount):
+        offset = _skip_name(data, offset) + 4
+    question = data[12:offset]
+
+    truncated = bool(flags & 0x0200)
+    answer_types = []
+    authority = []
+    try:
+        for _ in range(ancount):
+            offset = _skip_name(data, offset)
+            rtype, _, _, rdlength = struct.unpack("!HHIH", data[offset:offset + 10])
+            answer_types.append(rtype)
+            offset += 10 + rdlength
+        for _ in range(nscount):
+            owner = _read_name(data, offset)
+            offset = _skip_name(data, offset)
+            rtype, _, _, rdlength = struct.unpack("!HHIH", data[offset:offset + 10])
+            authority.append((owner, rtype))
+            offset += 10 + rdlength
+    except (struct.error, DNSError):
+        # Усеченный ответ: учитываем записи, что успели прийти
+        if not truncated:
+            raise DNSError("Некорректная секция ответа")
+    return query_id, question, DNSResponse(
+        flags & 0x000F, truncated, answer_types, authority
+    )
+
+
+def _has_zone(response: DNSResponse, name: str) -> bool:
+    """
+    Есть ли у имени своя зона: NS в ответе, либо NS или SOA с владельцем
+    name в секции полномочий (ответ без данных от зоны самого домена,
+    реферал). SOA родительской зоны (com) делегирования не доказывает.
+    """
+    if QTYPE_NS in response.answer_types:
+        return True
+    return any(
+        owner == name and rtype in (QTYPE_NS, QTYPE_SOA)
+        for owner, rtype in response.authority
+    )
+
+
+class _DNSProtocol(asyncio.DatagramProtocol):
+    """UDP-сокет к резолверу; ответы сопоставляются с запросами по id"""
+
+    def __init__(self):
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.pending: Dict[int, Tuple[bytes, asyncio.Future]] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            query_id, question, response = parse_response(data)
+        except DNSError as e:
+            logger.debug(f"Ответ DNS отброшен: {e}")
+            return
+        waiter = self.pending.get(query_id)
+        # Ответ на другой вопрос с тем же id (поздний, подмененный) не принимаем
+        if waiter is None or waiter[0] != question.lower() or waiter[1].done():
+            return
+        waiter[1].set_result(response)
+
+    def error_received(self, exc):
+        logger.debug(f"Ошибка UDP DNS: {exc}")
+
+    def connection_lost(self, exc):
+        for _, future in self.pending.values():
+            if not future.done():
+                future.set_exception(exc or ConnectionError("Сокет DNS закрыт"))
+
+
+class DNSResolver:
+    """
+    Асинхронный клиент рекурсивного резолвера
+
+    Пул из pool_size UDP-сокетов, запросы распределяются по кругу.
+    Сокеты открываются при первом запросе (или open()).
+    """
+
+    def __init__(
+        self,
+        address: Optional[str] = None,
+        timeout: float = 2.0,
+        retries: int = 1,
+        pool_size: int = 4
+    ):
+        """
+        Args:
+            address: Адрес резолвера host[:port] (по умолчанию - из
+                /etc/resolv.conf)
+            timeout: Ожидание ответа на одну попытку, секунды
+            retries: Повторов после таймаута
+            pool_size: Число UDP-сокетов
+        """
+        self.address = address or system_resolver()
+        self.host, self.port = parse_address(self.address)
+        self.timeout = timeout
+        self.retries = retries
+        self.pool_size = max(pool_size, 1)
+        self._pool: List[_DNSProtocol] = []
+        self._next = itertools.count()
+        self._open_lock: Optional[asyncio.Lock] = None
+
+    async def open(self) -> None:
+        """Открытие пула сокетов"""
+        if self._pool:
+            return
+        if self._open_lock is None:
+            self._open_lock = asyncio.Lock()
+        async with self._open_lock:
+            if self._pool:
+                return
+            loop = asyncio.get_running_loop()
+            pool = []
+            for _ in range(self.pool_size):
+                _, protocol = await loop.create_datagram_endpoint(
+                    _DNSProtocol, remote_addr=(self.host, self.port)
+                )
+                pool.append(protocol)
+            self._pool = pool
+
+    async def close(self) -> None:
+        """Закрытие сокетов"""
+        pool, self._pool = self._pool, []
+        for protocol in pool:
+            if protocol.transport is not None:
+                protocol.transport.close()
+
+    async def query(self, name: str, qtype: int = QTYPE_NS) -> DNSResponse:
+        """
+        Запрос записи
+
+        Args:
+            name: Доменное имя
+            qtype: Тип записи (QTYPE_NS, QTYPE_SOA)
+
+        Returns:
+            Ответ резолвера
+
+        Raises:
+            asyncio.TimeoutError: Нет ответа после всех попыток
+        """
+        await self.open()
+        protocol = self._pool[next(self._next) % len(self._pool)]
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.retries + 1):
+            # Непредсказуемый id затрудняет подмену ответа (RFC 5452)
+            query_id = secrets.randbits(16)
+            while query_id in protocol.pending:
+                query_id = secrets.randbits(16)
+            packet = build_query(query_id, name, qtype)
+            future = loop.create_future()
+            protocol.pending[query_id] = (packet[12:].lower(), future)
+            started = time.perf_counter()
+            try:
+                protocol.transport.sendto(packet)
+                response = await asyncio.wait_for(future, self.timeout)
+                metrics.observe("dns_request", time.perf_counter() - started, resolver=self.address)
+                return response
+            except asyncio.TimeoutError:
+                metrics.observe("dns_request", time.perf_counter() - started, resolver=self.address)
+                metrics.inc("timeouts", service="dns")
+                if attempt == self.retries:
+                    raise
+                metrics.inc("retries", service="dns")
+            finally:
+                protocol.pending.pop(query_id, None)
+
+
+class DNSPrefilter:
+    """
+    Делегирован ли домен: NS-запрос с кэшем и лимитом параллельности
+
+    Вердикты:
+        True  - есть NS-записи домена в ответе или NS/SOA самого домена
+                в секции полномочий (домен зарегистрирован)
+        False - NXDOMAIN (нужна проверка RDAP/WHOIS: домен может быть
+                свободен или снят с делегирования)
+        None  - ответ неясен (таймаут, SERVFAIL, NOERROR без записей
+                домена) - тоже RDAP/WHOIS
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[DNSResolver] = None,
+        max_concurrent: int = 50,
+        cache_size: int = 100000
+    ):
+        """
+        Args:
+            resolver: Клиент резолвера (по умолчанию - системный резолвер)
+            max_concurrent: Максимум одновременных DNS-запросов
+            cache_size: Максимум доменов в кэше вердиктов
+        """
+        self.resolver = resolver or DNSResolver()
+        self.max_concurrent = max_concurrent
+        self.cache_size = cache_size
+        self._cache: Dict[str, Tuple[bool, float]] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def open(self) -> None:
+        await self.resolver.open()
+
+    async def close(self) -> None:
+        await self.resolver.close()
+
+    def _cached(self, domain: str) -> Optional[Tuple[bool, float]]:
+        entry = self._cache.get(domain)
+        if entry is not None and entry[1] <= time.monotonic():
+            del self._cache[domain]
+            return None
+        return entry
+
+    def _remember(self, domain: str, delegated: bool) -> None:
+        if len(self._cache) >= self.cache_size:
+            # Вытесняется самая старая запись (словарь хранит порядок вставки)
+            del self._cache[next(iter(self._cache))]
+        ttl = DELEGATED_TTL if delegated else NXDOMAIN_TTL
+        self._cache[domain] = (delegated, time.monotonic() + ttl)
+
+    async def is_delegated(self, domain: str) -> Optional[bool]:
+        """
+        Вердикт для домена
+
+        Args:
+            domain: Регистрируемый домен (example.com)
+
+        Returns:
+            True / False / None (см. описание класса)
+        """
+        key = domain.lower().strip(".")
+        entry = self._cached(key)
+        if entry is not None:
+            metrics.inc("cache_hits", cache="dns")
+            return entry[0]
+        metrics.inc("cache_misses", cache="dns")
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        try:
+            async with self._semaphore:
+                with metrics.track("in_flight_requests", service="dns"):
+                    response = await self.resolver.query(key, QTYPE_NS)
+        except (asyncio.TimeoutError, OSError, ValueError) as e:
+            logger.debug(f"DNS запрос для {domain} не удался: {e!r}")
+            metrics.inc("dns_prefilter", result="unknown")
+            return None
+
+        if response.rcode == RCODE_NOERROR and _has_zone(response, key):
+            verdict = True
+        elif response.rcode == RCODE_NXDOMAIN:
+            verdict = False
+        else:
+            metrics.inc("dns_prefilter", result="unknown")
+            return None
+
+        metrics.inc("dns_prefilter", result="delegated" if verdict else "nxdomain")
+        self._remember(key, verdict)
+        return verdict
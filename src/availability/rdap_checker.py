@@ -2,28 +2,36 @@ import aiohttp
 import asyncio
 from typing import Optional
 import logging
-import tldextract
+import time
+from urllib.parse import urlparse
 from datetime import datetime
 
+from ..domain.suffixes import PublicSuffixList, default_suffixes
 from ..models.domain_status import DomainCheckResult, DomainStatus, CheckMethod
 from .bootstrap_loader import RDAPBootstrapLoader
+from .sessions import PooledSessionMixin
+from ..utils.metrics import registry as metrics
 
 logger = logging.getLogger(__name__)
 
 
-class RDAPChecker:
+class RDAPChecker(PooledSessionMixin):
     """Проверка доступности доменов через RDAP"""
     
     def __init__(
         self,
         bootstrap_loader: RDAPBootstrapLoader,
         timeout: int = 5,
-        max_retries: int = 2
+        max_retries: int = 2,
+        cassette=None,
+        suffixes: Optional[PublicSuffixList] = None
     ):
         self.bootstrap = bootstrap_loader
+        self.cassette = cassette
         self.timeout = aiohttp.ClientTimeout(total=timeout)
         self.max_retries = max_retries
-        self.tld_extract = tldextract.TLDExtract(cache_dir='.tld_cache')
+        # Список суффиксов из локального снимка - без сети и кэша tldextract
+        self.suffixes = suffixes or default_suffixes()
     
     async def check_domain(self, domain: str) -> Optional[DomainCheckResult]:
         """
@@ -36,12 +44,11 @@ class RDAPChecker:
             DomainCheckResult если проверка успешна, None если RDAP не поддерживается
         """
         # Извлекаем TLD
-        extracted = self.tld_extract(domain)
-        tld = extracted.suffix
-        
-        if not tld:
+        extracted = self.suffixes.registrable(domain)
+        if not extracted:
             logger.warning(f"Не удалось извлечь TLD из {domain}")
             return None
+        name, tld = extracted
         
         # Проверяем поддержку RDAP
         rdap_servers = self.bootstrap.get_rdap_servers(tld)
@@ -50,7 +57,7 @@ class RDAPChecker:
             return None
         
         # Нормализуем домен
-        normalized_domain = f"{extracted.domain}.{tld}".lower()
+        normalized_domain = f"{name}.{tld}"
         
         # Пробуем проверить через каждый сервер
         for server_url in rdap_servers:
@@ -85,11 +92,15 @@ class RDAPChecker:
         """
         # Формируем URL запроса
         query_url = f"{server_url.rstrip('/')}/domain/{domain}"
+        server = urlparse(server_url).netloc or server_url
         
         for attempt in range(1, self.max_retries + 1):
+            started = time.perf_counter()
             try:
-                async with aiohttp.ClientSession(timeout=self.timeout) as session:
+                async with self._client_session() as session:
                     async with session.get(query_url) as response:
+                        # Задержка до заголовков ответа
+                        metrics.observe("rdap_request", time.perf_counter() - started, server=server)
                         if response.status == 200:
                             # Домен зарегистрирован
                             data = await response.json()
@@ -118,6 +129,8 @@ class RDAPChecker:
                                     f"RDAP server error {response.status} "
                                     f"for {domain}, retry {attempt}/{self.max_retries}"
                                 )
+                                metrics.inc("retries", service="rdap")
+                                metrics.inc("backoff_seconds", 2 ** attempt, service="rdap")
                                 await asyncio.sleep(2 ** attempt)
                                 continue
                             else:
@@ -135,11 +148,15 @@ class RDAPChecker:
                             return None
             
             except asyncio.TimeoutError:
+                metrics.observe("rdap_request", time.perf_counter() - started, server=server)
+                metrics.inc("timeouts", service="rdap")
                 if attempt < self.max_retries:
                     logger.debug(
                         f"RDAP timeout for {domain}, "
                         f"retry {attempt}/{self.max_retries}"
                     )
+                    metrics.inc("retries", service="rdap")
+                    metrics.inc("backoff_seconds", 1, service="rdap")
                     await asyncio.sleep(1)
                     continue
                 else:
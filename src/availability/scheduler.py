@@ -0,0 +1,112 @@
+"""
+Планировщик пакетной проверки доменов по полосам
+
+Полоса - очередь доменов одного источника: RDAP-сервера реестра или
+WHOIS API. Задачи выдаются по кругу (по одной из каждой полосы), у
+каждой полосы свой лимит одновременных проверок, поверх них - общий.
+Медленный реестр занимает не больше своего лимита, а остальные слоты
+достаются другим полосам.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from typing import Awaitable, Callable, Deque, Dict, Generic, Hashable, Tuple, TypeVar, Union
+
+from ..utils.metrics import registry as metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=Hashable)
+R = TypeVar("R")
+
+
+class LaneScheduler(Generic[T]):
+    """Справедливая (round-robin) выдача задач по полосам с лимитами"""
+
+    def __init__(self, max_concurrent: int, lane_limit: Callable[[str], int]):
+        """
+        Args:
+            max_concurrent: Общий лимит одновременных задач
+            lane_limit: Лимит одновременных задач полосы по ее имени
+        """
+        self.max_concurrent = max(max_concurrent, 1)
+        self.lane_limit = lane_limit
+        self._pending: Dict[str, Deque[Tuple[T, float]]] = {}
+        self._rotation: Deque[str] = deque()
+        self.in_flight: Counter = Counter()
+        self.peak: Counter = Counter()
+
+    def add(self, lane: str, item: T) -> None:
+        """Добавление задачи в конец очереди полосы"""
+        queue = self._pending.get(lane)
+        if queue is None:
+            queue = self._pending[lane] = deque()
+        if not queue:
+            self._rotation.append(lane)
+        queue.append((item, time.perf_counter()))
+
+    @property
+    def lanes(self) -> Dict[str, int]:
+        """Задач в очереди по полосам"""
+        return {lane: len(queue) for lane, queue in self._pending.items() if queue}
+
+    def _next(self):
+        """Следующая задача по кругу из полосы со свободным слотом или None"""
+        for _ in range(len(self._rotation)):
+            lane = self._rotation[0]
+            # Выбранная полоса уходит в конец круга
+            self._rotation.rotate(-1)
+            if self.in_flight[lane] < max(self.lane_limit(lane), 1):
+                break
+        else:
+            return None
+
+        queue = self._pending[lane]
+        item, queued_at = queue.popleft()
+        if not queue:
+            self._rotation.remove(lane)
+        metrics.inc("semaphore_wait_seconds", time.perf_counter() - queued_at, pool="availability")
+        return lane, item
+
+    async def run(self, task: Callable[[T], Awaitable[R]]) -> Dict[T, Union[R, BaseException]]:
+        """
+        Выполнение всех добавленных задач
+
+        Args:
+            task: Корутина-обработчик задачи
+
+        Returns:
+            Результат или исключение по каждой задаче
+        """
+        results: Dict[T, Union[R, BaseException]] = {}
+        running: Dict[asyncio.Future, Tuple[str, T]] = {}
+        try:
+            while self._rotation or running:
+                while len(running) < self.max_concurrent:
+                    picked = self._next()
+                    if picked is None:
+                        break
+                    lane, item = picked
+                    self.in_flight[lane] += 1
+                    self.peak[lane] = max(self.peak[lane], self.in_flight[lane])
+                    running[asyncio.ensure_future(task(item))] = picked
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    lane, item = running.pop(future)
+                    self.in_flight[lane] -= 1
+                    if future.cancelled():
+                        # Задача отменила сама себя: exception() здесь бросил
+                        # бы CancelledError и потерял результаты остальных
+                        results[item] = asyncio.CancelledError()
+                        continue
+                    exc = future.exception()
+                    results[item] = exc if exc is not None else future.result()
+        finally:
+            for future in running:
+                future.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        return results
@@ -0,0 +1,57 @@
+"""
+Общий пул HTTP-соединений для RDAP и WHOIS проверок
+"""
+
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import aiohttp
+
+
+@asynccontextmanager
+async def _borrowed(session: aiohttp.ClientSession):
+    """Контекст над общей сессией: по выходу сессия не закрывается"""
+    yield session
+
+
+class PooledSessionMixin:
+    """
+    Сессия aiohttp на время работы чекера
+    
+    Без open() каждый запрос создает свою сессию (как раньше). После open()
+    запросы идут через одну сессию с пулом keep-alive соединений, который
+    можно разделить между несколькими запусками в одном процессе.
+    С кассетой (self.cassette) запросы записываются или воспроизводятся.
+    Класс должен задать self.timeout (aiohttp.ClientTimeout).
+    """
+    
+    _session: Optional[aiohttp.ClientSession] = None
+    cassette = None
+    
+    async def open(self, limit: int = 100) -> None:
+        """
+        Открытие общей сессии
+        
+        Args:
+            limit: Максимум одновременных соединений в пуле
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=limit)
+            )
+    
+    async def close(self) -> None:
+        """Закрытие общей сессии"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    def _client_session(self):
+        """Общая сессия (после open) или новая на один запрос"""
+        shared = self._session if self._session is not None and not self._session.closed else None
+        if self.cassette is not None:
+            return self.cassette.session(shared, timeout=self.timeout)
+        if shared is not None:
+            return _borrowed(shared)
+        return aiohttp.ClientSession(timeout=self.timeout)
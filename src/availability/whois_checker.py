@@ -2,14 +2,17 @@ import aiohttp
 import asyncio
 from typing import Optional, Dict, Any
 import logging
+import time
 from datetime import datetime
 
 from ..models.domain_status import DomainCheckResult, DomainStatus, CheckMethod
+from .sessions import PooledSessionMixin
+from ..utils.metrics import registry as metrics
 
 logger = logging.getLogger(__name__)
 
 
-class WHOISChecker:
+class WHOISChecker(PooledSessionMixin):
     """Проверка доступности доменов через WHOIS API"""
     
     def __init__(
@@ -18,9 +21,11 @@ class WHOISChecker:
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
         timeout: int = 10,
-        max_retries: int = 3
+        max_retries: int = 3,
+        cassette=None
     ):
         self.api_provider = api_provider.lower()
+        self.cassette = cassette
         self.api_key = api_key
         self.timeout = aiohttp.ClientTimeout(total=timeout)
         self.max_retries = max_retries
@@ -54,6 +59,9 @@ class WHOISChecker:
         logger.debug(f"Проверка {domain} через WHOIS API ({self.api_provider})")
         
         for attempt in range(1, self.max_retries + 1):
+            if attempt > 1:
+                metrics.inc("retries", service="whois")
+            started = time.perf_counter()
             try:
                 if self.api_provider == "whoisxml":
                     result = await self._check_whoisxml(domain)
@@ -71,13 +79,17 @@ class WHOISChecker:
                     result = await self._check_local_whois(domain)
                 else:
                     raise ValueError(f"Неизвестный WHOIS провайдер: {self.api_provider}")
+                metrics.observe("whois_request", time.perf_counter() - started, provider=self.api_provider)
                 
                 if result:
                     return result
             
             except asyncio.TimeoutError:
+                metrics.observe("whois_request", time.perf_counter() - started, provider=self.api_provider)
+                metrics.inc("timeouts", service="whois")
                 if attempt < self.max_retries:
                     delay = 2 ** attempt
+                    metrics.inc("backoff_seconds", delay, service="whois")
                     logger.debug(
                         f"WHOIS timeout for {domain}, "
                         f"retry {attempt}/{self.max_retries} after {delay}s"
@@ -88,6 +100,7 @@ class WHOISChecker:
                     logger.error(f"WHOIS timeout for {domain} after {self.max_retries} attempts")
             
             except Exception as e:
+                metrics.observe("whois_request", time.perf_counter() - started, provider=self.api_provider)
                 logger.error(f"WHOIS error for {domain}: {e}")
         
         # Все попытки исчерпаны
@@ -110,7 +123,7 @@ class WHOISChecker:
             "domainName": domain
         }
         
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
+        async with self._client_session() as session:
             async with session.get(url, params=params) as response:
                 if response.status != 200:
                     logger.error(
@@ -147,7 +160,7 @@ class WHOISChecker:
         params = {"domain": domain}
         headers = {"X-Api-Key": self.api_key}
         
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
+        async with self._client_session() as session:
             async with session.get(url, params=params, headers=headers) as response:
                 if response.status != 200:
                     logger.error(
@@ -185,7 +198,7 @@ class WHOISChecker:
             "r": "taken"  # проверка доступности
         }
 
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
+        async with self._client_session() as session:
             async with session.get(url, params=params) as response:
                 if response.status != 200:
                     logger.error(
@@ -222,7 +235,7 @@ class WHOISChecker:
             "whois": domain
         }
 
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
+        async with self._client_session() as session:
             async with session.get(url, params=params) as response:
                 if response.status != 200:
                     logger.error(
@@ -265,7 +278,7 @@ class WHOISChecker:
             "Authorization": f"Token token={self.api_key}"
         }
 
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
+        async with self._client_session() as session:
             async with session.get(url, params=params, headers=headers) as response:
                 if response.status != 200:
                     logger.error(
@@ -298,7 +311,7 @@ class WHOISChecker:
         # Who-Dat не требует API ключ
         url = f"{self.base_url}/{domain}"
 
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
+        async with self._client_session() as session:
             async with session.get(url) as response:
                 if response.status == 404:
                     # 404 обычно означает что домен не найден (свободен)
@@ -4,7 +4,9 @@ Domain Extractor
 """
 
 import logging
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Optional, Set, Union
+
+from ..models.backlink import Backlink
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +20,13 @@ class DomainExtractor:
     
     def extract_unique_domains(
         self,
-        backlinks: List[Dict[str, Any]]
+        backlinks: List[Union[Backlink, Dict[str, Any]]]
     ) -> List[str]:
         """
         Извлечение уникальных доменов из списка ссылок
 
         Args:
-            backlinks: Список ссылок от Keys.so API (backlinks или outlinks)
+            backlinks: Ссылки (записи Backlink или словари Keys.so API)
 
         Returns:
             Список уникальных доменов
@@ -34,35 +36,55 @@ class DomainExtractor:
         unique_domains: Set[str] = set()
 
         for link in backlinks:
-            # Keys.so API возвращает домен в разных полях:
-            # - backlinks (входящие): 'source_name' - домен источника
-            # - outlinks (исходящие): 'name' - домен назначения
-            domain = link.get('source_name') or link.get('name')
-
-            if domain and isinstance(domain, str):
-                # Очистка домена (удаление www. если есть)
-                domain = domain.lower().strip()
-                if domain.startswith('www.'):
-                    domain = domain[4:]
-
-                # Проверка, что это валидный домен (содержит точку)
-                if '.' not in domain or len(domain) <= 3:
-                    continue
-
-                # Фильтрация поддоменов (например, blog.example.com -> пропускаем)
-                # Оставляем только домены второго уровня (example.com)
-                parts = domain.split('.')
-                if len(parts) > 2:
-                    # Проверяем на известные TLD второго уровня (co.uk, com.au и т.д.)
-                    if len(parts) == 3 and parts[1] in ['co', 'com', 'org', 'net', 'ac', 'gov']:
-                        # Это нормальный домен типа example.co.uk
-                        unique_domains.add(domain)
-                    # Иначе это поддомен - пропускаем
-                elif len(parts) == 2:
-                    # Обычный домен второго уровня
-                    unique_domains.add(domain)
+            domain = self.registrable_domain(link)
+            if domain:
+                unique_domains.add(domain)
 
         result = sorted(list(unique_domains))
         logger.info(f"Найдено уникальных доменов: {len(result)}")
 
         return result
+
+    @staticmethod
+    def registrable_domain(link: Union[Backlink, Dict[str, Any]]) -> Optional[str]:
+        """
+        Домен ссылки, если он подходит для проверки
+
+        Args:
+            link: Запись Backlink или словарь Keys.so API
+
+        Returns:
+            Нормализованный домен второго уровня или None
+        """
+        # Keys.so API возвращает домен в разных полях ('source_name' у
+        # backlinks, 'name' у outlinks) - Backlink.from_keys_so их сводит
+        if isinstance(link, dict):
+            link = Backlink.from_keys_so(link)
+        domain = link.source_domain
+
+        if not domain or not isinstance(domain, str):
+            return None
+
+        # Очистка домена (удаление www. если есть)
+        domain = domain.lower().strip()
+        if domain.startswith('www.'):
+            domain = domain[4:]
+
+        # Проверка, что это валидный домен (содержит точку)
+        if '.' not in domain or len(domain) <= 3:
+            return None
+
+        # Фильтрация поддоменов (например, blog.example.com -> пропускаем)
+        # Оставляем только домены второго уровня (example.com)
+        parts = domain.split('.')
+        if len(parts) > 2:
+            # Проверяем на известные TLD второго уровня (co.uk, com.au и т.д.)
+            if len(parts) == 3 and parts[1] in ['co', 'com', 'org', 'net', 'ac', 'gov']:
+                # Это нормальный домен типа example.co.uk
+                return domain
+            # Иначе это поддомен - пропускаем
+            return None
+        if len(parts) == 2:
+            # Обычный домен второго уровня
+            return domain
+        return None
@@ -0,0 +1,205 @@
+"""
+Публичные суффиксы (Public Suffix List) из локального снимка
+
+Снимок data/public_suffixes.json - заранее разобранная ICANN-часть PSL
+(та же, что по умолчанию использует tldextract): обычные правила,
+wildcard (*.ck) и исключения (!www.ck). Загрузка - один json.load, без
+сети и без импорта tldextract.
+
+Обновление снимка:
+    python -m src.domain.suffixes public_suffix_list.dat
+(без аргумента берется список, встроенный в tldextract)
+"""
+
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT = "data/public_suffixes.json"
+
+PSL_SOURCE = "https://publicsuffix.org/list/public_suffix_list.dat"
+
+_PRIVATE_MARKER = "===BEGIN PRIVATE DOMAINS==="
+
+
+def parse_psl(text: str, include_private: bool = False) -> Dict[str, object]:
+    """
+    Разбор public_suffix_list.dat в правила снимка
+
+    Args:
+        text: Содержимое списка
+        include_private: Включить частные домены (blogspot.com и т.п.)
+
+    Returns:
+        Словарь снимка: version, rules, wildcards, exceptions
+    """
+    version = None
+    rules, wildcards, exceptions = set(), set(), set()
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("//"):
+            if line.startswith("// VERSION:"):
+                version = line.split(":", 1)[1].strip()
+            if _PRIVATE_MARKER in line and not include_private:
+                break
+            continue
+        if not line:
+            continue
+        rule = line.split()[0].lower()
+        if rule.startswith("!"):
+            exceptions.add(rule[1:])
+        elif rule.startswith("*."):
+            wildcards.add(rule[2:])
+        else:
+            rules.add(rule)
+    return {
+        "source": PSL_SOURCE,
+        "license": "MPL-2.0",
+        "version": version,
+        "rules": sorted(rules),
+        "wildcards": sorted(wildcards),
+        "exceptions": sorted(exceptions),
+    }
+
+
+def _decode_label(label: str) -> str:
+    """Punycode-метка (xn--) в юникод: правила PSL записаны в юникоде"""
+    if label.startswith("xn--"):
+        try:
+            return label.encode("ascii").decode("idna")
+        except UnicodeError:
+            pass
+    return label
+
+
+class PublicSuffixList:
+    """Поиск публичного суффикса домена по правилам PSL"""
+
+    __slots__ = ("rules", "wildcards", "exceptions", "version")
+
+    def __init__(
+        self,
+        rules: Iterable[str],
+        wildcards: Iterable[str] = (),
+        exceptions: Iterable[str] = (),
+        version: Optional[str] = None
+    ):
+        self.rules = frozenset(rules)
+        self.wildcards = frozenset(wildcards)
+        self.exceptions = frozenset(exceptions)
+        self.version = version
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "PublicSuffixList":
+        return cls(
+            snapshot["rules"],
+            snapshot.get("wildcards", ()),
+            snapshot.get("exceptions", ()),
+            version=snapshot.get("version")
+        )
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_SNAPSHOT) -> "PublicSuffixList":
+        """
+        Загрузка снимка; если его нет - разбор списка из tldextract
+
+        Args:
+            path: Путь к снимку (JSON)
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_snapshot(json.load(f))
+        except FileNotFoundError:
+            logger.warning(f"Снимок PSL {path} не найден, используется список из tldextract")
+            return cls.from_snapshot(parse_psl(_bundled_psl()))
+
+    def split(self, domain: str) -> Tuple[str, str]:
+        """
+        Разделение домена на часть до суффикса и публичный суффикс
+
+        Args:
+            domain: Доменное имя (blog.example.co.uk)
+
+        Returns:
+            ('blog.example', 'co.uk'); для неизвестного TLD - (domain, '')
+        """
+        labels = domain.lower().strip(".").split(".")
+        decoded = [_decode_label(label) for label in labels]
+        count = len(labels)
+        size = 0
+        for i in range(count):
+            candidate = ".".join(decoded[i:])
+            if candidate in self.exceptions:
+                # !www.ck: суффикс - ck, www.ck регистрируется
+                size = count - i - 1
+                break
+            if i > 0 and candidate in self.wildcards:
+                # *.ck: суффикс включает еще одну метку
+                size = count - i + 1
+                break
+            if candidate in self.rules:
+                size = count - i
+                break
+        if not size:
+            return domain, ""
+        return ".".join(labels[:count - size]), ".".join(labels[count - size:])
+
+    def registrable(self, domain: str) -> Optional[Tuple[str, str]]:
+        """
+        Метка перед суффиксом и суффикс (example, co.uk)
+
+        Returns:
+            None, если суффикс неизвестен или перед ним нет метки
+        """
+        name, suffix = self.split(domain)
+        if not suffix or not name:
+            return None
+        return name.rsplit(".", 1)[-1], suffix
+
+
+_default: Optional[PublicSuffixList] = None
+
+
+def default_suffixes() -> PublicSuffixList:
+    """Общий для процесса список из снимка по умолчанию (загружается при первом вызове)"""
+    global _default
+    if _default is None:
+        _default = PublicSuffixList.load(DEFAULT_SNAPSHOT)
+    return _default
+
+
+def _bundled_psl() -> str:
+    """Список суффиксов, встроенный в tldextract"""
+    import tldextract
+
+    return (Path(tldextract.__file__).parent / ".tld_set_snapshot").read_text(encoding="utf-8")
+
+
+def build_snapshot(source: Optional[str] = None, output: str = DEFAULT_SNAPSHOT) -> dict:
+    """
+    Сборка снимка из public_suffix_list.dat
+
+    Args:
+        source: Путь к списку (по умолчанию - встроенный в tldextract)
+        output: Путь снимка
+    """
+    text = Path(source).read_text(encoding="utf-8") if source else _bundled_psl()
+    snapshot = parse_psl(text)
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
+    return snapshot
+
+
+if __name__ == "__main__":
+    built = build_snapshot(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(
+        f"{DEFAULT_SNAPSHOT}: {len(built['rules'])} правил, {len(built['wildcards'])} wildcard, "
+        f"{len(built['exceptions'])} исключений (версия {built['version']})"
+    )
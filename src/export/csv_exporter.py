@@ -1,14 +1,132 @@
 import csv
 from pathlib import Path
-from typing import List
+from typing import AsyncIterable, List, Optional
 from datetime import datetime
 import logging
 
 from ..models.filtered_domain import FilteredDomain
+from .streams import open_text_output
 
 logger = logging.getLogger(__name__)
 
 
+# Заголовки CSV
+CSV_HEADERS = [
+    'Domain',
+    'Availability Status',
+    'DR',
+    'UR',
+    'Backlink Count',
+    'Total Backlinks',
+    'Referring Domains',
+    'Organic Traffic',
+    'Spam Status',
+    'Spam Score',
+    'Spam Ratio',
+    'Excluded',
+    'Checked At'
+]
+
+
+class CSVStreamWriter:
+    """
+    Построчная запись доменов в CSV
+    
+    Фильтры применяются к каждому домену при записи, поэтому память
+    не зависит от размера отчета, а строки появляются на диске по мере
+    поступления доменов.
+    """
+    
+    def __init__(
+        self,
+        output_file: str,
+        include_spam: bool = False,
+        include_excluded: bool = False,
+        only_available: bool = False,
+        compression: Optional[str] = None,
+        flush_every: int = 1000
+    ):
+        """
+        Args:
+            output_file: Путь к выходному файлу
+            include_spam: Включить спам-домены
+            include_excluded: Включить исключенные домены
+            only_available: Только свободные домены
+            compression: None, "gzip" или "zstd" (по умолчанию - по расширению)
+            flush_every: Сбрасывать буфер на диск каждые N строк
+        """
+        self.output_path = Path(output_file)
+        self.include_spam = include_spam
+        self.include_excluded = include_excluded
+        self.only_available = only_available
+        self.compression = compression
+        self.flush_every = flush_every
+        
+        self.rows_seen = 0
+        self.rows_written = 0
+        self._stream = None
+        self._writer = None
+    
+    @property
+    def filter_key(self) -> tuple:
+        """Ключ фильтра (писатели с одинаковым ключом делят его проверку)"""
+        return (self.include_spam, self.include_excluded, self.only_available, False)
+    
+    def accepts(self, domain: FilteredDomain) -> bool:
+        """Проходит ли домен фильтры отчета"""
+        return (
+            (self.include_spam or not domain.is_spam) and
+            (self.include_excluded or not domain.is_excluded) and
+            (not self.only_available or domain.availability_status == "AVAILABLE")
+        )
+    
+    def open(self) -> "CSVStreamWriter":
+        """Открытие файла и запись заголовков"""
+        self._stream = open_text_output(
+            str(self.output_path),
+            compression=self.compression,
+            newline=''
+        )
+        self._writer = csv.writer(self._stream)
+        self._writer.writerow(CSV_HEADERS)
+        return self
+    
+    def write(self, domain: FilteredDomain) -> bool:
+        """
+        Запись одного домена
+        
+        Returns:
+            True если домен прошел фильтры и записан
+        """
+        self.rows_seen += 1
+        if not self.accepts(domain):
+            return False
+        self.write_row(domain)
+        return True
+    
+    def write_row(self, domain: FilteredDomain) -> None:
+        """Запись домена, уже прошедшего фильтры"""
+        self._writer.writerow(CSVExporter._row(domain))
+        self.rows_written += 1
+        
+        if self.flush_every and self.rows_written % self.flush_every == 0:
+            self._stream.flush()
+    
+    def close(self) -> None:
+        """Сброс буфера и закрытие файла"""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+            self._writer = None
+    
+    def __enter__(self) -> "CSVStreamWriter":
+        return self.open()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
 class CSVExporter:
     """Экспорт данных в CSV формат"""
     
@@ -18,69 +136,93 @@ class CSVExporter:
         output_file: str,
         include_spam: bool = False,
         include_excluded: bool = False,
-        only_available: bool = False
+        only_available: bool = False,
+        compression: Optional[str] = None
     ) -> str:
         """
         Экспорт доменов в CSV
 
         Args:
-            domains: Список доменов
+            domains: Список (или любой итератор) доменов
             output_file: Путь к выходному файлу
             include_spam: Включить спам-домены
             include_excluded: Включить исключенные домены
             only_available: Только свободные домены
+            compression: None, "gzip" или "zstd" (по умолчанию - по расширению)
 
         Returns:
             Путь к созданному файлу
         """
         logger.info(f"Экспорт в CSV: {output_file}")
-
-        # Фильтруем домены
-        filtered = [
-            d for d in domains
-            if (include_spam or not d.is_spam) and
-               (include_excluded or not d.is_excluded) and
-               (not only_available or d.availability_status == "AVAILABLE")
-        ]
         
-        # Создаем директорию если не существует
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        writer = CSVStreamWriter(
+            output_file,
+            include_spam=include_spam,
+            include_excluded=include_excluded,
+            only_available=only_available,
+            compression=compression
+        )
+        with writer:
+            for domain in domains:
+                writer.write(domain)
         
-        # Заголовки
-        headers = [
-            'Domain',
-            'Availability Status',
-            'DR',
-            'UR',
-            'Backlink Count',
-            'Total Backlinks',
-            'Referring Domains',
-            'Organic Traffic',
-            'Spam Status',
-            'Excluded',
-            'Checked At'
-        ]
+        logger.info(f"✓ Экспортировано {writer.rows_written} доменов в {writer.output_path}")
+        return str(writer.output_path)
+    
+    @staticmethod
+    async def export_async(
+        domains: AsyncIterable[FilteredDomain],
+        output_file: str,
+        include_spam: bool = False,
+        include_excluded: bool = False,
+        only_available: bool = False,
+        compression: Optional[str] = None
+    ) -> str:
+        """
+        Экспорт доменов из асинхронного итератора по мере их поступления
+
+        Args:
+            domains: Асинхронный итератор доменов
+            output_file: Путь к выходному файлу
+            include_spam: Включить спам-домены
+            include_excluded: Включить исключенные домены
+            only_available: Только свободные домены
+            compression: None, "gzip" или "zstd" (по умолчанию - по расширению)
+
+        Returns:
+            Путь к созданному файлу
+        """
+        logger.info(f"Потоковый экспорт в CSV: {output_file}")
         
-        # Запись в CSV
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader()
-            
-            for domain in filtered:
-                writer.writerow({
-                    'Domain': domain.domain,
-                    'Availability Status': domain.availability_status or 'UNKNOWN',
-                    'DR': domain.dr if domain.dr is not None else '',
-                    'UR': domain.ur if domain.ur is not None else '',
-                    'Backlink Count': domain.backlink_count,
-                    'Total Backlinks': domain.total_backlinks or '',
-                    'Referring Domains': domain.referring_domains or '',
-                    'Organic Traffic': domain.organic_traffic or '',
-                    'Spam Status': 'SPAM' if domain.is_spam else 'CLEAN',
-                    'Excluded': 'YES' if domain.is_excluded else 'NO',
-                    'Checked At': domain.checked_at.isoformat() if domain.checked_at else ''
-                })
+        writer = CSVStreamWriter(
+            output_file,
+            include_spam=include_spam,
+            include_excluded=include_excluded,
+            only_available=only_available,
+            compression=compression
+        )
+        with writer:
+            async for domain in domains:
+                writer.write(domain)
         
-        logger.info(f"✓ Экспортировано {len(filtered)} доменов в {output_path}")
-        return str(output_path)
+        logger.info(f"✓ Экспортировано {writer.rows_written} доменов в {writer.output_path}")
+        return str(writer.output_path)
+    
+    @staticmethod
+    def _row(domain: FilteredDomain) -> list:
+        """Строка CSV в порядке CSV_HEADERS"""
+        return [
+            domain.domain,
+            domain.availability_status or 'UNKNOWN',
+            domain.dr if domain.dr is not None else '',
+            domain.ur if domain.ur is not None else '',
+            domain.backlink_count,
+            domain.total_backlinks or '',
+            domain.referring_domains or '',
+            domain.organic_traffic or '',
+            'SPAM' if domain.is_spam else 'CLEAN',
+            domain.spam_score if domain.spam_score is not None else '',
+            domain.spam_ratio if domain.spam_ratio is not None else '',
+            'YES' if domain.is_excluded else 'NO',
+            domain.checked_at.isoformat() if domain.checked_at else ''
+        ]
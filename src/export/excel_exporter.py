@@ -1,41 +1,215 @@
+import heapq
 from pathlib import Path
-from typing import List
+from typing import Iterable, List, Optional
 from datetime import datetime
 import logging
 
 try:
     from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill, Alignment, NamedStyle
     from openpyxl.utils import get_column_letter
     EXCEL_AVAILABLE = True
 except ImportError:
     EXCEL_AVAILABLE = False
 
 from ..models.filtered_domain import FilteredDomain
+from .stats import ReportStats
 
 logger = logging.getLogger(__name__)
 
+# Начиная с этого числа доменов используется потоковый (write-only) режим
+WRITE_ONLY_THRESHOLD = 50000
+
+DATA_HEADERS = [
+    'Domain', 'DR', 'UR', 'Backlink Count',
+    'Total Backlinks', 'Referring Domains',
+    'Organic Traffic', 'Spam Status', 'Spam Score',
+    'Spam Ratio', 'Excluded'
+]
+
+# Имена общих стилей книги
+STYLE_HEADER = "report_header"
+STYLE_SPAM_ROW = "spam_row"
+STYLE_TITLE = "report_title"
+STYLE_SECTION = "report_section"
+STYLE_LABEL = "report_label"
+
+
+class ExcelStreamWriter:
+    """
+    Построчная запись доменов в Excel
+    
+    Строки сразу пишутся на лист данных, статистика и топ-10 для сводки
+    считаются попутно; сводка и сохранение файла - при close().
+    """
+    
+    def __init__(
+        self,
+        output_file: str,
+        include_spam: bool = False,
+        include_excluded: bool = False,
+        target_domain: str = None,
+        write_only: bool = True
+    ):
+        """
+        Args:
+            output_file: Путь к выходному файлу
+            include_spam: Включить спам-домены
+            include_excluded: Включить исключенные домены
+            target_domain: Целевой домен (для титульной страницы)
+            write_only: Потоковый режим openpyxl
+        """
+        if not EXCEL_AVAILABLE:
+            raise ImportError(
+                "openpyxl не установлен. Установите: pip install openpyxl"
+            )
+        
+        self.output_path = Path(output_file)
+        self.include_spam = include_spam
+        self.include_excluded = include_excluded
+        self.target_domain = target_domain
+        self.write_only = write_only
+        
+        self.stats = ReportStats()
+        self.rows_written = 0
+        self._top: List[tuple] = []
+        self._wb = None
+        self._ws_summary = None
+        self._ws_data = None
+    
+    @property
+    def filter_key(self) -> tuple:
+        """Ключ фильтра (писатели с одинаковым ключом делят его проверку)"""
+        return (self.include_spam, self.include_excluded, False, True)
+    
+    def accepts(self, domain: FilteredDomain) -> bool:
+        """Проходит ли домен фильтры отчета"""
+        return (
+            (self.include_spam or not domain.is_spam) and
+            (self.include_excluded or not domain.is_excluded) and
+            domain.is_registered
+        )
+    
+    def open(self) -> "ExcelStreamWriter":
+        """Создание книги, листов и заголовков"""
+        # Создаем workbook с общими именованными стилями
+        self._wb = Workbook(write_only=self.write_only)
+        ExcelExporter._register_styles(self._wb)
+        
+        # Лист 1: Сводка (заполняется при закрытии)
+        if self.write_only:
+            self._ws_summary = self._wb.create_sheet("Summary")
+        else:
+            self._ws_summary = self._wb.active
+            self._ws_summary.title = "Summary"
+        
+        # Лист 2: Данные
+        self._ws_data = self._wb.create_sheet("Domains")
+        ExcelExporter._write_data_header(self._ws_data)
+        return self
+    
+    def write(self, domain: FilteredDomain) -> bool:
+        """
+        Запись одного домена
+        
+        Returns:
+            True если домен прошел фильтры и записан
+        """
+        self.stats.update(domain)
+        if not self.accepts(domain):
+            return False
+        self.write_row(domain)
+        return True
+    
+    def write_row(self, domain: FilteredDomain) -> None:
+        """Запись домена, уже прошедшего фильтры"""
+        self.rows_written += 1
+        
+        # Топ-10 по DR: min-куча фиксированного размера вместо сортировки
+        # (при равном DR выше идет домен, встреченный раньше)
+        entry = (
+            domain.dr if domain.dr else 0,
+            -self.rows_written,
+            domain.domain,
+            domain.dr,
+            domain.backlink_count
+        )
+        if len(self._top) < 10:
+            heapq.heappush(self._top, entry)
+        elif entry > self._top[0]:
+            heapq.heapreplace(self._top, entry)
+        
+        ExcelExporter._write_data_row(self._ws_data, domain)
+    
+    def close(self) -> None:
+        """Запись сводки и сохранение файла"""
+        if self._wb is None:
+            return
+        try:
+            ExcelExporter._create_summary_sheet(
+                self._ws_summary,
+                {
+                    'total': self.stats.total,
+                    'valid': self.rows_written,
+                    'spam': self.stats.spam,
+                    'excluded': self.stats.excluded,
+                    'top': self._top
+                },
+                self.target_domain
+            )
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self._wb.save(self.output_path)
+        finally:
+            self._wb = None
+    
+    def __enter__(self) -> "ExcelStreamWriter":
+        return self.open()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
 
 class ExcelExporter:
     """Экспорт данных в Excel с форматированием"""
     
+    @staticmethod
+    def resolve_write_only(domains, write_only: Optional[bool] = None) -> bool:
+        """
+        Выбор потокового режима
+        
+        None - автоматически: при числе доменов от WRITE_ONLY_THRESHOLD
+        или если размер заранее неизвестен
+        """
+        if write_only is not None:
+            return write_only
+        size = len(domains) if hasattr(domains, '__len__') else None
+        return size is None or size >= WRITE_ONLY_THRESHOLD
+    
     @staticmethod
     def export(
-        domains: List[FilteredDomain],
+        domains: Iterable[FilteredDomain],
         output_file: str,
         include_spam: bool = False,
         include_excluded: bool = False,
-        target_domain: str = None
+        target_domain: str = None,
+        write_only: Optional[bool] = None
     ) -> str:
         """
         Экспорт доменов в Excel
         
+        Домены обрабатываются за один проход: строки сразу пишутся на лист
+        данных, а статистика и топ-10 для сводки считаются попутно.
+        
         Args:
-            domains: Список доменов
+            domains: Список (или любой итератор) доменов
             output_file: Путь к выходному файлу
             include_spam: Включить спам-домены
             include_excluded: Включить исключенные домены
             target_domain: Целевой домен (для титульной страницы)
+            write_only: Потоковый режим openpyxl (None - автоматически
+                при числе доменов от WRITE_ONLY_THRESHOLD или неизвестном)
             
         Returns:
             Путь к созданному файлу
@@ -45,152 +219,133 @@ class ExcelExporter:
                 "openpyxl не установлен. Установите: pip install openpyxl"
             )
         
-        logger.info(f"Экспорт в Excel: {output_file}")
-        
-        # Фильтруем домены
-        filtered = [
-            d for d in domains
-            if (include_spam or not d.is_spam) and
-               (include_excluded or not d.is_excluded) and
-               d.is_registered
-        ]
+        write_only = ExcelExporter.resolve_write_only(domains, write_only)
         
-        # Создаем workbook
-        wb = Workbook()
-        
-        # Лист 1: Сводка
-        ws_summary = wb.active
-        ws_summary.title = "Summary"
-        ExcelExporter._create_summary_sheet(
-            ws_summary,
-            domains,
-            filtered,
-            target_domain
+        logger.info(
+            f"Экспорт в Excel: {output_file}"
+            f"{' (write-only)' if write_only else ''}"
         )
         
-        # Лист 2: Данные
-        ws_data = wb.create_sheet("Domains")
-        ExcelExporter._create_data_sheet(ws_data, filtered)
-        
-        # Сохранение
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        wb.save(output_path)
+        writer = ExcelStreamWriter(
+            output_file,
+            include_spam=include_spam,
+            include_excluded=include_excluded,
+            target_domain=target_domain,
+            write_only=write_only
+        )
+        with writer:
+            for domain in domains:
+                writer.write(domain)
         
-        logger.info(f"✓ Экспортировано {len(filtered)} доменов в {output_path}")
-        return str(output_path)
+        logger.info(f"✓ Экспортировано {writer.rows_written} доменов в {writer.output_path}")
+        return str(writer.output_path)
+    
+    @staticmethod
+    def _register_styles(wb) -> None:
+        """Регистрация именованных стилей (один объект на всю книгу)"""
+        wb.add_named_style(NamedStyle(
+            name=STYLE_HEADER,
+            font=Font(color="FFFFFF", bold=True),
+            fill=PatternFill(
+                start_color="366092",
+                end_color="366092",
+                fill_type="solid"
+            ),
+            alignment=Alignment(horizontal="center")
+        ))
+        wb.add_named_style(NamedStyle(
+            name=STYLE_SPAM_ROW,
+            fill=PatternFill(
+                start_color="FFE6E6",
+                end_color="FFE6E6",
+                fill_type="solid"
+            )
+        ))
+        wb.add_named_style(NamedStyle(name=STYLE_TITLE, font=Font(size=16, bold=True)))
+        wb.add_named_style(NamedStyle(name=STYLE_SECTION, font=Font(size=12, bold=True)))
+        wb.add_named_style(NamedStyle(name=STYLE_LABEL, font=Font(bold=True)))
     
     @staticmethod
-    def _create_summary_sheet(ws, all_domains, filtered_domains, target_domain):
+    def _styled(ws, value, style: str):
+        """Ячейка со ссылкой на именованный стиль"""
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+    
+    @staticmethod
+    def _create_summary_sheet(ws, stats: dict, target_domain):
         """Создание сводного листа"""
+        styled = ExcelExporter._styled
+        
+        # Ширина колонок задается до записи строк (требование write-only)
+        for col in ['A', 'B', 'C']:
+            ws.column_dimensions[col].width = 30
+        
         # Заголовок
-        ws['A1'] = "Domain Backlink Analysis Report"
-        ws['A1'].font = Font(size=16, bold=True)
+        ws.append([styled(ws, "Domain Backlink Analysis Report", STYLE_TITLE)])
+        ws.append([])
         
         # Информация о целевом домене
-        row = 3
         if target_domain:
-            ws[f'A{row}'] = "Target Domain:"
-            ws[f'B{row}'] = target_domain
-            ws[f'A{row}'].font = Font(bold=True)
-            row += 1
+            ws.append([styled(ws, "Target Domain:", STYLE_LABEL), target_domain])
         
-        ws[f'A{row}'] = "Report Date:"
-        ws[f'B{row}'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-        ws[f'A{row}'].font = Font(bold=True)
-        row += 2
+        ws.append([
+            styled(ws, "Report Date:", STYLE_LABEL),
+            datetime.now().strftime("%Y-%m-%d %H:%M")
+        ])
+        ws.append([])
         
         # Статистика
-        ws[f'A{row}'] = "Statistics:"
-        ws[f'A{row}'].font = Font(size=12, bold=True)
-        row += 1
-        
-        stats = [
-            ("Total Domains Analyzed", len(all_domains)),
-            ("Valid Domains", len(filtered_domains)),
-            ("Spam Domains", sum(1 for d in all_domains if d.is_spam)),
-            ("Excluded Domains", sum(1 for d in all_domains if d.is_excluded)),
-        ]
-        
-        for label, value in stats:
-            ws[f'A{row}'] = label
-            ws[f'B{row}'] = value
-            row += 1
+        ws.append([styled(ws, "Statistics:", STYLE_SECTION)])
+        ws.append(["Total Domains Analyzed", stats['total']])
+        ws.append(["Valid Domains", stats['valid']])
+        ws.append(["Spam Domains", stats['spam']])
+        ws.append(["Excluded Domains", stats['excluded']])
         
         # Топ домены
-        row += 1
-        ws[f'A{row}'] = "Top 10 Domains by DR:"
-        ws[f'A{row}'].font = Font(size=12, bold=True)
-        row += 1
-        
-        sorted_domains = sorted(
-            filtered_domains,
-            key=lambda d: d.dr if d.dr else 0,
-            reverse=True
-        )[:10]
-        
-        ws[f'A{row}'] = "Domain"
-        ws[f'B{row}'] = "DR"
-        ws[f'C{row}'] = "Backlinks"
-        for cell in [ws[f'A{row}'], ws[f'B{row}'], ws[f'C{row}']]:
-            cell.font = Font(bold=True)
-        row += 1
-        
-        for domain in sorted_domains:
-            ws[f'A{row}'] = domain.domain
-            ws[f'B{row}'] = domain.dr or 'N/A'
-            ws[f'C{row}'] = domain.backlink_count
-            row += 1
-        
-        # Автоподбор ширины
-        for col in ['A', 'B', 'C']:
-            ws.column_dimensions[col].width = 30
+        ws.append([])
+        ws.append([styled(ws, "Top 10 Domains by DR:", STYLE_SECTION)])
+        ws.append([
+            styled(ws, "Domain", STYLE_LABEL),
+            styled(ws, "DR", STYLE_LABEL),
+            styled(ws, "Backlinks", STYLE_LABEL)
+        ])
+        
+        for _, _, domain, dr, backlink_count in heapq.nlargest(10, stats['top']):
+            ws.append([domain, dr or 'N/A', backlink_count])
     
     @staticmethod
-    def _create_data_sheet(ws, domains):
-        """Создание листа с данными"""
+    def _write_data_header(ws) -> None:
+        """Ширина колонок и заголовки листа данных"""
+        # Автоподбор ширины колонок (до записи строк)
+        for col_idx in range(1, len(DATA_HEADERS) + 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = 20
+        
         # Заголовки
-        headers = [
-            'Domain', 'DR', 'UR', 'Backlink Count',
-            'Total Backlinks', 'Referring Domains',
-            'Organic Traffic', 'Spam Status', 'Excluded'
+        ws.append([
+            ExcelExporter._styled(ws, header, STYLE_HEADER)
+            for header in DATA_HEADERS
+        ])
+    
+    @staticmethod
+    def _write_data_row(ws, domain: FilteredDomain) -> None:
+        """Строка листа данных"""
+        row = [
+            domain.domain,
+            domain.dr or 'N/A',
+            domain.ur or 'N/A',
+            domain.backlink_count,
+            domain.total_backlinks or 'N/A',
+            domain.referring_domains or 'N/A',
+            domain.organic_traffic or 'N/A',
+            'SPAM' if domain.is_spam else 'CLEAN',
+            domain.spam_score if domain.spam_score is not None else 'N/A',
+            domain.spam_ratio if domain.spam_ratio is not None else 'N/A',
+            'YES' if domain.is_excluded else 'NO'
         ]
         
-        # Стили для заголовков
-        header_fill = PatternFill(
-            start_color="366092",
-            end_color="366092",
-            fill_type="solid"
-        )
-        header_font = Font(color="FFFFFF", bold=True)
-        
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_idx, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-        
-        # Данные
-        for row_idx, domain in enumerate(domains, 2):
-            ws.cell(row=row_idx, column=1, value=domain.domain)
-            ws.cell(row=row_idx, column=2, value=domain.dr or 'N/A')
-            ws.cell(row=row_idx, column=3, value=domain.ur or 'N/A')
-            ws.cell(row=row_idx, column=4, value=domain.backlink_count)
-            ws.cell(row=row_idx, column=5, value=domain.total_backlinks or 'N/A')
-            ws.cell(row=row_idx, column=6, value=domain.referring_domains or 'N/A')
-            ws.cell(row=row_idx, column=7, value=domain.organic_traffic or 'N/A')
-            ws.cell(row=row_idx, column=8, value='SPAM' if domain.is_spam else 'CLEAN')
-            ws.cell(row=row_idx, column=9, value='YES' if domain.is_excluded else 'NO')
-            
-            # Цветовая кодировка для спама
-            if domain.is_spam:
-                for col in range(1, 10):
-                    ws.cell(row=row_idx, column=col).fill = PatternFill(
-                        start_color="FFE6E6",
-                        end_color="FFE6E6",
-                        fill_type="solid"
-                    )
-        
-        # Автоподбор ширины колонок
-        for col_idx in range(1, len(headers) + 1):
-            ws.column_dimensions[get_column_letter(col_idx)].width = 20
+        # Цветовая кодировка для спама (общий именованный стиль)
+        if domain.is_spam:
+            row = [ExcelExporter._styled(ws, value, STYLE_SPAM_ROW) for value in row]
+        
+        ws.append(row)
@@ -0,0 +1,404 @@
+"""
+Экспорт в несколько форматов за один проход по результатам
+"""
+
+import asyncio
+import importlib
+import queue
+import threading
+from pathlib import Path
+from typing import AsyncIterable, Dict, Iterable, List, Optional, Sequence
+import logging
+
+from ..models.filtered_domain import FilteredDomain
+from .stats import ReportStats
+from .streams import with_compression_suffix
+
+logger = logging.getLogger(__name__)
+
+# Поддерживаемые форматы и расширения файлов
+EXPORT_FORMATS = {
+    'csv': '.csv',
+    'xlsx': '.xlsx',
+    'json': '.json',
+    'ndjson': '.ndjson',
+    'parquet': '.parquet',
+}
+
+# Писатели форматов: модуль импортируется при первом использовании формата,
+# поэтому openpyxl и pyarrow не загружаются, если xlsx/parquet не выбраны
+WRITERS = {
+    'csv': ('.csv_exporter', 'CSVStreamWriter'),
+    'xlsx': ('.excel_exporter', 'ExcelStreamWriter'),
+    'json': ('.json_exporter', 'JSONStreamWriter'),
+    'ndjson': ('.json_exporter', 'JSONStreamWriter'),
+    'parquet': ('.parquet_exporter', 'ParquetStreamWriter'),
+}
+
+# Доменов в одной пачке, передаваемой потокам записи
+DEFAULT_BATCH_SIZE = 1000
+
+# Пачек в очереди одного потока (ограничивает память при медленном формате)
+DEFAULT_QUEUE_SIZE = 8
+
+
+def parse_formats(value: str) -> List[str]:
+    """
+    Разбор списка форматов вида "csv,xlsx,json"
+    
+    Raises:
+        ValueError: Неизвестный формат
+    """
+    formats = []
+    for name in value.split(','):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in EXPORT_FORMATS:
+            raise ValueError(
+                f"Неизвестный формат: {name} "
+                f"(доступны: {', '.join(EXPORT_FORMATS)})"
+            )
+        if name not in formats:
+            formats.append(name)
+    if not formats:
+        raise ValueError("Не указан формат вывода")
+    return formats
+
+
+def output_file_for(base_file: str, fmt: str, compression: Optional[str] = None) -> str:
+    """
+    Имя файла для формата: расширение заменяется на расширение формата
+    
+    Args:
+        base_file: Базовый путь (report.csv, report)
+        fmt: Формат из EXPORT_FORMATS
+        compression: Сжатие (добавляет .gz/.zst для текстовых форматов)
+    """
+    path = Path(base_file)
+    if path.suffix.lower() in ('.gz', '.zst'):
+        path = path.with_suffix('')
+    if path.suffix.lower() in EXPORT_FORMATS.values():
+        path = path.with_suffix('')
+    output_file = str(path) + EXPORT_FORMATS[fmt]
+    
+    if fmt in ('csv', 'json', 'ndjson'):
+        output_file = with_compression_suffix(output_file, compression)
+    return output_file
+
+
+def writer_class(fmt: str) -> type:
+    """Класс потокового писателя формата (с импортом его модуля)"""
+    try:
+        module, name = WRITERS[fmt]
+    except KeyError:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    return getattr(importlib.import_module(module, __package__), name)
+
+
+def create_writer(
+    fmt: str,
+    output_file: str,
+    include_spam: bool = False,
+    include_excluded: bool = False,
+    only_available: bool = False,
+    target_domain: str = None,
+    compression: Optional[str] = None,
+    excel_write_only: bool = True
+):
+    """Потоковый писатель для формата"""
+    writer = writer_class(fmt)
+    if fmt == 'csv':
+        return writer(
+            output_file,
+            include_spam=include_spam,
+            include_excluded=include_excluded,
+            only_available=only_available,
+            compression=compression
+        )
+    if fmt == 'xlsx':
+        return writer(
+            output_file,
+            include_spam=include_spam,
+            include_excluded=include_excluded,
+            target_domain=target_domain,
+            write_only=excel_write_only
+        )
+    if fmt in ('json', 'ndjson'):
+        return writer(
+            output_file,
+            include_spam=include_spam,
+            include_excluded=include_excluded,
+            target_domain=target_domain,
+            ndjson=fmt == 'ndjson',
+            compression=compression
+        )
+    from .parquet_exporter import DEFAULT_PARQUET_COMPRESSION
+    return writer(
+        output_file,
+        include_spam=include_spam,
+        include_excluded=include_excluded,
+        only_available=only_available,
+        compression=compression or DEFAULT_PARQUET_COMPRESSION
+    )
+
+
+class _Sink:
+    """Писатель формата в отдельном потоке с ограниченной очередью пачек"""
+    
+    def __init__(self, name: str, writer, queue_size: int):
+        self.name = name
+        self.writer = writer
+        self.queue: "queue.Queue[Optional[list]]" = queue.Queue(maxsize=queue_size)
+        self.error: Optional[BaseException] = None
+        self.thread = threading.Thread(
+            target=self._run, name=f"export-{name}", daemon=True
+        )
+    
+    def _run(self) -> None:
+        try:
+            self.writer.open()
+            try:
+                while True:
+                    batch = self.queue.get()
+                    if batch is None:
+                        break
+                    for domain in batch:
+                        self.writer.write_row(domain)
+            finally:
+                self.writer.close()
+        except BaseException as e:
+            self.error = e
+            logger.error(f"Ошибка экспорта {self.name}: {e}")
+            # Дочитываем очередь, чтобы не блокировать основной поток
+            while self.queue.get() is not None:
+                pass
+
+
+class FanOutExporter:
+    """
+    Экспорт одного набора доменов сразу в несколько форматов
+    
+    Результаты обходятся один раз: каждый уникальный фильтр проверяется
+    для домена один раз (писатели с одинаковым filter_key делят проверку),
+    сводная статистика считается здесь же и передается всем писателям.
+    Запись каждого формата идет в своем потоке, поэтому сжатие и
+    сериализация разных форматов перекрываются.
+    """
+    
+    def __init__(
+        self,
+        writers: Dict[str, object],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        queue_size: int = DEFAULT_QUEUE_SIZE
+    ):
+        """
+        Args:
+            writers: Писатели по имени формата (create_writer)
+            batch_size: Доменов в одной пачке
+            queue_size: Пачек в очереди каждого писателя
+        """
+        self.writers = writers
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.stats = ReportStats()
+        
+        # Статистика общая: писатели читают ее при закрытии
+        for writer in writers.values():
+            if hasattr(writer, 'stats'):
+                writer.stats = self.stats
+    
+    def export(self, domains: Iterable[FilteredDomain]) -> Dict[str, str]:
+        """
+        Запись доменов во все форматы
+        
+        Returns:
+            Пути к созданным файлам по имени формата
+            
+        Raises:
+            RuntimeError: Запись хотя бы одного формата завершилась ошибкой
+                (остальные форматы при этом дописываются)
+        """
+        sinks, routes = self._start()
+        try:
+            for domain in domains:
+                for group, batch in self._route(routes, domain):
+                    self._dispatch(group, batch)
+            for group, batch in self._flush(routes):
+                self._dispatch(group, batch)
+        finally:
+            self._stop(sinks)
+        return self._result(sinks)
+    
+    async def export_async(self, domains: AsyncIterable[FilteredDomain]) -> Dict[str, str]:
+        """
+        Запись доменов из асинхронного итератора по мере их поступления
+        
+        Передача пачек в очереди писателей идет через пул потоков, чтобы
+        медленный формат не блокировал цикл событий.
+        
+        Returns:
+            Пути к созданным файлам по имени формата
+        """
+        loop = asyncio.get_running_loop()
+        sinks, routes = self._start()
+        try:
+            async for domain in domains:
+                for group, batch in self._route(routes, domain):
+                    await loop.run_in_executor(None, self._dispatch, group, batch)
+            for group, batch in self._flush(routes):
+                await loop.run_in_executor(None, self._dispatch, group, batch)
+        finally:
+            await loop.run_in_executor(None, self._stop, sinks)
+        return self._result(sinks)
+    
+    def _start(self) -> tuple:
+        """Запуск потоков писателей и группировка по фильтрам"""
+        sinks = [
+            _Sink(name, writer, self.queue_size)
+            for name, writer in self.writers.items()
+        ]
+        
+        # Группы писателей с одинаковым фильтром
+        groups: Dict[tuple, List[_Sink]] = {}
+        for sink in sinks:
+            groups.setdefault(sink.writer.filter_key, []).append(sink)
+        routes = [
+            (group[0].writer.accepts, group, [])
+            for group in groups.values()
+        ]
+        
+        for sink in sinks:
+            sink.thread.start()
+        return sinks, routes
+    
+    def _route(self, routes: list, domain: FilteredDomain) -> list:
+        """Учет домена; возвращает заполненные пачки для отправки"""
+        ready = []
+        self.stats.update(domain)
+        for accepts, group, batch in routes:
+            if accepts(domain):
+                batch.append(domain)
+                if len(batch) >= self.batch_size:
+                    ready.append((group, batch[:]))
+                    batch.clear()
+        return ready
+    
+    @staticmethod
+    def _flush(routes: list) -> list:
+        """Неполные пачки в конце экспорта"""
+        ready = []
+        for _, group, batch in routes:
+            if batch:
+                ready.append((group, batch[:]))
+                batch.clear()
+        return ready
+    
+    @staticmethod
+    def _stop(sinks: List[_Sink]) -> None:
+        """Сигнал завершения и ожидание потоков писателей"""
+        for sink in sinks:
+            sink.queue.put(None)
+        for sink in sinks:
+            sink.thread.join()
+    
+    @staticmethod
+    def _result(sinks: List[_Sink]) -> Dict[str, str]:
+        """Проверка ошибок и пути к файлам"""
+        failed = [sink for sink in sinks if sink.error is not None]
+        if failed:
+            raise RuntimeError(
+                "Ошибка экспорта: " +
+                "; ".join(f"{sink.name}: {sink.error}" for sink in failed)
+            ) from failed[0].error
+        
+        for sink in sinks:
+            logger.info(
+                f"✓ {sink.name}: экспортировано {sink.writer.rows_written} "
+                f"доменов в {sink.writer.output_path}"
+            )
+        return {sink.name: str(sink.writer.output_path) for sink in sinks}
+    
+    @staticmethod
+    def _dispatch(group: Sequence[_Sink], batch: list) -> None:
+        """Передача пачки всем писателям группы (пачка только читается)"""
+        for sink in group:
+            if sink.error is None:
+                sink.queue.put(batch)
+    
+    @staticmethod
+    def export_formats(
+        domains: Iterable[FilteredDomain],
+        base_file: str,
+        formats: Sequence[str],
+        include_spam: bool = False,
+        include_excluded: bool = False,
+        only_available: bool = False,
+        target_domain: str = None,
+        compression: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Экспорт доменов в несколько форматов
+        
+        Args:
+            domains: Список (или любой итератор) доменов
+            base_file: Базовый путь; расширение заменяется для каждого формата
+            formats: Форматы из EXPORT_FORMATS
+            include_spam: Включить спам-домены
+            include_excluded: Включить исключенные домены
+            only_available: Только свободные домены (csv, parquet)
+            target_domain: Целевой домен (xlsx, json)
+            compression: Сжатие текстовых форматов / кодек parquet
+            
+        Returns:
+            Пути к созданным файлам по имени формата
+        """
+        logger.info(f"Экспорт в форматы {', '.join(formats)}: {base_file}")
+        
+        excel_write_only = True
+        if 'xlsx' in formats:
+            from .excel_exporter import ExcelExporter
+            excel_write_only = ExcelExporter.resolve_write_only(domains)
+        exporter = FanOutExporter.for_formats(
+            base_file,
+            formats,
+            include_spam=include_spam,
+            include_excluded=include_excluded,
+            only_available=only_available,
+            target_domain=target_domain,
+            compression=compression,
+            excel_write_only=excel_write_only
+        )
+        return exporter.export(domains)
+    
+    @staticmethod
+    def for_formats(
+        base_file: str,
+        formats: Sequence[str],
+        include_spam: bool = False,
+        include_excluded: bool = False,
+        only_available: bool = False,
+        target_domain: str = None,
+        compression: Optional[str] = None,
+        excel_write_only: bool = True
+    ) -> "FanOutExporter":
+        """
+        Экспортер для списка форматов (параметры как у export_formats)
+        
+        Args:
+            excel_write_only: Потоковый режим openpyxl для xlsx
+        """
+        writers = {
+            fmt: create_writer(
+                fmt,
+                output_file_for(base_file, fmt, compression),
+                include_spam=include_spam,
+                include_excluded=include_excluded,
+                only_available=only_available,
+                target_domain=target_domain,
+                compression=compression,
+                excel_write_only=excel_write_only
+            )
+            for fmt in formats
+        }
+        return FanOutExporter(writers)
@@ -1,83 +1,292 @@
 import json
+from collections.abc import Sized
 from pathlib import Path
-from typing import List
+from typing import AsyncIterable, Iterable, Optional
 from datetime import datetime
 import logging
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from ..models.filtered_domain import FilteredDomain
+from .stats import ReportStats
+from .streams import open_text_output
 
 logger = logging.getLogger(__name__)
 
 
+def dumps(obj) -> str:
+    """Компактная сериализация в JSON (orjson, если установлен)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+class JSONStreamWriter:
+    """
+    Потоковая запись доменов в JSON
+    
+    Режимы:
+        ndjson=True  - JSON Lines, одна запись на строку
+        ndjson=False - документ {"metadata": ..., "domains": [...]},
+                       массив domains дописывается по мере поступления
+    
+    Если весь набор доменов известен заранее (stats передан в open()),
+    metadata со статистикой пишется перед массивом domains; иначе тот же
+    объект metadata записывается после массива, когда статистика
+    посчитана. Ключи документа в обоих случаях одинаковые.
+    """
+    
+    def __init__(
+        self,
+        output_file: str,
+        include_spam: bool = False,
+        include_excluded: bool = False,
+        target_domain: str = None,
+        ndjson: bool = False,
+        compression: Optional[str] = None,
+        flush_every: int = 1000
+    ):
+        """
+        Args:
+            output_file: Путь к выходному файлу
+            include_spam: Включить спам-домены
+            include_excluded: Включить исключенные домены
+            target_domain: Целевой домен
+            ndjson: Формат JSON Lines
+            compression: None, "gzip" или "zstd" (по умолчанию - по расширению)
+            flush_every: Сбрасывать буфер на диск каждые N записей
+        """
+        self.output_path = Path(output_file)
+        self.include_spam = include_spam
+        self.include_excluded = include_excluded
+        self.target_domain = target_domain
+        self.ndjson = ndjson
+        self.compression = compression
+        self.flush_every = flush_every
+        
+        self.stats = ReportStats()
+        self.rows_written = 0
+        self._stream = None
+        self._metadata: Optional[dict] = None
+    
+    @property
+    def filter_key(self) -> tuple:
+        """Ключ фильтра (писатели с одинаковым ключом делят его проверку)"""
+        return (self.include_spam, self.include_excluded, False, True)
+    
+    def accepts(self, domain: FilteredDomain) -> bool:
+        """Проходит ли домен фильтры отчета"""
+        return (
+            (self.include_spam or not domain.is_spam) and
+            (self.include_excluded or not domain.is_excluded) and
+            domain.is_registered
+        )
+    
+    def open(self, stats: Optional[dict] = None) -> "JSONStreamWriter":
+        """
+        Открытие файла и запись заголовка
+        
+        Args:
+            stats: Заранее посчитанная статистика для metadata
+        """
+        self._stream = open_text_output(
+            str(self.output_path),
+            compression=self.compression
+        )
+        if not self.ndjson:
+            metadata = {
+                "target_domain": self.target_domain,
+                "report_date": datetime.now().isoformat(),
+            }
+            if stats is not None:
+                metadata.update(stats)
+                self._stream.write('{\n  "metadata": ' + dumps(metadata) + ',\n  "domains": [')
+            else:
+                # Статистика станет известна только к close()
+                self._metadata = metadata
+                self._stream.write('{\n  "domains": [')
+        return self
+    
+    def write(self, domain: FilteredDomain) -> bool:
+        """
+        Запись одного домена
+        
+        Returns:
+            True если домен прошел фильтры и записан
+        """
+        self.stats.update(domain)
+        if not self.accepts(domain):
+            return False
+        self.write_row(domain)
+        return True
+    
+    def write_row(self, domain: FilteredDomain) -> None:
+        """Запись домена, уже прошедшего фильтры"""
+        record = dumps(JSONExporter._record(domain))
+        if self.ndjson:
+            self._stream.write(record + '\n')
+        else:
+            separator = ',\n    ' if self.rows_written else '\n    '
+            self._stream.write(separator + record)
+        self.rows_written += 1
+        
+        if self.flush_every and self.rows_written % self.flush_every == 0:
+            self._stream.flush()
+    
+    @property
+    def statistics(self) -> dict:
+        """Статистика по записанным доменам"""
+        return {
+            "total_domains_analyzed": self.stats.total,
+            "valid_domains": self.rows_written,
+            "spam_domains": self.stats.spam,
+            "excluded_domains": self.stats.excluded
+        }
+    
+    def close(self) -> None:
+        """Завершение документа и закрытие файла"""
+        if self._stream is None:
+            return
+        try:
+            if not self.ndjson:
+                self._stream.write('\n  ]' if self.rows_written else ']')
+                if self._metadata is not None:
+                    self._metadata.update(self.statistics)
+                    self._stream.write(',\n  "metadata": ' + dumps(self._metadata))
+                    self._metadata = None
+                self._stream.write('\n}\n')
+        finally:
+            self._stream.close()
+            self._stream = None
+    
+    def __enter__(self) -> "JSONStreamWriter":
+        return self.open()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
 class JSONExporter:
     """Экспорт данных в JSON формат"""
     
     @staticmethod
     def export(
-        domains: List[FilteredDomain],
+        domains: Iterable[FilteredDomain],
         output_file: str,
         include_spam: bool = False,
         include_excluded: bool = False,
-        target_domain: str = None
+        target_domain: str = None,
+        ndjson: bool = False,
+        compression: Optional[str] = None
     ) -> str:
         """
         Экспорт доменов в JSON
         
         Args:
-            domains: Список доменов
+            domains: Список (или любой итератор) доменов
             output_file: Путь к выходному файлу
             include_spam: Включить спам-домены
             include_excluded: Включить исключенные домены
             target_domain: Целевой домен
+            ndjson: Формат JSON Lines (одна запись на строку)
+            compression: None, "gzip" или "zstd" (по умолчанию - по расширению)
             
         Returns:
             Путь к созданному файлу
         """
-        logger.info(f"Экспорт в JSON: {output_file}")
+        logger.info(f"Экспорт в {'NDJSON' if ndjson else 'JSON'}: {output_file}")
         
-        # Фильтруем домены
-        filtered = [
-            d for d in domains
-            if (include_spam or not d.is_spam) and
-               (include_excluded or not d.is_excluded) and
-               d.is_registered
-        ]
+        writer = JSONStreamWriter(
+            output_file,
+            include_spam=include_spam,
+            include_excluded=include_excluded,
+            target_domain=target_domain,
+            ndjson=ndjson,
+            compression=compression
+        )
         
-        # Формируем структуру
-        data = {
-            "metadata": {
-                "target_domain": target_domain,
-                "report_date": datetime.now().isoformat(),
+        # Для списка статистика считается заранее и попадает в metadata
+        stats = None
+        if not ndjson and isinstance(domains, Sized):
+            stats = {
                 "total_domains_analyzed": len(domains),
-                "valid_domains": len(filtered),
+                "valid_domains": sum(1 for d in domains if writer.accepts(d)),
                 "spam_domains": sum(1 for d in domains if d.is_spam),
                 "excluded_domains": sum(1 for d in domains if d.is_excluded)
-            },
-            "domains": [
-                {
-                    "domain": d.domain,
-                    "dr": d.dr,
-                    "ur": d.ur,
-                    "backlink_count": d.backlink_count,
-                    "total_backlinks": d.total_backlinks,
-                    "referring_domains": d.referring_domains,
-                    "organic_traffic": d.organic_traffic,
-                    "is_spam": d.is_spam,
-                    "is_excluded": d.is_excluded,
-                    "spam_anchor_examples": d.spam_anchor_examples,
-                    "checked_at": d.checked_at.isoformat() if d.checked_at else None
-                }
-                for d in filtered
-            ]
-        }
+            }
         
-        # Создаем директорию
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        writer.open(stats)
+        try:
+            for domain in domains:
+                writer.write(domain)
+        finally:
+            writer.close()
         
-        # Сохранение
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        logger.info(f"✓ Экспортировано {writer.rows_written} доменов в {writer.output_path}")
+        return str(writer.output_path)
+    
+    @staticmethod
+    async def export_async(
+        domains: AsyncIterable[FilteredDomain],
+        output_file: str,
+        include_spam: bool = False,
+        include_excluded: bool = False,
+        target_domain: str = None,
+        ndjson: bool = False,
+        compression: Optional[str] = None
+    ) -> str:
+        """
+        Экспорт доменов из асинхронного итератора по мере их поступления
         
-        logger.info(f"✓ Экспортировано {len(filtered)} доменов в {output_path}")
-        return str(output_path)
+        Args:
+            domains: Асинхронный итератор доменов
+            output_file: Путь к выходному файлу
+            include_spam: Включить спам-домены
+            include_excluded: Включить исключенные домены
+            target_domain: Целевой домен
+            ndjson: Формат JSON Lines (одна запись на строку)
+            compression: None, "gzip" или "zstd" (по умолчанию - по расширению)
+            
+        Returns:
+            Путь к созданному файлу
+        """
+        logger.info(f"Потоковый экспорт в {'NDJSON' if ndjson else 'JSON'}: {output_file}")
+        
+        writer = JSONStreamWriter(
+            output_file,
+            include_spam=include_spam,
+            include_excluded=include_excluded,
+            target_domain=target_domain,
+            ndjson=ndjson,
+            compression=compression
+        )
+        with writer:
+            async for domain in domains:
+                writer.write(domain)
+        
+        logger.info(f"✓ Экспортировано {writer.rows_written} доменов в {writer.output_path}")
+        return str(writer.output_path)
+    
+    @staticmethod
+    def _record(d: FilteredDomain) -> dict:
+        """Запись домена для JSON"""
+        return {
+            "domain": d.domain,
+            "dr": d.dr,
+            "ur": d.ur,
+            "backlink_count": d.backlink_count,
+            "total_backlinks": d.total_backlinks,
+            "referring_domains": d.referring_domains,
+            "organic_traffic": d.organic_traffic,
+            "is_spam": d.is_spam,
+            "is_excluded": d.is_excluded,
+            "spam_score": d.spam_score,
+            "spam_ratio": d.spam_ratio,
+            "spam_anchor_examples": list(d.spam_anchor_examples),
+            "checked_at": d.checked_at.isoformat() if d.checked_at else None
+        }
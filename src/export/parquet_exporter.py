@@ -0,0 +1,372 @@
+from pathlib import Path
+from typing import AsyncIterable, Iterable, Optional, Union
+import logging
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+from ..models.backlink import Backlink
+from ..models.filtered_domain import FilteredDomain
+
+logger = logging.getLogger(__name__)
+
+# Строк в одной row group (и в буфере перед записью)
+DEFAULT_ROW_GROUP_SIZE = 50000
+
+# Кодек сжатия страниц Parquet по умолчанию
+DEFAULT_PARQUET_COMPRESSION = 'zstd'
+
+
+def _domain_schema():
+    """Схема таблицы доменов"""
+    status = pa.dictionary(pa.int8(), pa.string())
+    return pa.schema([
+        ('domain', pa.string()),
+        ('availability_status', status),
+        ('dr', pa.int32()),
+        ('ur', pa.int32()),
+        ('backlink_count', pa.int32()),
+        ('total_backlinks', pa.int64()),
+        ('referring_domains', pa.int64()),
+        ('organic_traffic', pa.int64()),
+        ('is_registered', pa.bool_()),
+        ('is_spam', pa.bool_()),
+        ('is_excluded', pa.bool_()),
+        ('spam_score', pa.float64()),
+        ('spam_ratio', pa.float64()),
+        ('spam_anchor_examples', pa.list_(pa.string())),
+        ('checked_at', pa.timestamp('us')),
+    ])
+
+
+def _link_schema():
+    """Схема таблицы ссылок"""
+    return pa.schema([
+        ('domain', pa.string()),
+        ('source_url', pa.string()),
+        ('url', pa.string()),
+        ('anchor', pa.string()),
+        ('source_dr', pa.int32()),
+        ('created_at', pa.timestamp('us')),
+    ])
+
+
+class _ColumnBuffer:
+    """Построчный буфер колонок, сбрасываемый в Parquet row group'ами"""
+    
+    def __init__(self, output_file: str, schema, row_group_size: int, compression: str):
+        self.output_path = Path(output_file)
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.rows_written = 0
+        self._columns = {name: [] for name in schema.names}
+        self._pending = 0
+        self._writer = None
+    
+    def open(self) -> None:
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = pq.ParquetWriter(
+            str(self.output_path),
+            self.schema,
+            compression=self.compression
+        )
+    
+    def append(self, row: tuple) -> None:
+        for column, value in zip(self._columns.values(), row):
+            column.append(value)
+        self._pending += 1
+        self.rows_written += 1
+        if self._pending >= self.row_group_size:
+            self.flush()
+    
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        table = pa.Table.from_arrays(
+            [
+                pa.array(self._columns[field.name], type=field.type)
+                for field in self.schema
+            ],
+            schema=self.schema
+        )
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        for column in self._columns.values():
+            column.clear()
+        self._pending = 0
+    
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._writer.close()
+            self._writer = None
+
+
+class ParquetStreamWriter:
+    """
+    Потоковая запись доменов в Parquet
+    
+    Домены копятся по колонкам и сбрасываются на диск row group'ами,
+    поэтому память ограничена размером одной группы.
+    """
+    
+    def __init__(
+        self,
+        output_file: str,
+        include_spam: bool = False,
+        include_excluded: bool = False,
+        only_available: bool = False,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = DEFAULT_PARQUET_COMPRESSION
+    ):
+        """
+        Args:
+            output_file: Путь к выходному файлу
+            include_spam: Включить спам-домены
+            include_excluded: Включить исключенные домены
+            only_available: Только свободные домены
+            row_group_size: Строк в одной row group
+            compression: Кодек сжатия страниц (zstd, snappy, gzip, none)
+        """
+        if not PARQUET_AVAILABLE:
+            raise ImportError(
+                "pyarrow не установлен. Установите: pip install pyarrow"
+            )
+        
+        self.include_spam = include_spam
+        self.include_excluded = include_excluded
+        self.only_available = only_available
+        self.rows_seen = 0
+        self._buffer = _ColumnBuffer(
+            output_file, _domain_schema(), row_group_size, compression
+        )
+    
+    @property
+    def output_path(self) -> Path:
+        return self._buffer.output_path
+    
+    @property
+    def rows_written(self) -> int:
+        return self._buffer.rows_written
+    
+    @property
+    def filter_key(self) -> tuple:
+        """Ключ фильтра (писатели с одинаковым ключом делят его проверку)"""
+        return (self.include_spam, self.include_excluded, self.only_available, False)
+    
+    def accepts(self, domain: FilteredDomain) -> bool:
+        """Проходит ли домен фильтры отчета"""
+        return (
+            (self.include_spam or not domain.is_spam) and
+            (self.include_excluded or not domain.is_excluded) and
+            (not self.only_available or domain.availability_status == "AVAILABLE")
+        )
+    
+    def open(self) -> "ParquetStreamWriter":
+        """Открытие файла"""
+        self._buffer.open()
+        return self
+    
+    def write(self, domain: FilteredDomain) -> bool:
+        """
+        Запись одного домена
+        
+        Returns:
+            True если домен прошел фильтры и записан
+        """
+        self.rows_seen += 1
+        if not self.accepts(domain):
+            return False
+        self.write_row(domain)
+        return True
+    
+    def write_row(self, domain: FilteredDomain) -> None:
+        """Запись домена, уже прошедшего фильтры"""
+        self._buffer.append((
+            domain.domain,
+            domain.availability_status or 'UNKNOWN',
+            domain.dr,
+            domain.ur,
+            domain.backlink_count,
+            domain.total_backlinks,
+            domain.referring_domains,
+            domain.organic_traffic,
+            domain.is_registered,
+            domain.is_spam,
+            domain.is_excluded,
+            domain.spam_score,
+            domain.spam_ratio,
+            domain.spam_anchor_examples,
+            domain.checked_at,
+        ))
+    
+    def close(self) -> None:
+        """Запись последней row group и закрытие файла"""
+        self._buffer.close()
+    
+    def __enter__(self) -> "ParquetStreamWriter":
+        return self.open()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class ParquetExporter:
+    """Экспорт данных в колоночный формат Parquet"""
+    
+    @staticmethod
+    def links_file_for(output_file: str) -> str:
+        """Путь к таблице ссылок рядом с основным файлом (report.links.parquet)"""
+        path = Path(output_file)
+        return str(path.with_name(f"{path.stem}.links{path.suffix or '.parquet'}"))
+    
+    @staticmethod
+    def export(
+        domains: Iterable[FilteredDomain],
+        output_file: str,
+        include_spam: bool = False,
+        include_excluded: bool = False,
+        only_available: bool = False,
+        links: Optional[Iterable[Union[Backlink, dict]]] = None,
+        links_file: Optional[str] = None,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = DEFAULT_PARQUET_COMPRESSION
+    ) -> str:
+        """
+        Экспорт доменов в Parquet
+        
+        Args:
+            domains: Список (или любой итератор) доменов
+            output_file: Путь к выходному файлу
+            include_spam: Включить спам-домены
+            include_excluded: Включить исключенные домены
+            only_available: Только свободные домены
+            links: Ссылки (Backlink или словари Keys.so) для таблицы ссылок
+            links_file: Путь к таблице ссылок (по умолчанию *.links.parquet)
+            row_group_size: Строк в одной row group
+            compression: Кодек сжатия страниц (zstd, snappy, gzip, none)
+            
+        Returns:
+            Путь к созданному файлу
+        """
+        logger.info(f"Экспорт в Parquet: {output_file}")
+        
+        writer = ParquetStreamWriter(
+            output_file,
+            include_spam=include_spam,
+            include_excluded=include_excluded,
+            only_available=only_available,
+            row_group_size=row_group_size,
+            compression=compression
+        )
+        with writer:
+            for domain in domains:
+                writer.write(domain)
+        
+        logger.info(f"✓ Экспортировано {writer.rows_written} доменов в {writer.output_path}")
+        
+        if links is not None:
+            ParquetExporter.export_links(
+                links,
+                links_file or ParquetExporter.links_file_for(output_file),
+                row_group_size=row_group_size,
+                compression=compression
+            )
+        
+        return str(writer.output_path)
+    
+    @staticmethod
+    async def export_async(
+        domains: AsyncIterable[FilteredDomain],
+        output_file: str,
+        include_spam: bool = False,
+        include_excluded: bool = False,
+        only_available: bool = False,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = DEFAULT_PARQUET_COMPRESSION
+    ) -> str:
+        """
+        Экспорт доменов из асинхронного итератора по мере их поступления
+        
+        Args:
+            domains: Асинхронный итератор доменов
+            output_file: Путь к выходному файлу
+            include_spam: Включить спам-домены
+            include_excluded: Включить исключенные домены
+            only_available: Только свободные домены
+            row_group_size: Строк в одной row group
+            compression: Кодек сжатия страниц (zstd, snappy, gzip, none)
+            
+        Returns:
+            Путь к созданному файлу
+        """
+        logger.info(f"Потоковый экспорт в Parquet: {output_file}")
+        
+        writer = ParquetStreamWriter(
+            output_file,
+            include_spam=include_spam,
+            include_excluded=include_excluded,
+            only_available=only_available,
+            row_group_size=row_group_size,
+            compression=compression
+        )
+        with writer:
+            async for domain in domains:
+                writer.write(domain)
+        
+        logger.info(f"✓ Экспортировано {writer.rows_written} доменов в {writer.output_path}")
+        return str(writer.output_path)
+    
+    @staticmethod
+    def export_links(
+        links: Iterable[Union[Backlink, dict]],
+        output_file: str,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = DEFAULT_PARQUET_COMPRESSION
+    ) -> str:
+        """
+        Экспорт ссылок Keys.so в отдельную таблицу
+        
+        Args:
+            links: Записи Backlink или словари API (source_name/name,
+                source_url, url, anchor, source_dr, created_at); дата
+                обнаружения есть у записей, декодированных с keep_dates
+            output_file: Путь к выходному файлу
+            row_group_size: Строк в одной row group
+            compression: Кодек сжатия страниц
+            
+        Returns:
+            Путь к созданному файлу
+        """
+        if not PARQUET_AVAILABLE:
+            raise ImportError(
+                "pyarrow не установлен. Установите: pip install pyarrow"
+            )
+        
+        buffer = _ColumnBuffer(output_file, _link_schema(), row_group_size, compression)
+        buffer.open()
+        try:
+            for link in links:
+                if isinstance(link, dict):
+                    link = Backlink.from_keys_so(link, keep_dates=True)
+                buffer.append((
+                    link.source_domain or None,
+                    link.source_url or None,
+                    link.target_url,
+                    link.anchor_text,
+                    link.dr,
+                    link.discovered_at,
+                ))
+        finally:
+            buffer.close()
+        
+        logger.info(f"✓ Экспортировано {buffer.rows_written} ссылок в {buffer.output_path}")
+        return str(buffer.output_path)
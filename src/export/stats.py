@@ -0,0 +1,24 @@
+"""
+Сводная статистика отчета, общая для всех форматов экспорта
+"""
+
+from dataclasses import dataclass
+
+from ..models.filtered_domain import FilteredDomain
+
+
+@dataclass
+class ReportStats:
+    """Счетчики по всем доменам, поступившим в экспорт"""
+    
+    total: int = 0
+    spam: int = 0
+    excluded: int = 0
+    
+    def update(self, domain: FilteredDomain) -> None:
+        """Учет одного домена"""
+        self.total += 1
+        if domain.is_spam:
+            self.spam += 1
+        if domain.is_excluded:
+            self.excluded += 1
@@ -0,0 +1,129 @@
+"""
+Буферизованные потоки вывода для экспортеров (с опциональным сжатием)
+"""
+
+import gzip
+import io
+from pathlib import Path
+from typing import Optional, TextIO
+import logging
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Размер буфера записи по умолчанию
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+
+def detect_compression(output_file: str) -> Optional[str]:
+    """Определение сжатия по расширению файла (.gz, .zst)"""
+    suffix = Path(output_file).suffix.lower()
+    for compression, compression_suffix in COMPRESSION_SUFFIXES.items():
+        if suffix == compression_suffix:
+            return compression
+    return None
+
+
+def with_compression_suffix(output_file: str, compression: Optional[str]) -> str:
+    """Добавление расширения сжатия к имени файла, если его нет"""
+    if not compression:
+        return output_file
+    suffix = COMPRESSION_SUFFIXES[compression]
+    if output_file.lower().endswith(suffix):
+        return output_file
+    return output_file + suffix
+
+
+def open_text_output(
+    output_file: str,
+    compression: Optional[str] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    newline: Optional[str] = None
+) -> TextIO:
+    """
+    Открытие текстового файла на запись с буферизацией и сжатием
+    
+    Args:
+        output_file: Путь к файлу (директория создается при необходимости)
+        compression: None, "gzip" или "zstd" (по умолчанию - по расширению)
+        buffer_size: Размер буфера записи
+        newline: Параметр newline для TextIOWrapper ('' для csv)
+        
+    Returns:
+        Текстовый поток в UTF-8
+    """
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    if compression is None:
+        compression = detect_compression(output_file)
+    
+    if compression is None:
+        return open(
+            output_path, 'w',
+            encoding='utf-8', newline=newline, buffering=buffer_size
+        )
+    
+    raw = open(output_path, 'wb')
+    try:
+        if compression == 'gzip':
+            binary = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6)
+        elif compression == 'zstd':
+            if not ZSTD_AVAILABLE:
+                raise ImportError(
+                    "zstandard не установлен. Установите: pip install zstandard"
+                )
+            binary = zstandard.ZstdCompressor(level=3).stream_writer(
+                raw, closefd=True
+            )
+        else:
+            raise ValueError(f"Неизвестный тип сжатия: {compression}")
+    except Exception:
+        raw.close()
+        raise
+    
+    stream = io.TextIOWrapper(
+        io.BufferedWriter(_ClosingWriter(binary, raw), buffer_size),
+        encoding='utf-8',
+        newline=newline
+    )
+    return stream
+
+
+class _ClosingWriter(io.RawIOBase):
+    """Обертка над сжимающим потоком, закрывающая и файл под ним"""
+    
+    def __init__(self, binary, raw):
+        self._binary = binary
+        self._raw = raw
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._binary.write(data)
+        return len(data)
+    
+    def flush(self) -> None:
+        if not self._binary.closed:
+            self._binary.flush()
+    
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self._binary.close()
+        finally:
+            if not self._raw.closed:
+                self._raw.close()
+            super().close()
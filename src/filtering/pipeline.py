@@ -4,11 +4,14 @@ Domain Filtering Pipeline
 """
 
 import logging
-from typing import List, Dict, Any, Optional
-from pathlib import Path
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Union
 
+from ..models.backlink import Backlink
+from ..models.domain_batch import DomainBatch
 from ..models.filtered_domain import FilteredDomain
 from ..availability.checker import AvailabilityResult
+from .spam_filter import SpamFilter, AnchorScanResult, ExclusionIndex
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +24,9 @@ class DomainFilteringPipeline:
         spam_phrases_file: str = "data/spam_phrases.txt",
         excluded_domains_file: str = "data/excluded_domains.txt",
         fetch_metrics: bool = True,
-        api_client: Optional[Any] = None
+        api_client: Optional[Any] = None,
+        spam_threshold: int = 1,
+        spam_score_threshold: float = 0.1
     ):
         """
         Инициализация пайплайна
@@ -31,17 +36,24 @@ class DomainFilteringPipeline:
             excluded_domains_file: Путь к файлу с исключениями
             fetch_metrics: Собирать ли дополнительные метрики
             api_client: API клиент для получения метрик
+            spam_threshold: Минимум спам-анкоров для пометки домена
+            spam_score_threshold: Минимальная взвешенная доля спам-анкоров
         """
         self.spam_phrases_file = spam_phrases_file
         self.excluded_domains_file = excluded_domains_file
         self.fetch_metrics = fetch_metrics
         self.api_client = api_client
+        self.spam_threshold = spam_threshold
+        self.spam_score_threshold = spam_score_threshold
         
-        # Загрузка спам-фраз
-        self.spam_phrases = self._load_spam_phrases()
+        # Загрузка спам-фраз (автомат компилируется один раз)
+        self.spam_filter = SpamFilter(spam_phrases_file)
+        self.spam_filter.load_spam_phrases()
+        self.spam_phrases = self.spam_filter.spam_phrases
         
-        # Загрузка исключенных доменов
-        self.excluded_domains = self._load_excluded_domains()
+        # Загрузка исключенных доменов (хэш-множество + суффиксный бор)
+        self.excluded_domains = ExclusionIndex(excluded_domains_file)
+        self.excluded_domains.load()
         
         logger.info(
             f"Filtering Pipeline инициализирован "
@@ -49,90 +61,62 @@ class DomainFilteringPipeline:
             f"excluded={len(self.excluded_domains)})"
         )
     
-    def _load_spam_phrases(self) -> List[str]:
-        """Загрузка спам-фраз из файла"""
-        try:
-            path = Path(self.spam_phrases_file)
-            if not path.exists():
-                logger.warning(f"Файл спам-фраз не найден: {path}")
-                return []
-            
-            with open(path, 'r', encoding='utf-8') as f:
-                phrases = [
-                    line.strip().lower()
-                    for line in f
-                    if line.strip() and not line.startswith('#')
-                ]
-            
-            logger.info(f"Загружено {len(phrases)} спам-фраз")
-            return phrases
-            
-        except Exception as e:
-            logger.error(f"Ошибка загрузки спам-фраз: {e}")
-            return []
+    def is_excluded(self, domain: str) -> bool:
+        """Проверка домена по правилам исключений"""
+        return self.excluded_domains.matches(domain)
     
-    def _load_excluded_domains(self) -> List[str]:
-        """Загрузка исключенных доменов из файла"""
-        try:
-            path = Path(self.excluded_domains_file)
-            if not path.exists():
-                logger.warning(f"Файл исключений не найден: {path}")
-                return []
-            
-            with open(path, 'r', encoding='utf-8') as f:
-                domains = [
-                    line.strip().lower()
-                    for line in f
-                    if line.strip() and not line.startswith('#')
-                ]
-            
-            logger.info(f"Загружено {len(domains)} исключенных доменов")
-            return domains
+    def filter_many(self, domains: List[str]) -> List[str]:
+        """
+        Пакетное исключение доменов
+        
+        Перед проверкой перечитывает файл исключений, если он изменился.
+        
+        Args:
+            domains: Список доменов
             
-        except Exception as e:
-            logger.error(f"Ошибка загрузки исключений: {e}")
-            return []
+        Returns:
+            Домены, не попавшие под исключения
+        """
+        self.excluded_domains.reload_if_changed()
+        return self.excluded_domains.filter_many(domains)
     
     async def process_domains(
         self,
         domains: List[str],
         availability_results: List[AvailabilityResult],
-        backlinks: List[Dict[str, Any]]
-    ) -> List[FilteredDomain]:
+        backlinks: List[Union[Backlink, Dict[str, Any]]],
+        columnar: bool = False
+    ) -> Union[List[FilteredDomain], DomainBatch]:
         """
         Обработка доменов через пайплайн
         
         Args:
             domains: Список доменов
             availability_results: Результаты проверки доступности
-            backlinks: Список обратных ссылок
+            backlinks: Ссылки (записи Backlink или словари Keys.so API)
+            columnar: Вернуть DomainBatch (колоночное хранение для больших запусков)
             
         Returns:
             Список отфильтрованных доменов с метриками
         """
         logger.info(f"Обработка {len(domains)} доменов через пайплайн")
         
+        # Подхватываем изменения файла исключений между запусками
+        self.excluded_domains.reload_if_changed()
+        
         # Создаем словарь для быстрого поиска availability
         availability_map = {
             result.domain: result
             for result in availability_results
         }
         
-        # Создаем словарь для подсчета ссылок
-        # Подсчитываем количество ссылок для каждого домена
-        backlink_counts = {}
+        # За один проход считаем ссылки и спам-статистику анкоров домена
+        aggregates = LinkAggregates()
         for link in backlinks:
-            # Получаем домен из ссылки (backlink или outlink)
-            domain = link.get('source_name') or link.get('name')
-            if domain:
-                # Удаляем www. для единообразия
-                domain = domain.lower().strip()
-                if domain.startswith('www.'):
-                    domain = domain[4:]
-                backlink_counts[domain] = backlink_counts.get(domain, 0) + 1
+            self.add_link(aggregates, link)
         
         # Обрабатываем каждый домен
-        filtered_domains = []
+        filtered_domains = DomainBatch() if columnar else []
         
         for domain in domains:
             # Получаем availability
@@ -140,25 +124,7 @@ class DomainFilteringPipeline:
             if not availability:
                 continue
             
-            # Создаем FilteredDomain
-            filtered_domain = FilteredDomain(
-                domain=domain,
-                is_registered=(
-                    availability.status.value == "REGISTERED"
-                    if availability else False
-                ),
-                availability_status=availability.status.value if availability else "UNKNOWN",
-                backlink_count=backlink_counts.get(domain, 0)
-            )
-            
-            # Проверка на исключенные домены
-            if domain.lower() in self.excluded_domains:
-                filtered_domain.is_excluded = True
-            
-            # TODO: Проверка на спам в анкорах
-            # TODO: Получение метрик через API
-            
-            filtered_domains.append(filtered_domain)
+            filtered_domains.append(self.build_domain(domain, availability, aggregates))
         
         logger.info(
             f"Обработано доменов: {len(filtered_domains)}, "
@@ -166,3 +132,88 @@ class DomainFilteringPipeline:
         )
         
         return filtered_domains
+    
+    def add_link(
+        self,
+        aggregates: "LinkAggregates",
+        link: Union[Backlink, Dict[str, Any]]
+    ) -> Optional[str]:
+        """
+        Учет одной ссылки: счетчик ссылок и спам-статистика анкоров домена
+        
+        Args:
+            aggregates: Накопленная статистика
+            link: Запись Backlink или словарь Keys.so API
+            
+        Returns:
+            Домен ссылки (без www.) или None
+        """
+        if isinstance(link, dict):
+            link = Backlink.from_keys_so(link)
+        domain = link.source_domain  # уже в нижнем регистре (Backlink)
+        if not domain:
+            return None
+        
+        # Удаляем www. для единообразия
+        if domain.startswith('www.'):
+            domain = domain[4:]
+        aggregates.backlink_counts[domain] = aggregates.backlink_counts.get(domain, 0) + 1
+        
+        scan = aggregates.spam_scans.get(domain)
+        if scan is None:
+            scan = aggregates.spam_scans[domain] = AnchorScanResult()
+        self.spam_filter.update_scan(scan, link.anchor_text)
+        return domain
+    
+    def build_domain(
+        self,
+        domain: str,
+        availability: AvailabilityResult,
+        aggregates: "LinkAggregates"
+    ) -> FilteredDomain:
+        """
+        Итоговая запись домена по результату проверки и статистике ссылок
+        
+        Args:
+            domain: Домен
+            availability: Результат проверки доступности
+            aggregates: Статистика по всем ссылкам запуска
+            
+        Returns:
+            Отфильтрованный домен
+        """
+        # Создаем FilteredDomain
+        filtered_domain = FilteredDomain(
+            domain=domain,
+            is_registered=(
+                availability.status.value == "REGISTERED"
+                if availability else False
+            ),
+            availability_status=availability.status.value if availability else "UNKNOWN",
+            backlink_count=aggregates.backlink_counts.get(domain, 0)
+        )
+        
+        # Проверка на исключенные домены
+        if self.excluded_domains.matches(domain):
+            filtered_domain.is_excluded = True
+        
+        # Проверка на спам в анкорах
+        scan = aggregates.spam_scans.get(domain)
+        if scan is not None:
+            filtered_domain.spam_score = round(scan.spam_score, 4)
+            filtered_domain.spam_ratio = round(scan.spam_ratio, 4)
+            if scan.evaluate(self.spam_threshold, self.spam_score_threshold):
+                filtered_domain.is_spam = True
+                filtered_domain.spam_anchor_examples = scan.examples
+        
+        # TODO: Получение метрик через API
+        
+        return filtered_domain
+
+
+@dataclass
+class LinkAggregates:
+    """Счетчики ссылок и спам-статистика анкоров по доменам"""
+    
+    backlink_counts: Dict[str, int] = field(default_factory=dict)
+    spam_scans: Dict[str, AnchorScanResult] = field(default_factory=dict)
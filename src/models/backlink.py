@@ -1,9 +1,35 @@
-from dataclasses import dataclass
-from typing import Optional
+import sys
+from typing import Any, Dict, Optional
 from datetime import datetime
 
+from .slots import slotted_dataclass
 
-@dataclass
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """Приведение даты из API (ISO строка, unix time) к datetime"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value)
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    """Приведение числа из API к int"""
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@slotted_dataclass
 class Backlink:
     """Модель обратной ссылки"""
     source_url: str           # URL источника ссылки
@@ -17,4 +43,60 @@ class Backlink:
     def __post_init__(self):
         """Нормализация данных после инициализации"""
         if self.source_domain:
-            self.source_domain = self.source_domain.lower().strip()
+            normalized = self.source_domain.lower().strip()
+            # Не заменяем уже нормализованную (возможно, интернированную) строку
+            if normalized != self.source_domain:
+                self.source_domain = normalized
+    
+    @classmethod
+    def from_keys_so(cls, item: Dict[str, Any], keep_dates: bool = False) -> "Backlink":
+        """
+        Компактная запись из элемента ответа Keys.so
+        
+        Сохраняются только поля, нужные пайплайну; остальное содержимое
+        элемента (статусы, служебные поля) отбрасывается. Домен и URL цели
+        интернируются - на один домен обычно приходится много ссылок.
+        
+        Args:
+            item: Элемент 'data' ответа backlinks ('source_name', 'source_url',
+                'url', 'anchor', 'source_dr') или outlinks ('name', 'url')
+            keep_dates: Разобрать 'created_at' в discovered_at
+        """
+        domain = item.get('source_name') or item.get('name') or ''
+        target_url = item.get('url')
+        dr = item.get('source_dr')
+        anchor = item.get('anchor')
+        return cls(
+            source_url=item.get('source_url') or target_url or '',
+            target_url=sys.intern(target_url) if isinstance(target_url, str) else target_url,
+            source_domain=sys.intern(domain.lower().strip()) if isinstance(domain, str) else '',
+            anchor_text=anchor if anchor is None or isinstance(anchor, str) else str(anchor),
+            dr=_to_int(dr if dr is not None else item.get('dr')),
+            discovered_at=parse_timestamp(item.get('created_at')) if keep_dates else None
+        )
+    
+    def to_row(self) -> list:
+        """Компактная строка для журнала запуска (порядок полей - как в модели)"""
+        return [
+            self.source_url,
+            self.target_url,
+            self.source_domain,
+            self.anchor_text,
+            self.dr,
+            self.ur,
+            self.discovered_at.isoformat() if self.discovered_at else None,
+        ]
+    
+    @classmethod
+    def from_row(cls, row: list) -> "Backlink":
+        """Запись из строки to_row()"""
+        source_url, target_url, domain, anchor, dr, ur, discovered_at = row
+        return cls(
+            source_url=source_url,
+            target_url=sys.intern(target_url) if isinstance(target_url, str) else target_url,
+            source_domain=sys.intern(domain) if domain else '',
+            anchor_text=anchor,
+            dr=dr,
+            ur=ur,
+            discovered_at=parse_timestamp(discovered_at)
+        )
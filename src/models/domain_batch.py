@@ -0,0 +1,277 @@
+"""
+Колоночное хранение результатов анализа для больших запусков
+"""
+
+import math
+import sys
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .filtered_domain import FilteredDomain
+
+# Пропуск в целочисленных колонках (метрики неотрицательны)
+_MISSING = -1
+_NAN = float('nan')
+
+# Битовые флаги статусов
+FLAG_REGISTERED = 1
+FLAG_SPAM = 2
+FLAG_EXCLUDED = 4
+
+# Коды availability_status (0 - None); неизвестные значения добавляются
+DEFAULT_STATUSES = (None, "AVAILABLE", "REGISTERED", "UNKNOWN", "ERROR")
+
+
+def _int_or_missing(value: Optional[int]) -> int:
+    return _MISSING if value is None else value
+
+
+def _missing_or_int(value: int) -> Optional[int]:
+    return None if value == _MISSING else value
+
+
+def _float_or_nan(value: Optional[float]) -> float:
+    return _NAN if value is None else value
+
+
+def _nan_or_float(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class DomainBatch:
+    """
+    Результаты запуска в параллельных типизированных массивах
+    
+    Вместо объекта на домен хранится по массиву на поле: строки доменов,
+    array('i'/'q'/'d') для метрик, байтовые коды статусов и флагов.
+    Примеры спам-анкоров хранятся только для спам-доменов.
+    
+    Индексация и итерация возвращают DomainRow - представление строки с
+    теми же атрибутами, что у FilteredDomain, поэтому пакет можно
+    передавать экспортерам вместо списка доменов.
+    """
+    
+    __slots__ = (
+        'domains', 'dr', 'ur', 'backlink_count', 'total_backlinks',
+        'referring_domains', 'organic_traffic', 'spam_score', 'spam_ratio',
+        'checked_at', 'flags', 'status_codes', 'statuses', '_status_index',
+        'spam_examples', 'intern_domains',
+    )
+    
+    def __init__(
+        self,
+        domains: Optional[Iterable[FilteredDomain]] = None,
+        intern_domains: bool = False
+    ):
+        """
+        Args:
+            domains: Начальные домены
+            intern_domains: Интернировать строки доменов (выгодно, когда
+                одинаковые домены приходят разными объектами строк, например
+                из разобранных ответов API; для уникальных строк это ~30 байт
+                на домен сверху)
+        """
+        self.intern_domains = intern_domains
+        self.domains: List[str] = []
+        self.dr = array('i')
+        self.ur = array('i')
+        self.backlink_count = array('q')
+        self.total_backlinks = array('q')
+        self.referring_domains = array('q')
+        self.organic_traffic = array('q')
+        self.spam_score = array('d')
+        self.spam_ratio = array('d')
+        self.checked_at = array('d')  # unix time, NaN - нет
+        self.flags = bytearray()
+        self.status_codes = bytearray()
+        self.statuses: List[Optional[str]] = list(DEFAULT_STATUSES)
+        self._status_index: Dict[Optional[str], int] = {
+            status: code for code, status in enumerate(self.statuses)
+        }
+        self.spam_examples: Dict[int, tuple] = {}
+        
+        if domains is not None:
+            self.extend(domains)
+    
+    def _status_code(self, status: Optional[str]) -> int:
+        code = self._status_index.get(status)
+        if code is None:
+            if len(self.statuses) >= 256:
+                raise ValueError("Слишком много различных статусов для байтового кода")
+            code = len(self.statuses)
+            self.statuses.append(status)
+            self._status_index[status] = code
+        return code
+    
+    def append(self, domain: FilteredDomain) -> int:
+        """
+        Добавление домена
+        
+        Returns:
+            Индекс строки
+        """
+        index = len(self.domains)
+        self.domains.append(
+            sys.intern(domain.domain) if self.intern_domains else domain.domain
+        )
+        self.dr.append(_int_or_missing(domain.dr))
+        self.ur.append(_int_or_missing(domain.ur))
+        self.backlink_count.append(domain.backlink_count)
+        self.total_backlinks.append(_int_or_missing(domain.total_backlinks))
+        self.referring_domains.append(_int_or_missing(domain.referring_domains))
+        self.organic_traffic.append(_int_or_missing(domain.organic_traffic))
+        self.spam_score.append(_float_or_nan(domain.spam_score))
+        self.spam_ratio.append(_float_or_nan(domain.spam_ratio))
+        self.checked_at.append(
+            domain.checked_at.timestamp() if domain.checked_at else _NAN
+        )
+        self.flags.append(
+            (FLAG_REGISTERED if domain.is_registered else 0) |
+            (FLAG_SPAM if domain.is_spam else 0) |
+            (FLAG_EXCLUDED if domain.is_excluded else 0)
+        )
+        self.status_codes.append(self._status_code(domain.availability_status))
+        if domain.spam_anchor_examples:
+            self.spam_examples[index] = tuple(domain.spam_anchor_examples)
+        return index
+    
+    def extend(self, domains: Iterable[FilteredDomain]) -> None:
+        """Добавление нескольких доменов"""
+        for domain in domains:
+            self.append(domain)
+    
+    def __len__(self) -> int:
+        return len(self.domains)
+    
+    def __getitem__(self, index: int) -> "DomainRow":
+        size = len(self.domains)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("индекс DomainBatch вне диапазона")
+        return DomainRow(self, index)
+    
+    def __iter__(self) -> Iterator["DomainRow"]:
+        for index in range(len(self.domains)):
+            yield DomainRow(self, index)
+    
+    def to_domain(self, index: int) -> FilteredDomain:
+        """Полноценный FilteredDomain для строки"""
+        return self[index].to_domain()
+    
+    def nbytes(self) -> int:
+        """Приблизительный объем памяти пакета (без самих строк доменов)"""
+        arrays = (
+            self.dr, self.ur, self.backlink_count, self.total_backlinks,
+            self.referring_domains, self.organic_traffic, self.spam_score,
+            self.spam_ratio, self.checked_at,
+        )
+        return (
+            sum(a.itemsize * len(a) for a in arrays) +
+            len(self.flags) + len(self.status_codes) +
+            sys.getsizeof(self.domains) + sys.getsizeof(self.spam_examples)
+        )
+
+
+class DomainRow:
+    """Представление строки DomainBatch с атрибутами FilteredDomain"""
+    
+    __slots__ = ('_batch', '_index')
+    
+    def __init__(self, batch: DomainBatch, index: int):
+        self._batch = batch
+        self._index = index
+    
+    @property
+    def domain(self) -> str:
+        return self._batch.domains[self._index]
+    
+    @property
+    def dr(self) -> Optional[int]:
+        return _missing_or_int(self._batch.dr[self._index])
+    
+    @property
+    def ur(self) -> Optional[int]:
+        return _missing_or_int(self._batch.ur[self._index])
+    
+    @property
+    def backlink_count(self) -> int:
+        return self._batch.backlink_count[self._index]
+    
+    @property
+    def total_backlinks(self) -> Optional[int]:
+        return _missing_or_int(self._batch.total_backlinks[self._index])
+    
+    @property
+    def referring_domains(self) -> Optional[int]:
+        return _missing_or_int(self._batch.referring_domains[self._index])
+    
+    @property
+    def organic_traffic(self) -> Optional[int]:
+        return _missing_or_int(self._batch.organic_traffic[self._index])
+    
+    @property
+    def is_registered(self) -> bool:
+        return bool(self._batch.flags[self._index] & FLAG_REGISTERED)
+    
+    @property
+    def is_spam(self) -> bool:
+        return bool(self._batch.flags[self._index] & FLAG_SPAM)
+    
+    @property
+    def is_excluded(self) -> bool:
+        return bool(self._batch.flags[self._index] & FLAG_EXCLUDED)
+    
+    @property
+    def spam_score(self) -> Optional[float]:
+        return _nan_or_float(self._batch.spam_score[self._index])
+    
+    @property
+    def spam_ratio(self) -> Optional[float]:
+        return _nan_or_float(self._batch.spam_ratio[self._index])
+    
+    @property
+    def availability_status(self) -> Optional[str]:
+        return self._batch.statuses[self._batch.status_codes[self._index]]
+    
+    @property
+    def spam_anchor_examples(self) -> Sequence[str]:
+        return self._batch.spam_examples.get(self._index, ())
+    
+    @property
+    def checked_at(self) -> Optional[datetime]:
+        value = self._batch.checked_at[self._index]
+        return None if math.isnan(value) else datetime.fromtimestamp(value)
+    
+    @property
+    def is_valid(self) -> bool:
+        """Проверка, что домен валиден для отчета"""
+        return not self.is_spam and not self.is_excluded
+    
+    def to_domain(self) -> FilteredDomain:
+        """Полноценный FilteredDomain для строки"""
+        return FilteredDomain(
+            domain=self.domain,
+            dr=self.dr,
+            ur=self.ur,
+            backlink_count=self.backlink_count,
+            total_backlinks=self.total_backlinks,
+            referring_domains=self.referring_domains,
+            organic_traffic=self.organic_traffic,
+            is_registered=self.is_registered,
+            is_spam=self.is_spam,
+            is_excluded=self.is_excluded,
+            spam_score=self.spam_score,
+            spam_ratio=self.spam_ratio,
+            availability_status=self.availability_status,
+            spam_anchor_examples=self.spam_anchor_examples,
+            checked_at=self.checked_at
+        )
+    
+    def to_dict(self) -> dict:
+        """Конвертация в словарь"""
+        return self.to_domain().to_dict()
+    
+    def __repr__(self) -> str:
+        return f"DomainRow({self._index}, {self.domain!r})"
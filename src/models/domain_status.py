@@ -1,8 +1,9 @@
-from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 from enum import Enum
 
+from .slots import slotted_dataclass
+
 
 class DomainStatus(Enum):
     """Статус доступности домена"""
@@ -19,7 +20,7 @@ class CheckMethod(Enum):
     CACHE = "CACHE"
 
 
-@dataclass
+@slotted_dataclass
 class DomainCheckResult:
     """Результат проверки домена"""
     domain: str
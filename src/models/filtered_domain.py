@@ -1,9 +1,10 @@
-from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, Sequence
 
+from .slots import slotted_dataclass
 
-@dataclass
+
+@slotted_dataclass
 class FilteredDomain:
     """Модель отфильтрованного домена с метриками"""
     
@@ -22,10 +23,12 @@ class FilteredDomain:
     is_registered: bool = True
     is_spam: bool = False
     is_excluded: bool = False
+    spam_score: Optional[float] = None  # Взвешенная доля спам-анкоров
+    spam_ratio: Optional[float] = None  # Доля спам-анкоров
     availability_status: Optional[str] = None  # "AVAILABLE", "REGISTERED", "ERROR"
     
     # Дополнительная информация
-    spam_anchor_examples: List[str] = field(default_factory=list)
+    spam_anchor_examples: Sequence[str] = ()  # Пустой кортеж общий, без аллокации
     checked_at: Optional[datetime] = None
     
     @property
@@ -49,7 +52,9 @@ class FilteredDomain:
             "is_registered": self.is_registered,
             "is_spam": self.is_spam,
             "is_excluded": self.is_excluded,
+            "spam_score": self.spam_score,
+            "spam_ratio": self.spam_ratio,
             "availability_status": self.availability_status,
-            "spam_anchor_examples": self.spam_anchor_examples,
+            "spam_anchor_examples": list(self.spam_anchor_examples),
             "checked_at": self.checked_at.isoformat() if self.checked_at else None
         }
@@ -0,0 +1,42 @@
+"""
+Dataclass со __slots__ для Python 3.8+
+"""
+
+import sys
+from dataclasses import dataclass, fields
+
+
+def slotted_dataclass(cls=None, **kwargs):
+    """
+    Декоратор dataclass без __dict__ у экземпляров
+    
+    На Python 3.10+ используется dataclass(slots=True); на более старых
+    версиях класс пересоздается с __slots__ по именам полей.
+    
+    Args:
+        cls: Декорируемый класс
+        **kwargs: Параметры dataclass (frozen, eq, ...)
+    """
+    def wrap(cls):
+        if sys.version_info >= (3, 10):
+            return dataclass(cls, slots=True, **kwargs)
+        
+        cls = dataclass(cls, **kwargs)
+        cls_dict = dict(cls.__dict__)
+        field_names = tuple(f.name for f in fields(cls))
+        cls_dict['__slots__'] = field_names
+        # Значения по умолчанию уже сохранены в сгенерированном __init__
+        for name in field_names:
+            cls_dict.pop(name, None)
+        cls_dict.pop('__dict__', None)
+        cls_dict.pop('__weakref__', None)
+        
+        qualname = getattr(cls, '__qualname__', None)
+        cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+        if qualname is not None:
+            cls.__qualname__ = qualname
+        return cls
+    
+    if cls is None:
+        return wrap
+    return wrap(cls)
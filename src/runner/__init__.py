@@ -0,0 +1,9 @@
+from .analysis import PipelinedAnalyzer, AnalysisResult
+from .batch import BatchRunner, BatchResult, CombinedReport, load_targets
+from .stages import StageStats, format_stage_table
+
+__all__ = [
+    'PipelinedAnalyzer', 'AnalysisResult',
+    'BatchRunner', 'BatchResult', 'CombinedReport', 'load_targets',
+    'StageStats', 'format_stage_table',
+]
@@ -0,0 +1,472 @@
+"""
+Конвейерный запуск анализа: стадии работают одновременно
+"""
+
+import asyncio
+import functools
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from ..availability.checker import AvailabilityResult, DomainStatus
+from ..domain.extractor import DomainExtractor
+from ..filtering.pipeline import DomainFilteringPipeline, LinkAggregates
+from ..models.backlink import Backlink
+from ..models.filtered_domain import FilteredDomain
+from .checkpoint import LinkProgress, RunCheckpoint
+from .priority import DomainValue, PriorityFunc, Prioritized, value_priority
+from .stages import MonitoredPriorityQueue, MonitoredQueue, StageStats
+
+logger = logging.getLogger(__name__)
+
+# Маркер конца потока в очередях
+_DONE = object()
+
+# Маркер "все ссылки собраны" в очереди результатов проверки
+_LINKS_DONE = object()
+
+# Функция экспорта: получает асинхронный поток готовых доменов
+ExportFunc = Callable[[AsyncIterator[FilteredDomain]], Awaitable[Any]]
+
+
+@dataclass
+class AnalysisResult:
+    """Итоги конвейерного запуска"""
+    
+    links: int = 0
+    domains: int = 0
+    registered: int = 0
+    available: int = 0
+    errors: int = 0
+    valid: int = 0
+    wall_time: float = 0.0
+    stages: List[StageStats] = field(default_factory=list)
+    export_result: Any = None
+    # Продолжение запуска: что взято из журнала, а не запрошено заново
+    run_id: Optional[str] = None
+    resumed_links: int = 0
+    resumed_checks: int = 0
+    # Домены, не проверенные из-за исчерпания check_budget
+    unchecked: int = 0
+    # Домены (если экспорт не задан) и ссылки (если keep_links)
+    filtered_domains: List[FilteredDomain] = field(default_factory=list)
+    all_links: List[Backlink] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict[str, object]:
+        """Счетчики и статистика стадий (без доменов и ссылок)"""
+        return {
+            "run_id": self.run_id,
+            "links": self.links,
+            "domains": self.domains,
+            "registered": self.registered,
+            "available": self.available,
+            "errors": self.errors,
+            "valid": self.valid,
+            "wall_time": round(self.wall_time, 3),
+            "resumed_links": self.resumed_links,
+            "resumed_checks": self.resumed_checks,
+            "unchecked": self.unchecked,
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+
+class PipelinedAnalyzer:
+    """
+    Анализ домена конвейером стадий с ограниченными очередями
+    
+    collect -> aggregate -> check (пул воркеров) -> filter -> export
+    
+    Страницы ссылок сразу попадают в агрегатор; новый домен уходит на
+    проверку доступности, как только встретился впервые, не дожидаясь
+    последней страницы. Счетчики ссылок и спам-статистика домена
+    окончательны только после сбора всех ссылок, поэтому результаты
+    проверок, пришедшие раньше, ждут этого момента в фильтре; дальше
+    домены идут в экспорт по мере завершения проверок.
+    
+    Домены ждут проверки в очереди с приоритетом: первыми проверяются
+    самые ценные по уже собранным ссылкам (check_priority), свободные
+    домены попадают в лог сразу после проверки.
+    """
+    
+    def __init__(
+        self,
+        api_client,
+        checker,
+        pipeline: DomainFilteringPipeline,
+        extractor: Optional[DomainExtractor] = None,
+        link_types: Sequence[str] = ('backlinks',),
+        limit: int = 100000,
+        check_workers: int = 20,
+        queue_size: int = 1000,
+        keep_links: bool = False,
+        keep_dates: bool = False,
+        stage_listener: Optional[Callable[[str, str, str], None]] = None,
+        check_priority: Optional[PriorityFunc] = value_priority,
+        check_budget: Optional[int] = None
+    ):
+        """
+        Args:
+            api_client: KeysSoClient (iter_link_pages)
+            checker: DomainAvailabilityChecker (check_domain)
+            pipeline: Пайплайн фильтрации (add_link, build_domain)
+            extractor: Экстрактор доменов для проверки
+            link_types: Типы ссылок: 'backlinks', 'outlinks'
+            limit: Максимум ссылок каждого типа
+            check_workers: Параллельных проверок доступности
+            queue_size: Емкость очередей между стадиями
+            keep_links: Сохранить все ссылки в результате (для экспорта ссылок)
+            keep_dates: Разобрать дату обнаружения ссылок
+            stage_listener: Вызывается на границах стадий:
+                stage_listener(target, stage, 'start' | 'finish')
+            check_priority: Ключ очередности проверки check_priority(domain,
+                DomainValue) - больше проверяется раньше; None - в порядке
+                появления доменов (очередь ограничена queue_size)
+            check_budget: Максимум запросов к RDAP/WHOIS за запуск
+                (AvailabilityResult.lookups: ответы DNS-префильтра и
+                общего чекера не тратят бюджет, RDAP с переходом на
+                WHOIS - два запроса); после исчерпания остальные домены
+                не проверяются и не попадают в отчет
+        """
+        self.api_client = api_client
+        self.checker = checker
+        self.pipeline = pipeline
+        self.extractor = extractor or DomainExtractor()
+        self.link_types = list(link_types)
+        self.limit = limit
+        self.check_workers = max(1, check_workers)
+        self.queue_size = queue_size
+        self.keep_links = keep_links
+        self.keep_dates = keep_dates
+        self.stage_listener = stage_listener
+        self.check_priority = check_priority
+        self.check_budget = check_budget
+    
+    async def run(
+        self,
+        target_domain: str,
+        export: Optional[ExportFunc] = None,
+        checkpoint: Optional[RunCheckpoint] = None
+    ) -> AnalysisResult:
+        """
+        Запуск анализа
+        
+        С журналом запуска загруженные страницы и результаты проверок
+        дописываются на диск по мере получения. Если журнал уже содержит
+        данные (продолжение после сбоя), сохраненные страницы проходят
+        конвейер без запросов к API, сбор продолжается со следующей
+        страницы, а проверенные домены не проверяются повторно. Отчеты
+        строятся заново целиком.
+        
+        Args:
+            target_domain: Целевой домен
+            export: Функция экспорта; без нее домены собираются в
+                AnalysisResult.filtered_domains
+            checkpoint: Журнал запуска
+            
+        Returns:
+            Итоги запуска со статистикой стадий
+        """
+        if checkpoint is None:
+            return await self._run(target_domain, export, None)
+        
+        checkpoint.write_meta(
+            target=target_domain,
+            link_types=self.link_types,
+            limit=self.limit,
+            status="running"
+        )
+        checkpoint.open()
+        try:
+            result = await self._run(target_domain, export, checkpoint)
+        except BaseException:
+            checkpoint.write_meta(status="failed")
+            raise
+        finally:
+            checkpoint.close()
+        files = result.export_result if isinstance(result.export_result, dict) else None
+        checkpoint.write_meta(status="completed", files=files)
+        return result
+    
+    async def _run(
+        self,
+        target_domain: str,
+        export: Optional[ExportFunc],
+        checkpoint: Optional[RunCheckpoint]
+    ) -> AnalysisResult:
+        """Запуск стадий конвейера"""
+        started = time.perf_counter()
+        result = AnalysisResult(run_id=checkpoint.run_id if checkpoint else None)
+        aggregates = LinkAggregates()
+        saved_checks = checkpoint.load_checks() if checkpoint else {}
+        
+        # Подхватываем изменения файла исключений между запусками
+        self.pipeline.excluded_domains.reload_if_changed()
+        
+        pages_q = MonitoredQueue(max(1, self.queue_size // 100), name="pages")
+        # С приоритетом очередь доменов не ограничена: иначе выбор шел бы
+        # только среди queue_size первых, а сбор ссылок ждал бы проверок.
+        # Памяти это почти не добавляет: все домены и так хранятся в values
+        domains_q = MonitoredPriorityQueue(
+            0 if self.check_priority else self.queue_size, name="domains"
+        )
+        checked_q = MonitoredQueue(self.queue_size, name="checked")
+        export_q = MonitoredQueue(self.queue_size, name="export")
+        
+        listener = (
+            functools.partial(self.stage_listener, target_domain)
+            if self.stage_listener else None
+        )
+        collect = StageStats("collect", listener=listener)
+        aggregate = StageStats("aggregate", queue=pages_q, listener=listener)
+        check = StageStats("check", queue=domains_q, listener=listener)
+        filter_stage = StageStats("filter", queue=checked_q, listener=listener)
+        export_stage = StageStats("export", queue=export_q, listener=listener)
+        result.stages = [collect, aggregate, check, filter_stage, export_stage]
+        
+        async def collect_links():
+            collect.start()
+            progress: Dict[str, LinkProgress] = {}
+            if checkpoint is not None:
+                t = time.perf_counter()
+                for _, page in checkpoint.replay_pages():
+                    collect.record(t, len(page))
+                    result.resumed_links += len(page)
+                    await pages_q.put(page)
+                    t = time.perf_counter()
+                progress = checkpoint.progress
+            
+            for link_type in self.link_types:
+                saved = progress.get(link_type) or LinkProgress()
+                if saved.done or saved.links >= self.limit:
+                    continue
+                pages = self.api_client.iter_link_pages(
+                    link_type,
+                    target_domain,
+                    limit=self.limit - saved.links,
+                    as_records=True,
+                    keep_dates=self.keep_dates,
+                    start_page=saved.pages + 1
+                )
+                page_number = saved.pages
+                while True:
+                    t = time.perf_counter()
+                    try:
+                        page = await pages.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    page_number += 1
+                    if checkpoint is not None:
+                        checkpoint.append_page(link_type, page_number, page)
+                    collect.record(t, len(page))
+                    await pages_q.put(page)
+                if checkpoint is not None:
+                    checkpoint.mark_links_done(link_type)
+            collect.finish()
+            await pages_q.put(_DONE)
+        
+        values: Dict[str, DomainValue] = {}
+        order = itertools.count()
+        # Актуальная запись очереди для еще не проверенных доменов. Ценность
+        # домена растет со следующими страницами - тогда он ставится в
+        # очередь заново с новым ключом, а старая запись пропускается
+        waiting: Dict[str, Prioritized] = {}
+        
+        def queued(domain) -> Prioritized:
+            if domain is _DONE:
+                return Prioritized(None, next(order), _DONE)
+            key = self.check_priority(domain, values[domain]) if self.check_priority else 0
+            entry = waiting[domain] = Prioritized(key, next(order), domain)
+            return entry
+        
+        async def aggregate_links():
+            while True:
+                page = await pages_q.get()
+                if page is _DONE:
+                    break
+                aggregate.start()
+                t = time.perf_counter()
+                new_domains = []
+                grown = set()
+                for link in page:
+                    self.pipeline.add_link(aggregates, link)
+                    domain = self.extractor.registrable_domain(link)
+                    if not domain:
+                        continue
+                    value = values.get(domain)
+                    if value is None:
+                        value = values[domain] = DomainValue()
+                        new_domains.append(domain)
+                    elif self.check_priority and domain in waiting:
+                        grown.add(domain)
+                    value.add(link)
+                if self.keep_links:
+                    result.all_links.extend(page)
+                result.links += len(page)
+                aggregate.record(t, len(page))
+                
+                for domain in new_domains:
+                    saved = saved_checks.pop(domain, None)
+                    if saved is not None:
+                        # Проверен до сбоя - сразу в фильтр
+                        result.resumed_checks += 1
+                        await checked_q.put(saved)
+                    else:
+                        # Ключ - по ссылкам, собранным к этому моменту
+                        await domains_q.put(queued(domain))
+                
+                for domain in grown:
+                    entry = waiting.get(domain)
+                    if entry is not None and entry.key != self.check_priority(domain, values[domain]):
+                        await domains_q.put(queued(domain))
+            
+            aggregate.finish()
+            result.domains = len(values)
+            await checked_q.put(_LINKS_DONE)
+            for _ in range(self.check_workers):
+                await domains_q.put(queued(_DONE))
+        
+        lookups = 0
+        
+        async def check_worker():
+            nonlocal lookups
+            while True:
+                entry = await domains_q.get()
+                domain = entry.item
+                if domain is _DONE:
+                    break
+                if waiting.get(domain) is not entry:
+                    # Домен переставлен в очереди с большим ключом
+                    continue
+                del waiting[domain]
+                if self.check_budget is not None and lookups >= self.check_budget:
+                    # Бюджет исчерпан: очередь дочитывается до конца потока
+                    if not result.unchecked:
+                        logger.warning(
+                            f"{target_domain}: исчерпан бюджет проверок "
+                            f"({self.check_budget}), остальные домены не проверяются"
+                        )
+                    result.unchecked += 1
+                    continue
+                # Резерв на время проверки: параллельные воркеры не
+                # перерасходуют бюджет; итог - по фактическим запросам
+                lookups += 1
+                check.start()
+                t = time.perf_counter()
+                try:
+                    availability = await self.checker.check_domain(domain)
+                except Exception as e:
+                    logger.error(f"Error checking {domain}: {e}")
+                    availability = AvailabilityResult(
+                        domain=domain,
+                        status=DomainStatus.ERROR,
+                        checked_via="error",
+                        error=str(e)
+                    )
+                lookups += availability.lookups - 1
+                check.record(t)
+                if availability.status == DomainStatus.AVAILABLE:
+                    value = values[domain]
+                    logger.info(
+                        f"Свободный домен: {domain} (DR {value.max_dr}, ссылок {value.links})"
+                    )
+                if checkpoint is not None:
+                    checkpoint.append_check(availability)
+                await checked_q.put(availability)
+        
+        async def check_domains():
+            await asyncio.gather(*(check_worker() for _ in range(self.check_workers)))
+            check.finish()
+            await checked_q.put(_DONE)
+        
+        async def filter_domains():
+            links_done = False
+            pending: List[AvailabilityResult] = []
+            
+            async def emit(availability: AvailabilityResult):
+                filter_stage.start()
+                t = time.perf_counter()
+                if availability.status == DomainStatus.REGISTERED:
+                    result.registered += 1
+                elif availability.status == DomainStatus.AVAILABLE:
+                    result.available += 1
+                elif availability.status == DomainStatus.ERROR:
+                    result.errors += 1
+                domain = self.pipeline.build_domain(availability.domain, availability, aggregates)
+                if domain.is_valid:
+                    result.valid += 1
+                filter_stage.record(t)
+                await export_q.put(domain)
+            
+            while True:
+                item = await checked_q.get()
+                if item is _DONE:
+                    break
+                if item is _LINKS_DONE:
+                    # Статистика ссылок окончательна - выпускаем отложенные
+                    links_done = True
+                    for availability in pending:
+                        await emit(availability)
+                    pending.clear()
+                elif links_done:
+                    await emit(item)
+                else:
+                    pending.append(item)
+            
+            filter_stage.finish()
+            await export_q.put(_DONE)
+        
+        async def finished_domains() -> AsyncIterator[FilteredDomain]:
+            while True:
+                domain = await export_q.get()
+                if domain is _DONE:
+                    break
+                export_stage.start()
+                t = time.perf_counter()
+                yield domain
+                export_stage.record(t)
+            export_stage.finish()
+        
+        async def export_domains():
+            if export is not None:
+                result.export_result = await export(finished_domains())
+            else:
+                async for domain in finished_domains():
+                    result.filtered_domains.append(domain)
+        
+        try:
+            await self._run_stages([
+                collect_links(),
+                aggregate_links(),
+                check_domains(),
+                filter_domains(),
+                export_domains(),
+            ])
+        finally:
+            # После сбоя в очередях остаются элементы - их глубина больше не актуальна
+            for queue in (pages_q, domains_q, checked_q, export_q):
+                queue.discard()
+        
+        result.wall_time = time.perf_counter() - started
+        return result
+    
+    @staticmethod
+    async def _run_stages(coroutines: list) -> None:
+        """Запуск стадий; ошибка одной отменяет остальные"""
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
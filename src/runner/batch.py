@@ -0,0 +1,203 @@
+"""
+Пакетный режим: анализ многих целевых доменов в одном процессе
+"""
+
+import asyncio
+import dataclasses
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ..models.filtered_domain import FilteredDomain
+from .analysis import AnalysisResult, ExportFunc, PipelinedAnalyzer
+from .checkpoint import RunCheckpoint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TARGET_CONCURRENCY = 4
+
+
+def normalize_target(value: str) -> str:
+    """Целевой домен из строки файла: без схемы, пути и www."""
+    target = value.strip().lower()
+    if '://' in target:
+        target = target.split('://', 1)[1]
+    target = target.split('/', 1)[0]
+    if target.startswith('www.'):
+        target = target[4:]
+    return target
+
+
+def load_targets(path: str) -> List[str]:
+    """
+    Чтение списка целей
+    
+    Args:
+        path: Файл: один домен на строку, строки с # - комментарии
+        
+    Returns:
+        Цели в порядке файла, без повторов
+    """
+    targets = []
+    seen = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            target = normalize_target(line)
+            if target and target not in seen:
+                seen.add(target)
+                targets.append(target)
+    return targets
+
+
+def _max(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+class CombinedReport:
+    """
+    Сводный отчет по всем целям: одна запись на домен
+    
+    Счетчики ссылок суммируются, флаги спама и исключения объединяются,
+    метрики берутся максимальные.
+    """
+    
+    def __init__(self):
+        self._domains: Dict[str, FilteredDomain] = {}
+    
+    def __len__(self) -> int:
+        return len(self._domains)
+    
+    def add(self, domain: FilteredDomain) -> None:
+        """Добавление записи домена одной из целей"""
+        existing = self._domains.get(domain.domain)
+        if existing is None:
+            # Копия: отчет цели мог еще не дописать исходную запись
+            self._domains[domain.domain] = dataclasses.replace(domain)
+            return
+        
+        existing.backlink_count += domain.backlink_count
+        existing.is_excluded = existing.is_excluded or domain.is_excluded
+        if domain.is_spam and not existing.is_spam:
+            existing.is_spam = True
+            existing.spam_anchor_examples = domain.spam_anchor_examples
+        existing.spam_score = _max(existing.spam_score, domain.spam_score)
+        existing.spam_ratio = _max(existing.spam_ratio, domain.spam_ratio)
+        existing.dr = _max(existing.dr, domain.dr)
+        existing.ur = _max(existing.ur, domain.ur)
+    
+    def extend(self, domains: Iterable[FilteredDomain]) -> None:
+        for domain in domains:
+            self.add(domain)
+    
+    def domains(self) -> List[FilteredDomain]:
+        """Записи в порядке первого появления"""
+        return list(self._domains.values())
+
+
+@dataclass
+class TargetOutcome:
+    """Итог анализа одной цели"""
+    
+    target: str
+    result: Optional[AnalysisResult] = None
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchResult:
+    """Итоги пакетного запуска"""
+    
+    outcomes: List[TargetOutcome] = field(default_factory=list)
+    combined: CombinedReport = field(default_factory=CombinedReport)
+    wall_time: float = 0.0
+    
+    @property
+    def failed(self) -> List[TargetOutcome]:
+        return [o for o in self.outcomes if not o.ok]
+
+
+class BatchRunner:
+    """
+    Анализ списка целей одним конвейером
+    
+    Все цели используют один PipelinedAnalyzer, а значит один клиент
+    Keys.so (общий лимит запросов), один чекер доступности (общие
+    HTTP-сессии и результаты проверок) и один пайплайн фильтрации.
+    Одновременно обрабатывается не больше concurrency целей; ошибка
+    одной цели не прерывает остальные.
+    """
+    
+    def __init__(
+        self,
+        analyzer: PipelinedAnalyzer,
+        concurrency: int = DEFAULT_TARGET_CONCURRENCY
+    ):
+        """
+        Args:
+            analyzer: Конвейер анализа (общий для всех целей)
+            concurrency: Целей одновременно
+        """
+        self.analyzer = analyzer
+        self.concurrency = max(1, concurrency)
+    
+    async def run(
+        self,
+        targets: List[str],
+        export_for: Optional[Callable[[str], Optional[ExportFunc]]] = None,
+        checkpoint_for: Optional[Callable[[str], Optional[RunCheckpoint]]] = None
+    ) -> BatchResult:
+        """
+        Запуск анализа всех целей
+        
+        Args:
+            targets: Целевые домены
+            export_for: Функция экспорта для цели (отчет цели)
+            checkpoint_for: Журнал запуска для цели
+            
+        Returns:
+            Итоги по целям и сводный отчет
+        """
+        started = time.perf_counter()
+        batch = BatchResult()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def run_target(target: str) -> TargetOutcome:
+            async with semaphore:
+                logger.info(f"Анализ цели {target}")
+                collected: List[FilteredDomain] = []
+                export = export_for(target) if export_for else None
+                
+                async def tapped_export(domains):
+                    async def tap():
+                        async for domain in domains:
+                            collected.append(domain)
+                            yield domain
+                    return await export(tap())
+                
+                try:
+                    result = await self.analyzer.run(
+                        target,
+                        export=tapped_export if export else None,
+                        checkpoint=checkpoint_for(target) if checkpoint_for else None
+                    )
+                except Exception as e:
+                    logger.error(f"Ошибка анализа {target}: {e}")
+                    return TargetOutcome(target=target, error=str(e))
+                
+                # В сводный отчет попадают только успешно завершенные цели
+                batch.combined.extend(collected if export else result.filtered_domains)
+                return TargetOutcome(target=target, result=result)
+        
+        batch.outcomes = list(await asyncio.gather(*(run_target(t) for t in targets)))
+        batch.wall_time = time.perf_counter() - started
+        return batch
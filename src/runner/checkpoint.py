@@ -0,0 +1,201 @@
+"""
+Журнал запуска для продолжения после сбоя (--resume RUN_ID)
+
+Каталог запуска:
+    meta.json     - параметры и статус запуска (перезаписывается атомарно)
+    pages.ndjson  - загруженные страницы ссылок, по строке на страницу
+    checks.ndjson - результаты проверок доступности, по строке на домен
+
+Журналы только дописываются: каждая запись - одна строка JSON, поэтому
+стоимость сохранения пропорциональна новым данным, а не всему состоянию.
+Оборванная при сбое последняя строка отбрасывается при открытии.
+"""
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from ..api.decoding import loads
+from ..availability.checker import AvailabilityResult, DomainStatus
+from ..export.json_exporter import dumps
+from ..models.backlink import Backlink
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RUNS_DIR = "runs"
+
+META_FILE = "meta.json"
+PAGES_FILE = "pages.ndjson"
+CHECKS_FILE = "checks.ndjson"
+
+
+def new_run_id(label: str) -> str:
+    """Идентификатор запуска: дата-время и метка (домен цели)"""
+    safe_label = re.sub(r'[^a-z0-9]+', '_', label.lower()).strip('_')
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{safe_label}"
+
+
+def _repair_tail(path: Path) -> None:
+    """Отрезает недописанную последнюю строку журнала"""
+    if not path.exists():
+        return
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        # Ищем последний перевод строки с конца файла блоками
+        position = size
+        block = 65536
+        while position > 0:
+            start = max(0, position - block)
+            f.seek(start)
+            chunk = f.read(position - start)
+            if position == size and chunk.endswith(b'\n'):
+                return
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                f.truncate(start + newline + 1)
+                logger.warning(f"Журнал {path.name}: отброшена оборванная запись")
+                return
+            position = start
+        f.truncate(0)
+
+
+def _read_lines(path: Path) -> Iterator[Any]:
+    """Записи журнала (оборванная последняя строка пропускается)"""
+    if not path.exists():
+        return
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            yield loads(line)
+
+
+@dataclass
+class LinkProgress:
+    """Состояние сбора ссылок одного типа"""
+    
+    pages: int = 0
+    links: int = 0
+    done: bool = False
+
+
+class RunCheckpoint:
+    """Журнал одного запуска (одной цели)"""
+    
+    def __init__(self, run_dir: str, flush_every: int = 100):
+        """
+        Args:
+            run_dir: Каталог запуска
+            flush_every: Сбрасывать журнал проверок на диск каждые N записей
+        """
+        self.run_dir = Path(run_dir)
+        self.flush_every = flush_every
+        self.progress: Dict[str, LinkProgress] = {}
+        self._pages = None
+        self._checks = None
+        self._pending_checks = 0
+    
+    @property
+    def run_id(self) -> str:
+        return self.run_dir.name
+    
+    def exists(self) -> bool:
+        return (self.run_dir / META_FILE).exists()
+    
+    def read_meta(self) -> Dict[str, Any]:
+        """Параметры и статус запуска"""
+        with open(self.run_dir / META_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def write_meta(self, **fields) -> Dict[str, Any]:
+        """Обновление meta.json (запись во временный файл и переименование)"""
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        meta = self.read_meta() if self.exists() else {"run_id": self.run_id}
+        meta.update(fields)
+        meta["updated_at"] = datetime.now().isoformat(timespec='seconds')
+        tmp = self.run_dir / (META_FILE + ".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.run_dir / META_FILE)
+        return meta
+    
+    def replay_pages(self) -> Iterator[Tuple[str, List[Backlink]]]:
+        """
+        Сохраненные страницы ссылок в порядке загрузки
+        
+        По ходу чтения заполняет self.progress: сколько страниц и ссылок
+        каждого типа уже загружено и завершен ли сбор.
+        """
+        self.progress = {}
+        for record in _read_lines(self.run_dir / PAGES_FILE):
+            progress = self.progress.setdefault(record["t"], LinkProgress())
+            if record.get("done"):
+                progress.done = True
+                continue
+            links = [Backlink.from_row(row) for row in record["links"]]
+            progress.pages = record["p"]
+            progress.links += len(links)
+            yield record["t"], links
+    
+    def load_checks(self) -> Dict[str, AvailabilityResult]:
+        """Завершенные проверки доступности по домену"""
+        results = {}
+        for record in _read_lines(self.run_dir / CHECKS_FILE):
+            results[record["d"]] = AvailabilityResult(
+                domain=record["d"],
+                status=DomainStatus(record["s"]),
+                checked_via=record["v"],
+                error=record.get("e")
+            )
+        return results
+    
+    def open(self) -> "RunCheckpoint":
+        """Открытие журналов на дозапись"""
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        for name in (PAGES_FILE, CHECKS_FILE):
+            _repair_tail(self.run_dir / name)
+        self._pages = open(self.run_dir / PAGES_FILE, 'a', encoding='utf-8')
+        self._checks = open(self.run_dir / CHECKS_FILE, 'a', encoding='utf-8')
+        return self
+    
+    def append_page(self, link_type: str, page: int, links: List[Backlink]) -> None:
+        """Запись загруженной страницы (сразу на диск: страница - дорогой запрос)"""
+        self._pages.write(dumps({
+            "t": link_type,
+            "p": page,
+            "links": [link.to_row() for link in links]
+        }) + "\n")
+        self._pages.flush()
+    
+    def mark_links_done(self, link_type: str) -> None:
+        """Сбор ссылок типа завершен"""
+        self._pages.write(dumps({"t": link_type, "done": True}) + "\n")
+        self._pages.flush()
+    
+    def append_check(self, result: AvailabilityResult) -> None:
+        """Запись результата проверки; ошибки не сохраняются, чтобы повторить их"""
+        if result.status == DomainStatus.ERROR:
+            return
+        record = {"d": result.domain, "s": result.status.value, "v": result.checked_via}
+        if result.error:
+            record["e"] = result.error
+        self._checks.write(dumps(record) + "\n")
+        self._pending_checks += 1
+        if self._pending_checks >= self.flush_every:
+            self._checks.flush()
+            self._pending_checks = 0
+    
+    def close(self) -> None:
+        """Сброс и закрытие журналов"""
+        for handle in (self._pages, self._checks):
+            if handle is not None:
+                handle.close()
+        self._pages = self._checks = None
+        self._pending_checks = 0
@@ -0,0 +1,61 @@
+"""
+Порядок проверки доступности по ценности домена
+
+Ценность считается по ссылкам, уже прошедшим агрегацию: максимальный DR
+источника и число ссылок домена. Домен с большей ценностью проверяется
+раньше, так что при прерванном или ограниченном (--check-budget) запуске
+самые ценные свободные домены уже найдены.
+"""
+
+from typing import Any, Callable, Optional
+
+from ..models.backlink import Backlink
+from ..models.slots import slotted_dataclass
+
+
+@slotted_dataclass
+class DomainValue:
+    """Накопленная по ссылкам ценность домена-кандидата"""
+
+    links: int = 0
+    max_dr: int = 0
+
+    def add(self, link: Backlink) -> None:
+        """Учет одной ссылки домена"""
+        self.links += 1
+        if link.dr is not None and link.dr > self.max_dr:
+            self.max_dr = link.dr
+
+
+# Ключ приоритета: больше - проверяется раньше
+PriorityFunc = Callable[[str, DomainValue], Any]
+
+
+def value_priority(domain: str, value: DomainValue) -> tuple:
+    """Приоритет по умолчанию: DR, затем число ссылок"""
+    return (value.max_dr, value.links)
+
+
+class Prioritized:
+    """
+    Элемент очереди проверок (asyncio.PriorityQueue - min-heap)
+
+    Раньше выходит элемент с большим ключом, при равных ключах - ранее
+    добавленный. Элемент без ключа (конец потока) - после всех доменов.
+    """
+
+    __slots__ = ("key", "seq", "item")
+
+    def __init__(self, key: Optional[Any], seq: int, item: Any):
+        self.key = key
+        self.seq = seq
+        self.item = item
+
+    def __lt__(self, other: "Prioritized") -> bool:
+        if self.key is None:
+            return other.key is None and self.seq < other.seq
+        if other.key is None:
+            return True
+        if self.key != other.key:
+            return self.key > other.key
+        return self.seq < other.seq
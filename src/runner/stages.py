@@ -0,0 +1,130 @@
+"""
+Статистика стадий конвейера и очереди с замером глубины
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from ..utils.metrics import registry as metrics
+
+
+class MonitoredQueue(asyncio.Queue):
+    """
+    Ограниченная asyncio.Queue, запоминающая глубину при каждой вставке
+
+    Текущая глубина именованной очереди видна в реестре метрик
+    (gauge queue_depth); очереди с одним именем из параллельных
+    запусков пакета суммируются.
+    """
+    
+    def __init__(self, maxsize: int = 0, name: str = ""):
+        super().__init__(maxsize)
+        self.name = name
+        self.puts = 0
+        self.max_depth = 0
+        self._depth_sum = 0
+    
+    def put_nowait(self, item) -> None:
+        super().put_nowait(item)
+        depth = self.qsize()
+        self.puts += 1
+        self._depth_sum += depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if self.name:
+            metrics.add("queue_depth", 1, queue=self.name)
+    
+    def get_nowait(self):
+        item = super().get_nowait()
+        if self.name:
+            metrics.add("queue_depth", -1, queue=self.name)
+        return item
+    
+    def discard(self) -> None:
+        """Сброс необработанных элементов (после остановки конвейера)"""
+        while not self.empty():
+            self.get_nowait()
+    
+    @property
+    def avg_depth(self) -> float:
+        """Средняя глубина очереди в моменты вставки"""
+        return self._depth_sum / self.puts if self.puts else 0.0
+
+
+class MonitoredPriorityQueue(MonitoredQueue, asyncio.PriorityQueue):
+    """MonitoredQueue с выдачей элементов по приоритету (heapq)"""
+
+
+@dataclass
+class StageStats:
+    """Счетчики одной стадии"""
+    
+    name: str
+    items: int = 0
+    busy: float = 0.0  # Суммарное время обработки (по всем воркерам)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    queue: Optional[MonitoredQueue] = None  # Входная очередь стадии
+    # Вызывается на границах стадии: listener(name, 'start' | 'finish')
+    listener: Optional[Callable[[str, str], None]] = None
+    
+    def start(self) -> None:
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+            if self.listener is not None:
+                self.listener(self.name, "start")
+    
+    def finish(self) -> None:
+        self.finished_at = time.perf_counter()
+        if self.listener is not None:
+            self.listener(self.name, "finish")
+    
+    def record(self, started: float, items: int = 1) -> None:
+        """Учет обработанных элементов (started - perf_counter() до обработки)"""
+        self.busy += time.perf_counter() - started
+        self.items += items
+    
+    @property
+    def elapsed(self) -> float:
+        """Время от первого до последнего элемента стадии"""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+    
+    @property
+    def throughput(self) -> float:
+        """Элементов в секунду за время работы стадии"""
+        return self.items / self.elapsed if self.elapsed > 0 else 0.0
+    
+    def to_dict(self) -> Dict[str, object]:
+        """Конвертация в словарь"""
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "elapsed": round(self.elapsed, 3),
+            "busy": round(self.busy, 3),
+            "throughput": round(self.throughput, 1),
+            "queue_max": self.queue.max_depth if self.queue else None,
+            "queue_avg": round(self.queue.avg_depth, 1) if self.queue else None,
+        }
+
+
+def format_stage_table(stages: List[StageStats]) -> List[str]:
+    """Строки таблицы статистики стадий для лога"""
+    lines = [
+        f"  {'стадия':<14} {'элементов':>10} {'время, s':>9} {'занято, s':>10} "
+        f"{'эл./s':>9} {'очередь max/avg':>16}"
+    ]
+    for stage in stages:
+        queue = (
+            f"{stage.queue.max_depth}/{stage.queue.avg_depth:.1f}"
+            if stage.queue else "-"
+        )
+        lines.append(
+            f"  {stage.name:<14} {stage.items:>10} {stage.elapsed:>9.1f} "
+            f"{stage.busy:>10.1f} {stage.throughput:>9.1f} {queue:>16}"
+        )
+    return lines
@@ -0,0 +1,270 @@
+"""
+Запись и воспроизведение HTTP-обмена с внешними API (--record / --replay)
+
+Кассета - каталог из двух файлов:
+    index.ndjson - строка на ответ: ключ запроса, смещение и длина тела,
+                   статус, исходная задержка
+    bodies.bin   - тела ответов подряд (сжатые zlib)
+
+Ключ запроса - хэш метода, URL и параметров без секретов (API-ключи в
+параметрах и заголовки в кассету не попадают). Один и тот же запрос
+может быть записан несколько раз: ответы воспроизводятся в порядке
+записи, затем повторяется последний.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import time
+import zlib
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.ndjson"
+BODIES_FILE = "bodies.bin"
+
+# Параметры запроса с секретами: не входят в ключ и не сохраняются
+SECRET_PARAMS = frozenset({"apikey", "api_key", "key", "token"})
+
+
+class CassetteMiss(LookupError):
+    """
+    Запрос не найден в кассете (в режиме воспроизведения)
+    
+    Не наследует aiohttp.ClientError: клиент не должен повторять запрос
+    с паузой, как при сетевой ошибке.
+    """
+
+
+def _public_params(params: Optional[Dict[str, Any]]) -> List[tuple]:
+    if not params:
+        return []
+    return sorted(
+        (str(k), str(v)) for k, v in params.items()
+        if str(k).lower() not in SECRET_PARAMS
+    )
+
+
+def request_key(method: str, url: str, params=None, json_body=None) -> str:
+    """Ключ запроса: метод, URL, параметры (без секретов) и тело JSON"""
+    parts = [method.upper(), url, urlencode(_public_params(params))]
+    if json_body is not None:
+        parts.append(json.dumps(json_body, sort_keys=True, ensure_ascii=False))
+    return hashlib.sha1("\n".join(parts).encode('utf-8')).hexdigest()
+
+
+class CassetteResponse:
+    """Ответ из кассеты с интерфейсом aiohttp.ClientResponse (status, read, text, json)"""
+    
+    def __init__(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.status = status
+        self._body = body
+        self.content_type = content_type
+        self.headers = {"Content-Type": content_type}
+    
+    async def read(self) -> bytes:
+        return self._body
+    
+    async def text(self, encoding: str = "utf-8") -> str:
+        return self._body.decode(encoding, errors="replace")
+    
+    async def json(self, content_type: Optional[str] = None, **kwargs) -> Any:
+        return json.loads(self._body) if self._body else None
+
+
+class CassetteSession:
+    """
+    Сессия с интерфейсом aiohttp.ClientSession (get, post, close)
+    
+    При записи запрос выполняется через настоящую сессию, ответ
+    сохраняется в кассету; при воспроизведении сеть не используется.
+    """
+    
+    def __init__(self, cassette: "Cassette", session: Optional[aiohttp.ClientSession] = None):
+        self.cassette = cassette
+        self.session = session
+    
+    @property
+    def closed(self) -> bool:
+        return self.session.closed if self.session is not None else False
+    
+    def get(self, url: str, *, params=None, headers=None, **kwargs):
+        return self._request("GET", url, params=params, headers=headers, **kwargs)
+    
+    def post(self, url: str, *, json=None, params=None, headers=None, **kwargs):
+        return self._request("POST", url, params=params, json_body=json, headers=headers, **kwargs)
+    
+    @asynccontextmanager
+    async def _request(self, method, url, params=None, json_body=None, headers=None, **kwargs):
+        key = request_key(method, url, params, json_body)
+        if self.cassette.replaying:
+            yield await self.cassette.replay(key)
+            return
+        
+        request_kwargs = dict(kwargs)
+        if params is not None:
+            request_kwargs["params"] = params
+        if json_body is not None:
+            request_kwargs["json"] = json_body
+        if headers is not None:
+            request_kwargs["headers"] = headers
+        started = time.perf_counter()
+        async with self.session.request(method, url, **request_kwargs) as response:
+            body = await response.read()
+            elapsed = time.perf_counter() - started
+            self.cassette.record(
+                key, method, url, params, response.status, body, elapsed,
+                response.content_type or "application/json"
+            )
+        yield CassetteResponse(response.status, body, response.content_type or "application/json")
+    
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+
+
+class Cassette:
+    """Кассета HTTP-обмена в каталоге"""
+    
+    def __init__(self, path: str, mode: str = "replay", replay_latency: bool = False):
+        """
+        Args:
+            path: Каталог кассеты
+            mode: "record" - дозапись ответов, "replay" - воспроизведение
+            replay_latency: При воспроизведении выдерживать записанные задержки
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Неизвестный режим кассеты: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency = replay_latency
+        
+        self.recorded = 0
+        self.hits = 0
+        self.misses = 0
+        
+        self._index: Dict[str, List[dict]] = {}
+        self._served: Dict[str, int] = {}
+        self._bodies = None
+        self._bodies_map = None
+        self._index_file = None
+        self._offset = 0
+    
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+    
+    def open(self) -> "Cassette":
+        """Открытие кассеты"""
+        if self.replaying:
+            self._load()
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._bodies = open(self.path / BODIES_FILE, 'ab')
+            self._offset = self._bodies.tell()
+            self._index_file = open(self.path / INDEX_FILE, 'a', encoding='utf-8')
+        return self
+    
+    def _load(self) -> None:
+        """Чтение индекса; тела отображаются в память (mmap)"""
+        index_path = self.path / INDEX_FILE
+        if not index_path.exists():
+            raise FileNotFoundError(f"Кассета не найдена: {self.path}")
+        with open(index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break  # оборванная запись
+                entry = json.loads(line)
+                self._index.setdefault(entry["k"], []).append(entry)
+        
+        bodies_path = self.path / BODIES_FILE
+        if bodies_path.stat().st_size:
+            self._bodies = open(bodies_path, 'rb')
+            self._bodies_map = mmap.mmap(self._bodies.fileno(), 0, access=mmap.ACCESS_READ)
+        logger.info(f"Кассета {self.path}: {sum(map(len, self._index.values()))} ответов")
+    
+    def close(self) -> None:
+        """Закрытие файлов кассеты"""
+        if self._bodies_map is not None:
+            self._bodies_map.close()
+            self._bodies_map = None
+        for handle in (self._bodies, self._index_file):
+            if handle is not None:
+                handle.close()
+        self._bodies = self._index_file = None
+    
+    def __enter__(self):
+        return self.open()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def record(self, key, method, url, params, status, body, elapsed, content_type) -> None:
+        """Дозапись ответа"""
+        data = zlib.compress(body, 6)
+        self._bodies.write(data)
+        entry = {
+            "k": key,
+            "o": self._offset,
+            "n": len(data),
+            "s": status,
+            "t": round(elapsed, 4),
+            "c": content_type,
+            "r": f"{method} {url}?{urlencode(_public_params(params))}",
+        }
+        self._offset += len(data)
+        # Тело пишется раньше индекса: запись индекса всегда ссылается на целое тело
+        self._bodies.flush()
+        self._index_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._index_file.flush()
+        self.recorded += 1
+    
+    async def replay(self, key: str) -> CassetteResponse:
+        """Ответ на запрос из кассеты"""
+        entries = self._index.get(key)
+        if not entries:
+            self.misses += 1
+            if self.misses <= 10:
+                logger.warning(f"Нет в кассете: {key}")
+            raise CassetteMiss(f"Запрос отсутствует в кассете {self.path}")
+        served = self._served.get(key, 0)
+        self._served[key] = served + 1
+        entry = entries[min(served, len(entries) - 1)]
+        self.hits += 1
+        
+        if self.replay_latency and entry["t"]:
+            await asyncio.sleep(entry["t"])
+        body = self._bodies_map[entry["o"]:entry["o"] + entry["n"]] if entry["n"] else b""
+        return CassetteResponse(entry["s"], zlib.decompress(body) if body else b"", entry["c"])
+    
+    def wrap(self, session: Optional[aiohttp.ClientSession]) -> CassetteSession:
+        """Сессия клиента поверх настоящей (запись) или без сети (воспроизведение)"""
+        return CassetteSession(self, None if self.replaying else session)
+    
+    @asynccontextmanager
+    async def session(self, shared: Optional[aiohttp.ClientSession] = None, **session_kwargs):
+        """
+        Сессия на один запрос для клиентов с общей или временной сессией
+        
+        Args:
+            shared: Открытая общая сессия (не закрывается по выходу)
+            session_kwargs: Параметры временной aiohttp.ClientSession
+        """
+        if self.replaying or shared is not None:
+            yield self.wrap(shared)
+            return
+        async with aiohttp.ClientSession(**session_kwargs) as session:
+            yield self.wrap(session)
+    
+    def summary(self) -> str:
+        if self.replaying:
+            return f"воспроизведено {self.hits}, нет в кассете {self.misses}"
+        return f"записано {self.recorded}"
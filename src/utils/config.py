@@ -22,6 +22,7 @@ class APIConfig:
     base_url: str = "https://api.keys.so/v1"
     timeout: int = 30
     max_retries: int = 3
+    rate_limit: float = 1.0  # Запросов в секунду к Keys.so
     
     @classmethod
     def from_env(cls) -> "APIConfig":
@@ -37,7 +38,8 @@ class APIConfig:
             api_key=api_key,
             base_url=os.getenv("KEYS_SO_BASE_URL", cls.base_url),
             timeout=int(os.getenv("REQUEST_TIMEOUT", cls.timeout)),
-            max_retries=int(os.getenv("MAX_RETRIES", cls.max_retries))
+            max_retries=int(os.getenv("MAX_RETRIES", cls.max_retries)),
+            rate_limit=float(os.getenv("KEYS_SO_RATE_LIMIT", cls.rate_limit))
         )
 
 
@@ -0,0 +1,279 @@
+"""
+Легковесная инструментация запуска: гистограммы задержек и счетчики
+
+Общий для процесса реестр `registry` собирает:
+    - задержки запросов по эндпоинтам (гистограммы с фиксированными
+      границами - запись одного значения стоит O(log n) без аллокаций)
+    - повторы запросов и время пауз между ними
+    - ожидание семафоров и лимитеров частоты
+    - попадания и промахи кэшей
+    - текущие значения (gauge): запросы в работе, глубина очередей
+
+Метрика идентифицируется именем и набором меток (server=..., provider=...).
+Во время работы реестр можно отдавать в текстовом формате Prometheus
+(`format_prometheus`, см. `metrics_server`).
+"""
+
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Границы корзин гистограммы, секунды
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, object]) -> MetricKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def format_key(key: MetricKey) -> str:
+    """name{label=value,...}"""
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+class Histogram:
+    """Гистограмма задержек с фиксированными границами"""
+    
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # последняя - больше всех границ
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+    
+    def percentile(self, q: float) -> float:
+        """Оценка перцентиля q (0..100): верхняя граница корзины"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+    
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+    
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_s": round(self.sum, 3),
+            "mean_ms": round(self.mean * 1000, 2),
+            "p50_ms": round(self.percentile(50) * 1000, 2),
+            "p90_ms": round(self.percentile(90) * 1000, 2),
+            "p99_ms": round(self.percentile(99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+            "buckets": {
+                (f"le_{bound}" if i < len(self.buckets) else "inf"): count
+                for i, (bound, count) in enumerate(
+                    zip(list(self.buckets) + [None], self.counts)
+                )
+                if count
+            },
+        }
+
+
+class MetricsRegistry:
+    """Реестр гистограмм и счетчиков"""
+    
+    def __init__(self):
+        self.histograms: Dict[MetricKey, Histogram] = {}
+        self.counters: Dict[MetricKey, float] = {}
+        self.gauges: Dict[MetricKey, float] = {}
+    
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Запись длительности в гистограмму"""
+        key = _key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(seconds)
+    
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        """Увеличение счетчика"""
+        key = _key(name, labels)
+        self.counters[key] = self.counters.get(key, 0.0) + value
+    
+    def add(self, name: str, delta: float, **labels) -> None:
+        """Изменение текущего значения (gauge)"""
+        key = _key(name, labels)
+        self.gauges[key] = self.gauges.get(key, 0.0) + delta
+    
+    def set(self, name: str, value: float, **labels) -> None:
+        """Установка текущего значения (gauge)"""
+        self.gauges[_key(name, labels)] = value
+    
+    def gauge(self, name: str, **labels) -> float:
+        return self.gauges.get(_key(name, labels), 0.0)
+    
+    @contextmanager
+    def track(self, name: str, **labels) -> Iterator[None]:
+        """Gauge на время блока увеличен на 1 (например, запросы в работе)"""
+        self.add(name, 1, **labels)
+        try:
+            yield
+        finally:
+            self.add(name, -1, **labels)
+    
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Замер длительности блока (в т.ч. с await внутри)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+    
+    def counter(self, name: str, **labels) -> float:
+        return self.counters.get(_key(name, labels), 0.0)
+    
+    def total(self, name: str) -> float:
+        """Сумма счетчика по всем меткам"""
+        return sum(value for (key_name, _), value in self.counters.items() if key_name == name)
+    
+    def hit_ratio(self, cache: str) -> Optional[float]:
+        """Доля попаданий кэша (счетчики cache_hits/cache_misses с cache=...)"""
+        hits = self.counter("cache_hits", cache=cache)
+        misses = self.counter("cache_misses", cache=cache)
+        return hits / (hits + misses) if hits + misses else None
+    
+    def caches(self) -> List[str]:
+        return sorted({
+            dict(labels).get("cache")
+            for name, labels in self.counters
+            if name in ("cache_hits", "cache_misses")
+        } - {None})
+    
+    def reset(self) -> None:
+        self.histograms.clear()
+        self.counters.clear()
+        self.gauges.clear()
+    
+    def snapshot(self) -> dict:
+        """Все метрики в виде словаря (для JSON)"""
+        return {
+            "latency": {
+                format_key(key): histogram.to_dict()
+                for key, histogram in sorted(self.histograms.items())
+            },
+            "counters": {
+                format_key(key): round(value, 3)
+                for key, value in sorted(self.counters.items())
+            },
+            "gauges": {
+                format_key(key): round(value, 3)
+                for key, value in sorted(self.gauges.items())
+            },
+            "cache_hit_ratio": {
+                cache: round(self.hit_ratio(cache), 4) for cache in self.caches()
+            },
+        }
+    
+    def format_lines(self) -> List[str]:
+        """Строки сводки для лога"""
+        lines = []
+        if self.histograms:
+            lines.append(
+                f"  {'запросы':<48} {'кол-во':>7} {'p50, ms':>8} {'p99, ms':>8} "
+                f"{'max, ms':>8} {'всего, s':>9}"
+            )
+            for key, histogram in sorted(self.histograms.items()):
+                lines.append(
+                    f"  {format_key(key):<48} {histogram.count:>7} "
+                    f"{histogram.percentile(50) * 1000:>8.1f} {histogram.percentile(99) * 1000:>8.1f} "
+                    f"{histogram.max * 1000:>8.1f} {histogram.sum:>9.1f}"
+                )
+        for key, value in sorted(self.counters.items()):
+            if key[0] in ("cache_hits", "cache_misses"):
+                continue
+            lines.append(f"  {format_key(key):<48} {value:>10.2f}")
+        for cache in self.caches():
+            hits = self.counter("cache_hits", cache=cache)
+            misses = self.counter("cache_misses", cache=cache)
+            lines.append(
+                f"  {'кэш ' + cache:<48} {self.hit_ratio(cache):>9.1%} "
+                f"({int(hits)} попаданий / {int(misses)} промахов)"
+            )
+        return lines
+
+
+def _prometheus_labels(labels: Tuple[Tuple[str, str], ...], **extra) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _prometheus_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def format_prometheus(metrics: MetricsRegistry, prefix: str = "domain_analyzer") -> str:
+    """
+    Реестр в текстовом формате Prometheus (exposition format 0.0.4)
+    
+    Счетчики получают суффикс _total, гистограммы - _seconds с
+    накопительными корзинами le, как требует формат.
+    
+    Args:
+        metrics: Реестр метрик
+        prefix: Префикс имен метрик
+        
+    Returns:
+        Текст для ответа на /metrics
+    """
+    lines = []
+    
+    def family(items, suffix: str, kind: str):
+        seen = set()
+        for (name, labels), value in sorted(items):
+            full = f"{prefix}_{name}{suffix}"
+            if full not in seen:
+                seen.add(full)
+                lines.append(f"# TYPE {full} {kind}")
+            yield full, labels, value
+    
+    for full, labels, value in family(metrics.counters.items(), "_total", "counter"):
+        lines.append(f"{full}{_prometheus_labels(labels)} {_prometheus_number(value)}")
+    for full, labels, value in family(metrics.gauges.items(), "", "gauge"):
+        lines.append(f"{full}{_prometheus_labels(labels)} {_prometheus_number(value)}")
+    for full, labels, histogram in family(metrics.histograms.items(), "_seconds", "histogram"):
+        cumulative = 0
+        for bound, count in zip(list(histogram.buckets) + [float("inf")], histogram.counts):
+            cumulative += count
+            le = _prometheus_number(bound)
+            lines.append(f"{full}_bucket{_prometheus_labels(labels, le=le)} {cumulative}")
+        lines.append(f"{full}_sum{_prometheus_labels(labels)} {_prometheus_number(histogram.sum)}")
+        lines.append(f"{full}_count{_prometheus_labels(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+# Реестр процесса
+registry = MetricsRegistry()
@@ -0,0 +1,70 @@
+"""
+HTTP-эндпоинт /metrics для Prometheus внутри процесса анализа
+"""
+
+import logging
+from typing import Optional
+
+from aiohttp import web
+
+from .metrics import MetricsRegistry, format_prometheus, registry
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsServer:
+    """
+    Отдает реестр метрик в текстовом формате Prometheus
+
+    Работает в том же event loop, что и анализ: ответ собирается
+    из текущих значений реестра между шагами конвейера, без потоков
+    и копирования данных.
+    """
+
+    def __init__(
+        self,
+        port: int,
+        host: str = "127.0.0.1",
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Args:
+            port: Порт (0 - выбрать свободный)
+            host: Адрес, на котором слушать
+            metrics: Реестр (по умолчанию общий реестр процесса)
+        """
+        self.port = port
+        self.host = host
+        self.metrics = metrics or registry
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=format_prometheus(self.metrics).encode("utf-8"),
+            headers={"Content-Type": CONTENT_TYPE}
+        )
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Фактический порт, если был запрошен 0
+        self.port = self._runner.addresses[0][1]
+        logger.info(f"Метрики Prometheus: http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
@@ -0,0 +1,337 @@
+"""
+Профилирование запуска анализа (--profile cpu|async|memory)
+
+    cpu    - cProfile (profile_cpu.pstats) и сэмплы стека главного потока
+             в формате collapsed stacks (profile_cpu.collapsed, вход для
+             flamegraph.pl / speedscope)
+    async  - время каждой корутины-задачи: сколько она выполнялась в
+             event loop и сколько ждала (profile_async.txt)
+    memory - tracemalloc: топ выделений памяти на каждой границе стадий
+             конвейера и прирост с прошлой границы (profile_memory.txt)
+
+Каждый режим пишет текстовую сводку горячих точек (profile_<mode>.txt),
+ее начало выводится в лог.
+"""
+
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Coroutine
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cpu", "async", "memory")
+
+# Строк сводки в логе
+SUMMARY_LINES = 10
+
+
+class RunProfiler:
+    """Базовый профилировщик: включается на время анализа, пишет файлы в каталог запуска"""
+
+    mode = ""
+    _summary: List[str] = []
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def stage_boundary(self, target: str, stage: str, event: str) -> None:
+        """Начало (event='start') или конец ('finish') стадии конвейера"""
+
+    def write(self, out_dir: str) -> List[str]:
+        """
+        Запись результатов
+
+        Args:
+            out_dir: Каталог запуска
+
+        Returns:
+            Пути созданных файлов (первый - текстовая сводка)
+        """
+        raise NotImplementedError
+
+    def summary_lines(self) -> List[str]:
+        """Начало сводки для лога"""
+        return self._summary[:SUMMARY_LINES]
+
+    def _write_summary(self, out_dir: str, lines: List[str]) -> str:
+        self._summary = lines
+        path = os.path.join(out_dir, f"profile_{self.mode}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """Периодические снимки стека потока (wall-clock, включая ожидание I/O)"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+class CPUProfiler(RunProfiler):
+    """cProfile + сэмплирование стека для flamegraph"""
+
+    mode = "cpu"
+
+    def __init__(self, sample_interval: float = 0.005):
+        self._profile = cProfile.Profile()
+        self._sampler = StackSampler(threading.get_ident(), sample_interval)
+
+    def start(self) -> None:
+        self._sampler.start()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+        self._sampler.stop()
+
+    def write(self, out_dir: str) -> List[str]:
+        pstats_file = os.path.join(out_dir, "profile_cpu.pstats")
+        self._profile.dump_stats(pstats_file)
+
+        collapsed_file = os.path.join(out_dir, "profile_cpu.collapsed")
+        with open(collapsed_file, "w", encoding="utf-8") as f:
+            for stack, count in self._sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        stats = pstats.Stats(self._profile)
+        total = stats.total_tt or 1.0
+        # (файл, строка, функция) -> (примитивных вызовов, вызовов, собственное, суммарное, ...)
+        top = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        lines = [
+            f"CPU: {stats.total_tt:.2f}s в {stats.total_calls} вызовах; "
+            f"сэмплов стека: {sum(self._sampler.stacks.values())}",
+            f"{'собств., s':>11} {'%':>6} {'всего, s':>10} {'вызовов':>10}  функция",
+        ]
+        for (filename, line, func), (_, calls, tottime, cumtime, _) in top[:30]:
+            lines.append(
+                f"{tottime:>11.3f} {tottime / total:>6.1%} {cumtime:>10.3f} {calls:>10}  "
+                f"{func} ({os.path.basename(filename)}:{line})"
+            )
+
+        details = io.StringIO()
+        pstats.Stats(self._profile, stream=details).sort_stats("cumulative").print_stats(40)
+        lines += ["", "По суммарному времени:", details.getvalue()]
+        return [self._write_summary(out_dir, lines), pstats_file, collapsed_file]
+
+
+@dataclass
+class CoroutineStats:
+    """Время задач одной корутины"""
+
+    tasks: int = 0
+    done: int = 0
+    steps: int = 0
+    busy: float = 0.0  # Выполнение в event loop
+    wall: float = 0.0  # От создания до завершения (завершенные задачи)
+    max_step: float = 0.0
+
+    @property
+    def waiting(self) -> float:
+        return max(0.0, self.wall - self.busy)
+
+
+class _TimedCoroutine(Coroutine):
+    """Обертка корутины задачи: замеряет каждый шаг (send/throw)"""
+
+    __slots__ = ("_coro", "_stats")
+
+    def __init__(self, coro, stats: CoroutineStats):
+        self._coro = coro
+        self._stats = stats
+
+    def _step(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = self._stats
+            stats.steps += 1
+            stats.busy += elapsed
+            if elapsed > stats.max_step:
+                stats.max_step = elapsed
+
+    def send(self, value):
+        return self._step(self._coro.send, value)
+
+    def throw(self, *args):
+        return self._step(self._coro.throw, *args)
+
+    def close(self):
+        return self._coro.close()
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    def __getattr__(self, name):
+        # cr_frame, cr_code, __qualname__ и т.п. - для repr и get_stack задачи
+        return getattr(self._coro, name)
+
+
+def coroutine_name(coro) -> str:
+    """Имя корутины без '<locals>.'"""
+    name = getattr(coro, "__qualname__", None) or type(coro).__name__
+    return name.replace("<locals>.", "")
+
+
+class AsyncProfiler(RunProfiler):
+    """Время выполнения и ожидания задач asyncio по корутинам"""
+
+    mode = "async"
+
+    def __init__(self):
+        self.coroutines: Dict[str, CoroutineStats] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._previous_factory = None
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    def _task_factory(self, loop, coro, **kwargs):
+        stats = self.coroutines.setdefault(coroutine_name(coro), CoroutineStats())
+        stats.tasks += 1
+        created = time.perf_counter()
+        task = asyncio.Task(_TimedCoroutine(coro, stats), loop=loop, **kwargs)
+
+        def finished(_):
+            stats.done += 1
+            stats.wall += time.perf_counter() - created
+
+        task.add_done_callback(finished)
+        return task
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._previous_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._task_factory)
+        self._started = time.perf_counter()
+
+    def stop(self) -> None:
+        self._elapsed = time.perf_counter() - self._started
+        if self._loop is not None:
+            self._loop.set_task_factory(self._previous_factory)
+
+    def write(self, out_dir: str) -> List[str]:
+        busy = sum(stats.busy for stats in self.coroutines.values())
+        lines = [
+            f"asyncio: {self._elapsed:.2f}s запуска, задачи выполнялись в loop "
+            f"{busy:.2f}s ({busy / self._elapsed if self._elapsed else 0:.0%}), "
+            f"остальное - ожидание I/O и таймеров",
+            f"{'ожидание, s':>12} {'выполн., s':>11} {'задач':>7} {'шагов':>9} "
+            f"{'сред. ожид., ms':>16} {'макс. шаг, ms':>14}  корутина",
+        ]
+        ordered = sorted(self.coroutines.items(), key=lambda item: item[1].waiting, reverse=True)
+        for name, stats in ordered:
+            mean_wait = stats.waiting / stats.done * 1000 if stats.done else 0.0
+            lines.append(
+                f"{stats.waiting:>12.2f} {stats.busy:>11.2f} {stats.tasks:>7} {stats.steps:>9} "
+                f"{mean_wait:>16.1f} {stats.max_step * 1000:>14.1f}  {name}"
+            )
+        lines += [
+            "",
+            "ожидание - время жизни завершенных задач минус выполнение; "
+            "макс. шаг > 100 ms - блокировка event loop синхронным кодом",
+        ]
+        return [self._write_summary(out_dir, lines)]
+
+
+class MemoryProfiler(RunProfiler):
+    """Снимки tracemalloc на границах стадий"""
+
+    mode = "memory"
+
+    def __init__(self, top: int = 10, frames: int = 1):
+        self.top = top
+        self.frames = frames
+        self._lines: List[str] = []
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._was_tracing = False
+
+    def start(self) -> None:
+        self._was_tracing = tracemalloc.is_tracing()
+        if not self._was_tracing:
+            tracemalloc.start(self.frames)
+        self._record("start")
+
+    def stop(self) -> None:
+        self._record("end")
+        self._previous = None
+        if not self._was_tracing:
+            tracemalloc.stop()
+
+    def stage_boundary(self, target: str, stage: str, event: str) -> None:
+        self._record(f"{target}: {stage} {event}")
+
+    def _record(self, label: str) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        self._lines.append(
+            f"== {label}: {current / 2**20:.1f} MB (пик {peak / 2**20:.1f} MB)"
+        )
+        for stat in snapshot.statistics("lineno")[:self.top]:
+            self._lines.append(f"   {stat}")
+        if self._previous is not None:
+            growth = [
+                diff for diff in snapshot.compare_to(self._previous, "lineno")[:self.top]
+                if diff.size_diff > 0
+            ]
+            if growth:
+                self._lines.append("   прирост с прошлой границы:")
+                self._lines += [f"   {diff}" for diff in growth]
+        self._previous = snapshot
+
+    def write(self, out_dir: str) -> List[str]:
+        boundaries = [line for line in self._lines if line.startswith("== ")]
+        return [self._write_summary(out_dir, boundaries + [""] + self._lines)]
+
+
+def create_profiler(mode: str) -> RunProfiler:
+    """Профилировщик для режима --profile"""
+    if mode == "cpu":
+        return CPUProfiler()
+    if mode == "async":
+        return AsyncProfiler()
+    if mode == "memory":
+        return MemoryProfiler()
+    raise ValueError(f"Неизвестный режим профилирования: {mode}")
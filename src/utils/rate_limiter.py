@@ -0,0 +1,94 @@
+"""
+Ограничение частоты запросов к внешним API (token bucket)
+"""
+
+import asyncio
+import logging
+import time
+
+from .metrics import registry as metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRateLimiter:
+    """
+    Ограничение частоты запросов по алгоритму token bucket
+    
+    Общий экземпляр разделяется всеми корутинами клиента, поэтому
+    параллельные запросы не превышают заданную частоту.
+    """
+    
+    def __init__(self, rate: float, burst: int = 1, name: str = "default"):
+        """
+        Args:
+            rate: Запросов в секунду (0 или меньше - без ограничения)
+            burst: Максимум запросов подряд без ожидания
+            name: Имя лимитера в метриках запуска
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        
+        # Статистика ожиданий
+        self.total_wait = 0.0
+        self.waits = 0
+    
+    def _refill(self, now: float) -> None:
+        """Пополнение токенов за прошедшее время"""
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+    
+    async def acquire(self) -> None:
+        """Ожидание разрешения на один запрос"""
+        if self.rate <= 0 and not self._paused_until:
+            return
+        
+        # Ожидание считается вместе с очередью на блокировку
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                
+                if self.rate <= 0:
+                    break
+                
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+            
+            waited = time.monotonic() - started
+            if waited > 0.001:
+                self.total_wait += waited
+                self.waits += 1
+                metrics.inc("rate_limit_wait_seconds", waited, limiter=self.name)
+    
+    def pause(self, seconds: float) -> None:
+        """
+        Приостановка всех запросов (например, после ответа 429)
+        
+        Args:
+            seconds: Длительность паузы
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        self._updated_at = self._paused_until
+        logger.debug(f"Rate limiter приостановлен на {seconds:.1f}s")
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
@@ -0,0 +1,158 @@
+"""
+Локальный рекурсивный резолвер-заглушка (UDP) для тестов DNS-префильтра
+
+Используется тестами и офлайн-бенчмарками (benchmarks/bench_pipeline.py).
+Ответ для домена определяется его хэшем, как у фейковых RDAP и WHOIS
+серверов benchmarks/fake_servers.py, поэтому NXDOMAIN получают ровно те
+домены, что свободны у них при том же available.
+"""
+
+import asyncio
+import struct
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+
+# Виды ответов (rcode; NODATA и EMPTY - NOERROR без записей в ответе)
+NOERROR = 0
+SERVFAIL = 2
+NXDOMAIN = 3
+NODATA = "nodata"  # SOA зоны самого домена в секции полномочий
+EMPTY = "empty"  # SOA родительской зоны (имя без своей зоны)
+
+QTYPE_NS = 2
+QTYPE_SOA = 6
+
+
+def _bucket(value: str) -> float:
+    """Детерминированное число [0, 1) по строке (как в fake_servers)"""
+    return (zlib.crc32(value.encode('utf-8')) % 10000) / 10000
+
+
+def _record(owner: bytes, rtype: int, rdata: bytes) -> bytes:
+    return owner + struct.pack("!HHIH", rtype, 1, 3600, len(rdata)) + rdata
+
+
+@dataclass
+class DNSServerStats:
+    """Счетчики запросов резолвера (статусы - по rcode)"""
+
+    requests: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    statuses: Counter = field(default_factory=Counter)
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "peak_in_flight": self.peak_in_flight,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+        }
+
+
+class _DNSProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server: "FakeDNSServer"):
+        self.server = server
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        asyncio.ensure_future(self.server._answer(self.transport, data, addr))
+
+
+class FakeDNSServer:
+    """
+    NS-запрос -> NS / NXDOMAIN / SERVFAIL / ответ без данных по хэшу домена
+
+    Доли: available - NXDOMAIN, servfail - SERVFAIL, nodata - NOERROR с
+    SOA домена в секции полномочий, empty - NOERROR с SOA родительской
+    зоны; остальные - NS в секции ответа.
+    """
+
+    def __init__(
+        self,
+        available: float = 0.3,
+        servfail: float = 0.0,
+        nodata: float = 0.0,
+        empty: float = 0.0,
+        latency: float = 0.0
+    ):
+        self.available = available
+        self.servfail = servfail
+        self.nodata = nodata
+        self.empty = empty
+        self.latency = latency
+        self.stats = DNSServerStats()
+        self.address = ""
+        self._transport = None
+
+    def _kind(self, name: str):
+        value = _bucket(name)
+        for kind, share in (
+            (NXDOMAIN, self.available),
+            (SERVFAIL, self.servfail),
+            (NODATA, self.nodata),
+            (EMPTY, self.empty),
+        ):
+            if value < share:
+                return kind
+            value -= share
+        return NOERROR
+
+    def _rcode(self, name: str) -> int:
+        kind = self._kind(name)
+        return kind if isinstance(kind, int) else NOERROR
+
+    def _response(self, query_id: int, question: bytes, name: str) -> bytes:
+        kind = self._kind(name)
+        rcode = kind if isinstance(kind, int) else NOERROR
+        self.stats.statuses[rcode] += 1
+        answer = authority = b""
+        ancount = nscount = 0
+        soa = (
+            b"\x03ns1\x08fake-dns\x00\x04root\x08fake-dns\x00"
+            + struct.pack("!IIIII", 1, 3600, 600, 86400, 300)
+        )
+        if kind == NOERROR:
+            # Имя - указатель на вопрос, NS ns1.fake-dns.
+            answer, ancount = _record(b"\xc0\x0c", QTYPE_NS, b"\x03ns1\x08fake-dns\x00"), 1
+        elif kind == NODATA:
+            authority, nscount = _record(b"\xc0\x0c", QTYPE_SOA, soa), 1
+        elif kind == EMPTY:
+            # Владелец - TLD: указатель на метки вопроса после первой
+            owner = struct.pack("!H", 0xC00C + 1 + question[0])
+            authority, nscount = _record(owner, QTYPE_SOA, soa), 1
+        header = struct.pack("!HHHHHH", query_id, 0x8180 | rcode, 1, ancount, nscount, 0)
+        return header + question + answer + authority
+
+    async def _answer(self, transport, data: bytes, addr) -> None:
+        self.stats.requests += 1
+        self.stats.in_flight += 1
+        self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.stats.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            query_id = struct.unpack("!H", data[:2])[0]
+            offset, labels = 12, []
+            while data[offset]:
+                labels.append(data[offset + 1:offset + 1 + data[offset]].decode("ascii"))
+                offset += 1 + data[offset]
+            question = data[12:offset + 5]
+            transport.sendto(
+                self._response(query_id, question, ".".join(labels).lower()), addr
+            )
+        finally:
+            self.stats.in_flight -= 1
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DNSProtocol(self), local_addr=("127.0.0.1", 0)
+        )
+        self.address = f"127.0.0.1:{self._transport.get_extra_info('sockname')[1]}"
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._transport.close()
@@ -0,0 +1,78 @@
+"""
+Тесты записи и воспроизведения HTTP-обмена (кассеты)
+"""
+
+import pytest
+
+from benchmarks.fake_servers import FakeKeysSoServer, FakeRDAPServer, FakeWhoisServer, RDAPBehavior
+from src.api.keys_so_client import KeysSoClient
+from src.availability import DomainAvailabilityChecker
+from src.utils.cassette import INDEX_FILE, Cassette, CassetteMiss, request_key
+
+
+DOMAINS = ["site1.com", "site2.com", "site3.ru", "site4.net"]
+
+
+def test_request_key_ignores_secrets():
+    """Тест: API-ключ не влияет на ключ запроса"""
+    a = request_key("GET", "http://api/x", {"apiKey": "one", "domainName": "a.com"})
+    b = request_key("GET", "http://api/x", {"apiKey": "two", "domainName": "a.com"})
+    c = request_key("GET", "http://api/x", {"apiKey": "one", "domainName": "b.com"})
+    assert a == b != c
+
+
+async def _run(cassette, keys_url, setup):
+    """Сбор ссылок и проверка доменов через кассету"""
+    async with KeysSoClient(api_key="secret-token", base_url=keys_url, rate_limit=0,
+                            cassette=cassette) as client:
+        links = await client.get_backlinks("target.example", limit=500, as_records=True)
+    
+    checker = DomainAvailabilityChecker(whois_api_key="secret-whois", cassette=cassette)
+    setup(checker)
+    async with checker:
+        results = await checker.check_domains(DOMAINS)
+    return links, results
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay_offline(tmp_path):
+    """Тест: записанный прогон воспроизводится без серверов с тем же результатом"""
+    path = tmp_path / "cassette"
+    
+    async with FakeKeysSoServer(links=250, domains=20) as keys, \
+            FakeRDAPServer(RDAPBehavior(available=0.5)) as rdap, \
+            FakeWhoisServer(available=0.5) as whois:
+        def setup(checker):
+            rdap.attach(checker, ["com", "net"])
+            whois.attach(checker, "whoisxml")
+        
+        with Cassette(str(path), mode="record") as cassette:
+            links, results = await _run(cassette, keys.url, setup)
+            recorded = cassette.recorded
+    
+    # 3 страницы ссылок, 3 RDAP запроса и 1 WHOIS (.ru без RDAP)
+    assert recorded == 7
+    assert "secret" not in (path / INDEX_FILE).read_text(encoding="utf-8")
+    
+    # Серверы остановлены: ответы приходят только из кассеты
+    with Cassette(str(path), mode="replay") as cassette:
+        replayed_links, replayed_results = await _run(cassette, keys.url, setup)
+        assert cassette.misses == 0
+        assert cassette.hits == 7
+    
+    assert [l.source_domain for l in replayed_links] == [l.source_domain for l in links]
+    assert [(r.domain, r.status, r.checked_via) for r in replayed_results] == \
+        [(r.domain, r.status, r.checked_via) for r in results]
+
+
+@pytest.mark.asyncio
+async def test_replay_miss_fails_fast(tmp_path):
+    """Тест: запроса нет в кассете - ошибка без повторов"""
+    with Cassette(str(tmp_path / "c"), mode="record"):
+        pass
+    with Cassette(str(tmp_path / "c"), mode="replay") as cassette:
+        async with KeysSoClient(api_key="x", base_url="http://keys.invalid",
+                                cassette=cassette) as client:
+            with pytest.raises(CassetteMiss):
+                await client.get_backlinks("target.example", limit=10)
+        assert cassette.misses == 1
@@ -0,0 +1,144 @@
+"""
+Проверка доступности против локальных RDAP/WHOIS серверов (без сети)
+"""
+
+import pytest
+
+from benchmarks.fake_servers import (
+    FakeKeysSoServer,
+    FakeRDAPServer,
+    FakeWhoisServer,
+    RDAPBehavior,
+    expected_status,
+)
+from src.api.keys_so_client import KeysSoClient
+from src.availability import DomainAvailabilityChecker
+from src.availability.whois_checker import WHOISChecker
+from src.filtering.pipeline import DomainFilteringPipeline
+from src.runner import PipelinedAnalyzer
+
+from ..fake_dns import FakeDNSServer
+
+
+DOMAINS = [f"site{i}.com" for i in range(40)]
+
+
+@pytest.mark.asyncio
+async def test_checker_against_fake_rdap():
+    """Тест: RDAP 200/404 дают REGISTERED/AVAILABLE, соединения переиспользуются"""
+    async with FakeRDAPServer(RDAPBehavior(available=0.3)) as rdap:
+        checker = DomainAvailabilityChecker(max_concurrent=5)
+        rdap.attach(checker, ["com"])
+        
+        async with checker:
+            results = await checker.check_domains(DOMAINS)
+    
+    assert [r.status.value for r in results] == [expected_status(d, 0.3) for d in DOMAINS]
+    assert all(r.checked_via == "rdap" for r in results)
+    assert rdap.stats.requests == len(DOMAINS)
+    assert rdap.stats.connections <= 5
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_rdap_falls_back_to_whois():
+    """Тест: на 429 от RDAP проверка уходит в WHOIS"""
+    async with FakeRDAPServer(RDAPBehavior(available=0.0, rate_limited=1.0)) as rdap, \
+            FakeWhoisServer(available=0.3) as whois:
+        checker = DomainAvailabilityChecker(whois_api_key="test")
+        rdap.attach(checker, ["com"])
+        whois.attach(checker, "whoisxml")
+        
+        result = await checker.check_domain("site1.com")
+    
+    assert result.checked_via == "whois"
+    assert result.lookups == 2
+    assert rdap.stats.statuses[429] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("provider", FakeWhoisServer.PROVIDERS)
+async def test_whois_provider_formats(provider):
+    """Тест разбора ответа каждого WHOIS провайдера"""
+    async with FakeWhoisServer(available=0.5) as whois:
+        checker = WHOISChecker(api_provider=provider, api_key="test", base_url=whois.base_url(provider))
+        for domain in DOMAINS[:10]:
+            result = await checker.check_domain(domain)
+            assert result.status.value == expected_status(domain, 0.5), (provider, domain)
+
+
+@pytest.mark.asyncio
+async def test_keys_so_pagination():
+    """Тест постраничного сбора ссылок"""
+    async with FakeKeysSoServer(links=250, domains=40) as keys:
+        async with KeysSoClient(api_key="test", base_url=keys.url, rate_limit=0) as client:
+            links = await client.get_backlinks("target.example", limit=1000, as_records=True)
+    
+    assert len(links) == 250
+    assert keys.stats.requests == 3
+    assert {link.source_domain for link in links} == {keys.domain(i) for i in range(40)}
+
+
+@pytest.mark.asyncio
+async def test_check_domains_limits_each_rdap_server():
+    """Тест: лимит на RDAP-сервер, TLD без RDAP - сразу в WHOIS"""
+    async with FakeRDAPServer(RDAPBehavior(latency=0.03)) as slow, \
+            FakeRDAPServer(RDAPBehavior()) as fast, \
+            FakeWhoisServer(available=0.3) as whois:
+        checker = DomainAvailabilityChecker(whois_api_key="test", max_concurrent=8, per_server_limit=2)
+        fast.attach(checker, ["net"])
+        checker.bootstrap_loader._parse_bootstrap_data({
+            "services": slow.bootstrap(["com"])["services"] + fast.bootstrap(["net"])["services"]
+        })
+        whois.attach(checker, "whoisxml")
+        domains = [f"site{i}.{tld}" for i in range(10) for tld in ("com", "net", "ru")]
+        
+        async with checker:
+            results = await checker.check_domains(domains)
+    
+    assert [r.domain for r in results] == domains
+    assert [r.checked_via for r in results] == ["rdap", "rdap", "whois"] * 10
+    assert slow.stats.requests == fast.stats.requests == whois.stats.requests == 10
+    assert slow.stats.peak_in_flight == 2
+    assert fast.stats.peak_in_flight <= 2
+
+
+@pytest.mark.asyncio
+async def test_pipeline_workers_respect_per_server_limit(tmp_path):
+    """Тест: лимит на RDAP-сервер действует и для воркеров конвейера"""
+    async with FakeKeysSoServer(links=200, domains=60, tlds=("com", "net")) as keys, \
+            FakeRDAPServer(RDAPBehavior(latency=0.02)) as rdap:
+        checker = DomainAvailabilityChecker(max_concurrent=20, per_server_limit=3)
+        rdap.attach(checker, ["com", "net"])
+        pipeline = DomainFilteringPipeline(
+            spam_phrases_file=str(tmp_path / "spam.txt"),
+            excluded_domains_file=str(tmp_path / "excluded.txt"),
+            fetch_metrics=False
+        )
+        
+        async with KeysSoClient(api_key="test", base_url=keys.url, rate_limit=0) as client, \
+                checker:
+            result = await PipelinedAnalyzer(
+                client, checker, pipeline, check_workers=20
+            ).run("target.example")
+    
+    assert result.registered + result.available == 60
+    assert rdap.stats.requests == 60
+    assert rdap.stats.peak_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_dns_prefilter_skips_rdap_for_delegated():
+    """Тест: делегированные домены - REGISTERED по DNS, в RDAP идут только остальные"""
+    async with FakeDNSServer(available=0.3, servfail=0.1) as dns, \
+            FakeRDAPServer(RDAPBehavior(available=0.3)) as rdap:
+        checker = DomainAvailabilityChecker(dns_prefilter=True, dns_resolver=dns.address)
+        rdap.attach(checker, ["com"])
+        
+        async with checker:
+            results = await checker.check_domains(DOMAINS)
+    
+    via_dns = [r.domain for r in results if r.checked_via == "dns"]
+    assert via_dns and all(dns._rcode(d) == 0 for d in via_dns)
+    assert rdap.stats.requests == len(DOMAINS) - len(via_dns)
+    assert sum(r.lookups for r in results) == rdap.stats.requests
+    assert [r.status.value for r in results] == [expected_status(d, 0.3) for d in DOMAINS]
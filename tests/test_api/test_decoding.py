@@ -0,0 +1,89 @@
+"""
+Тесты декодирования страниц Keys.so в записи Backlink
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from src.api import decoding
+from src.api.decoding import decode_links_page
+from src.models.backlink import Backlink
+
+
+def _page(items, **meta):
+    return json.dumps({"data": items, "total": 10, "current_page": 1, "last_page": 2, **meta}).encode()
+
+
+BACKLINK = {
+    "source_name": "Blog.Example.com", "source_url": "https://blog.example.com/post",
+    "url": "https://target.com/", "anchor": "Best casino", "source_dr": "37",
+    "created_at": "2024-02-01 08:30:00", "status": "active", "nofollow": 0,
+}
+OUTLINK = {"name": "partner.org", "url": "https://partner.org/page", "anchor": 42}
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "json"])
+def decoder(request, monkeypatch):
+    if request.param and not decoding.ORJSON_AVAILABLE:
+        pytest.skip("orjson не установлен")
+    monkeypatch.setattr(decoding, "ORJSON_AVAILABLE", request.param)
+
+
+def test_decode_page(decoder):
+    """Тест разбора страницы из байтов"""
+    records, meta = decode_links_page(_page([BACKLINK, OUTLINK]))
+    
+    assert meta == {"count": 2, "total": 10, "current_page": 1, "last_page": 2}
+    backlink, outlink = records
+    assert backlink == Backlink(
+        source_url="https://blog.example.com/post",
+        target_url="https://target.com/",
+        source_domain="blog.example.com",
+        anchor_text="Best casino",
+        dr=37
+    )
+    assert outlink.source_domain == "partner.org"
+    assert outlink.source_url == "https://partner.org/page"
+    assert outlink.anchor_text == "42"
+    assert outlink.dr is None
+
+
+def test_decode_dates_and_empty_page():
+    """Тест даты обнаружения и пустой страницы"""
+    records, _ = decode_links_page({"data": [BACKLINK]}, keep_dates=True)
+    assert records[0].discovered_at == datetime(2024, 2, 1, 8, 30)
+    assert decode_links_page({"data": []}) == ([], {"count": 0})
+
+
+def test_domains_are_shared_between_records():
+    """Тест: один домен - одна строка на все записи"""
+    items = [dict(BACKLINK, source_url=f"https://blog.example.com/{i}") for i in range(3)]
+    records, _ = decode_links_page(_page(items))
+    assert records[0].source_domain is records[2].source_domain
+    assert records[0].target_url is records[2].target_url
+
+
+async def test_client_collects_records(monkeypatch):
+    """Тест постраничного сбора записей клиентом"""
+    from src.api.keys_so_client import KeysSoClient
+    
+    pages = {
+        1: {"data": [BACKLINK] * 100, "total": 150, "current_page": 1, "last_page": 2},
+        2: {"data": [OUTLINK] * 50, "total": 150, "current_page": 2, "last_page": 2},
+    }
+    
+    async def fake_request(endpoint, params=None, method="POST"):
+        return json.loads(json.dumps(pages[params["page"]]))
+    
+    client = KeysSoClient(api_key="test", rate_limit=0)
+    monkeypatch.setattr(client, "_make_request", fake_request)
+    
+    records = await client.get_backlinks("target.com", as_records=True)
+    assert len(records) == 150
+    assert all(isinstance(r, Backlink) for r in records)
+    assert records[-1].source_domain == "partner.org"
+    
+    raw = await client.get_all_outlinks("target.com")
+    assert raw[0]["source_name"] == "Blog.Example.com"
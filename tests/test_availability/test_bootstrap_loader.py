@@ -0,0 +1,143 @@
+"""
+Тесты индекса RDAP bootstrap и его фонового обновления
+"""
+
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from src.availability.bootstrap_loader import RDAPBootstrapLoader
+
+DNS_JSON = {
+    "services": [
+        [["com", "net"], ["https://rdap.verisign.example/"]],
+        [["uk"], ["https://rdap.nominet.example/"]],
+        [["co.uk"], ["https://rdap.co-uk.example/"]],
+        [["org"], ["https://rdap.verisign.example/"]],
+    ]
+}
+
+
+class BootstrapServer:
+    """dns.json с ETag; на совпадающий If-None-Match отвечает 304"""
+
+    def __init__(self):
+        self.data = DNS_JSON
+        self.etag = '"v1"'
+        self.requests = []
+        self.fail = False
+        self._runner = None
+        self.url = ""
+
+    async def _dns(self, request):
+        self.requests.append(dict(request.headers))
+        if self.fail:
+            return web.Response(status=503)
+        if request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304)
+        return web.json_response(
+            self.data, headers={"ETag": self.etag, "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+        )
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/dns.json", self._dns)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{self._runner.addresses[0][1]}/dns.json"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_index_saved_and_reloaded_without_network(tmp_path):
+    """Тест: индекс пишется после загрузки и читается без запросов"""
+    cache_file = tmp_path / "bootstrap.pickle"
+    async with BootstrapServer() as server:
+        loader = RDAPBootstrapLoader(cache_file=str(cache_file), bootstrap_url=server.url)
+        await loader.load()
+    assert len(server.requests) == 1
+    assert cache_file.exists()
+
+    # Сервер остановлен: загрузка только из индекса
+    reloaded = RDAPBootstrapLoader(cache_file=str(cache_file), bootstrap_url=server.url)
+    started = time.perf_counter()
+    await reloaded.load()
+    elapsed = time.perf_counter() - started
+
+    assert reloaded.get_rdap_servers("com") == ("https://rdap.verisign.example/",)
+    assert reloaded.get_supported_tlds() == {"com", "net", "uk", "co.uk", "org"}
+    assert elapsed < 0.05
+
+
+@pytest.mark.asyncio
+async def test_longest_suffix_and_shared_server_lists(tmp_path):
+    """Тест: самый длинный совпадающий суффикс, одинаковые списки серверов - один объект"""
+    loader = RDAPBootstrapLoader(cache_file=str(tmp_path / "b.pickle"))
+    loader._parse_bootstrap_data(DNS_JSON)
+    loader._loaded = True
+
+    assert loader.get_rdap_servers("co.uk") == ("https://rdap.co-uk.example/",)
+    assert loader.get_rdap_servers("org.uk") == ("https://rdap.nominet.example/",)
+    assert loader.get_rdap_servers("example.co.uk") == ("https://rdap.co-uk.example/",)
+    assert loader.get_rdap_servers("COM") == ("https://rdap.verisign.example/",)
+    assert loader.get_rdap_servers("unknown") is None
+    assert loader.get_rdap_servers("com") is loader.get_rdap_servers("org")
+
+
+@pytest.mark.asyncio
+async def test_stale_index_revalidated_in_background(tmp_path):
+    """Тест: устаревший индекс обслуживает сразу, перепроверка - условным запросом"""
+    cache_file = tmp_path / "bootstrap.pickle"
+    async with BootstrapServer() as server:
+        await RDAPBootstrapLoader(cache_file=str(cache_file), bootstrap_url=server.url).load()
+
+        # Срок годности 0 дней: индекс сразу устаревший
+        loader = RDAPBootstrapLoader(cache_file=str(cache_file), cache_ttl_days=0, bootstrap_url=server.url)
+        await loader.load()
+        assert loader.get_rdap_servers("com") is not None
+        await loader._refresh_task
+        assert server.requests[-1]["If-None-Match"] == '"v1"'
+        assert len(server.requests) == 2
+
+        # Список изменился: новый ETag, индекс подменяется
+        server.data = {"services": [[["com"], ["https://rdap.new.example/"]]]}
+        server.etag = '"v2"'
+        loader._maybe_refresh()
+        await loader._refresh_task
+        assert loader.get_rdap_servers("com") == ("https://rdap.new.example/",)
+        assert loader.get_rdap_servers("uk") is None
+
+        await loader.close()
+
+    # Следующий запуск видит обновленный индекс
+    reloaded = RDAPBootstrapLoader(cache_file=str(cache_file), bootstrap_url=server.url)
+    await reloaded.load()
+    assert reloaded.get_rdap_servers("com") == ("https://rdap.new.example/",)
+
+
+@pytest.mark.asyncio
+async def test_failed_revalidation_keeps_stale_index(tmp_path):
+    """Тест: ошибка обновления не мешает проверкам, повтор - не сразу"""
+    cache_file = tmp_path / "bootstrap.pickle"
+    async with BootstrapServer() as server:
+        await RDAPBootstrapLoader(cache_file=str(cache_file), bootstrap_url=server.url).load()
+        server.fail = True
+
+        loader = RDAPBootstrapLoader(cache_file=str(cache_file), cache_ttl_days=0, bootstrap_url=server.url)
+        await loader.load()
+        await loader._refresh_task
+
+        assert loader.get_rdap_servers("net") == ("https://rdap.verisign.example/",)
+        # Следующая попытка - через RETRY_AFTER, а не на каждой проверке
+        assert loader.stale is False
+        loader.get_rdap_servers("com")
+        await asyncio.sleep(0)
+        assert len(server.requests) == 2
+        await loader.close()
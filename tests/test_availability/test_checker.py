@@ -0,0 +1,115 @@
+"""
+Тесты общего чекера доступности (пакетный режим)
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from src.availability.checker import AvailabilityResult, DomainAvailabilityChecker, DomainStatus
+from src.availability.rdap_checker import RDAPChecker
+
+
+def _counting_checker(**kwargs):
+    checker = DomainAvailabilityChecker(skip_rdap=True, **kwargs)
+    calls = []
+    
+    async def check(domain):
+        calls.append(domain)
+        await asyncio.sleep(0.01)
+        return AvailabilityResult(
+            domain=domain, status=DomainStatus.AVAILABLE, checked_via="rdap", lookups=1
+        )
+    
+    checker._check_domain = check
+    return checker, calls
+
+
+@pytest.mark.asyncio
+async def test_shared_checker_checks_domain_once():
+    """Тест: одновременные и повторные запросы домена - одна проверка"""
+    checker, calls = _counting_checker(shared=True)
+    
+    results = await asyncio.gather(*(checker.check_domain(d) for d in ["a.com", "A.com", "b.com", "a.com"]))
+    again = await checker.check_domain("b.com")
+    
+    assert sorted(calls) == ["a.com", "b.com"]
+    assert checker.dedup_hits == 3
+    assert [r.status for r in results] == [DomainStatus.AVAILABLE] * 4
+    assert again.domain == "b.com"
+    # Запросы к RDAP/WHOIS учитываются только у первой проверки домена
+    assert sum(r.lookups for r in results) + again.lookups == 2
+
+
+@pytest.mark.asyncio
+async def test_shared_checker_limits_concurrency():
+    """Тест: max_concurrent ограничивает все проверки общего чекера"""
+    checker = DomainAvailabilityChecker(skip_rdap=True, max_concurrent=2, shared=True)
+    active = peak = 0
+    
+    async def check(domain):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return AvailabilityResult(domain=domain, status=DomainStatus.REGISTERED, checked_via="rdap")
+    
+    checker._check_domain = check
+    await asyncio.gather(*(checker.check_domain(f"d{i}.com") for i in range(8)))
+    
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_check_is_retried():
+    """Тест: ошибка проверки не кэшируется"""
+    checker = DomainAvailabilityChecker(skip_rdap=True, shared=True)
+    attempts = []
+    
+    async def check(domain):
+        attempts.append(domain)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return AvailabilityResult(domain=domain, status=DomainStatus.REGISTERED, checked_via="rdap")
+    
+    checker._check_domain = check
+    with pytest.raises(RuntimeError):
+        await checker.check_domain("a.com")
+    result = await checker.check_domain("a.com")
+    
+    assert result.status == DomainStatus.REGISTERED
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_rdap_checker_reuses_open_session():
+    """Тест: после open() запросы RDAP идут через одну сессию"""
+    async def handler(request):
+        status = 404 if request.match_info["name"].startswith("free") else 200
+        return web.json_response({}, status=status)
+    
+    app = web.Application()
+    app.router.add_get("/domain/{name}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    
+    checker = RDAPChecker(bootstrap_loader=None)
+    try:
+        await checker.open(limit=4)
+        session = checker._session
+        server = f"http://127.0.0.1:{port}"
+        taken = await checker._query_rdap_server(server, "taken.com", "com")
+        free = await checker._query_rdap_server(server, "free.com", "com")
+        
+        assert taken.status.value == "REGISTERED"
+        assert free.status.value == "AVAILABLE"
+        assert checker._session is session and not session.closed
+    finally:
+        await checker.close()
+        await runner.cleanup()
+    assert checker._session is None
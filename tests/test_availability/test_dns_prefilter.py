@@ -0,0 +1,88 @@
+"""
+Тесты DNS-префильтра (локальный резолвер-заглушка)
+"""
+
+import asyncio
+import socket
+
+import pytest
+
+from src.availability.dns_prefilter import (
+    QTYPE_SOA,
+    DNSPrefilter,
+    DNSResolver,
+    build_query,
+    parse_address,
+    parse_response,
+)
+
+from ..fake_dns import EMPTY, NODATA, NOERROR, FakeDNSServer
+
+DOMAINS = [f"site{i}.com" for i in range(30)]
+
+
+def test_parse_address():
+    assert parse_address("10.0.0.1") == ("10.0.0.1", 53)
+    assert parse_address("127.0.0.1:5353") == ("127.0.0.1", 5353)
+    assert parse_address("[::1]:5300") == ("::1", 5300)
+    assert parse_address("[2001:db8::1]") == ("2001:db8::1", 53)
+
+
+def test_query_roundtrip():
+    """Тест: запрос разбирается как ответ без записей, вопрос сохраняется"""
+    packet = build_query(0x1234, "пример.рф")
+    query_id, question, response = parse_response(packet)
+    
+    assert query_id == 0x1234
+    assert question.startswith(b"\x0cxn--e1afmkfd\x08xn--p1ai\x00")
+    assert response.rcode == 0 and response.answer_types == []
+
+
+@pytest.mark.asyncio
+async def test_prefilter_verdicts_and_cache():
+    """Тест: NS - True, NXDOMAIN - False, SERVFAIL - None; вердикты кэшируются"""
+    async with FakeDNSServer(available=0.3, servfail=0.2) as dns:
+        prefilter = DNSPrefilter(DNSResolver(dns.address), max_concurrent=4)
+        verdicts = await asyncio.gather(*(prefilter.is_delegated(d) for d in DOMAINS))
+        again = await prefilter.is_delegated(DOMAINS[0])
+        await prefilter.close()
+    
+    expected = {0: True, 3: False, 2: None}
+    assert verdicts == [expected[dns._rcode(d)] for d in DOMAINS]
+    assert {True, False, None} <= set(verdicts)
+    assert again == verdicts[0]
+    # Повторно запрошен только домен с неясным ответом, если он первый
+    assert dns.stats.requests == len(DOMAINS) + (verdicts[0] is None)
+    assert dns.stats.peak_in_flight <= 4
+
+
+@pytest.mark.asyncio
+async def test_authority_section_verdicts():
+    """Тест: SOA зоны домена без NS в ответе - делегирован, SOA зоны TLD - неясно"""
+    async with FakeDNSServer(available=0.0, nodata=0.4, empty=0.3) as dns:
+        resolver = DNSResolver(dns.address)
+        prefilter = DNSPrefilter(resolver)
+        kinds = [dns._kind(d) for d in DOMAINS]
+        verdicts = await asyncio.gather(*(prefilter.is_delegated(d) for d in DOMAINS))
+        response = await resolver.query(DOMAINS[kinds.index(NODATA)])
+        await prefilter.close()
+    
+    assert {NOERROR, NODATA, EMPTY} <= set(kinds)
+    expected = {NOERROR: True, NODATA: True, EMPTY: None}
+    assert verdicts == [expected[kind] for kind in kinds]
+    assert response.answer_types == []
+    assert response.authority == [(DOMAINS[kinds.index(NODATA)], QTYPE_SOA)]
+
+
+@pytest.mark.asyncio
+async def test_silent_resolver_gives_no_verdict():
+    """Тест: резолвер не отвечает - None после таймаута и повтора"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    try:
+        address = f"127.0.0.1:{sock.getsockname()[1]}"
+        prefilter = DNSPrefilter(DNSResolver(address, timeout=0.05, retries=1))
+        assert await prefilter.is_delegated("site1.com") is None
+        await prefilter.close()
+    finally:
+        sock.close()
@@ -0,0 +1,76 @@
+"""
+Тесты планировщика проверок по полосам
+"""
+
+import asyncio
+
+import pytest
+
+from src.availability.scheduler import LaneScheduler
+
+
+@pytest.mark.asyncio
+async def test_round_robin_across_lanes_with_limits():
+    """Тест: задачи выдаются по кругу, полоса не превышает своего лимита"""
+    scheduler = LaneScheduler(max_concurrent=3, lane_limit=lambda lane: 2 if lane == "slow" else 1)
+    for i in range(6):
+        scheduler.add("slow", f"s{i}")
+    for i in range(2):
+        scheduler.add("a", f"a{i}")
+        scheduler.add("b", f"b{i}")
+    started = []
+    
+    async def task(item):
+        started.append(item)
+        await asyncio.sleep(0.02 if item.startswith("s") else 0.001)
+        return item.upper()
+    
+    results = await scheduler.run(task)
+    
+    # Первый круг - по одной задаче из каждой полосы
+    assert started[:3] == ["s0", "a0", "b0"]
+    assert results == {item: item.upper() for item in started}
+    assert scheduler.peak["slow"] == 2
+    assert scheduler.peak["a"] == scheduler.peak["b"] == 1
+    # Быстрые полосы не ждут, пока закончится медленная
+    assert started.index("b1") < started.index("s3")
+    assert scheduler.lanes == {}
+
+
+@pytest.mark.asyncio
+async def test_exceptions_are_returned_per_item():
+    """Тест: ошибка задачи - ее результат, остальные выполняются"""
+    scheduler = LaneScheduler(max_concurrent=2, lane_limit=lambda lane: 2)
+    for item in (1, 2, 3):
+        scheduler.add("lane", item)
+    
+    async def task(item):
+        if item == 2:
+            raise ValueError("boom")
+        return item * 10
+    
+    results = await scheduler.run(task)
+    
+    assert results[1] == 10 and results[3] == 30
+    assert isinstance(results[2], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_self_cancelled_task_does_not_abort_run():
+    """Тест: задача, отменившая сама себя, не прерывает остальные"""
+    scheduler = LaneScheduler(max_concurrent=3, lane_limit=lambda lane: 3)
+    for item in (1, 2, 3):
+        scheduler.add("lane", item)
+    
+    async def task(item):
+        if item == 2:
+            asyncio.current_task().cancel()
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.001)
+        return item * 10
+    
+    results = await scheduler.run(task)
+    
+    assert results[1] == 10 and results[3] == 30
+    assert isinstance(results[2], asyncio.CancelledError)
+    assert scheduler.in_flight["lane"] == 0
@@ -0,0 +1,85 @@
+"""
+Тесты для потокового CSV экспорта
+"""
+
+import csv
+import gzip
+
+import pytest
+
+from src.export.csv_exporter import CSVExporter, CSVStreamWriter
+from src.models.filtered_domain import FilteredDomain
+
+
+def _domains():
+    return [
+        FilteredDomain(domain="free.com", availability_status="AVAILABLE", dr=30),
+        FilteredDomain(domain="taken.com", availability_status="REGISTERED"),
+        FilteredDomain(domain="spam.com", availability_status="AVAILABLE", is_spam=True),
+        FilteredDomain(domain="skip.com", availability_status="AVAILABLE", is_excluded=True),
+    ]
+
+
+def _read_domains(path, opener=open):
+    with opener(path, 'rt', encoding='utf-8', newline='') as f:
+        return [row['Domain'] for row in csv.DictReader(f)]
+
+
+def test_export_filters(tmp_path):
+    """Тест фильтров при экспорте"""
+    output = tmp_path / "out" / "report.csv"
+    
+    CSVExporter.export(_domains(), str(output))
+    assert _read_domains(output) == ["free.com", "taken.com"]
+    
+    CSVExporter.export(iter(_domains()), str(output), include_spam=True, only_available=True)
+    assert _read_domains(output) == ["free.com", "spam.com"]
+
+
+def test_export_gzip_by_suffix(tmp_path):
+    """Тест сжатия gzip по расширению файла"""
+    output = tmp_path / "report.csv.gz"
+    
+    CSVExporter.export(_domains(), str(output))
+    
+    assert _read_domains(output, gzip.open) == ["free.com", "taken.com"]
+
+
+@pytest.mark.asyncio
+async def test_export_async_iterator(tmp_path):
+    """Тест экспорта из асинхронного итератора"""
+    output = tmp_path / "report.csv"
+    
+    async def produce():
+        for domain in _domains():
+            yield domain
+    
+    await CSVExporter.export_async(produce(), str(output), include_excluded=True)
+    
+    assert _read_domains(output) == ["free.com", "taken.com", "skip.com"]
+
+
+def test_rows_land_before_close(tmp_path):
+    """Тест: строки видны на диске до закрытия файла"""
+    output = tmp_path / "report.csv"
+    
+    with CSVStreamWriter(str(output), flush_every=1) as writer:
+        writer.write(FilteredDomain(domain="first.com"))
+        assert "first.com" in output.read_text(encoding="utf-8")
+        
+        assert writer.write(FilteredDomain(domain="spam.com", is_spam=True)) is False
+    
+    assert writer.rows_seen == 2
+    assert writer.rows_written == 1
+
+
+def test_export_zstd(tmp_path):
+    """Тест сжатия zstd"""
+    zstandard = pytest.importorskip("zstandard")
+    output = tmp_path / "report.csv.zst"
+    
+    CSVExporter.export(_domains(), str(output), compression="zstd")
+    
+    with open(output, 'rb') as f:
+        data = zstandard.ZstdDecompressor().stream_reader(f).read().decode('utf-8')
+    assert "free.com" in data and "spam.com" not in data
@@ -0,0 +1,103 @@
+"""
+Тесты для Excel экспорта
+"""
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from src.export import excel_exporter
+from src.export.excel_exporter import ExcelExporter, STYLE_SPAM_ROW
+from src.models.filtered_domain import FilteredDomain
+
+
+def _domains():
+    return [
+        FilteredDomain(domain="low.com", availability_status="AVAILABLE", dr=10),
+        FilteredDomain(domain="nodr.com", availability_status="AVAILABLE"),
+        FilteredDomain(domain="high.com", availability_status="REGISTERED", dr=50),
+        FilteredDomain(domain="tie.com", availability_status="AVAILABLE", dr=10),
+        FilteredDomain(domain="spam.com", availability_status="AVAILABLE", dr=90, is_spam=True),
+        FilteredDomain(domain="skip.com", availability_status="AVAILABLE", is_excluded=True),
+        FilteredDomain(domain="unknown.com", availability_status="UNKNOWN", dr=99, is_registered=False),
+    ]
+
+
+def _summary(path):
+    wb = openpyxl.load_workbook(path)
+    return {
+        row[0]: row[1:]
+        for row in wb["Summary"].iter_rows(values_only=True)
+        if row and row[0]
+    }, wb
+
+
+@pytest.mark.parametrize("write_only", [False, True])
+def test_export_summary_and_data(tmp_path, write_only):
+    """Тест сводки, топа по DR и фильтров в обоих режимах"""
+    output = tmp_path / "report.xlsx"
+    ExcelExporter.export(_domains(), str(output), target_domain="target.com", write_only=write_only)
+    
+    summary, wb = _summary(output)
+    assert wb.sheetnames == ["Summary", "Domains"]
+    assert summary["Target Domain:"][0] == "target.com"
+    assert summary["Total Domains Analyzed"][0] == 7
+    assert summary["Valid Domains"][0] == 4
+    assert summary["Spam Domains"][0] == 1
+    assert summary["Excluded Domains"][0] == 1
+    
+    rows = list(wb["Summary"].iter_rows(values_only=True))
+    start = [r[0] for r in rows].index("Domain") + 1
+    top = [r[0] for r in rows[start:] if r[0]]
+    # Стабильный порядок при равном DR, как у sorted()
+    assert top == ["high.com", "low.com", "tie.com", "nodr.com"]
+    
+    data = [r[0] for r in wb["Domains"].iter_rows(min_row=2, values_only=True)]
+    assert data == ["low.com", "nodr.com", "high.com", "tie.com"]
+
+
+def test_spam_rows_use_named_style(tmp_path):
+    """Тест общего стиля для спам-строк"""
+    output = tmp_path / "report.xlsx"
+    ExcelExporter.export(iter(_domains()), str(output), include_spam=True)
+    
+    wb = openpyxl.load_workbook(output)
+    styles = {
+        row[0].value: {cell.style for cell in row}
+        for row in wb["Domains"].iter_rows(min_row=2)
+    }
+    assert styles["spam.com"] == {STYLE_SPAM_ROW}
+    assert STYLE_SPAM_ROW not in styles["low.com"]
+
+
+def test_top_limited_to_ten(tmp_path):
+    """Тест ограничения топа десятью доменами"""
+    domains = [
+        FilteredDomain(domain=f"d{i}.com", availability_status="AVAILABLE", dr=i)
+        for i in range(25)
+    ]
+    output = tmp_path / "report.xlsx"
+    ExcelExporter.export(domains, str(output))
+    
+    rows = list(openpyxl.load_workbook(output)["Summary"].iter_rows(values_only=True))
+    start = [r[0] for r in rows].index("Domain") + 1
+    assert [r[1] for r in rows[start:]] == list(range(24, 14, -1))
+
+
+def test_write_only_auto_selection(tmp_path, monkeypatch):
+    """Тест автоматического выбора потокового режима"""
+    modes = []
+    real_workbook = excel_exporter.Workbook
+    
+    def workbook(write_only=False):
+        modes.append(write_only)
+        return real_workbook(write_only=write_only)
+    
+    monkeypatch.setattr(excel_exporter, "Workbook", workbook)
+    monkeypatch.setattr(excel_exporter, "WRITE_ONLY_THRESHOLD", 5)
+    output = str(tmp_path / "report.xlsx")
+    
+    ExcelExporter.export(_domains()[:3], output)
+    ExcelExporter.export(_domains(), output)
+    ExcelExporter.export(iter(_domains()[:3]), output)
+    assert modes == [False, True, True]
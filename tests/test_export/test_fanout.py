@@ -0,0 +1,129 @@
+"""
+Тесты для экспорта в несколько форматов за один проход
+"""
+
+import csv
+import json
+
+import pytest
+
+from src.export.fanout import (
+    FanOutExporter,
+    create_writer,
+    output_file_for,
+    parse_formats,
+)
+from src.models.filtered_domain import FilteredDomain
+
+
+def _domains():
+    return [
+        FilteredDomain(domain="free.com", availability_status="AVAILABLE", is_registered=False),
+        FilteredDomain(domain="taken.com", availability_status="REGISTERED", dr=20),
+        FilteredDomain(domain="spam.com", availability_status="REGISTERED", is_spam=True),
+        FilteredDomain(domain="skip.com", availability_status="REGISTERED", is_excluded=True),
+    ]
+
+
+def test_parse_formats():
+    """Тест разбора списка форматов"""
+    assert parse_formats("csv, xlsx,csv,JSON") == ["csv", "xlsx", "json"]
+    with pytest.raises(ValueError):
+        parse_formats("csv,doc")
+    with pytest.raises(ValueError):
+        parse_formats(",")
+
+
+def test_output_file_for():
+    """Тест имен файлов для форматов"""
+    assert output_file_for("out/report", "xlsx") == "out/report.xlsx"
+    assert output_file_for("out/report.csv", "json") == "out/report.json"
+    assert output_file_for("out/report.csv.gz", "ndjson", "gzip") == "out/report.ndjson.gz"
+    assert output_file_for("out/report", "parquet", "gzip") == "out/report.parquet"
+
+
+def test_export_formats_single_pass(tmp_path):
+    """Тест: один проход по итератору, каждый формат со своим фильтром"""
+    pytest.importorskip("openpyxl")
+    consumed = []
+    
+    def produce():
+        for domain in _domains():
+            consumed.append(domain.domain)
+            yield domain
+    
+    files = FanOutExporter.export_formats(
+        produce(), str(tmp_path / "report"), ["csv", "json", "xlsx"]
+    )
+    assert consumed == ["free.com", "taken.com", "spam.com", "skip.com"]
+    
+    with open(files["csv"], encoding='utf-8', newline='') as f:
+        assert [r["Domain"] for r in csv.DictReader(f)] == ["free.com", "taken.com"]
+    
+    data = json.loads((tmp_path / "report.json").read_text(encoding='utf-8'))
+    assert [d["domain"] for d in data["domains"]] == ["taken.com"]
+    assert {
+        key: data["metadata"][key]
+        for key in ("total_domains_analyzed", "valid_domains", "spam_domains", "excluded_domains")
+    } == {
+        "total_domains_analyzed": 4,
+        "valid_domains": 1,
+        "spam_domains": 1,
+        "excluded_domains": 1
+    }
+    
+    import openpyxl
+    rows = list(openpyxl.load_workbook(files["xlsx"])["Summary"].iter_rows(values_only=True))
+    summary = {row[0]: row[1] for row in rows if row and row[0]}
+    assert summary["Total Domains Analyzed"] == 4
+    assert summary["Valid Domains"] == 1
+
+
+def test_batches_split_across_sinks(tmp_path):
+    """Тест передачи пачками"""
+    domains = [FilteredDomain(domain=f"d{i}.com") for i in range(25)]
+    writers = {
+        fmt: create_writer(fmt, output_file_for(str(tmp_path / "report"), fmt))
+        for fmt in ("csv", "ndjson")
+    }
+    FanOutExporter(writers, batch_size=4, queue_size=1).export(domains)
+    
+    lines = (tmp_path / "report.ndjson").read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)["domain"] for line in lines] == [d.domain for d in domains]
+    assert writers["csv"].rows_written == 25
+
+
+def test_failed_sink_does_not_block_others(tmp_path):
+    """Тест: ошибка одного формата не блокирует остальные"""
+    writers = {
+        "csv": create_writer("csv", str(tmp_path / "report.csv")),
+        "json": create_writer("json", str(tmp_path / "report.json")),
+    }
+    
+    def broken(domain):
+        raise OSError("disk full")
+    
+    writers["csv"].write_row = broken
+    domains = [FilteredDomain(domain=f"d{i}.com") for i in range(50)]
+    
+    with pytest.raises(RuntimeError, match="csv: disk full"):
+        FanOutExporter(writers, batch_size=2, queue_size=1).export(domains)
+    
+    data = json.loads((tmp_path / "report.json").read_text(encoding='utf-8'))
+    assert len(data["domains"]) == 50
+
+
+@pytest.mark.asyncio
+async def test_export_async_from_stream(tmp_path):
+    """Тест записи из асинхронного потока доменов"""
+    async def produce():
+        for domain in _domains():
+            yield domain
+    
+    exporter = FanOutExporter.for_formats(str(tmp_path / "report"), ["csv", "ndjson"])
+    files = await exporter.export_async(produce())
+    
+    with open(files["csv"], encoding='utf-8', newline='') as f:
+        assert [r["Domain"] for r in csv.DictReader(f)] == ["free.com", "taken.com"]
+    lines = (tmp_path / "report.ndjson").read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)["domain"] for line in lines if '"domain"' in line] == ["taken.com"]
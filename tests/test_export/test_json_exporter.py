@@ -0,0 +1,113 @@
+"""
+Тесты для JSON / NDJSON экспорта
+"""
+
+import gzip
+import json
+
+import pytest
+
+from src.export import json_exporter
+from src.export.json_exporter import JSONExporter, JSONStreamWriter
+from src.models.filtered_domain import FilteredDomain
+
+
+def _domains():
+    return [
+        FilteredDomain(domain="good.com", dr=40, spam_anchor_examples=["купить"]),
+        FilteredDomain(domain="spam.com", is_spam=True, spam_score=0.5),
+        FilteredDomain(domain="skip.com", is_excluded=True),
+        FilteredDomain(domain="free.com", is_registered=False),
+    ]
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "json"])
+def encoder(request, monkeypatch):
+    if request.param and not json_exporter.ORJSON_AVAILABLE:
+        pytest.skip("orjson не установлен")
+    monkeypatch.setattr(json_exporter, "ORJSON_AVAILABLE", request.param)
+
+
+def test_export_list_keeps_metadata(tmp_path, encoder):
+    """Тест структуры документа для списка доменов"""
+    output = tmp_path / "report.json"
+    JSONExporter.export(_domains(), str(output), target_domain="target.com")
+    
+    data = json.loads(output.read_text(encoding='utf-8'))
+    assert data["metadata"]["target_domain"] == "target.com"
+    assert data["metadata"]["total_domains_analyzed"] == 4
+    assert data["metadata"]["valid_domains"] == 1
+    assert data["metadata"]["spam_domains"] == 1
+    assert data["metadata"]["excluded_domains"] == 1
+    assert list(data) == ["metadata", "domains"]
+    assert data["domains"][0]["domain"] == "good.com"
+    assert data["domains"][0]["spam_anchor_examples"] == ["купить"]
+
+
+def test_export_iterator_writes_trailing_metadata(tmp_path):
+    """Тест metadata после массива для итератора"""
+    output = tmp_path / "report.json"
+    JSONExporter.export(
+        iter(_domains()), str(output), include_spam=True, target_domain="target.com"
+    )
+    
+    data = json.loads(output.read_text(encoding='utf-8'))
+    assert list(data) == ["domains", "metadata"]
+    assert [d["domain"] for d in data["domains"]] == ["good.com", "spam.com"]
+    assert data["metadata"]["target_domain"] == "target.com"
+    assert data["metadata"]["total_domains_analyzed"] == 4
+    assert data["metadata"]["valid_domains"] == 2
+    assert data["metadata"]["spam_domains"] == 1
+    assert data["metadata"]["excluded_domains"] == 1
+
+
+def test_empty_document_is_valid(tmp_path):
+    """Тест пустого массива доменов"""
+    output = tmp_path / "report.json"
+    JSONExporter.export(iter([]), str(output))
+    
+    data = json.loads(output.read_text(encoding='utf-8'))
+    assert data["domains"] == []
+    assert data["metadata"]["total_domains_analyzed"] == 0
+
+
+def test_ndjson_gzip(tmp_path, encoder):
+    """Тест JSON Lines со сжатием"""
+    output = tmp_path / "report.ndjson.gz"
+    JSONExporter.export(_domains(), str(output), include_spam=True, ndjson=True)
+    
+    with gzip.open(output, 'rt', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [r["domain"] for r in records] == ["good.com", "spam.com"]
+    assert records[1]["spam_score"] == 0.5
+
+
+def test_ndjson_lines_visible_before_close(tmp_path):
+    """Тест: записи доступны для чтения до конца экспорта"""
+    output = tmp_path / "report.ndjson"
+    writer = JSONStreamWriter(str(output), ndjson=True, flush_every=1)
+    with writer:
+        writer.write(_domains()[0])
+        assert json.loads(output.read_text(encoding='utf-8'))["domain"] == "good.com"
+
+
+async def test_export_async(tmp_path):
+    """Тест экспорта из асинхронного итератора"""
+    async def produce():
+        for domain in _domains():
+            yield domain
+    
+    output = tmp_path / "report.ndjson"
+    await JSONExporter.export_async(
+        produce(), str(output), include_excluded=True, ndjson=True
+    )
+    
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)["domain"] for line in lines] == ["good.com", "skip.com"]
+    
+    # По умолчанию, как и export() - документ JSON
+    output = tmp_path / "report.json"
+    await JSONExporter.export_async(produce(), str(output))
+    data = json.loads(output.read_text(encoding='utf-8'))
+    assert [d["domain"] for d in data["domains"]] == ["good.com"]
+    assert data["metadata"]["total_domains_analyzed"] == 4
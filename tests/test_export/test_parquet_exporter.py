@@ -0,0 +1,104 @@
+"""
+Тесты для Parquet экспорта
+"""
+
+from datetime import datetime
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+pa = pytest.importorskip("pyarrow")
+
+from src.export.parquet_exporter import ParquetExporter
+from src.models.backlink import Backlink
+from src.models.filtered_domain import FilteredDomain
+
+
+def _domains():
+    return [
+        FilteredDomain(
+            domain="free.com", availability_status="AVAILABLE", dr=30,
+            backlink_count=5, checked_at=datetime(2024, 1, 2, 3, 4, 5)
+        ),
+        FilteredDomain(domain="taken.com", availability_status="REGISTERED"),
+        FilteredDomain(
+            domain="spam.com", availability_status="AVAILABLE", is_spam=True,
+            spam_score=0.75, spam_anchor_examples=["casino"]
+        ),
+        FilteredDomain(domain="skip.com", availability_status="AVAILABLE", is_excluded=True),
+    ]
+
+
+def test_export_typed_columns(tmp_path):
+    """Тест типов колонок и фильтров"""
+    output = tmp_path / "out" / "report.parquet"
+    ParquetExporter.export(_domains(), str(output), include_spam=True)
+    
+    table = pq.read_table(output)
+    assert table.column("domain").to_pylist() == ["free.com", "taken.com", "spam.com"]
+    assert table.schema.field("dr").type == pa.int32()
+    assert pa.types.is_dictionary(table.schema.field("availability_status").type)
+    assert pa.types.is_timestamp(table.schema.field("checked_at").type)
+    
+    rows = table.to_pylist()
+    assert rows[0]["checked_at"] == datetime(2024, 1, 2, 3, 4, 5)
+    assert rows[0]["dr"] == 30
+    assert rows[1]["dr"] is None
+    assert rows[2]["spam_score"] == 0.75
+    assert rows[2]["spam_anchor_examples"] == ["casino"]
+
+
+def test_row_groups(tmp_path):
+    """Тест записи row group'ами"""
+    domains = [FilteredDomain(domain=f"d{i}.com") for i in range(25)]
+    output = tmp_path / "report.parquet"
+    ParquetExporter.export(iter(domains), str(output), row_group_size=10)
+    
+    metadata = pq.ParquetFile(output).metadata
+    assert metadata.num_rows == 25
+    assert metadata.num_row_groups == 3
+
+
+def test_export_links_table(tmp_path):
+    """Тест отдельной таблицы ссылок"""
+    links = [
+        {
+            "source_name": "blog.com", "source_url": "https://blog.com/a",
+            "url": "https://target.com/", "anchor": "target", "source_dr": "42",
+            "created_at": "2024-03-01 10:00:00"
+        },
+        {"name": "out.com", "url": "https://out.com/", "created_at": "bad date"},
+    ]
+    output = tmp_path / "report.parquet"
+    ParquetExporter.export(_domains(), str(output), links=links)
+    
+    rows = pq.read_table(tmp_path / "report.links.parquet").to_pylist()
+    assert [r["domain"] for r in rows] == ["blog.com", "out.com"]
+    assert rows[0]["source_dr"] == 42
+    assert rows[0]["created_at"] == datetime(2024, 3, 1, 10, 0)
+    assert rows[1]["created_at"] is None
+
+
+async def test_export_async(tmp_path):
+    """Тест экспорта из асинхронного итератора"""
+    async def produce():
+        for domain in _domains():
+            yield domain
+    
+    output = tmp_path / "report.parquet"
+    await ParquetExporter.export_async(produce(), str(output), only_available=True)
+    
+    assert pq.read_table(output).column("domain").to_pylist() == ["free.com"]
+
+
+def test_export_links_from_records(tmp_path):
+    """Тест таблицы ссылок из записей Backlink"""
+    links = [Backlink("https://a.com/x", "https://target.com/", "a.com", "anchor", dr=5)]
+    output = tmp_path / "links.parquet"
+    ParquetExporter.export_links(links, str(output))
+    
+    rows = pq.read_table(output).to_pylist()
+    assert rows == [{
+        "domain": "a.com", "source_url": "https://a.com/x", "url": "https://target.com/",
+        "anchor": "anchor", "source_dr": 5, "created_at": None
+    }]
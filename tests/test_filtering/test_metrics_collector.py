@@ -0,0 +1,81 @@
+"""
+Тесты для сборщика метрик доменов
+"""
+
+from datetime import datetime, timedelta
+
+import aiosqlite
+import pytest
+
+from src.filtering.metrics_collector import DomainMetricsCollector, MetricsCacheManager
+
+
+class FakeApiClient:
+    """Заглушка KeysSoClient, считающая запросы"""
+    
+    def __init__(self, failing=()):
+        self.requests = []
+        self.params = []
+        self.failing = set(failing)
+    
+    async def _make_request(self, endpoint, params=None, method="POST"):
+        self.requests.append(params["domain"])
+        self.params.append(params)
+        if params["domain"] in self.failing:
+            raise Exception("API error 500")
+        return {
+            "domain_rating": len(params["domain"]),
+            "total_backlinks": 100,
+        }
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return MetricsCacheManager(db_path=str(tmp_path / "metrics.db"), ttl_days=7)
+
+
+@pytest.mark.asyncio
+async def test_cached_metrics_skip_api(cache):
+    """Тест: повторный сбор берет метрики из кэша"""
+    client = FakeApiClient()
+    collector = DomainMetricsCollector(client, cache=cache)
+    
+    first = await collector.collect_metrics(["a.com", "bb.com"])
+    second = await collector.collect_metrics(["a.com", "bb.com", "ccc.com"])
+    
+    assert first["a.com"]["dr"] == 5
+    assert second["bb.com"]["dr"] == 6
+    assert second["ccc.com"]["dr"] == 7
+    assert sorted(client.requests) == ["a.com", "bb.com", "ccc.com"]
+    assert client.params[0] == {"domain": client.requests[0]}
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached(cache):
+    """Тест: неудачные запросы не кэшируются"""
+    client = FakeApiClient(failing={"bad.com"})
+    collector = DomainMetricsCollector(client, cache=cache)
+    
+    result = await collector.collect_metrics(["bad.com"])
+    assert result["bad.com"] is None
+    
+    client.failing.clear()
+    result = await collector.collect_metrics(["bad.com"])
+    assert result["bad.com"]["dr"] == 7
+    assert client.requests == ["bad.com", "bad.com"]
+
+
+@pytest.mark.asyncio
+async def test_cache_ttl(cache):
+    """Тест: просроченные записи кэша игнорируются и удаляются"""
+    await cache.set_many({"A.com": {"dr": 10}})
+    
+    assert await cache.get_many(["a.com"]) == {"a.com": {"dr": 10}}
+    
+    stale = (datetime.now() - timedelta(days=8)).isoformat()
+    async with aiosqlite.connect(cache.db_path) as db:
+        await db.execute("UPDATE domain_metrics SET fetched_at = ?", (stale,))
+        await db.commit()
+    
+    assert await cache.get_many(["a.com"]) == {}
+    assert await cache.cleanup_old_entries() == 1
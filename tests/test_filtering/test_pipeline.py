@@ -0,0 +1,146 @@
+"""
+Тесты для пайплайна фильтрации
+"""
+
+import pytest
+
+from src.availability.checker import AvailabilityResult, DomainStatus
+from src.filtering.pipeline import DomainFilteringPipeline
+from src.models.domain_batch import DomainBatch
+
+
+@pytest.fixture
+def phrase_files(tmp_path):
+    """Файлы спам-фраз и исключений"""
+    spam_file = tmp_path / "spam.txt"
+    spam_file.write_text("casino\npoker\n", encoding="utf-8")
+    exclude_file = tmp_path / "excluded.txt"
+    exclude_file.write_text("facebook.com\n", encoding="utf-8")
+    return str(spam_file), str(exclude_file)
+
+
+def _registered(*domains):
+    return [
+        AvailabilityResult(domain=d, status=DomainStatus.REGISTERED, checked_via="rdap")
+        for d in domains
+    ]
+
+
+@pytest.mark.asyncio
+async def test_process_domains_marks_spam(phrase_files):
+    """Тест пометки спама по анкорам ссылок"""
+    spam_file, exclude_file = phrase_files
+    pipeline = DomainFilteringPipeline(
+        spam_phrases_file=spam_file,
+        excluded_domains_file=exclude_file,
+        fetch_metrics=False
+    )
+    
+    backlinks = [
+        {"source_name": "www.spam.com", "anchor": "Best Casino"},
+        {"source_name": "spam.com", "anchor": "news"},
+        {"source_name": "clean.com", "anchor": "occasion"},
+        {"source_name": "facebook.com", "anchor": "share"},
+    ]
+    
+    result = await pipeline.process_domains(
+        domains=["clean.com", "facebook.com", "spam.com"],
+        availability_results=_registered("clean.com", "facebook.com", "spam.com"),
+        backlinks=backlinks
+    )
+    by_domain = {d.domain: d for d in result}
+    
+    assert by_domain["spam.com"].is_spam is True
+    assert by_domain["spam.com"].spam_anchor_examples == ["Best Casino"]
+    assert by_domain["spam.com"].backlink_count == 2
+    assert by_domain["clean.com"].is_valid is True
+    assert by_domain["facebook.com"].is_excluded is True
+
+
+@pytest.mark.asyncio
+async def test_process_domains_spam_threshold(phrase_files):
+    """Тест настраиваемого порога спама"""
+    spam_file, exclude_file = phrase_files
+    pipeline = DomainFilteringPipeline(
+        spam_phrases_file=spam_file,
+        excluded_domains_file=exclude_file,
+        fetch_metrics=False,
+        spam_threshold=2
+    )
+    
+    result = await pipeline.process_domains(
+        domains=["spam.com"],
+        availability_results=_registered("spam.com"),
+        backlinks=[{"source_name": "spam.com", "anchor": "poker"}]
+    )
+    
+    assert result[0].is_spam is False
+
+
+@pytest.mark.asyncio
+async def test_process_domains_spam_ratio(tmp_path):
+    """Тест: один спам-анкор среди множества чистых не делает домен спамным"""
+    spam_file = tmp_path / "spam.txt"
+    spam_file.write_text("poker\nviagra | 50\n", encoding="utf-8")
+    pipeline = DomainFilteringPipeline(
+        spam_phrases_file=str(spam_file),
+        excluded_domains_file=str(tmp_path / "missing.txt"),
+        fetch_metrics=False
+    )
+    
+    backlinks = [{"source_name": "big.com", "anchor": "play poker"}]
+    backlinks += [{"source_name": "big.com", "anchor": "article"}] * 499
+    backlinks += [{"source_name": "pharma.com", "anchor": "viagra"}]
+    backlinks += [{"source_name": "pharma.com", "anchor": "article"}] * 99
+    
+    result = await pipeline.process_domains(
+        domains=["big.com", "pharma.com"],
+        availability_results=_registered("big.com", "pharma.com"),
+        backlinks=backlinks
+    )
+    by_domain = {d.domain: d for d in result}
+    
+    assert by_domain["big.com"].is_spam is False
+    assert by_domain["big.com"].spam_ratio == pytest.approx(0.002)
+    assert by_domain["pharma.com"].is_spam is True
+    assert by_domain["pharma.com"].spam_score == pytest.approx(0.5)
+
+
+def test_filter_many_with_wildcards(tmp_path):
+    """Тест пакетного исключения по шаблонам"""
+    exclude_file = tmp_path / "excluded.txt"
+    exclude_file.write_text("facebook.com\n*.blogspot.com\n", encoding="utf-8")
+    pipeline = DomainFilteringPipeline(
+        spam_phrases_file=str(tmp_path / "missing.txt"),
+        excluded_domains_file=str(exclude_file),
+        fetch_metrics=False
+    )
+    
+    domains = ["facebook.com", "my.blogspot.com", "blogspot.com", "site.org"]
+    
+    assert pipeline.filter_many(domains) == ["blogspot.com", "site.org"]
+    assert pipeline.is_excluded("my.blogspot.com") is True
+
+
+@pytest.mark.asyncio
+async def test_process_domains_columnar(phrase_files):
+    """Тест колоночного результата"""
+    spam_file, exclude_file = phrase_files
+    pipeline = DomainFilteringPipeline(
+        spam_phrases_file=spam_file,
+        excluded_domains_file=exclude_file,
+        fetch_metrics=False
+    )
+    
+    result = await pipeline.process_domains(
+        domains=["clean.com", "spam.com"],
+        availability_results=_registered("clean.com", "spam.com"),
+        backlinks=[{"source_name": "spam.com", "anchor": "poker"}],
+        columnar=True
+    )
+    
+    assert isinstance(result, DomainBatch)
+    assert [(row.domain, row.is_spam) for row in result] == [
+        ("clean.com", False), ("spam.com", True)
+    ]
+    assert result[1].spam_anchor_examples == ("poker",)
@@ -7,7 +7,10 @@ from pathlib import Path
 import tempfile
 import os
 
-from src.filtering.spam_filter import SpamFilter, DomainExcluder
+from src.filtering import spam_filter as spam_filter_module
+from src.filtering.spam_filter import (
+    SpamFilter, DomainExcluder, PhraseMatcher, ExclusionIndex
+)
 
 
 class TestSpamFilter:
@@ -126,6 +129,242 @@ class TestSpamFilter:
         assert all(
             spam_filter.is_spam_anchor(ex) for ex in examples
         )
+    
+    def test_find_all_spam_phrases(self):
+        """Тест поиска всех спам-фраз в анкоре"""
+        spam_filter = SpamFilter()
+        spam_filter.spam_phrases = {"casino", "online casino", "poker", "viagra"}
+        spam_filter._loaded = True
+        
+        found = spam_filter.find_spam_phrases("Best Online Casino and poker")
+        
+        assert set(found) == {"online casino", "casino", "poker"}
+        assert spam_filter.find_spam_phrases("read article") == []
+        assert spam_filter.find_spam_phrases(None) == []
+    
+    def test_phrases_reassignment(self):
+        """Тест перестроения автомата после замены набора фраз"""
+        spam_filter = SpamFilter()
+        spam_filter.spam_phrases = {"casino"}
+        spam_filter._loaded = True
+        assert spam_filter.is_spam_anchor("poker night") is False
+        
+        spam_filter.spam_phrases = {"poker"}
+        assert spam_filter.is_spam_anchor("poker night") is True
+        assert spam_filter.is_spam_anchor("casino") is False
+    
+    def test_phrases_same_size_update(self):
+        """Тест перестроения автомата при изменении набора того же размера"""
+        spam_filter = SpamFilter()
+        spam_filter.spam_phrases = {"casino"}
+        spam_filter._loaded = True
+        assert spam_filter.is_spam_anchor("poker night") is False
+        
+        spam_filter.remove_phrases(["casino"])
+        spam_filter.add_phrases(["poker"])
+        assert spam_filter.is_spam_anchor("poker night") is True
+        assert spam_filter.is_spam_anchor("casino") is False
+        
+        spam_filter.spam_phrases ^= {"poker", "slots"}
+        assert spam_filter.is_spam_anchor("poker night") is False
+        assert spam_filter.is_spam_anchor("slots") is True
+        
+        # Изменить набор в обход автомата нельзя
+        with pytest.raises(AttributeError):
+            spam_filter.spam_phrases.add("casino")
+
+    
+    def test_scan_anchors_single_pass(self):
+        """Тест проверки анкоров домена за один проход"""
+        spam_filter = SpamFilter()
+        spam_filter.spam_phrases = {"casino", "poker"}
+        spam_filter._loaded = True
+        
+        anchors = ["visit casino", None, "read article", "casino poker", "news"]
+        result = spam_filter.scan_anchors(anchors, max_examples=5, early_exit=False)
+        
+        assert result.is_spam is True
+        assert result.completed is True
+        assert result.anchors_checked == 5
+        assert result.spam_count == 2
+        assert result.examples == ["visit casino", "casino poker"]
+        assert result.phrase_counts == {"casino": 2, "poker": 1}
+    
+    def test_scan_anchors_threshold_and_early_exit(self):
+        """Тест порога спама и досрочной остановки"""
+        spam_filter = SpamFilter()
+        spam_filter.spam_phrases = {"casino"}
+        spam_filter._loaded = True
+        
+        anchors = ["casino"] * 3 + ["clean"] * 10
+        
+        result = spam_filter.scan_anchors(anchors, spam_threshold=5)
+        assert result.is_spam is False
+        assert result.spam_count == 3
+        assert result.completed is True
+        
+        result = spam_filter.scan_anchors(anchors, spam_threshold=2, max_examples=2)
+        assert result.is_spam is True
+        assert result.completed is False
+        assert result.anchors_checked == 2
+    
+    def test_scan_anchors_early_exit_with_score_threshold(self):
+        """Тест досрочной остановки при пороге по spam_score"""
+        spam_filter = SpamFilter()
+        spam_filter.spam_phrases = {"casino"}
+        spam_filter._loaded = True
+        
+        # 3 спам-анкора из 10: доля не ниже 0.3 уже после третьего
+        anchors = ["casino"] * 3 + ["clean"] * 7
+        result = spam_filter.scan_anchors(
+            anchors, spam_score_threshold=0.3, max_examples=1
+        )
+        assert result.is_spam is True
+        assert result.completed is False
+        assert result.anchors_checked == 3
+        
+        # Доля еще может опуститься ниже порога - проверяются все анкоры
+        result = spam_filter.scan_anchors(
+            anchors, spam_score_threshold=0.4, max_examples=1
+        )
+        assert result.is_spam is False
+        assert result.completed is True
+        assert result.anchors_checked == 10
+        
+        # Размер неизвестен - без досрочной остановки
+        result = spam_filter.scan_anchors(
+            iter(anchors), spam_score_threshold=0.3, max_examples=1
+        )
+        assert result.is_spam is True
+        assert result.completed is True
+    
+    def test_load_weighted_phrases(self, tmp_path):
+        """Тест загрузки фраз с весами"""
+        phrases_file = tmp_path / "spam.txt"
+        phrases_file.write_text(
+            "casino\nviagra | 5\nonline poker|2.5\nbad | weight\n",
+            encoding="utf-8"
+        )
+        
+        spam_filter = SpamFilter(str(phrases_file))
+        spam_filter.load_spam_phrases()
+        
+        assert spam_filter.spam_phrases == {"casino", "viagra", "online poker", "bad"}
+        assert spam_filter.spam_weights == {"viagra": 5.0, "online poker": 2.5}
+        assert spam_filter.is_spam_anchor("cheap viagra") is True
+    
+    def test_spam_ratio_and_score(self):
+        """Тест доли и взвешенной оценки спама"""
+        spam_filter = SpamFilter()
+        spam_filter.spam_phrases = {"casino", "viagra"}
+        spam_filter.spam_weights = {"viagra": 10.0}
+        spam_filter._loaded = True
+        
+        anchors = ["casino"] + ["article"] * 99
+        result = spam_filter.scan_anchors(anchors, spam_score_threshold=0.05)
+        assert result.spam_ratio == pytest.approx(0.01)
+        assert result.spam_score == pytest.approx(0.01)
+        assert result.is_spam is False
+        assert result.completed is True
+        
+        anchors = ["buy viagra casino"] + ["article"] * 99
+        result = spam_filter.scan_anchors(anchors, spam_score_threshold=0.05)
+        assert result.spam_ratio == pytest.approx(0.01)
+        assert result.spam_score == pytest.approx(0.1)
+        assert result.is_spam is True
+    
+    def test_scan_anchor_groups(self):
+        """Тест пакетной проверки анкоров нескольких доменов"""
+        spam_filter = SpamFilter()
+        spam_filter.spam_phrases = {"casino", "viagra"}
+        spam_filter._loaded = True
+        
+        groups = {
+            f"domain{i}.com": (
+                ["buy viagra", "article"] if i % 2 else ["article", "news"]
+            )
+            for i in range(20)
+        }
+        
+        results = spam_filter.scan_anchor_groups(groups)
+        assert set(results) == set(groups)
+        assert sum(1 for r in results.values() if r.is_spam) == 10
+    
+    @pytest.mark.parametrize("use_processes", [False, True])
+    def test_scan_anchor_groups_pool(self, use_processes, monkeypatch):
+        """Тест пакетной проверки в пуле потоков и процессов"""
+        spam_filter = SpamFilter()
+        spam_filter.spam_phrases = {"casino", "viagra"}
+        spam_filter.spam_weights = {"viagra": 3.0}
+        spam_filter._loaded = True
+        
+        groups = {
+            f"domain{i}.com": (
+                ["buy viagra", "article"] if i % 2 else ["article", "news"]
+            )
+            for i in range(20)
+        }
+        serial = spam_filter.scan_anchor_groups(groups)
+        
+        chunks = []
+        split_groups = spam_filter_module._split_groups
+        monkeypatch.setattr(
+            spam_filter_module, "_split_groups",
+            lambda *args: chunks.append(split_groups(*args)) or chunks[-1]
+        )
+        
+        # Пакет меньше порога - без пула
+        spam_filter.scan_anchor_groups(groups, max_workers=2, use_processes=use_processes)
+        assert chunks == []
+        
+        pooled = spam_filter.scan_anchor_groups(
+            groups,
+            max_workers=2,
+            use_processes=use_processes,
+            parallel_threshold=10
+        )
+        
+        assert len(chunks) == 1 and len(chunks[0]) > 1
+        assert pooled == serial
+        assert sum(1 for r in pooled.values() if r.is_spam) == 10
+        assert pooled["domain1.com"].spam_score == pytest.approx(1.5)
+
+
+class TestPhraseMatcher:
+    """Тесты для PhraseMatcher"""
+    
+    def test_matches_regex_word_boundaries(self):
+        """Тест совпадения с семантикой r'\\b' + re.escape(phrase) + r'\\b'"""
+        import random
+        import re
+        
+        rng = random.Random(42)
+        alphabet = "ab c-_.1"
+        
+        for _ in range(500):
+            phrases = {
+                ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+                for _ in range(rng.randint(1, 6))
+            }
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+            
+            matcher = PhraseMatcher(phrases)
+            expected = {
+                p for p in phrases
+                if re.search(r'\b' + re.escape(p) + r'\b', text)
+            }
+            
+            assert set(matcher.find_all(text)) == expected
+            assert (matcher.search(text) is not None) == bool(expected)
+    
+    def test_non_ascii_phrases(self):
+        """Тест кириллических фраз"""
+        matcher = PhraseMatcher(["казино", "ставки на спорт"])
+        
+        assert matcher.find_all("лучшие ставки на спорт и казино") == [
+            "ставки на спорт", "казино"
+        ]
+        assert matcher.search("казиноонлайн") is None
 
 
 class TestDomainExcluder:
@@ -177,6 +416,23 @@ class TestDomainExcluder:
         result = excluder.remove_exclusion("nonexistent.com")
         assert result is False
     
+    def test_add_remove_wildcard_exclusion(self):
+        """Тест добавления и удаления шаблонов исключений"""
+        excluder = DomainExcluder()
+        excluder._loaded = True
+        
+        excluder.add_exclusion("*.Blogspot.com")
+        excluder.add_exclusion(".ru")
+        assert excluder.is_excluded("a.blogspot.com") is True
+        assert excluder.is_excluded("blogspot.com") is False
+        assert excluder.is_excluded("yandex.ru") is True
+        
+        assert excluder.remove_exclusion("*.blogspot.com") is True
+        assert excluder.is_excluded("a.blogspot.com") is False
+        assert excluder.remove_exclusion(".ru") is True
+        assert excluder.is_excluded("yandex.ru") is False
+        assert excluder.remove_exclusion(".ru") is False
+    
     def test_load_from_file(self):
         """Тест загрузки из файла"""
         # Создаем временный файл
@@ -221,6 +477,91 @@ class TestDomainExcluder:
             assert len(excluder2.excluded_domains) == 3
             assert "facebook.com" in excluder2.excluded_domains
 
+    
+    def test_wildcard_rules_from_file(self, tmp_path):
+        """Тест шаблонов исключений в файле"""
+        rules_file = tmp_path / "exclusions.txt"
+        rules_file.write_text("facebook.com\n*.blogspot.com\n", encoding="utf-8")
+        
+        excluder = DomainExcluder(str(rules_file))
+        
+        assert excluder.is_excluded("facebook.com") is True
+        assert excluder.is_excluded("news.blogspot.com") is True
+        assert excluder.is_excluded("blogspot.com") is False
+
+
+class TestExclusionIndex:
+    """Тесты для ExclusionIndex"""
+    
+    def test_exact_and_wildcard_rules(self):
+        """Тест точных доменов и шаблонов"""
+        index = ExclusionIndex()
+        for rule in ["facebook.com", "*.blogspot.com", ".example.org", "*.ru"]:
+            index.add(rule)
+        
+        assert len(index) == 4
+        assert index.matches("Facebook.com") is True
+        assert index.matches("m.facebook.com") is False
+        
+        assert index.matches("blogspot.com") is False
+        assert index.matches("a.blogspot.com") is True
+        assert index.matches("x.a.blogspot.com") is True
+        
+        assert index.matches("example.org") is True
+        assert index.matches("www.example.org") is True
+        assert index.matches("badexample.org") is False
+        
+        assert index.matches("yandex.ru") is True
+        assert index.matches("yandex.com") is False
+    
+    def test_remove_rules(self):
+        """Тест удаления правил из индекса"""
+        index = ExclusionIndex()
+        for rule in ["facebook.com", "*.example.org", ".example.org", "*.a.b.ru"]:
+            index.add(rule)
+        assert len(index) == 4
+        
+        # Остается правило .example.org для того же узла
+        assert index.remove("*.example.org") is True
+        assert index.matches("www.example.org") is True
+        assert index.remove(".example.org") is True
+        assert index.matches("www.example.org") is False
+        
+        assert index.remove("*.a.b.ru") is True
+        assert index.matches("x.a.b.ru") is False
+        assert index._trie == {}
+        
+        assert index.remove("facebook.com") is True
+        assert index.remove("facebook.com") is False
+        assert len(index) == 0
+    
+    def test_filter_many(self):
+        """Тест пакетной фильтрации"""
+        index = ExclusionIndex()
+        index.add("twitter.com")
+        index.add(".su")
+        
+        domains = ["a.com", "twitter.com", "old.su", "b.net"]
+        assert index.filter_many(domains) == ["a.com", "b.net"]
+    
+    def test_reload_if_changed(self, tmp_path):
+        """Тест перезагрузки при изменении файла"""
+        rules_file = tmp_path / "exclusions.txt"
+        rules_file.write_text("# comment\nfacebook.com\n", encoding="utf-8")
+        
+        index = ExclusionIndex(str(rules_file))
+        index.load()
+        assert index.reload_if_changed() is False
+        assert "twitter.com" not in index
+        
+        rules_file.write_text("twitter.com\n", encoding="utf-8")
+        stat = rules_file.stat()
+        os.utime(rules_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        
+        assert index.reload_if_changed() is True
+        assert "twitter.com" in index
+        assert "facebook.com" not in index
+
 
 class TestIntegration:
     """Интеграционные тесты"""
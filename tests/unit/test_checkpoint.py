@@ -0,0 +1,133 @@
+"""
+Тесты журнала запуска и продолжения после сбоя
+"""
+
+import asyncio
+
+import pytest
+
+from src.availability.checker import AvailabilityResult, DomainStatus
+from src.filtering.pipeline import DomainFilteringPipeline
+from src.models.backlink import Backlink
+from src.runner import PipelinedAnalyzer
+from src.runner.checkpoint import PAGES_FILE, RunCheckpoint, new_run_id
+
+
+def _links(*domains):
+    return [
+        Backlink.from_keys_so({"source_name": d, "url": f"http://{d}/", "anchor": "casino" if "spam" in d else "a"})
+        for d in domains
+    ]
+
+
+PAGES = [_links("a.com", "spam.com"), _links("b.com", "a.com"), _links("c.com")]
+
+
+class FlakyClient:
+    """Отдает страницы; с fail_after - падает после указанного числа страниц"""
+    
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.requested = []
+    
+    async def iter_link_pages(self, endpoint, domain, limit=100000, as_records=True,
+                              keep_dates=False, start_page=1):
+        self.requested.append(start_page)
+        for number, page in enumerate(PAGES[start_page - 1:], start=start_page):
+            if self.fail_after is not None and number > self.fail_after:
+                raise ConnectionError("connection reset")
+            await asyncio.sleep(0)
+            yield page
+
+
+class CountingChecker:
+    def __init__(self):
+        self.checked = []
+    
+    async def check_domain(self, domain):
+        await asyncio.sleep(0)
+        self.checked.append(domain)
+        return AvailabilityResult(domain=domain, status=DomainStatus.AVAILABLE, checked_via="rdap")
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    spam_file = tmp_path / "spam.txt"
+    spam_file.write_text("casino\n", encoding="utf-8")
+    exclude_file = tmp_path / "excluded.txt"
+    exclude_file.write_text("", encoding="utf-8")
+    return DomainFilteringPipeline(
+        spam_phrases_file=str(spam_file),
+        excluded_domains_file=str(exclude_file),
+        fetch_metrics=False
+    )
+
+
+def test_journal_roundtrip_and_torn_tail(tmp_path):
+    """Тест: записи читаются обратно, оборванная строка отбрасывается"""
+    checkpoint = RunCheckpoint(str(tmp_path / "run")).open()
+    checkpoint.append_page("backlinks", 1, PAGES[0])
+    checkpoint.append_check(AvailabilityResult("a.com", DomainStatus.AVAILABLE, "rdap"))
+    checkpoint.append_check(AvailabilityResult("x.com", DomainStatus.ERROR, "error", "boom"))
+    checkpoint.close()
+    
+    # Сбой посреди записи
+    with open(tmp_path / "run" / PAGES_FILE, "a", encoding="utf-8") as f:
+        f.write('{"t":"backlinks","p":2,"links":[["http://b')
+    
+    checkpoint = RunCheckpoint(str(tmp_path / "run"))
+    pages = list(checkpoint.replay_pages())
+    assert [link.source_domain for link in pages[0][1]] == ["a.com", "spam.com"]
+    assert checkpoint.progress["backlinks"].pages == 1
+    # Ошибки проверки не сохраняются - их нужно повторить
+    assert list(checkpoint.load_checks()) == ["a.com"]
+    
+    checkpoint.open()
+    checkpoint.append_page("backlinks", 2, PAGES[1])
+    checkpoint.close()
+    assert len(list(checkpoint.replay_pages())) == 2
+    assert (tmp_path / "run" / PAGES_FILE).read_text(encoding="utf-8").endswith("\n")
+
+
+def test_new_run_id():
+    assert new_run_id("Example.COM").endswith("-example_com")
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_completed_work(tmp_path, pipeline):
+    """Тест: продолжение не запрашивает загруженные страницы и не проверяет домены повторно"""
+    run_dir = str(tmp_path / "runs" / "run1")
+    checker = CountingChecker()
+    analyzer = PipelinedAnalyzer(FlakyClient(fail_after=2), checker, pipeline)
+    
+    with pytest.raises(ConnectionError):
+        await analyzer.run("target.com", checkpoint=RunCheckpoint(run_dir))
+    assert RunCheckpoint(run_dir).read_meta()["status"] == "failed"
+    checked_before = set(checker.checked)
+    assert checked_before  # часть доменов проверена до сбоя
+    
+    client = FlakyClient()
+    resumed_checker = CountingChecker()
+    analyzer = PipelinedAnalyzer(client, resumed_checker, pipeline)
+    result = await analyzer.run("target.com", checkpoint=RunCheckpoint(run_dir))
+    
+    assert client.requested == [3]
+    assert not checked_before & set(resumed_checker.checked)
+    assert result.resumed_links == 4
+    assert result.links == 5
+    by_domain = {d.domain: d for d in result.filtered_domains}
+    assert set(by_domain) == {"a.com", "b.com", "c.com", "spam.com"}
+    assert by_domain["a.com"].backlink_count == 2
+    assert by_domain["spam.com"].is_spam is True
+    
+    meta = RunCheckpoint(run_dir).read_meta()
+    assert meta["status"] == "completed"
+    assert meta["target"] == "target.com"
+    
+    # Повторное продолжение завершенного запуска обходится без запросов
+    client = FlakyClient()
+    again = await PipelinedAnalyzer(client, CountingChecker(), pipeline).run(
+        "target.com", checkpoint=RunCheckpoint(run_dir)
+    )
+    assert client.requested == []
+    assert again.resumed_checks == 4
@@ -0,0 +1,84 @@
+"""
+Тесты для компактных моделей и DomainBatch
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.export.csv_exporter import CSVExporter
+from src.models import slots
+from src.models.domain_batch import DomainBatch
+from src.models.filtered_domain import FilteredDomain
+
+
+def _domains():
+    return [
+        FilteredDomain(
+            domain="spam.com", dr=15, backlink_count=3, is_spam=True,
+            spam_score=0.5, spam_ratio=0.25, availability_status="REGISTERED",
+            spam_anchor_examples=["casino"], checked_at=datetime(2024, 5, 1, 12, 0)
+        ),
+        FilteredDomain(domain="free.com", is_registered=False, availability_status="AVAILABLE"),
+        FilteredDomain(domain="odd.com", is_excluded=True, availability_status="PENDING"),
+    ]
+
+
+def test_models_have_no_instance_dict():
+    """Тест: у моделей нет __dict__, пустые примеры не аллоцируются"""
+    first, second = FilteredDomain("a.com"), FilteredDomain("b.com")
+    assert not hasattr(first, "__dict__")
+    assert first.spam_anchor_examples is second.spam_anchor_examples
+    assert first.to_dict()["spam_anchor_examples"] == []
+    with pytest.raises(AttributeError):
+        first.unknown_field = 1
+
+
+def test_slotted_fallback_for_old_python(monkeypatch):
+    """Тест пересоздания класса со __slots__ на Python < 3.10"""
+    monkeypatch.setattr(slots.sys, "version_info", (3, 8, 0))
+    
+    @slots.slotted_dataclass
+    class Point:
+        x: int
+        y: int = 2
+    
+    point = Point(1)
+    assert (point.x, point.y) == (1, 2)
+    assert Point.__slots__ == ("x", "y")
+    assert not hasattr(point, "__dict__")
+
+
+def test_batch_roundtrip():
+    """Тест: строки пакета совпадают с исходными доменами"""
+    domains = _domains()
+    batch = DomainBatch(domains)
+    
+    assert len(batch) == 3
+    for original, row in zip(domains, batch):
+        assert row.to_dict() == original.to_dict()
+    assert batch[-1].availability_status == "PENDING"
+    assert batch[0].spam_anchor_examples == ("casino",)
+    assert batch[1].dr is None and batch[1].spam_score is None
+    assert [row.is_valid for row in batch] == [False, True, False]
+    with pytest.raises(IndexError):
+        batch[3]
+
+
+def test_batch_rows_work_with_exporters(tmp_path):
+    """Тест: пакет можно передать экспортеру вместо списка"""
+    output = tmp_path / "report.csv"
+    CSVExporter.export(DomainBatch(_domains()), str(output), include_spam=True)
+    
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert [line.split(',')[0] for line in lines[1:]] == ["spam.com", "free.com"]
+
+
+def test_batch_interning():
+    """Тест интернирования строк доменов"""
+    name = "".join(["dup", ".com"])
+    batch = DomainBatch(
+        [FilteredDomain(name), FilteredDomain("".join(["dup", ".com"]))],
+        intern_domains=True
+    )
+    assert batch.domains[0] is batch.domains[1]
@@ -0,0 +1,141 @@
+"""
+Тесты реестра метрик запуска
+"""
+
+import asyncio
+
+import aiohttp
+import pytest
+
+from src.availability.checker import AvailabilityResult, DomainAvailabilityChecker, DomainStatus
+from src.runner.stages import MonitoredQueue
+from src.utils.metrics import Histogram, MetricsRegistry, format_prometheus, registry
+from src.utils.metrics_server import MetricsServer
+from src.utils.rate_limiter import AsyncRateLimiter
+
+
+def test_histogram_percentiles():
+    """Тест: перцентили - верхние границы корзин, max - точный"""
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    for value in [0.005] * 90 + [0.05] * 9 + [3.0]:
+        histogram.observe(value)
+
+    assert histogram.count == 100
+    assert histogram.percentile(50) == 0.01
+    assert histogram.percentile(95) == 0.1
+    assert histogram.percentile(100) == 3.0
+    assert histogram.to_dict()["buckets"] == {"le_0.01": 90, "le_0.1": 9, "inf": 1}
+
+
+def test_counters_by_labels_and_hit_ratio():
+    """Тест: счетчики различаются метками, доля попаданий кэша"""
+    metrics = MetricsRegistry()
+    metrics.inc("retries", service="rdap")
+    metrics.inc("retries", 2, service="whois")
+    metrics.inc("cache_hits", 3, cache="availability")
+    metrics.inc("cache_misses", cache="availability")
+
+    assert metrics.counter("retries", service="whois") == 2
+    assert metrics.total("retries") == 3
+    assert metrics.hit_ratio("availability") == 0.75
+    assert metrics.hit_ratio("unknown") is None
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["retries{service=rdap}"] == 1
+    assert snapshot["cache_hit_ratio"] == {"availability": 0.75}
+    assert any("availability" in line for line in metrics.format_lines())
+
+
+@pytest.mark.asyncio
+async def test_timer_records_awaited_block():
+    """Тест: timer замеряет блок с await"""
+    metrics = MetricsRegistry()
+    with metrics.timer("request", endpoint="backlinks"):
+        await asyncio.sleep(0.02)
+
+    histogram = metrics.histograms[("request", (("endpoint", "backlinks"),))]
+    assert histogram.count == 1
+    assert histogram.sum >= 0.015
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_wait_recorded():
+    """Тест: ожидание лимитера попадает в счетчик с его именем"""
+    registry.reset()
+    limiter = AsyncRateLimiter(rate=20, burst=1, name="test")
+
+    await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+
+    assert registry.counter("rate_limit_wait_seconds", limiter="test") >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_checker_dedup_counted_as_cache_hits():
+    """Тест: повторная проверка домена в shared-режиме - попадание кэша"""
+    registry.reset()
+    checker = DomainAvailabilityChecker(skip_rdap=True, shared=True)
+
+    async def fake_check(domain):
+        await asyncio.sleep(0.01)
+        return AvailabilityResult(domain=domain, status=DomainStatus.AVAILABLE, checked_via="rdap")
+
+    checker._check_domain = fake_check
+    await asyncio.gather(*(checker.check_domain(d) for d in ["a.com", "A.com", "b.com"]))
+
+    assert registry.counter("cache_hits", cache="availability") == 1
+    assert registry.counter("cache_misses", cache="availability") == 2
+    assert registry.counter("semaphore_wait_seconds", pool="availability") >= 0
+
+
+def test_prometheus_format():
+    """Тест: счетчики с _total, gauge, накопительные корзины гистограммы"""
+    metrics = MetricsRegistry()
+    metrics.inc("domains_checked", 2, method="rdap", status="AVAILABLE")
+    metrics.add("queue_depth", 3, queue="domains")
+    metrics.observe("rdap_request", 0.003, server="rdap.example")
+    metrics.observe("rdap_request", 0.2, server="rdap.example")
+
+    text = format_prometheus(metrics)
+
+    assert "# TYPE domain_analyzer_domains_checked_total counter" in text
+    assert 'domain_analyzer_domains_checked_total{method="rdap",status="AVAILABLE"} 2' in text
+    assert 'domain_analyzer_queue_depth{queue="domains"} 3' in text
+    assert "# TYPE domain_analyzer_rdap_request_seconds histogram" in text
+    assert 'domain_analyzer_rdap_request_seconds_bucket{server="rdap.example",le="0.0025"} 0' in text
+    assert 'domain_analyzer_rdap_request_seconds_bucket{server="rdap.example",le="0.005"} 1' in text
+    assert 'domain_analyzer_rdap_request_seconds_bucket{server="rdap.example",le="+Inf"} 2' in text
+    assert 'domain_analyzer_rdap_request_seconds_count{server="rdap.example"} 2' in text
+    assert text.count("# TYPE domain_analyzer_rdap_request_seconds") == 1
+
+
+def test_queue_depth_gauge():
+    """Тест: глубина именованной очереди отражается в gauge и сбрасывается discard"""
+    registry.reset()
+    queue = MonitoredQueue(10, name="domains")
+    for i in range(3):
+        queue.put_nowait(i)
+    queue.get_nowait()
+    assert registry.gauge("queue_depth", queue="domains") == 2
+
+    queue.discard()
+    assert registry.gauge("queue_depth", queue="domains") == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_serves_registry():
+    """Тест: /metrics отдает текущие значения реестра"""
+    metrics = MetricsRegistry()
+    metrics.inc("pages_fetched", endpoint="/report/simple/links/backlinks")
+
+    async with MetricsServer(0, metrics=metrics) as server:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{server.port}/metrics") as response:
+                assert response.status == 200
+                assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                first = await response.text()
+            metrics.inc("pages_fetched", endpoint="/report/simple/links/backlinks")
+            async with session.get(f"http://127.0.0.1:{server.port}/metrics") as response:
+                second = await response.text()
+
+    assert 'domain_analyzer_pages_fetched_total{endpoint="/report/simple/links/backlinks"} 1' in first
+    assert 'domain_analyzer_pages_fetched_total{endpoint="/report/simple/links/backlinks"} 2' in second
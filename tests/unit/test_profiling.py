@@ -0,0 +1,80 @@
+"""
+Тесты режимов профилирования запуска
+"""
+
+import asyncio
+import pstats
+
+import pytest
+
+from src.runner import PipelinedAnalyzer
+from src.utils.profiling import AsyncProfiler, CPUProfiler, MemoryProfiler, create_profiler
+
+from .test_runner import PAGES, FakeChecker, FakeClient, pipeline  # noqa: F401
+
+
+def _analyzer(pipeline, profiler):
+    return PipelinedAnalyzer(
+        FakeClient(PAGES, delay=0.005),
+        FakeChecker(available={"free.net"}, delay=0.01),
+        pipeline,
+        link_types=['backlinks', 'outlinks'],
+        check_workers=2,
+        stage_listener=profiler.stage_boundary
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_profiler_attributes_wait(pipeline, tmp_path):
+    """Тест: ожидание задач приписывается их корутинам"""
+    profiler = AsyncProfiler()
+    profiler.start()
+    await _analyzer(pipeline, profiler).run("target.com")
+    profiler.stop()
+
+    workers = profiler.coroutines["PipelinedAnalyzer._run.check_worker"]
+    assert workers.tasks == 2 and workers.done == 2
+    # Воркеры почти все время ждут проверок (sleep), а не выполняются
+    assert workers.waiting > workers.busy
+
+    summary, = profiler.write(str(tmp_path))
+    text = (tmp_path / "profile_async.txt").read_text(encoding="utf-8")
+    assert summary.endswith("profile_async.txt")
+    assert "PipelinedAnalyzer._run.check_worker" in text
+    assert asyncio.get_running_loop().get_task_factory() is None
+
+
+@pytest.mark.asyncio
+async def test_memory_profiler_snapshots_stage_boundaries(pipeline, tmp_path):
+    """Тест: снимок памяти на каждой границе стадий"""
+    profiler = MemoryProfiler(top=3)
+    profiler.start()
+    await _analyzer(pipeline, profiler).run("target.com")
+    profiler.stop()
+
+    summary, = profiler.write(str(tmp_path))
+    lines = open(summary, encoding="utf-8").read().splitlines()
+    boundaries = [line for line in lines if line.startswith("== ")]
+    assert boundaries[0].startswith("== start")
+    assert any(line.startswith("== target.com: collect finish") for line in boundaries)
+    assert any(line.startswith("== target.com: export finish") for line in boundaries)
+
+
+@pytest.mark.asyncio
+async def test_cpu_profiler_writes_pstats_and_collapsed(pipeline, tmp_path):
+    """Тест: pstats читается, collapsed stacks - строки 'стек число'"""
+    profiler = CPUProfiler(sample_interval=0.001)
+    profiler.start()
+    await _analyzer(pipeline, profiler).run("target.com")
+    profiler.stop()
+
+    summary, pstats_file, collapsed_file = profiler.write(str(tmp_path))
+    assert pstats.Stats(pstats_file).total_calls > 0
+    lines = open(collapsed_file, encoding="utf-8").read().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert profiler.summary_lines()[0].startswith("CPU:")
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        create_profiler("gpu")
@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+import pytest
+
+from src.utils.rate_limiter import AsyncRateLimiter
+
+
+@pytest.mark.asyncio
+async def test_burst_then_rate():
+    """Тест: burst запросов сразу, остальные - с заданной частотой"""
+    limiter = AsyncRateLimiter(rate=20, burst=3)
+    
+    started = time.monotonic()
+    await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+    elapsed = time.monotonic() - started
+    
+    # 3 токена сразу + 2 запроса по 50 мс
+    assert 0.08 <= elapsed < 0.5
+    assert limiter.waits >= 1
+
+
+@pytest.mark.asyncio
+async def test_pause_blocks_all_requests():
+    """Тест: пауза после 429 задерживает следующие запросы"""
+    limiter = AsyncRateLimiter(rate=0)
+    
+    await limiter.acquire()
+    limiter.pause(0.1)
+    
+    started = time.monotonic()
+    await limiter.acquire()
+    assert time.monotonic() - started >= 0.09
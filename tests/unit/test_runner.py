@@ -0,0 +1,358 @@
+"""
+Тесты конвейерного запуска анализа
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.availability.checker import AvailabilityResult, DomainStatus
+from src.filtering.pipeline import DomainFilteringPipeline
+from src.models.backlink import Backlink
+from src.models.filtered_domain import FilteredDomain
+from src.runner import BatchRunner, CombinedReport, PipelinedAnalyzer, format_stage_table, load_targets
+
+
+class FakeClient:
+    """Отдает заранее заданные страницы ссылок с задержкой"""
+    
+    def __init__(self, pages, delay=0.0):
+        self.pages = pages
+        self.delay = delay
+        self.requested = []
+    
+    async def iter_link_pages(self, endpoint, domain, limit=100000, as_records=True,
+                              keep_dates=False, start_page=1):
+        self.requested.append((endpoint, start_page))
+        for page in self.pages.get(endpoint, [])[start_page - 1:]:
+            await asyncio.sleep(self.delay)
+            yield [Backlink.from_keys_so(item) for item in page]
+
+
+class FakeChecker:
+    """Проверка доступности с задержкой; домены из available - свободны"""
+    
+    def __init__(self, available=(), failing=(), delay=0.0, lookups=None):
+        self.available = set(available)
+        self.failing = set(failing)
+        self.delay = delay
+        self.lookups = lookups or {}  # Запросов к RDAP/WHOIS по домену (по умолчанию 1)
+        self.checked = []
+    
+    async def check_domain(self, domain):
+        await asyncio.sleep(self.delay)
+        self.checked.append(domain)
+        if domain in self.failing:
+            raise RuntimeError("boom")
+        status = DomainStatus.AVAILABLE if domain in self.available else DomainStatus.REGISTERED
+        return AvailabilityResult(
+            domain=domain, status=status, checked_via="rdap",
+            lookups=self.lookups.get(domain, 1)
+        )
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    spam_file = tmp_path / "spam.txt"
+    spam_file.write_text("casino\n", encoding="utf-8")
+    exclude_file = tmp_path / "excluded.txt"
+    exclude_file.write_text("facebook.com\n", encoding="utf-8")
+    return DomainFilteringPipeline(
+        spam_phrases_file=str(spam_file),
+        excluded_domains_file=str(exclude_file),
+        fetch_metrics=False
+    )
+
+
+PAGES = {
+    'backlinks': [
+        [
+            {"source_name": "www.spam.com", "url": "http://spam.com/a", "anchor": "Best Casino"},
+            {"source_name": "clean.com", "url": "http://clean.com/", "anchor": "news"},
+        ],
+        [
+            {"source_name": "spam.com", "url": "http://spam.com/b", "anchor": "news"},
+            {"source_name": "blog.clean.com", "url": "http://blog.clean.com/", "anchor": "x"},
+            {"source_name": "facebook.com", "url": "http://facebook.com/", "anchor": "share"},
+        ],
+    ],
+    'outlinks': [
+        [{"source_name": "free.net", "url": "http://free.net/", "anchor": "link"}],
+    ],
+}
+
+
+@pytest.mark.asyncio
+async def test_run_matches_batch_pipeline(pipeline):
+    """Тест: результат конвейера совпадает с пакетной обработкой"""
+    checker = FakeChecker(available={"free.net"})
+    analyzer = PipelinedAnalyzer(
+        FakeClient(PAGES),
+        checker,
+        pipeline,
+        link_types=['backlinks', 'outlinks'],
+        check_workers=2,
+        queue_size=2,
+        keep_links=True
+    )
+    
+    result = await analyzer.run("target.com")
+    by_domain = {d.domain: d for d in result.filtered_domains}
+    
+    assert sorted(checker.checked) == ["clean.com", "facebook.com", "free.net", "spam.com"]
+    assert result.links == 6
+    assert len(result.all_links) == 6
+    assert result.domains == 4
+    assert result.registered == 3
+    assert result.available == 1
+    assert by_domain["spam.com"].is_spam is True
+    assert by_domain["spam.com"].backlink_count == 2
+    assert by_domain["facebook.com"].is_excluded is True
+    assert by_domain["free.net"].is_registered is False
+    assert result.valid == sum(1 for d in result.filtered_domains if d.is_valid)
+
+
+@pytest.mark.asyncio
+async def test_check_errors_become_error_status(pipeline):
+    """Тест: ошибка проверки не останавливает конвейер"""
+    analyzer = PipelinedAnalyzer(
+        FakeClient(PAGES),
+        FakeChecker(failing={"clean.com"}),
+        pipeline
+    )
+    
+    result = await analyzer.run("target.com")
+    by_domain = {d.domain: d for d in result.filtered_domains}
+    
+    assert result.errors == 1
+    assert by_domain["clean.com"].availability_status == "ERROR"
+
+
+@pytest.mark.asyncio
+async def test_export_receives_stream(pipeline):
+    """Тест: экспорт получает домены асинхронным потоком"""
+    async def export(domains):
+        return [d.domain async for d in domains]
+    
+    analyzer = PipelinedAnalyzer(FakeClient(PAGES), FakeChecker(), pipeline)
+    result = await analyzer.run("target.com", export=export)
+    
+    assert sorted(result.export_result) == ["clean.com", "facebook.com", "spam.com"]
+    assert result.filtered_domains == []
+    stages = {s.name: s for s in result.stages}
+    assert stages["collect"].items == 5
+    assert stages["check"].items == 3
+    assert stages["export"].items == 3
+    assert len(format_stage_table(result.stages)) == len(result.stages) + 1
+
+
+@pytest.mark.asyncio
+async def test_stages_overlap(pipeline):
+    """Тест: проверка доменов идет параллельно со сбором ссылок"""
+    pages = {
+        'backlinks': [
+            [{"source_name": f"site{i}.com", "url": f"http://site{i}.com/", "anchor": "a"}]
+            for i in range(10)
+        ]
+    }
+    analyzer = PipelinedAnalyzer(
+        FakeClient(pages, delay=0.03),
+        FakeChecker(delay=0.03),
+        pipeline,
+        check_workers=1
+    )
+    
+    started = time.perf_counter()
+    result = await analyzer.run("target.com")
+    elapsed = time.perf_counter() - started
+    
+    # Последовательно: 10 * 0.03 + 10 * 0.03 = 0.6 s
+    assert len(result.filtered_domains) == 10
+    assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_collect_error_cancels_stages(pipeline):
+    """Тест: ошибка сбора ссылок прерывает запуск"""
+    class BrokenClient:
+        async def iter_link_pages(self, *args, **kwargs):
+            yield [Backlink.from_keys_so({"source_name": "a.com", "url": "http://a.com/"})]
+            raise RuntimeError("api down")
+    
+    analyzer = PipelinedAnalyzer(BrokenClient(), FakeChecker(delay=0.01), pipeline)
+    
+    with pytest.raises(RuntimeError, match="api down"):
+        await analyzer.run("target.com")
+
+
+VALUED_PAGES = {
+    'backlinks': [
+        [
+            {"source_name": "low.com", "url": "http://low.com/", "source_dr": 5},
+            {"source_name": "mid.com", "url": "http://mid.com/", "source_dr": 40},
+            {"source_name": "top.com", "url": "http://top.com/", "source_dr": 80},
+            {"source_name": "many.com", "url": "http://many.com/1", "source_dr": 40},
+            {"source_name": "www.many.com", "url": "http://many.com/2", "source_dr": 40},
+            {"source_name": "nodr.com", "url": "http://nodr.com/"},
+        ],
+    ],
+}
+
+
+@pytest.mark.asyncio
+async def test_checks_ordered_by_value(pipeline):
+    """Тест: сначала домены с большим DR, при равном DR - с большим числом ссылок"""
+    checker = FakeChecker(delay=0.001)
+    analyzer = PipelinedAnalyzer(FakeClient(VALUED_PAGES), checker, pipeline, check_workers=1)
+    
+    result = await analyzer.run("target.com")
+    
+    assert checker.checked == ["top.com", "many.com", "mid.com", "low.com", "nodr.com"]
+    assert result.unchecked == 0
+
+
+@pytest.mark.asyncio
+async def test_priority_follows_value_from_later_pages(pipeline):
+    """Тест: домен, набравший ценность на следующих страницах, переставляется в очереди"""
+    pages = {
+        'backlinks': [
+            [
+                {"source_name": "low.com", "url": "http://low.com/", "source_dr": 10},
+                {"source_name": "mid.com", "url": "http://mid.com/", "source_dr": 20},
+                {"source_name": "top.com", "url": "http://top.com/", "source_dr": 30},
+            ],
+            [
+                {"source_name": "low.com", "url": "http://low.com/2", "source_dr": 90},
+            ],
+        ],
+    }
+    checker = FakeChecker(delay=0.05)
+    analyzer = PipelinedAnalyzer(FakeClient(pages, delay=0.01), checker, pipeline, check_workers=1)
+    
+    result = await analyzer.run("target.com")
+    
+    # top.com уже проверяется, когда приходит вторая страница
+    assert checker.checked == ["top.com", "low.com", "mid.com"]
+    assert result.domains == 3
+
+
+@pytest.mark.asyncio
+async def test_check_budget_stops_lookups(pipeline):
+    """Тест: после check_budget проверок остальные домены не проверяются"""
+    checker = FakeChecker(available={"top.com"}, delay=0.001)
+    analyzer = PipelinedAnalyzer(
+        FakeClient(VALUED_PAGES), checker, pipeline, check_workers=2, check_budget=2
+    )
+    
+    result = await analyzer.run("target.com")
+    
+    assert sorted(checker.checked) == ["many.com", "top.com"]
+    assert result.domains == 5
+    assert result.unchecked == 3
+    assert sorted(d.domain for d in result.filtered_domains) == ["many.com", "top.com"]
+    assert result.available == 1
+    assert result.to_dict()["unchecked"] == 3
+
+
+@pytest.mark.asyncio
+async def test_check_budget_counts_external_requests(pipeline):
+    """Тест: бюджет тратят запросы к RDAP/WHOIS, а не проверенные домены"""
+    # top.com - RDAP с переходом на WHOIS, many.com и mid.com - ответ DNS
+    checker = FakeChecker(delay=0.001, lookups={"top.com": 2, "many.com": 0, "mid.com": 0})
+    analyzer = PipelinedAnalyzer(
+        FakeClient(VALUED_PAGES), checker, pipeline, check_workers=1, check_budget=3
+    )
+    
+    result = await analyzer.run("target.com")
+    
+    assert checker.checked == ["top.com", "many.com", "mid.com", "low.com"]
+    assert result.unchecked == 1
+
+
+@pytest.mark.asyncio
+async def test_discovery_order_without_priority(pipeline):
+    """Тест: check_priority=None - проверка в порядке появления доменов"""
+    checker = FakeChecker(delay=0.001)
+    analyzer = PipelinedAnalyzer(
+        FakeClient(VALUED_PAGES), checker, pipeline, check_workers=1, check_priority=None
+    )
+    
+    await analyzer.run("target.com")
+    
+    assert checker.checked == ["low.com", "mid.com", "top.com", "many.com", "nodr.com"]
+
+
+def test_load_targets(tmp_path):
+    """Тест чтения файла целей"""
+    path = tmp_path / "targets.txt"
+    path.write_text(
+        "# клиенты\nexample.com\nhttps://www.Example.com/page\n\nshop.org  # магазин\n",
+        encoding="utf-8"
+    )
+    assert load_targets(str(path)) == ["example.com", "shop.org"]
+
+
+def test_combined_report_merges_targets():
+    """Тест сводного отчета: одна запись на домен"""
+    report = CombinedReport()
+    first = FilteredDomain(domain="a.com", backlink_count=2, dr=10)
+    report.add(first)
+    report.add(FilteredDomain(domain="b.com", backlink_count=1))
+    report.add(FilteredDomain(
+        domain="a.com", backlink_count=3, dr=30, is_spam=True,
+        spam_score=0.5, spam_anchor_examples=("casino",)
+    ))
+    
+    by_domain = {d.domain: d for d in report.domains()}
+    assert len(report) == 2
+    assert by_domain["a.com"].backlink_count == 5
+    assert by_domain["a.com"].dr == 30
+    assert by_domain["a.com"].is_spam is True
+    assert by_domain["a.com"].spam_anchor_examples == ("casino",)
+    # Исходная запись цели не меняется
+    assert first.backlink_count == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_runner_shares_checks(pipeline):
+    """Тест пакетного режима: общий чекер, отчет по цели и сводный"""
+    class TargetClient:
+        async def iter_link_pages(self, endpoint, domain, **kwargs):
+            if domain == "broken.com":
+                raise RuntimeError("api down")
+            yield [
+                Backlink.from_keys_so({"source_name": "shared.com", "url": "http://shared.com/"}),
+                Backlink.from_keys_so({"source_name": f"only-{domain}", "url": "http://x/"}),
+            ]
+    
+    from src.availability.checker import DomainAvailabilityChecker
+    checker = DomainAvailabilityChecker(skip_rdap=True, shared=True)
+    calls = []
+    
+    async def check(domain):
+        calls.append(domain)
+        await asyncio.sleep(0.01)
+        return AvailabilityResult(domain=domain, status=DomainStatus.REGISTERED, checked_via="rdap")
+    
+    checker._check_domain = check
+    reports = {}
+    
+    def export_for(target):
+        async def export(domains):
+            reports[target] = [d.domain async for d in domains]
+            return {"csv": f"{target}.csv"}
+        return export
+    
+    analyzer = PipelinedAnalyzer(TargetClient(), checker, pipeline)
+    batch = await BatchRunner(analyzer, concurrency=2).run(
+        ["a.com", "b.com", "broken.com"], export_for=export_for
+    )
+    
+    assert [o.ok for o in batch.outcomes] == [True, True, False]
+    assert sorted(reports["a.com"]) == ["only-a.com", "shared.com"]
+    assert calls.count("shared.com") == 1
+    assert checker.dedup_hits == 1
+    by_domain = {d.domain: d for d in batch.combined.domains()}
+    assert set(by_domain) == {"shared.com", "only-a.com", "only-b.com"}
+    assert by_domain["shared.com"].backlink_count == 2
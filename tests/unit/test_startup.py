@@ -0,0 +1,37 @@
+"""
+Тесты ленивых импортов: модули CLI не загружают HTTP- и офисные библиотеки
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _loaded_after(code: str, modules) -> list:
+    check = (
+        f"{code}\n"
+        "import sys\n"
+        f"print(','.join(m for m in {list(modules)!r} if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", check], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout.strip()
+    return [m for m in output.split(",") if m]
+
+
+def test_cli_imports_are_light():
+    """Тест: импорт domain_analyzer не загружает aiohttp, openpyxl, pyarrow, tldextract"""
+    assert _loaded_after(
+        "import domain_analyzer", ["aiohttp", "aiosqlite", "openpyxl", "pyarrow", "tldextract"]
+    ) == []
+
+
+def test_csv_writer_does_not_load_other_formats():
+    """Тест: писатель CSV создается без импорта openpyxl и pyarrow"""
+    assert _loaded_after(
+        "from src.export.fanout import create_writer\n"
+        "create_writer('csv', '/tmp/report.csv')",
+        ["openpyxl", "pyarrow"]
+    ) == []
@@ -0,0 +1,65 @@
+"""
+Тесты списка публичных суффиксов из локального снимка
+"""
+
+import pytest
+
+from src.domain.suffixes import PublicSuffixList, default_suffixes, parse_psl
+
+PSL = """
+// VERSION: test
+// ===BEGIN ICANN DOMAINS===
+com
+io
+uk
+co.uk
+рф
+*.ck
+!www.ck
+jp
+kawasaki.jp
+*.kawasaki.jp
+!city.kawasaki.jp
+// ===END ICANN DOMAINS===
+// ===BEGIN PRIVATE DOMAINS===
+github.io
+"""
+
+
+@pytest.fixture
+def suffixes():
+    return PublicSuffixList.from_snapshot(parse_psl(PSL))
+
+
+@pytest.mark.parametrize("domain, expected", [
+    ("example.com", ("example", "com")),
+    ("blog.example.co.uk", ("blog.example", "co.uk")),
+    ("foo.bar.ck", ("foo", "bar.ck")),
+    ("www.ck", ("www", "ck")),
+    ("a.b.kawasaki.jp", ("a", "b.kawasaki.jp")),
+    ("city.kawasaki.jp", ("city", "kawasaki.jp")),
+    ("xn--e1afmkfd.xn--p1ai", ("xn--e1afmkfd", "xn--p1ai")),
+    ("Example.COM.", ("example", "com")),
+    ("foo.unknowntld", ("foo.unknowntld", "")),
+    # Частные домены в снимок не входят (как в tldextract по умолчанию)
+    ("user.github.io", ("user.github", "io")),
+])
+def test_split(suffixes, domain, expected):
+    assert suffixes.split(domain) == expected
+
+
+def test_registrable(suffixes):
+    assert suffixes.registrable("blog.example.co.uk") == ("example", "co.uk")
+    assert suffixes.registrable("co.uk") is None
+    assert suffixes.registrable("foo.unknowntld") is None
+
+
+def test_snapshot_matches_tldextract():
+    """Тест: снимок в data/ дает те же суффиксы, что tldextract"""
+    tldextract = pytest.importorskip("tldextract")
+    extract = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+    suffixes = default_suffixes()
+    for domain in ["example.com", "test.co.uk", "пример.рф", "site.com.br", "a.b.kawasaki.jp",
+                   "shop.msk.ru", "foo.bar.ck", "x.blogspot.com"]:
+        result = extract(domain)
+        assert suffixes.registrable(domain) == (result.domain, result.suffix)